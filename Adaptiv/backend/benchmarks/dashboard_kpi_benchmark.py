@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Dashboard summary benchmark: ORM row loading vs the one-statement KPI query.
+
+Times the previous DashboardService.get_dashboard_summary body (two count()
+queries, every order of the window loaded as an ORM object and summed in
+Python, then a separate top-item query) against
+AnalyticsService.get_kpi_summary on one large tenant, reporting latency,
+peak Python memory (tracemalloc) and SQL statements per call. Both must
+return the same numbers.
+
+If no tenant has at least --orders orders, one is generated with
+benchmarks.synthetic_dataset first. --days widens the window; with 365 the
+legacy path hydrates the whole tenant.
+
+Usage:
+    python -m benchmarks.dashboard_kpi_benchmark
+    python -m benchmarks.dashboard_kpi_benchmark --database-url sqlite:///benchmarks/synthetic.db --days 365
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+# Allow running as a script from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from benchmarks.synthetic_dataset import DatasetSpec, SyntheticDatasetGenerator
+from config.database import Base
+from services.analytics_service import AnalyticsService
+
+
+def legacy_summary(db, user_id, days):
+    """The summary as previously computed, with ORM objects for the window's orders"""
+    total_items = db.query(models.Item).filter(models.Item.user_id == user_id).count()
+    total_orders = db.query(models.Order).filter(models.Order.user_id == user_id).count()
+
+    since = datetime.now() - timedelta(days=days)
+    recent_orders = db.query(models.Order).filter(
+        models.Order.user_id == user_id,
+        models.Order.order_date >= since
+    ).all()
+    total_revenue = sum(order.total_amount or 0 for order in recent_orders)
+
+    top_item = db.query(
+        models.Item.name,
+        func.sum(models.OrderItem.quantity).label('total_sold')
+    ).join(
+        models.OrderItem, models.Item.id == models.OrderItem.item_id
+    ).join(
+        models.Order, models.OrderItem.order_id == models.Order.id
+    ).filter(
+        models.Item.user_id == user_id,
+        models.Order.order_date >= since
+    ).group_by(
+        models.Item.id, models.Item.name
+    ).order_by(
+        func.sum(models.OrderItem.quantity).desc(), models.Item.id
+    ).first()
+
+    return {
+        'total_items': total_items,
+        'total_orders': total_orders,
+        'recent_orders_count': len(recent_orders),
+        'total_revenue': round(total_revenue, 2),
+        'top_selling_item': top_item.name if top_item else None,
+    }
+
+
+def kpi_summary(db, user_id, days):
+    kpis = AnalyticsService(db).get_kpi_summary(user_id, days=days)
+    return {key: round(kpis[key], 2) if key == 'total_revenue' else kpis[key]
+            for key in ('total_items', 'total_orders', 'recent_orders_count', 'total_revenue', 'top_selling_item')}
+
+
+def largest_tenant(db, min_orders):
+    row = db.query(models.Order.user_id, func.count(models.Order.id).label('orders')) \
+        .group_by(models.Order.user_id).order_by(func.count(models.Order.id).desc()).first()
+    return row.user_id if row and row.orders >= min_orders else None
+
+
+def measure(session_factory, queries, fn, user_id, days, iterations):
+    """Median latency (ms), peak traced memory (KB) and statements per call, each in a fresh Session"""
+    samples, peaks = [], []
+    for _ in range(iterations):
+        db = session_factory()
+        try:
+            queries.clear()
+            tracemalloc.start()
+            started = time.perf_counter()
+            result = fn(db, user_id, days)
+            samples.append((time.perf_counter() - started) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+        finally:
+            db.close()
+    return result, statistics.median(samples), max(peaks), len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the ORM dashboard summary with the aggregate KPI query")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///benchmarks/synthetic.db"))
+    parser.add_argument("--user-id", type=int, help="Tenant to summarize (default: the one with most orders)")
+    parser.add_argument("--orders", type=int, default=100000, help="Orders for the generated tenant")
+    parser.add_argument("--days", type=int, default=30, help="Summary window")
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *a: queries.append(a[2]))
+
+    user_id = args.user_id
+    if user_id is None:
+        with session_factory() as db:
+            user_id = largest_tenant(db, args.orders)
+        if user_id is None:
+            spec = DatasetSpec(users=1, items_per_user=80, orders_per_user=args.orders, seed=100)
+            SyntheticDatasetGenerator(engine, spec).generate()
+            with session_factory() as db:
+                user_id = largest_tenant(db, args.orders)
+
+    with session_factory() as db:
+        order_count = db.query(func.count(models.Order.id)).filter(models.Order.user_id == user_id).scalar()
+    print(f"tenant {user_id}: {order_count} orders, {args.days}-day window")
+
+    print(f"{'path':<12} {'p50':>10} {'peak mem':>11} {'queries':>8}")
+    results = {}
+    for name, fn in (("orm", legacy_summary), ("kpi", kpi_summary)):
+        results[name], p50, peak, statements = measure(
+            session_factory, queries, fn, user_id, args.days, args.iterations
+        )
+        print(f"{name:<12} {p50:8.2f}ms {peak:9.1f}KB {statements:8d}")
+
+    # Both paths must report the same summary
+    assert results["orm"] == results["kpi"], results
+    print(f"summary: {results['kpi']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Local stand-ins for external services used by the benchmark harness.
+
+- FakeLLMServer: an OpenAI-compatible /v1/chat/completions endpoint on
+  localhost that answers instantly with a fixed JSON body, so agent
+  benchmarks measure our code rather than model latency
+- MockSquareAPI / MockSquareService: serves a tenant's catalog and paginated
+  SearchOrders results, so sync_square_catalog and sync_square_orders run
+  end to end offline
+- FakeSearchBackend: a Tavily-compatible search() with a configurable
+  delay that counts calls, for the agent web search cache
+- FakeGeminiModel: generate_content() answering competitor price prompts
+  after a delay, for the competitor price refresh
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.square_service import SquareService
+
+DEFAULT_LLM_CONTENT = json.dumps({"recommendations": []})
+
+
+class FakeLLMServer:
+    """
+    OpenAI-compatible chat completions endpoint on a free localhost port.
+
+    Usage:
+        with FakeLLMServer() as llm:
+            client = OpenAI(api_key="test", base_url=llm.base_url)
+    """
+
+    def __init__(self, content: str = DEFAULT_LLM_CONTENT):
+        self.content = content
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def __enter__(self) -> "FakeLLMServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with fake._lock:
+                    fake.requests += 1
+                payload = json.dumps({
+                    "id": "chatcmpl-benchmark",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": fake.content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeSearchBackend:
+    """
+    Tavily client stand-in: search() sleeps `latency` seconds and returns a
+    deterministic Tavily-shaped response for the query. `calls` lists every
+    query that reached the backend.
+    """
+
+    def __init__(self, latency: float = 0.0, results: int = 5):
+        self.latency = latency
+        self.results = results
+        self.calls: List[str] = []
+        self._lock = threading.Lock()
+
+    def search(self, query: str, **params) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append(query)
+        if self.latency:
+            time.sleep(self.latency)
+        return {
+            "query": query,
+            "answer": f"Summary for {query}",
+            "results": [
+                {
+                    "title": f"Result {n} for {query}",
+                    "url": f"https://search.test/{n}",
+                    "content": f"{query} " * 80,
+                    "raw_content": f"{query} " * 2000,
+                    "score": round(0.95 - n * 0.1, 2),
+                }
+                for n in range(self.results)
+            ],
+        }
+
+
+class FakeGeminiModel:
+    """
+    Stand-in for genai.GenerativeModel: generate_content() sleeps `latency`
+    seconds and answers a competitor price prompt with two sources whose
+    prices derive from the product name. `prompts` counts the calls.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.prompts: List[str] = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str):
+        with self._lock:
+            self.prompts.append(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        product = prompt.split('"')[1] if '"' in prompt else "item"
+        base = 3 + len(product) % 5
+        body = {
+            "competitors": [
+                {"source": "Corner Cafe", "product_name": product, "price": base + 0.5},
+                {"source": "Bean Co", "product_name": product, "price": f"${base:.2f}"},
+            ],
+            "market_analysis": {"average_price": base + 0.25, "confidence": "medium"},
+        }
+
+        class Response:
+            text = f"Here is what I found:\n{json.dumps(body)}"
+
+        return Response()
+
+
+class MockSquareAPI:
+    """
+    Deterministic in-memory Square API for one tenant.
+
+    Generates `order_count` COMPLETED orders over the last `days` days whose
+    line items reference the given catalog object ids, and serves them through
+    /v2/orders/search with the same cursor pagination and `limit` semantics
+    as Square. Each catalog object id is also a single-variation ITEM served
+    by /v2/catalog/list and /v2/catalog/search; tests edit `catalog` and
+    call `touch` to simulate merchant changes.
+    """
+
+    def __init__(self, catalog_ids: List[str], location_ids: List[str], order_count: int = 1000,
+                 days: int = 30, seed: int = 7, now: Optional[datetime] = None):
+        rng = np.random.default_rng(seed)
+        now = now or datetime.now(timezone.utc)
+        offsets = np.sort(rng.uniform(0, days * 86400, size=order_count))[::-1]
+        self.orders: List[Dict[str, Any]] = []
+        for n, offset in enumerate(offsets):
+            created = now - timedelta(seconds=float(offset))
+            line_count = int(rng.integers(1, 4))
+            line_items = []
+            total = 0
+            for _ in range(line_count):
+                price_cents = int(rng.integers(250, 1400))
+                quantity = int(rng.choice([1, 1, 1, 2]))
+                total += price_cents * quantity
+                line_items.append({
+                    "catalog_object_id": catalog_ids[int(rng.integers(0, len(catalog_ids)))],
+                    "quantity": str(quantity),
+                    "base_price_money": {"amount": price_cents, "currency": "USD"}
+                })
+            timestamp = created.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+            self.orders.append({
+                "id": f"MOCKORDER-{seed}-{n}",
+                "location_id": location_ids[n % len(location_ids)],
+                "created_at": timestamp,
+                "closed_at": timestamp,
+                "state": "COMPLETED",
+                "line_items": line_items,
+                "total_money": {"amount": total, "currency": "USD"}
+            })
+        self.location_ids = location_ids
+        self.requests = 0
+        stamp = now.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        self.catalog: List[Dict[str, Any]] = [{
+            "type": "ITEM",
+            "id": f"ITEM-{variation_id}",
+            "updated_at": stamp,
+            "is_deleted": False,
+            "item_data": {
+                "name": f"Item {n}",
+                "variations": [{
+                    "type": "ITEM_VARIATION",
+                    "id": variation_id,
+                    "item_variation_data": {
+                        "name": "Regular",
+                        "price_money": {"amount": int(rng.integers(250, 1400)), "currency": "USD"}
+                    }
+                }]
+            }
+        } for n, variation_id in enumerate(catalog_ids)]
+
+    def touch(self, catalog_object: Dict[str, Any], when: Optional[datetime] = None) -> None:
+        """Mark a catalog object as updated, as Square does on every edit"""
+        when = when or datetime.now(timezone.utc)
+        catalog_object["updated_at"] = when.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+    def handle(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None) -> Dict[str, Any]:
+        self.requests += 1
+        if endpoint == '/v2/locations':
+            return {"locations": [{"id": location_id} for location_id in self.location_ids]}
+        if endpoint == '/v2/orders/search':
+            return self._search_orders(data or {})
+        if endpoint == '/v2/catalog/list':
+            live = [obj for obj in self.catalog if not obj["is_deleted"]]
+            return self._page(live, "objects", (data or {}).get('cursor'), 100)
+        if endpoint == '/v2/catalog/search':
+            return self._search_catalog(data or {})
+        raise ValueError(f"MockSquareAPI does not implement {method} {endpoint}")
+
+    def _search_catalog(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        begin_time = body.get('begin_time')
+        matching = [
+            obj for obj in self.catalog
+            if (begin_time is None or obj["updated_at"] >= begin_time)
+            and (body.get('include_deleted_objects') or not obj["is_deleted"])
+        ]
+        matching.sort(key=lambda obj: obj["updated_at"])
+        response = self._page(matching, "objects", body.get('cursor'), int(body.get('limit') or 100))
+        response["latest_time"] = max((obj["updated_at"] for obj in self.catalog), default=None)
+        return response
+
+    def _page(self, rows: List[Dict[str, Any]], key: str, cursor: Optional[str], limit: int) -> Dict[str, Any]:
+        offset = int(cursor or 0)
+        response: Dict[str, Any] = {key: rows[offset:offset + limit]}
+        if offset + limit < len(rows):
+            response["cursor"] = str(offset + limit)
+        return response
+
+    def _search_orders(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        start_at = body.get('query', {}).get('filter', {}).get('date_time_filter', {}) \
+            .get('closed_at', {}).get('start_at')
+        start = datetime.fromisoformat(start_at.replace('Z', '+00:00')) if start_at else None
+        matching = [
+            order for order in self.orders
+            if start is None or datetime.fromisoformat(order['closed_at'].replace('Z', '+00:00')) >= start
+        ]
+        matching.sort(key=lambda order: order['closed_at'])
+
+        return self._page(matching, "orders", body.get('cursor'), int(body.get('limit') or 500))
+
+
+class MockSquareService(SquareService):
+    """SquareService whose HTTP calls are answered by a MockSquareAPI"""
+
+    def __init__(self, db, mock_api: MockSquareAPI):
+        super().__init__(db)
+        self.mock_api = mock_api
+
+    def _make_square_request(self, endpoint: str, access_token: str, method: str = 'GET', data: Dict = None) -> Dict[str, Any]:
+        return self.mock_api.handle(endpoint, method, data)
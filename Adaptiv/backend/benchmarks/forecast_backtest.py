@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Forecast backtest: hold out the last days of every item's daily revenue,
+fit both forecasting methods on the rest and report MAPE per method, plus
+fit time for all items and the latency of cached forecasts.
+
+Usage:
+    python -m benchmarks.forecast_backtest
+    python -m benchmarks.forecast_backtest --database-url sqlite:///benchmarks/synthetic.db --holdout 14
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Allow running as a script from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from config.database import Base
+from services.cache_service import cache_service
+from services.forecast_service import ForecastService, HISTORY_DAYS, BACKTEST_DAYS
+
+
+def _fmt(value):
+    return f"{value:8.2f}%" if value is not None else "      n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the item revenue forecasting models")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///benchmarks/synthetic.db"))
+    parser.add_argument("--days", type=int, default=HISTORY_DAYS, help="Days of history per series")
+    parser.add_argument("--holdout", type=int, default=BACKTEST_DAYS, help="Days held out for scoring")
+    parser.add_argument("--max-mape", type=float, help="Exit non-zero if the selected MAPE exceeds this")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    service = ForecastService(db)
+
+    print(f"{'user':>6} {'items':>6} {'scored':>6} {'holt-winters':>13} {'seasonal naive':>15} {'selected':>10} {'fit':>9}")
+    selected = []
+    for (user_id,) in db.query(models.Item.user_id).distinct().order_by(models.Item.user_id):
+        started = time.perf_counter()
+        report = service.backtest_user(user_id, days=args.days, holdout=args.holdout)
+        fit_ms = (time.perf_counter() - started) * 1000
+        print(f"{user_id:>6} {report['items']:>6} {report['scored_items']:>6} "
+              f"{_fmt(report['mean_holt_winters_mape']):>13} {_fmt(report['mean_seasonal_naive_mape']):>15} "
+              f"{_fmt(report['mean_selected_mape']):>10} {fit_ms:7.1f}ms")
+        if report["mean_selected_mape"] is not None:
+            selected.append(report["mean_selected_mape"])
+
+        # Refresh the stored models, then time cached forecasts
+        service.refresh_user_models(user_id)
+        cache_service.clear()
+        for item_id in report["item_ids"]:
+            service.get_item_forecast(item_id, user_id)
+        latencies = []
+        for item_id in report["item_ids"]:
+            started = time.perf_counter()
+            service.get_item_forecast(item_id, user_id)
+            latencies.append((time.perf_counter() - started) * 1000)
+        if latencies:
+            print(f"{'':>6} cached forecast p50 {statistics.median(latencies):.3f}ms, max {max(latencies):.3f}ms")
+
+    overall = statistics.mean(selected) if selected else None
+    print(f"\nMean selected MAPE across users: {_fmt(overall).strip()}")
+    if args.max_mape is not None and overall is not None and overall > args.max_mape:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Index advisor: EXPLAIN the app's hot query shapes and flag sequential scans.
+
+QUERY_CATALOG mirrors the filters the services and routers actually issue
+(elasticity, dashboard, sync, recommendations, competitor history). Each
+query is built with the ORM, bound to sample ids taken from the database,
+and explained with the database's own planner:
+
+- SQLite: EXPLAIN QUERY PLAN; a plain "SCAN <table>" is a full table scan
+- PostgreSQL: EXPLAIN (FORMAT JSON) with enable_seqscan off, so a remaining
+  Seq Scan means no usable index exists (not merely that the table is small)
+
+Usage:
+    python -m benchmarks.index_advisor
+    python -m benchmarks.index_advisor --database-url postgresql://... --fail-on-scan
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, desc, event, func, select
+from sqlalchemy.engine import Engine
+
+# Allow running as a script from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+
+
+@dataclass
+class QueryShape:
+    name: str
+    build: Callable[[Dict[str, Any]], Any]
+    # Small lookup tables a scan of which is acceptable in this query
+    allow_scan: List[str] = field(default_factory=list)
+
+
+def _since(days: int) -> datetime:
+    return datetime.now() - timedelta(days=days)
+
+
+QUERY_CATALOG: List[QueryShape] = [
+    QueryShape("elasticity: price changes for an item", lambda s: (
+        select(models.PriceHistory)
+        .where(models.PriceHistory.item_id == s["item_id"])
+        .order_by(models.PriceHistory.changed_at.asc())
+    )),
+    QueryShape("item analytics: recent price changes", lambda s: (
+        select(models.PriceHistory)
+        .where(models.PriceHistory.item_id == s["item_id"], models.PriceHistory.user_id == s["user_id"],
+               models.PriceHistory.changed_at >= _since(30))
+        .order_by(models.PriceHistory.changed_at.desc())
+    )),
+    QueryShape("elasticity: item sales in a window", lambda s: (
+        select(func.sum(models.OrderItem.quantity))
+        .join(models.Order, models.OrderItem.order_id == models.Order.id)
+        .where(models.OrderItem.item_id == s["item_id"],
+               models.Order.order_date.between(_since(28), _since(14)))
+    )),
+    QueryShape("dashboard: user orders in a date range", lambda s: (
+        select(models.Order.id, models.Order.order_date, models.Order.total_amount)
+        .where(models.Order.user_id == s["user_id"], models.Order.order_date >= _since(30))
+    )),
+    QueryShape("dashboard: order lines for a user's orders", lambda s: (
+        select(models.OrderItem.item_id, func.sum(models.OrderItem.quantity))
+        .join(models.Order, models.OrderItem.order_id == models.Order.id)
+        .where(models.Order.user_id == s["user_id"], models.Order.order_date >= _since(30))
+        .group_by(models.OrderItem.item_id)
+    )),
+    QueryShape("square sync: latest order for a user", lambda s: (
+        select(models.Order)
+        .where(models.Order.user_id == s["user_id"])
+        .order_by(models.Order.order_date.desc())
+        .limit(1)
+    )),
+    QueryShape("orders: lines of one order", lambda s: (
+        select(models.OrderItem).where(models.OrderItem.order_id == s["order_id"])
+    )),
+    QueryShape("pricing recommendations: recent for a user", lambda s: (
+        select(models.PricingRecommendation)
+        .where(models.PricingRecommendation.user_id == s["user_id"],
+               models.PricingRecommendation.recommendation_date >= _since(30))
+        .order_by(desc(models.PricingRecommendation.recommendation_date))
+    )),
+    QueryShape("pricing recommendations: one batch", lambda s: (
+        select(models.PricingRecommendation)
+        .where(models.PricingRecommendation.user_id == s["user_id"],
+               models.PricingRecommendation.recommendation_date >= _since(30),
+               models.PricingRecommendation.batch_id == s["recommendation_batch_id"])
+    )),
+    QueryShape("competitor history: recent for a user", lambda s: (
+        select(models.CompetitorPriceHistory)
+        .where(models.CompetitorPriceHistory.user_id == s["user_id"],
+               models.CompetitorPriceHistory.captured_at >= _since(30))
+    )),
+    QueryShape("competitor items: latest batch of a competitor", lambda s: (
+        select(models.CompetitorItem)
+        .where(models.CompetitorItem.competitor_id == s["competitor_id"],
+               models.CompetitorItem.batch_id == s["competitor_batch_id"])
+    )),
+    QueryShape("competitors: entities of a user", lambda s: (
+        select(models.CompetitorEntity).where(models.CompetitorEntity.user_id == s["user_id"])
+    )),
+]
+
+
+def sample_values(engine: Engine) -> Dict[str, Any]:
+    """Real ids from the database so plans reflect actual selectivity"""
+    with engine.connect() as conn:
+        def first(stmt, default):
+            value = conn.execute(stmt.limit(1)).scalar()
+            return default if value is None else value
+
+        user_id = first(select(models.Order.user_id).where(models.Order.user_id.isnot(None))
+                        .group_by(models.Order.user_id).order_by(func.count().desc()), 1)
+        return {
+            "user_id": user_id,
+            "item_id": first(select(models.Item.id).where(models.Item.user_id == user_id), 1),
+            "order_id": first(select(models.Order.id).where(models.Order.user_id == user_id), 1),
+            "competitor_id": first(select(models.CompetitorEntity.id).where(models.CompetitorEntity.user_id == user_id), 1),
+            "competitor_batch_id": first(select(models.CompetitorItem.batch_id), "batch"),
+            "recommendation_batch_id": first(select(models.PricingRecommendation.batch_id), "batch"),
+        }
+
+
+def _install_explain_hook(engine: Engine):
+    """Prefix statements run with the `explain_prefix` execution option"""
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _explain(conn, cursor, statement, parameters, context, executemany):
+        prefix = context.execution_options.get("explain_prefix") if context is not None else None
+        return (prefix + statement if prefix else statement), parameters
+
+
+def _sqlite_findings(rows) -> Dict[str, Any]:
+    plan = [row[3] for row in rows]
+    scans = [line.split()[1] for line in plan
+             if line.startswith("SCAN ") and " USING " not in line and not line.startswith("SCAN CONSTANT")]
+    return {"plan": plan, "scans": scans, "temp_sorts": [line for line in plan if "TEMP B-TREE" in line]}
+
+
+def _postgres_findings(rows) -> Dict[str, Any]:
+    document = rows[0][0]
+    root = (json.loads(document) if isinstance(document, str) else document)[0]["Plan"]
+    plan, scans = [], []
+
+    def walk(node, depth=0):
+        relation = node.get("Relation Name")
+        index = node.get("Index Name")
+        plan.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else "") +
+                    (f" using {index}" if index else ""))
+        if node["Node Type"] == "Seq Scan":
+            scans.append(relation)
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(root)
+    return {"plan": plan, "scans": scans, "temp_sorts": [line for line in plan if line.strip() == "Sort"]}
+
+
+def explain_catalog(engine: Engine, catalog: Optional[List[QueryShape]] = None) -> List[Dict[str, Any]]:
+    """EXPLAIN every query shape and report the tables it scans sequentially"""
+    _install_explain_hook(engine)
+    samples = sample_values(engine)
+    dialect = engine.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN (FORMAT JSON) "
+
+    findings = []
+    for shape in catalog or QUERY_CATALOG:
+        with engine.connect() as conn:
+            if dialect == "postgresql":
+                conn.exec_driver_sql("SET enable_seqscan = off")
+            result = conn.execution_options(explain_prefix=prefix).execute(shape.build(samples))
+            rows = result.cursor.fetchall()
+            result.close()
+            conn.rollback()
+        detail = _sqlite_findings(rows) if dialect == "sqlite" else _postgres_findings(rows)
+        detail["scans"] = [table for table in detail["scans"] if table not in shape.allow_scan]
+        findings.append({"query": shape.name, **detail})
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the app's hot query shapes and flag sequential scans")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///adaptiv.db"))
+    parser.add_argument("--verbose", action="store_true", help="Print the full plan of every query")
+    parser.add_argument("--fail-on-scan", action="store_true", help="Exit non-zero if any query scans a table")
+    parser.add_argument("--json", action="store_true", help="Print findings as JSON")
+    args = parser.parse_args()
+
+    findings = explain_catalog(create_engine(args.database_url))
+    if args.json:
+        print(json.dumps(findings, indent=2))
+    else:
+        for finding in findings:
+            status = f"SEQ SCAN {', '.join(finding['scans'])}" if finding["scans"] else "ok"
+            print(f"{finding['query']:<50} {status}")
+            if args.verbose or finding["scans"]:
+                for line in finding["plan"]:
+                    print(f"    {line}")
+
+    flagged = [f for f in findings if f["scans"]]
+    print(f"\n{len(flagged)} of {len(findings)} query shapes scan a table sequentially")
+    if args.fail_on_scan and flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
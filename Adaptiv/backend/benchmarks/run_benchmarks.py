@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the hot service calls, run against a synthetic dataset.
+
+Each case runs a fixed number of iterations in a fresh Session with the
+in-process cache cleared, and records wall-clock p50/p95 and the number of
+SQL statements issued. Results are written to a JSON baseline that can be
+diffed against a previous release with --compare.
+
+External services are replaced by local fakes (see benchmarks/fakes.py):
+the LLM by an instant OpenAI-compatible server and Square by a
+deterministic in-memory SearchOrders API.
+
+Usage:
+    python -m benchmarks.run_benchmarks --regenerate --output benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json --fail-on-regression 20
+    python -m benchmarks.run_benchmarks --only dashboard --iterations 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import sqlalchemy
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+# Allow running as a script from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Agents need a key to construct their OpenAI client; every call goes to FakeLLMServer
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import models
+from benchmarks.fakes import FakeLLMServer, MockSquareAPI, MockSquareService
+from benchmarks.synthetic_dataset import (
+    DatasetSpec, SyntheticDatasetGenerator, EMAIL_PREFIX, synthetic_user_ids
+)
+from services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ITERATIONS = 10
+
+# Tenant that sync_square_orders writes into; its orders are wiped before every iteration
+SYNC_TENANT_EMAIL = f"{EMAIL_PREFIX}sync@adaptiv.test"
+SYNC_TENANT_ITEMS = 40
+SYNC_TENANT_ORDERS = 300
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine"""
+
+    def __init__(self, engine: Engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+@dataclass
+class BenchmarkContext:
+    """State shared by all cases in one run"""
+    engine: Engine
+    session_factory: sessionmaker
+    user_ids: List[int]
+    llm_base_url: str
+    sync_user_id: Optional[int] = None
+    square_api: Optional[MockSquareAPI] = None
+
+    @property
+    def user_id(self) -> int:
+        """The largest synthetic tenant (first generated)"""
+        return self.user_ids[0]
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    run: Callable[[Session, BenchmarkContext], Any]
+    setup: Optional[Callable[[Session, BenchmarkContext], None]] = None
+    iterations: Optional[int] = None
+
+
+CASES: Dict[str, BenchmarkCase] = {}
+
+
+def register(name: str, iterations: Optional[int] = None,
+             setup: Optional[Callable[[Session, BenchmarkContext], None]] = None):
+    """Decorator adding a benchmark case. `setup` runs untimed before each iteration."""
+    def decorator(func: Callable[[Session, BenchmarkContext], Any]):
+        CASES[name] = BenchmarkCase(name=name, run=func, setup=setup, iterations=iterations)
+        return func
+    return decorator
+
+
+# ----------------------------------------------------------------------
+# Cases
+# ----------------------------------------------------------------------
+
+@register("dashboard.get_dashboard_data")
+def bench_dashboard_data(db: Session, ctx: BenchmarkContext):
+    from services.dashboard_service import DashboardService
+    return DashboardService(db).get_dashboard_data(user_id=ctx.user_id, time_frame="1m")
+
+
+@register("dashboard.get_sales_data_1y")
+def bench_sales_data_year(db: Session, ctx: BenchmarkContext):
+    from services.dashboard_service import DashboardService
+    return DashboardService(db).get_sales_data(user_id=ctx.user_id, time_frame="1y")
+
+
+@register("dashboard.get_dashboard_summary")
+def bench_dashboard_summary(db: Session, ctx: BenchmarkContext):
+    from services.dashboard_service import DashboardService
+    return DashboardService(db).get_dashboard_summary(ctx.user_id)
+
+
+@register("item_analytics.get_item_analytics")
+def bench_item_analytics(db: Session, ctx: BenchmarkContext):
+    from services.item_analytics_service import ItemAnalyticsService
+    item_id = db.query(models.Item.id).filter(models.Item.user_id == ctx.user_id) \
+        .order_by(models.Item.id).limit(1).scalar()
+    return ItemAnalyticsService(db).get_item_analytics(item_id, ctx.user_id)
+
+
+@register("item_analytics.get_batch_item_analytics")
+def bench_batch_item_analytics(db: Session, ctx: BenchmarkContext):
+    from services.item_analytics_service import ItemAnalyticsService
+    return ItemAnalyticsService(db).get_batch_item_analytics(ctx.user_id)
+
+
+@register("item_analytics.get_top_performing_items")
+def bench_top_items(db: Session, ctx: BenchmarkContext):
+    from services.item_analytics_service import ItemAnalyticsService
+    return ItemAnalyticsService(db).get_top_performing_items(ctx.user_id)
+
+
+@register("agents.data_collection.process", iterations=3)
+def bench_data_collection(db: Session, ctx: BenchmarkContext):
+    from openai import OpenAI
+    from dynamic_pricing_agents.agents.data_collection import DataCollectionAgent
+    agent = DataCollectionAgent()
+    agent.client = OpenAI(api_key="test", base_url=ctx.llm_base_url)
+    return agent.process({"db": db, "user_id": ctx.user_id})
+
+
+def _reset_sync_tenant(db: Session, ctx: BenchmarkContext):
+    """Start every sync iteration from an empty order history (initial sync path)"""
+    order_ids = db.query(models.Order.id).filter(models.Order.user_id == ctx.sync_user_id)
+    db.query(models.OrderItem).filter(models.OrderItem.order_id.in_(order_ids.scalar_subquery())) \
+        .delete(synchronize_session=False)
+    db.query(models.Order).filter(models.Order.user_id == ctx.sync_user_id).delete(synchronize_session=False)
+    db.query(models.POSIntegration).filter(models.POSIntegration.user_id == ctx.sync_user_id) \
+        .update({models.POSIntegration.sync_metadata: None}, synchronize_session=False)
+    db.commit()
+
+
+@register("square.sync_square_orders", iterations=3, setup=_reset_sync_tenant)
+def bench_square_sync(db: Session, ctx: BenchmarkContext):
+    result = MockSquareService(db, ctx.square_api).sync_square_orders(ctx.sync_user_id)
+    if not result.get("success", True):
+        raise RuntimeError(f"Square sync failed: {result}")
+    return result
+
+
+def ensure_sync_tenant(session_factory: sessionmaker) -> Tuple[int, List[str], List[str]]:
+    """Create (once) the tenant that the Square sync benchmark writes into"""
+    db = session_factory()
+    try:
+        user = db.query(models.User).filter(models.User.email == SYNC_TENANT_EMAIL).first()
+        if not user:
+            user = models.User(email=SYNC_TENANT_EMAIL, hashed_password="synthetic-load-test-user",
+                               name="Load Test Sync Cafe", pos_connected=True)
+            db.add(user)
+            db.flush()
+            location_ids = [f"SYNCLOC-{user.id}-0", f"SYNCLOC-{user.id}-1"]
+            db.add(models.POSIntegration(
+                user_id=user.id, provider="square", access_token="synthetic-token",
+                merchant_id=f"SYNCMERCHANT-{user.id}", pos_id=location_ids[0],
+                location_ids=json.dumps(location_ids)
+            ))
+            db.add_all([
+                models.Item(user_id=user.id, name=f"Sync Item {n}", category="Synthetic",
+                            current_price=3.0 + n * 0.25, pos_id=f"SYNCITEM-{user.id}-{n}")
+                for n in range(SYNC_TENANT_ITEMS)
+            ])
+            db.commit()
+        integration = db.query(models.POSIntegration).filter(models.POSIntegration.user_id == user.id).first()
+        catalog_ids = [row[0] for row in db.query(models.Item.pos_id)
+                       .filter(models.Item.user_id == user.id).order_by(models.Item.id)]
+        return user.id, catalog_ids, json.loads(integration.location_ids)
+    finally:
+        db.close()
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def _percentile(values: List[float], pct: float) -> float:
+    return float(np.percentile(np.asarray(values, dtype=float), pct))
+
+
+def run_case(case: BenchmarkCase, ctx: BenchmarkContext, counter: QueryCounter, iterations: int) -> Dict[str, Any]:
+    timings_ms: List[float] = []
+    query_counts: List[int] = []
+    for _ in range(iterations):
+        db = ctx.session_factory()
+        try:
+            cache_service.clear()
+            if case.setup:
+                case.setup(db, ctx)
+            counter.count = 0
+            started = time.perf_counter()
+            case.run(db, ctx)
+            timings_ms.append((time.perf_counter() - started) * 1000)
+            query_counts.append(counter.count)
+        finally:
+            db.rollback()
+            db.close()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(timings_ms, 50), 2),
+        "p95_ms": round(_percentile(timings_ms, 95), 2),
+        "mean_ms": round(float(np.mean(timings_ms)), 2),
+        "min_ms": round(min(timings_ms), 2),
+        "max_ms": round(max(timings_ms), 2),
+        "queries_p50": int(_percentile(query_counts, 50)),
+        "queries_max": max(query_counts),
+    }
+
+
+def run_suite(engine: Engine, spec: Optional[DatasetSpec] = None, only: Optional[List[str]] = None,
+              iterations: Optional[int] = None) -> Dict[str, Any]:
+    """Run the registered cases against `engine` and return the baseline document"""
+    user_ids = synthetic_user_ids(engine, spec.seed if spec else None)
+    if not user_ids:
+        raise RuntimeError("No synthetic tenants found; run with --regenerate or benchmarks.synthetic_dataset first")
+
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counter = QueryCounter(engine)
+    selected = [case for name, case in CASES.items() if not only or any(name.startswith(o) for o in only)]
+
+    results: Dict[str, Any] = {}
+    with FakeLLMServer() as llm:
+        ctx = BenchmarkContext(engine=engine, session_factory=session_factory,
+                               user_ids=user_ids, llm_base_url=llm.base_url)
+        if any(case.name.startswith("square.") for case in selected):
+            ctx.sync_user_id, catalog_ids, location_ids = ensure_sync_tenant(session_factory)
+            ctx.square_api = MockSquareAPI(catalog_ids, location_ids, order_count=SYNC_TENANT_ORDERS)
+
+        for case in selected:
+            count = iterations or case.iterations or DEFAULT_ITERATIONS
+            logger.info(f"Running {case.name} x{count}")
+            results[case.name] = run_case(case, ctx, counter, count)
+            print(f"{case.name:<45} p50 {results[case.name]['p50_ms']:>9.2f} ms  "
+                  f"p95 {results[case.name]['p95_ms']:>9.2f} ms  queries {results[case.name]['queries_p50']:>6}")
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "dataset": asdict(spec) if spec else {"users": len(user_ids)},
+        "environment": {
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "dialect": engine.dialect.name,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-case p50/p95/query deltas of `current` against `previous`"""
+    rows = []
+    for name, result in current["results"].items():
+        before = previous.get("results", {}).get(name)
+        if not before:
+            rows.append({"case": name, "new": True})
+            continue
+        rows.append({
+            "case": name,
+            "p50_change_pct": _change_pct(before["p50_ms"], result["p50_ms"]),
+            "p95_change_pct": _change_pct(before["p95_ms"], result["p95_ms"]),
+            "queries_before": before["queries_p50"],
+            "queries_after": result["queries_p50"],
+        })
+    return rows
+
+
+def _change_pct(before: float, after: float) -> float:
+    return round((after - before) / before * 100, 1) if before else 0.0
+
+
+def print_comparison(rows: List[Dict[str, Any]]):
+    print(f"\n{'case':<45}{'p50 Δ%':>10}{'p95 Δ%':>10}{'queries':>16}")
+    for row in rows:
+        if row.get("new"):
+            print(f"{row['case']:<45}{'new':>10}")
+            continue
+        queries = f"{row['queries_before']} -> {row['queries_after']}"
+        print(f"{row['case']:<45}{row['p50_change_pct']:>+10.1f}{row['p95_change_pct']:>+10.1f}{queries:>16}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the key service calls against a synthetic dataset")
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL", "sqlite:///benchmarks/synthetic.db"))
+    parser.add_argument("--regenerate", action="store_true", help="Generate the synthetic dataset before running")
+    parser.add_argument("--users", type=int, default=DatasetSpec.users)
+    parser.add_argument("--items", type=int, default=DatasetSpec.items_per_user)
+    parser.add_argument("--orders", type=int, default=DatasetSpec.orders_per_user)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--only", nargs="*", help="Run only cases whose name starts with one of these prefixes")
+    parser.add_argument("--iterations", type=int, default=None, help="Override iterations for every case")
+    parser.add_argument("--output", default="benchmarks/baseline.json")
+    parser.add_argument("--compare", default=None, help="Previous baseline JSON to diff against")
+    parser.add_argument("--fail-on-regression", type=float, default=None, metavar="PCT",
+                        help="Exit non-zero if any case's p50 regressed by more than PCT percent")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s %(message)s")
+    logger.setLevel(logging.INFO)
+
+    engine = create_engine(args.database_url)
+    spec = DatasetSpec(users=args.users, items_per_user=args.items, orders_per_user=args.orders, seed=args.seed)
+    if args.regenerate:
+        SyntheticDatasetGenerator(engine, spec).generate()
+
+    baseline = run_suite(engine, spec, only=args.only, iterations=args.iterations)
+    with open(args.output, "w") as f:
+        json.dump(baseline, f, indent=2)
+    print(f"\nBaseline written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            rows = compare(baseline, json.load(f))
+        print_comparison(rows)
+        if args.fail_on_regression is not None:
+            regressed = [row["case"] for row in rows
+                         if not row.get("new") and row["p50_change_pct"] > args.fail_on_regression]
+            if regressed:
+                print(f"\nRegressed by more than {args.fail_on_regression}%: {', '.join(regressed)}")
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark the concurrent scraping pipeline against fixture HTML served locally.
+
+A local HTTP server plays the search results for several restaurants: each
+restaurant has 10 candidate URLs, only one of which carries a real menu.
+Every response is delayed to simulate network latency, and pages carry ETags.
+
+Compares:
+- serial:   the previous flow, one fresh request per URL until a menu is found
+- pipeline: ScrapePipeline with a cold on-disk cache
+- cached:   ScrapePipeline again, pages revalidated with If-None-Match (304)
+
+Usage:
+    python -m benchmarks.scrape_pipeline_benchmark [--restaurants 5] [--latency-ms 80]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from bs4 import BeautifulSoup
+
+# Add the backend and competitor_analysis directories to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+sys.path.append(os.path.join(backend_dir, 'competitor_analysis'))
+
+from restaurant_menu_scraper import MenuScraper
+from scrape_pipeline import ScrapePipeline, MIN_MENU_ITEMS
+
+URLS_PER_RESTAURANT = 10
+MENU_URL_INDEX = 7  # The serial flow has to walk past 7 non-menu pages first
+
+MENU_PAGE = """<html><head><title>{name} Menu</title></head><body>
+<h1>{name}</h1>
+<div class="menu">
+{items}
+</div>
+</body></html>"""
+
+MENU_ITEM = """  <div class="menu-item"><h3>{item}</h3><span class="price">${price:.2f}</span></div>"""
+
+NOISE_PAGE = """<html><head><title>{name} reviews</title></head><body>
+<h1>What people say about {name}</h1>
+{paragraphs}
+</body></html>"""
+
+
+def fixture_page(path: str) -> str:
+    """HTML for /r<restaurant>/u<url> paths"""
+    restaurant, url_index = (int(part[1:]) for part in path.strip('/').split('/'))
+    name = f"Fixture Cafe {restaurant}"
+    if url_index == MENU_URL_INDEX:
+        items = "\n".join(
+            MENU_ITEM.format(item=f"House Dish Number {i}", price=4 + i * 0.75)
+            for i in range(12)
+        )
+        return MENU_PAGE.format(name=name, items=items)
+    paragraphs = "\n".join(f"<p>Review {i}: lovely atmosphere and friendly staff.</p>" for i in range(40))
+    return NOISE_PAGE.format(name=name, paragraphs=paragraphs)
+
+
+def make_handler(latency: float, counters: dict, lock: threading.Lock):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = fixture_page(self.path).encode()
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            with lock:
+                counters['requests'] += 1
+            if self.headers.get('If-None-Match') == etag:
+                with lock:
+                    counters['not_modified'] += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The pipeline cancelled this request after finding a menu
+
+        def log_message(self, *args):
+            pass
+
+    return FixtureHandler
+
+
+def scrape_serial(scraper: MenuScraper, urls):
+    """The previous flow: one URL at a time, a fresh connection each, stop at the first menu"""
+    for url in urls:
+        response = requests.get(url, headers=dict(scraper.session.headers), timeout=30)
+        items = scraper._extract_menu_items_generic(BeautifulSoup(response.content, 'html.parser'))
+        if len(items) >= MIN_MENU_ITEMS:
+            return url, items
+    return None, []
+
+
+async def scrape_all_with_pipeline(pipeline: ScrapePipeline, url_lists):
+    """All restaurants concurrently, sharing one connection pool"""
+    try:
+        return await asyncio.gather(*(pipeline.scrape(urls) for urls in url_lists))
+    finally:
+        await pipeline.aclose()
+
+
+def run_benchmark(restaurants: int, latency_ms: int):
+    counters = {'requests': 0, 'not_modified': 0}
+    lock = threading.Lock()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(latency_ms / 1000, counters, lock))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    url_lists = [
+        [f"{base_url}/r{r}/u{u}" for u in range(URLS_PER_RESTAURANT)]
+        for r in range(restaurants)
+    ]
+    scraper = MenuScraper(openai_api_key='')
+    scraper.openai_client = None  # Benchmark the network + parsing path only
+
+    def reset():
+        with lock:
+            counters['requests'] = counters['not_modified'] = 0
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            reset()
+            started = time.perf_counter()
+            serial_results = [scrape_serial(scraper, urls) for urls in url_lists]
+            serial_seconds = time.perf_counter() - started
+            serial_requests = counters['requests']
+
+            # Only the HTML stage applies without OpenAI or a browser
+            def pipeline_run():
+                reset()
+                pipeline = ScrapePipeline(scraper, cache_dir=cache_dir, per_host_limit=8, stages=('static_html',))
+                run_started = time.perf_counter()
+                results = asyncio.run(scrape_all_with_pipeline(pipeline, url_lists))
+                elapsed = time.perf_counter() - run_started
+                return results, elapsed, counters['requests'], counters['not_modified']
+
+            cold_results, cold_seconds, cold_requests, _ = pipeline_run()
+            warm_results, warm_seconds, warm_requests, warm_not_modified = pipeline_run()
+    finally:
+        server.shutdown()
+
+    for serial, cold, warm in zip(serial_results, cold_results, warm_results):
+        assert serial[0] is not None, "serial flow found no menu"
+        assert len(cold) == 1 and cold[0].url == serial[0], (cold, serial[0])
+        assert len(warm) == 1 and len(warm[0].menu_items) == len(serial[1])
+
+    print(f"\nScrape pipeline benchmark: {restaurants} restaurants x {URLS_PER_RESTAURANT} URLs, "
+          f"{latency_ms} ms server latency")
+    print(f"{'mode':<10}{'seconds':>10}{'requests':>10}{'304s':>8}{'speedup':>10}")
+    print(f"{'serial':<10}{serial_seconds:>10.3f}{serial_requests:>10}{0:>8}{1:>9.1f}x")
+    print(f"{'pipeline':<10}{cold_seconds:>10.3f}{cold_requests:>10}{0:>8}{serial_seconds / cold_seconds:>9.1f}x")
+    print(f"{'cached':<10}{warm_seconds:>10.3f}{warm_requests:>10}{warm_not_modified:>8}"
+          f"{serial_seconds / warm_seconds:>9.1f}x")
+
+    assert cold_seconds < serial_seconds, "pipeline should beat the serial flow"
+    return {
+        'serial_seconds': serial_seconds,
+        'pipeline_seconds': cold_seconds,
+        'cached_seconds': warm_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the concurrent scraping pipeline')
+    parser.add_argument('--restaurants', type=int, default=5)
+    parser.add_argument('--latency-ms', type=int, default=80)
+    args = parser.parse_args()
+    run_benchmark(args.restaurants, args.latency_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Serialization microbenchmark on real agent and analytics outputs.
+
+Builds, for one tenant, the payloads the API and agents actually serialize
+(DataCollectionAgent POS data and per-item quantitative insights, batch item
+analytics, dashboard sales data) and times the previous path - recursive
+NumPy conversion, jsonable_encoder, json.dumps - against the orjson layer in
+utils.json_utils. No LLM calls are made.
+
+Usage:
+    python -m benchmarks.serialization_benchmark
+    python -m benchmarks.serialization_benchmark --database-url sqlite:///benchmarks/synthetic.db --iterations 50
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Allow running as a script from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from fastapi.encoders import jsonable_encoder
+
+import models
+from config.database import Base
+from dynamic_pricing_agents.agents.data_collection import DataCollectionAgent
+from services.dashboard_service import DashboardService
+from services.item_analytics_service import ItemAnalyticsService
+from utils.data_utils import convert_numpy_to_python
+from utils.json_utils import json_dumps
+
+
+def agent_payload(db, user_id):
+    """DataCollectionAgent output before the LLM step"""
+    agent = DataCollectionAgent()
+    insights = {}
+    for item in agent._get_menu_items(db, user_id):
+        insights[item["id"]] = {
+            "item_id": item["id"],
+            "item_name": item["name"],
+            "sales_momentum": agent._calculate_sales_momentum(db, item["id"]),
+            "price_elasticity": agent._calculate_price_elasticity(db, item["id"]),
+            "seasonality": agent._analyze_seasonality(db, item["id"]),
+        }
+    return {
+        "user_id": user_id,
+        "pos_data": agent._collect_pos_data(db, user_id),
+        "price_history": agent._collect_price_history(db, user_id),
+        "quantitative_insights": insights,
+    }
+
+
+def legacy_dumps(payload):
+    return json.dumps(jsonable_encoder(convert_numpy_to_python(payload))).encode()
+
+
+def timed(fn, payload, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON serialization paths on real payloads")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///benchmarks/synthetic.db"))
+    parser.add_argument("--user-id", type=int, help="Tenant to build payloads for (default: the first one)")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    user_id = args.user_id or db.query(models.Item.user_id).order_by(models.Item.user_id).limit(1).scalar()
+    if user_id is None:
+        sys.exit("No tenants found; generate data with benchmarks.synthetic_dataset first")
+
+    payloads = {
+        "agent.data_collection": agent_payload(db, user_id),
+        "api.item_analytics": ItemAnalyticsService(db).get_batch_item_analytics(user_id),
+        "api.dashboard_sales": DashboardService(db).get_sales_data(None, None, user_id, "6m"),
+    }
+
+    print(f"{'payload':<24} {'size':>9} {'legacy p50':>11} {'orjson p50':>11} {'speedup':>8}")
+    for name, payload in payloads.items():
+        encoded = json_dumps(payload)
+        # Both paths must produce the same document
+        assert json.loads(encoded) == json.loads(legacy_dumps(payload)), name
+        legacy = timed(legacy_dumps, payload, args.iterations)
+        fast = timed(json_dumps, payload, args.iterations)
+        print(f"{name:<24} {len(encoded) / 1024:7.1f}KB {legacy:9.2f}ms {fast:9.2f}ms {legacy / fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic multi-tenant dataset generator.
+
+Writes N users x M items x K orders per user straight into the SQLAlchemy
+models with bulk inserts, plus everything the services read alongside them:
+business profiles, Square integrations, price history, weekly COGS and
+competitor menus scraped in weekly batches.
+
+The same spec (seed + end date) always produces the same rows:
+- Order volume follows a growth trend, weekly and annual seasonality, and
+  breakfast / lunch / dinner peaks within the day
+- Item popularity is Zipf-like per tenant; each item has a few price changes
+  over the period and demand reacts to them through a per-item elasticity
+- Unit prices on order lines are the item's price at order time
+- Competitors re-scrape their menus weekly (one batch_id per scrape) with
+  prices drifting around a competitor-specific price level
+
+Tenants left by an earlier run with the same seed are deleted (with all their
+rows) before generating, so regenerating into an existing database works.
+
+Usage:
+    python -m benchmarks.synthetic_dataset --users 10 --items 80 --orders 100000
+    python -m benchmarks.synthetic_dataset --database-url postgresql://... --users 50 --orders 200000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+from sqlalchemy import create_engine, func, insert, or_, select, text
+from sqlalchemy.engine import Engine
+
+# Allow running as a script from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from config.database import Base
+from utils.datetime_utils import get_local_time_buckets
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT executemany batch
+INSERT_CHUNK_SIZE = 20000
+
+# Prefix on every generated email, used to find (and clear) synthetic tenants
+EMAIL_PREFIX = "loadtest+"
+
+MENU_CATALOG = {
+    "Coffee": [("Espresso", 3.0), ("Americano", 3.5), ("Latte", 4.75), ("Cappuccino", 4.5), ("Flat White", 4.75),
+               ("Mocha", 5.25), ("Cortado", 4.0), ("Cold Brew", 4.5), ("Iced Latte", 5.0), ("Drip Coffee", 2.75)],
+    "Tea": [("Chai Latte", 4.75), ("Matcha Latte", 5.5), ("Earl Grey", 3.0), ("Green Tea", 3.0), ("Iced Tea", 3.25)],
+    "Pastry": [("Croissant", 3.75), ("Almond Croissant", 4.5), ("Blueberry Muffin", 3.5), ("Scone", 3.25),
+               ("Cinnamon Roll", 4.25), ("Banana Bread", 3.5), ("Danish", 3.95)],
+    "Breakfast": [("Avocado Toast", 9.5), ("Breakfast Burrito", 10.5), ("Bagel", 3.5), ("Oatmeal", 6.0),
+                  ("Egg Sandwich", 7.5), ("Yogurt Parfait", 6.5)],
+    "Lunch": [("Turkey Sandwich", 11.5), ("Caprese Panini", 11.0), ("Chicken Salad", 12.5), ("Soup of the Day", 7.0),
+              ("Grain Bowl", 13.0), ("BLT", 10.5), ("Caesar Salad", 11.0)],
+    "Dessert": [("Chocolate Chip Cookie", 2.75), ("Brownie", 3.5), ("Cheesecake Slice", 6.0), ("Lemon Bar", 3.75)],
+    "Drinks": [("Orange Juice", 4.5), ("Sparkling Water", 2.5), ("Smoothie", 7.0), ("Lemonade", 3.75)],
+}
+
+# Monday..Sunday demand multipliers
+WEEKDAY_FACTORS = np.array([0.85, 0.9, 0.95, 1.0, 1.15, 1.3, 1.1])
+
+# Share of orders per hour of day: breakfast, lunch and early evening peaks
+HOUR_WEIGHTS = np.array([0, 0, 0, 0, 0, 0.2, 1.5, 4.0, 6.0, 4.5, 3.0, 4.0, 6.0, 5.0, 2.5, 2.0,
+                         2.5, 3.0, 2.5, 1.5, 0.8, 0.3, 0, 0], dtype=float)
+
+SUBSCRIPTION_TIERS = ("free", "basic", "premium")
+SUBSCRIPTION_WEIGHTS = (0.5, 0.3, 0.2)
+
+
+@dataclass
+class DatasetSpec:
+    """What to generate. Identical specs produce identical datasets."""
+    users: int = 3
+    items_per_user: int = 60
+    orders_per_user: int = 20000
+    days: int = 365
+    competitors_per_user: int = 4
+    competitor_batches: int = 12
+    price_changes_per_item: int = 2
+    seed: int = 42
+    end_date: str = field(default_factory=lambda: date.today().isoformat())
+
+    @property
+    def end(self) -> datetime:
+        return datetime.fromisoformat(self.end_date).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    @property
+    def start(self) -> datetime:
+        return self.end - timedelta(days=self.days)
+
+
+class SyntheticDatasetGenerator:
+    """
+    Generates a DatasetSpec into the database behind `engine`.
+
+    Primary keys are assigned by the generator (continuing after the current
+    maximum of each table) so child rows can reference parents without
+    round trips; Postgres sequences are moved past them at the end.
+    """
+
+    def __init__(self, engine: Engine, spec: DatasetSpec):
+        self.engine = engine
+        self.spec = spec
+        self.rng = np.random.default_rng(spec.seed)
+        self.counts: Dict[str, int] = {}
+        self._next_ids: Dict[str, int] = {}
+
+    def generate(self) -> Dict[str, Any]:
+        """Write the whole dataset and return row counts per table"""
+        started = time.perf_counter()
+        Base.metadata.create_all(self.engine)
+
+        with self.engine.begin() as conn:
+            existing = [row[0] for row in conn.execute(
+                select(models.User.id).where(models.User.email.like(f"{EMAIL_PREFIX}{self.spec.seed}-%"))
+            )]
+            if existing:
+                deleted = delete_tenants(conn, existing)
+                logger.info(f"Deleted {len(existing)} tenants from a previous run: {deleted}")
+            self._load_id_offsets(conn)
+            for user_index in range(self.spec.users):
+                self._generate_tenant(conn, user_index)
+                logger.info(f"Generated tenant {user_index + 1}/{self.spec.users}")
+            self._sync_sequences(conn)
+
+        summary = {
+            "spec": asdict(self.spec),
+            "rows": dict(self.counts),
+            "seconds": round(time.perf_counter() - started, 2)
+        }
+        logger.info(f"Synthetic dataset generated: {summary}")
+        return summary
+
+    # ------------------------------------------------------------------
+    # Tenants
+    # ------------------------------------------------------------------
+
+    def _generate_tenant(self, conn, user_index: int):
+        spec = self.spec
+        rng = self.rng
+        user_id = self._take_ids(models.User, 1)[0]
+
+        self._insert(conn, models.User, [{
+            "id": user_id,
+            "email": f"{EMAIL_PREFIX}{spec.seed}-{user_index}@adaptiv.test",
+            "hashed_password": "synthetic-load-test-user",
+            "name": f"Load Test Cafe {user_index}",
+            "is_active": True,
+            "created_at": spec.start - timedelta(days=int(rng.integers(1, 60))),
+            "pos_connected": True,
+            "competitor_tracking_enabled": True,
+            "subscription_tier": str(rng.choice(SUBSCRIPTION_TIERS, p=SUBSCRIPTION_WEIGHTS)),
+            "is_google_user": False,
+            "is_admin": False,
+        }])
+
+        location_ids = [f"SYNLOC-{user_id}-{n}" for n in range(int(rng.integers(1, 4)))]
+        self._insert(conn, models.BusinessProfile, [{
+            "id": self._take_ids(models.BusinessProfile, 1)[0],
+            "user_id": user_id,
+            "business_name": f"Load Test Cafe {user_index}",
+            "industry": "Food & Beverage",
+            "company_size": "1-10",
+            "city": "Testville",
+            "state": "NY",
+            "country": "USA",
+            "timezone": "America/New_York",
+        }])
+        self._insert(conn, models.POSIntegration, [{
+            "id": self._take_ids(models.POSIntegration, 1)[0],
+            "user_id": user_id,
+            "provider": "square",
+            "access_token": "synthetic-token",
+            "merchant_id": f"SYNMERCHANT-{user_id}",
+            "pos_id": location_ids[0],
+            "location_ids": json.dumps(location_ids),
+            "last_sync_at": spec.end,
+        }])
+
+        items = self._generate_items(conn, user_id)
+        self._generate_orders(conn, user_id, items, location_ids)
+        self._generate_competitors(conn, user_id, items)
+
+    def _generate_items(self, conn, user_id: int) -> Dict[str, np.ndarray]:
+        """Items with Zipf popularity, elasticities and a piecewise-constant price schedule"""
+        spec, rng = self.spec, self.rng
+        catalog = [(category, name, price) for category, entries in MENU_CATALOG.items() for name, price in entries]
+
+        picks = rng.choice(len(catalog), size=spec.items_per_user, replace=spec.items_per_user > len(catalog))
+        names, categories, base_prices = [], [], []
+        seen: Dict[str, int] = {}
+        for pick in picks:
+            category, name, price = catalog[pick]
+            seen[name] = seen.get(name, 0) + 1
+            names.append(name if seen[name] == 1 else f"{name} {seen[name]}")
+            categories.append(category)
+            base_prices.append(round(price * rng.uniform(0.9, 1.15) * 4) / 4)
+
+        item_ids = np.array(self._take_ids(models.Item, spec.items_per_user))
+        base_prices = np.array(base_prices)
+        cost_ratio = rng.uniform(0.22, 0.4, size=spec.items_per_user)
+        popularity = 1.0 / np.arange(1, spec.items_per_user + 1) ** 1.1
+        popularity = rng.permutation(popularity)
+        elasticity = rng.uniform(0.4, 1.8, size=spec.items_per_user)
+
+        # Price schedule: change_days[i] are the day offsets of item i's changes
+        change_days = np.sort(rng.integers(7, spec.days, size=(spec.items_per_user, spec.price_changes_per_item)), axis=1)
+        change_factors = rng.choice([0.95, 1.05, 1.08, 1.1, 1.15], size=(spec.items_per_user, spec.price_changes_per_item))
+        price_steps = np.round(base_prices[:, None] * np.cumprod(change_factors, axis=1) * 4) / 4
+        price_table = np.concatenate([base_prices[:, None], price_steps], axis=1)
+        day_index = np.arange(spec.days)
+        # prices[d, i] = price of item i on day d
+        step_at_day = (change_days[None, :, :] <= day_index[:, None, None]).sum(axis=2)
+        prices = price_table[np.arange(spec.items_per_user)[None, :], step_at_day]
+
+        self._insert(conn, models.Item, [
+            {
+                "id": int(item_ids[i]),
+                "name": names[i],
+                "category": categories[i],
+                "description": f"Synthetic {categories[i].lower()} item",
+                "current_price": float(prices[-1, i]),
+                "cost": round(float(base_prices[i] * cost_ratio[i]), 2),
+                "user_id": user_id,
+                "pos_id": f"SYNITEM-{user_id}-{i}",
+                "created_at": spec.start,
+                "updated_at": spec.end,
+            }
+            for i in range(spec.items_per_user)
+        ])
+
+        history = []
+        for i in range(spec.items_per_user):
+            for step, day in enumerate(change_days[i]):
+                history.append({
+                    "item_id": int(item_ids[i]),
+                    "user_id": user_id,
+                    "previous_price": float(price_table[i, step]),
+                    "new_price": float(price_table[i, step + 1]),
+                    "change_reason": "Synthetic price change",
+                    "changed_at": spec.start + timedelta(days=int(day), hours=6),
+                })
+        self._insert(conn, models.PriceHistory, self._with_ids(models.PriceHistory, history))
+
+        return {
+            "ids": item_ids,
+            "names": np.array(names),
+            "base_prices": base_prices,
+            "costs": np.round(base_prices * cost_ratio, 2),
+            "popularity": popularity,
+            "elasticity": elasticity,
+            "prices": prices,
+        }
+
+    def _generate_orders(self, conn, user_id: int, items: Dict[str, np.ndarray], location_ids: List[str]):
+        """Orders and order lines, generated day by day and inserted in chunks"""
+        spec, rng = self.spec, self.rng
+        n_items = len(items["ids"])
+
+        days = np.arange(spec.days)
+        day_dates = [spec.start + timedelta(days=int(d)) for d in days]
+        weekday = np.array([d.weekday() for d in day_dates])
+        day_of_year = np.array([d.timetuple().tm_yday for d in day_dates])
+        trend = 1 + 0.3 * days / max(spec.days - 1, 1)
+        annual = 1 + 0.15 * np.sin(2 * np.pi * (day_of_year - 80) / 365.25)
+        day_weights = trend * WEEKDAY_FACTORS[weekday] * annual
+        orders_per_day = rng.multinomial(spec.orders_per_user, day_weights / day_weights.sum())
+
+        # Demand reacts to price changes: weight_i(d) = popularity_i * (price_i(d) / base_i) ^ -elasticity_i
+        demand = items["popularity"][None, :] * (items["prices"] / items["base_prices"][None, :]) ** -items["elasticity"][None, :]
+        demand = demand / demand.sum(axis=1, keepdims=True)
+        hour_p = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+
+        order_rows: List[Dict] = []
+        line_rows: List[Dict] = []
+        cogs_by_week = np.zeros(spec.days // 7 + 1)
+        order_ids = iter(self._take_ids(models.Order, spec.orders_per_user))
+        order_seq = 0
+
+        for d in days:
+            n_orders = int(orders_per_day[d])
+            if not n_orders:
+                continue
+            seconds = rng.choice(24, size=n_orders, p=hour_p) * 3600 + rng.integers(0, 3600, size=n_orders)
+            seconds.sort()
+            lines_per_order = np.minimum(1 + rng.poisson(0.8, size=n_orders), 6)
+            n_lines = int(lines_per_order.sum())
+            line_items = rng.choice(n_items, size=n_lines, p=demand[d])
+            quantities = rng.choice([1, 2, 3], size=n_lines, p=[0.8, 0.15, 0.05])
+            unit_prices = items["prices"][d, line_items]
+            unit_costs = items["costs"][line_items]
+            line_totals = unit_prices * quantities
+            line_costs = unit_costs * quantities
+            order_index = np.repeat(np.arange(n_orders), lines_per_order)
+            order_totals = np.bincount(order_index, weights=line_totals, minlength=n_orders)
+            order_costs = np.bincount(order_index, weights=line_costs, minlength=n_orders)
+            order_locations = rng.integers(0, len(location_ids), size=n_orders)
+            cogs_by_week[d // 7] += order_costs.sum()
+
+            ids_today = [next(order_ids) for _ in range(n_orders)]
+            line_ids = self._take_ids(models.OrderItem, n_lines)
+            for o in range(n_orders):
+                order_date = day_dates[d] + timedelta(seconds=int(seconds[o]))
+                total = round(float(order_totals[o]), 2)
+                cost = round(float(order_costs[o]), 2)
+                order_rows.append({
+                    "id": ids_today[o],
+                    "order_date": order_date,
+                    "total_amount": total,
+                    "user_id": user_id,
+                    "pos_id": f"SYNORDER-{user_id}-{order_seq}",
+                    "location_id": location_ids[order_locations[o]],
+                    "created_at": order_date,
+                    "updated_at": order_date,
+                    "total_cost": cost,
+                    "gross_margin": round(total - cost, 2),
+                    "net_margin": round(total - cost, 2),
+                    **get_local_time_buckets(order_date, "America/New_York"),
+                })
+                order_seq += 1
+            for n in range(n_lines):
+                quantity = int(quantities[n])
+                unit_cost = float(unit_costs[n])
+                line_rows.append({
+                    "id": int(line_ids[n]),
+                    "order_id": ids_today[order_index[n]],
+                    "item_id": int(items["ids"][line_items[n]]),
+                    "quantity": quantity,
+                    "unit_price": float(unit_prices[n]),
+                    "unit_cost": unit_cost,
+                    "subtotal_cost": round(unit_cost * quantity, 2),
+                })
+
+            if len(line_rows) >= INSERT_CHUNK_SIZE:
+                self._insert(conn, models.Order, order_rows)
+                self._insert(conn, models.OrderItem, line_rows)
+                order_rows, line_rows = [], []
+
+        self._insert(conn, models.Order, order_rows)
+        self._insert(conn, models.OrderItem, line_rows)
+
+        cogs_rows = []
+        for week, amount in enumerate(cogs_by_week):
+            week_start = spec.start + timedelta(days=week * 7)
+            if week_start >= spec.end:
+                break
+            cogs_rows.append({
+                "user_id": user_id,
+                "week_start_date": week_start,
+                "week_end_date": week_start + timedelta(days=6),
+                "amount": round(float(amount) * 1.05, 2),
+            })
+        self._insert(conn, models.COGS, self._with_ids(models.COGS, cogs_rows))
+
+    def _generate_competitors(self, conn, user_id: int, items: Dict[str, np.ndarray]):
+        """Competitors sharing part of the tenant's menu, re-scraped weekly"""
+        spec, rng = self.spec, self.rng
+        competitor_ids = self._take_ids(models.CompetitorEntity, spec.competitors_per_user)
+
+        entities = []
+        batch_rows = []
+        for c, competitor_id in enumerate(competitor_ids):
+            name = f"Synthetic Competitor {user_id}-{c}"
+            entities.append({
+                "id": int(competitor_id),
+                "user_id": user_id,
+                "name": name,
+                "address": f"{100 + c} Main St, Testville",
+                "category": "cafe",
+                "distance_km": round(float(rng.uniform(0.2, 5.0)), 2),
+                "score": round(float(rng.uniform(0.5, 1.0)), 2),
+                "is_selected": c < 3,
+                "created_at": spec.start,
+            })
+
+            menu_mask = rng.random(len(items["ids"])) < 0.7
+            price_level = rng.uniform(0.85, 1.2)
+            drift = rng.normal(0.003, 0.004)
+            for b in range(spec.competitor_batches):
+                synced_at = spec.end - timedelta(days=7 * (spec.competitor_batches - b), hours=-3)
+                batch_id = f"syn-{spec.seed}-{competitor_id}-{b}"
+                noise = rng.normal(0, 0.03, size=len(items["ids"]))
+                for i in np.flatnonzero(menu_mask):
+                    batch_rows.append({
+                        "competitor_id": int(competitor_id),
+                        "competitor_name": name,
+                        "item_name": str(items["names"][i]),
+                        "category": "cafe",
+                        "price": round(float(items["base_prices"][i] * price_level * (1 + drift * b + noise[i])), 2),
+                        "batch_id": batch_id,
+                        "sync_timestamp": synced_at,
+                        "created_at": synced_at,
+                    })
+
+        self._insert(conn, models.CompetitorEntity, entities)
+        self._insert(conn, models.CompetitorItem, self._with_ids(models.CompetitorItem, batch_rows))
+
+    # ------------------------------------------------------------------
+    # Bulk insert helpers
+    # ------------------------------------------------------------------
+
+    def _load_id_offsets(self, conn):
+        for model in (models.User, models.BusinessProfile, models.POSIntegration, models.Item,
+                      models.PriceHistory, models.Order, models.OrderItem, models.COGS,
+                      models.CompetitorEntity, models.CompetitorItem):
+            max_id = conn.execute(select(func.max(model.id))).scalar() or 0
+            self._next_ids[model.__tablename__] = max_id + 1
+
+    def _take_ids(self, model, count: int) -> List[int]:
+        start = self._next_ids[model.__tablename__]
+        self._next_ids[model.__tablename__] = start + count
+        return list(range(start, start + count))
+
+    def _with_ids(self, model, rows: List[Dict]) -> List[Dict]:
+        for row, row_id in zip(rows, self._take_ids(model, len(rows))):
+            row["id"] = row_id
+        return rows
+
+    def _insert(self, conn, model, rows: List[Dict]):
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            conn.execute(insert(model.__table__), rows[start:start + INSERT_CHUNK_SIZE])
+        self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+
+    def _sync_sequences(self, conn):
+        """Move Postgres id sequences past the explicitly assigned ids"""
+        if conn.dialect.name != "postgresql":
+            return
+        for table in self._next_ids:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+            ))
+
+
+def delete_tenants(conn, user_ids: List[int]) -> Dict[str, int]:
+    """
+    Delete users and every row that belongs to them, directly (user_id) or
+    through another table (e.g. order_items via orders), children first.
+    Returns the number of rows deleted per table.
+    """
+    if not user_ids:
+        return {}
+    users = models.User.__table__
+    tables = Base.metadata.sorted_tables  # Parents before children
+    owned = {users.name: users.c.id.in_(user_ids)}
+    for table in tables:
+        conditions = [
+            fk.parent.in_(select(fk.column).where(owned[fk.column.table.name]))
+            for fk in table.foreign_keys
+            if fk.column.table is not table and fk.column.table.name in owned
+        ]
+        if table is not users and conditions:
+            owned[table.name] = or_(*conditions)
+
+    deleted = {}
+    for table in reversed(tables):
+        if table.name in owned:
+            count = conn.execute(table.delete().where(owned[table.name])).rowcount
+            if count:
+                deleted[table.name] = count
+    return deleted
+
+
+def synthetic_user_ids(engine: Engine, seed: Optional[int] = None) -> List[int]:
+    """Ids of generated tenants (optionally only those from one seed), in creation order"""
+    pattern = f"{EMAIL_PREFIX}{seed}-%" if seed is not None else f"{EMAIL_PREFIX}%"
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(
+            select(models.User.id).where(models.User.email.like(pattern)).order_by(models.User.id)
+        )]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic multi-tenant dataset")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///benchmarks/synthetic.db"))
+    parser.add_argument("--users", type=int, default=DatasetSpec.users)
+    parser.add_argument("--items", type=int, default=DatasetSpec.items_per_user, help="Items per user")
+    parser.add_argument("--orders", type=int, default=DatasetSpec.orders_per_user, help="Orders per user")
+    parser.add_argument("--days", type=int, default=DatasetSpec.days)
+    parser.add_argument("--competitors", type=int, default=DatasetSpec.competitors_per_user)
+    parser.add_argument("--batches", type=int, default=DatasetSpec.competitor_batches, help="Competitor scrape batches")
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--end-date", default=None, help="Last day of data (YYYY-MM-DD, default today)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    spec = DatasetSpec(
+        users=args.users, items_per_user=args.items, orders_per_user=args.orders, days=args.days,
+        competitors_per_user=args.competitors, competitor_batches=args.batches, seed=args.seed,
+        **({"end_date": args.end_date} if args.end_date else {})
+    )
+    summary = SyntheticDatasetGenerator(create_engine(args.database_url), spec).generate()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ import logging
 import uuid
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
-from sqlalchemy import create_engine, and_
+from sqlalchemy import create_engine, and_, func
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import IntegrityError
 from models import Base, User, CompetitorEntity, CompetitorItem
@@ -236,34 +236,55 @@ class CompetitorDatabase:
             return deleted_count
     
     def get_competitor_summary(self, user_id: int) -> Dict:
-        """Get a summary of competitors and their item counts"""
+        """Get a summary of competitors and their latest-batch item counts"""
         with self.get_session() as session:
-            competitors = session.query(CompetitorEntity).filter(
+            # Tag each item with its competitor's latest batch, then count only
+            # that batch -- one grouped query for all competitors
+            ranked = session.query(
+                CompetitorItem.competitor_id,
+                CompetitorItem.batch_id,
+                CompetitorItem.sync_timestamp,
+                func.first_value(CompetitorItem.batch_id).over(
+                    partition_by=CompetitorItem.competitor_id,
+                    order_by=(CompetitorItem.sync_timestamp.desc().nullslast(), CompetitorItem.id.desc())
+                ).label('latest_batch_id')
+            ).join(
+                CompetitorEntity, CompetitorItem.competitor_id == CompetitorEntity.id
+            ).filter(
                 CompetitorEntity.user_id == user_id
-            ).all()
+            ).subquery()
             
-            summary = {
-                'total_competitors': len(competitors),
-                'selected_competitors': len([c for c in competitors if c.is_selected]),
-                'competitors': []
-            }
+            latest = session.query(ranked).filter(
+                ranked.c.batch_id.is_not_distinct_from(ranked.c.latest_batch_id)
+            ).subquery()
             
-            for competitor in competitors:
-                item_count = session.query(CompetitorItem).filter(
-                    CompetitorItem.competitor_id == competitor.id
-                ).count()
-                
-                latest_batch = session.query(CompetitorItem.sync_timestamp).filter(
-                    CompetitorItem.competitor_id == competitor.id
-                ).order_by(CompetitorItem.sync_timestamp.desc()).first()
-                
-                summary['competitors'].append({
-                    'id': competitor.id,
-                    'name': competitor.name,
-                    'category': competitor.category,
-                    'is_selected': competitor.is_selected,
-                    'item_count': item_count,
-                    'last_sync': latest_batch[0] if latest_batch else None
-                })
+            rows = session.query(
+                CompetitorEntity.id,
+                CompetitorEntity.name,
+                CompetitorEntity.category,
+                CompetitorEntity.is_selected,
+                func.count(latest.c.competitor_id).label('item_count'),
+                func.max(latest.c.sync_timestamp).label('last_sync')
+            ).outerjoin(
+                latest, latest.c.competitor_id == CompetitorEntity.id
+            ).filter(
+                CompetitorEntity.user_id == user_id
+            ).group_by(
+                CompetitorEntity.id, CompetitorEntity.name, CompetitorEntity.category, CompetitorEntity.is_selected
+            ).all()
             
-            return summary
+            return {
+                'total_competitors': len(rows),
+                'selected_competitors': len([r for r in rows if r.is_selected]),
+                'competitors': [
+                    {
+                        'id': r.id,
+                        'name': r.name,
+                        'category': r.category,
+                        'is_selected': r.is_selected,
+                        'item_count': r.item_count,
+                        'last_sync': r.last_sync
+                    }
+                    for r in rows
+                ]
+            }
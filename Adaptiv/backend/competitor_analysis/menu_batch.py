@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Batch processing for AI menu standardization, cleanup and extraction
+
+Instead of one blocking OpenAI request per restaurant, menus are packed into
+requests bounded by an estimated token budget and the requests run
+concurrently under a rate limit.
+
+Each request carries several menus, separated by section headers:
+
+    ### MENU <n>
+    Item Name - $Price
+    ...
+
+Sections are numbered by position rather than by the caller's key, so menus
+can be keyed by anything (restaurant names with spaces, URLs). The model is
+asked to answer with the same headers, so every line in the response can be
+routed back to the menu it belongs to. Menus whose section is
+missing from the response are reported as failed and keep their original items.
+
+Usage:
+    from menu_batch import BatchMenuProcessor
+    processor = BatchMenuProcessor(openai_client)
+    results = processor.standardize({restaurant_id: menu_items, ...})
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+# Rough characters-per-token ratio used to estimate request size
+CHARS_PER_TOKEN = 4
+
+SECTION_HEADER = "### MENU "
+SECTION_PATTERN = re.compile(r'^#+\s*MENU\s+(\S+)\s*$', re.IGNORECASE)
+ITEM_PATTERN = re.compile(r'^(.+?)\s*-\s*\$(\d+\.?\d*)$')
+
+STANDARDIZE_INSTRUCTIONS = """
+Standardize the menu items below to ensure consistent format. Each item line should be exactly:
+Item Name - $Price
+
+Fix any formatting issues, ensure prices have $ symbol, remove extra characters.
+The input contains several menus, each starting with a "### MENU <id>" header line.
+Repeat every header line unchanged, followed by that menu's standardized items, one per line.
+Return nothing else.
+
+Example output format:
+### MENU 12
+Margherita Pizza - $12.99
+Caesar Salad - $8.50
+### MENU 15
+Coffee - $3.00
+"""
+
+CLEANUP_INSTRUCTIONS = """
+Clean up the restaurant menus below by:
+1. Remove duplicate items - if there are two items that are similar or the same, keep the one with the HIGHER price
+2. Remove invalid items (non-food/drink items)
+3. Ensure consistent format: "Item Name - $Price"
+4. Fix any formatting issues
+
+Important: When you find similar items with different prices (e.g., "Coffee - $3.00" and "Coffee - $4.50"), always keep the one with the higher price ($4.50 in this example).
+
+The input contains several menus, each starting with a "### MENU <id>" header line.
+Menus are independent: never merge items across menus.
+Repeat every header line unchanged, followed by that menu's cleaned items, one per line,
+in the format "Item Name - $Price". Return nothing else.
+"""
+
+EXTRACT_INSTRUCTIONS = """
+Extract menu items and prices from the restaurant website contents below.
+
+The input contains several websites, each starting with a "### MENU <id>" header line.
+Find all food and drink items with prices. Return only the item name and price.
+Repeat every header line unchanged, followed by the items found on that website,
+one per line, in the format: Item Name - $Price
+If a website has no menu items or prices, output only its header line.
+"""
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter allowing at most `requests_per_minute` acquisitions
+    per rolling minute, spaced evenly.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute and requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        """Block until the next request slot is available"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, good enough for packing requests"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def format_menu_lines(menu_items: List[Dict]) -> List[str]:
+    """Render menu items as 'Item Name - $Price' lines"""
+    lines = []
+    for item in menu_items:
+        name = (item.get('name') or '').strip()
+        if not name:
+            continue
+        price = str(item.get('price') or '').strip()
+        if price and not price.startswith('$'):
+            price = f"${price}"
+        lines.append(f"{name} - {price}")
+    return lines
+
+
+def pack_batches(sections: Dict[Hashable, List[str]], max_tokens: int) -> List[List[Tuple[Hashable, List[str]]]]:
+    """
+    Pack menu sections into batches whose estimated size stays under max_tokens.
+
+    Sections are kept whole when possible. A single section larger than the
+    budget is split across several batches; its parts share the same key and
+    are merged again when the responses are parsed.
+    """
+    batches: List[List[Tuple[Hashable, List[str]]]] = []
+    current: List[Tuple[Hashable, List[str]]] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            batches.append(current)
+        current, current_tokens = [], 0
+
+    for key, lines in sections.items():
+        header_tokens = estimate_tokens(f"{SECTION_HEADER}{key}")
+        section_tokens = header_tokens + sum(estimate_tokens(line) for line in lines)
+
+        if section_tokens <= max_tokens:
+            if current_tokens + section_tokens > max_tokens:
+                flush()
+            current.append((key, lines))
+            current_tokens += section_tokens
+            continue
+
+        # Oversized menu: split it into budget-sized chunks of its own
+        flush()
+        chunk: List[str] = []
+        chunk_tokens = header_tokens
+        for line in lines:
+            line_tokens = estimate_tokens(line)
+            if chunk and chunk_tokens + line_tokens > max_tokens:
+                batches.append([(key, chunk)])
+                chunk, chunk_tokens = [], header_tokens
+            chunk.append(line)
+            chunk_tokens += line_tokens
+        if chunk:
+            batches.append([(key, chunk)])
+
+    flush()
+    return batches
+
+
+def build_batch_prompt(instructions: str, batch: List[Tuple[Hashable, List[str]]]) -> str:
+    """Build the prompt for one batch of menu sections"""
+    body = "\n".join(
+        "\n".join([f"{SECTION_HEADER}{key}", *lines])
+        for key, lines in batch
+    )
+    return f"{instructions.strip()}\n\n{body}\n"
+
+
+def parse_batch_response(response_text: str, keys: List[Hashable]) -> Dict[Hashable, List[Dict]]:
+    """
+    Route 'Item Name - $Price' lines back to their menu by section header.
+    Keys whose header never appears are left out of the result.
+    """
+    key_lookup = {str(key): key for key in keys}
+    results: Dict[Hashable, List[Dict]] = {}
+    current_key = None
+
+    for raw_line in response_text.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        header = SECTION_PATTERN.match(line)
+        if header:
+            current_key = key_lookup.get(header.group(1))
+            if current_key is not None:
+                results.setdefault(current_key, [])
+            continue
+
+        if current_key is None:
+            continue
+
+        line = re.sub(r'^[-•*]\s*', '', line)  # Remove bullet points
+        line = re.sub(r'^\d+\.\s*', '', line)  # Remove numbering
+        match = ITEM_PATTERN.match(line)
+        if match:
+            name = match.group(1).strip()
+            if name and 2 < len(name) < 100:
+                results[current_key].append({
+                    'name': name,
+                    'price': f"${match.group(2)}",
+                    'description': ''
+                })
+
+    return results
+
+
+class BatchMenuProcessor:
+    """
+    Runs menu prompts through OpenAI in packed, concurrent, rate-limited requests.
+
+    Args:
+        openai_client: OpenAI client (any client exposing chat.completions.create)
+        model: Chat model used for every request
+        max_batch_tokens: Estimated input token budget per request
+        max_concurrency: Number of requests in flight at once
+        requests_per_minute: Request rate limit shared by all workers
+        max_output_tokens: max_tokens sent with each request
+        on_request: Optional callback invoked once per request sent (used for quota tracking)
+    """
+
+    def __init__(self, openai_client, model: str = "gpt-4o-mini", max_batch_tokens: int = 3000,
+                 max_concurrency: int = 4, requests_per_minute: float = 60,
+                 max_output_tokens: int = 4000, on_request: Optional[Callable[[], None]] = None):
+        self.openai_client = openai_client
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.max_output_tokens = max_output_tokens
+        self.on_request = on_request
+
+    def standardize(self, menus: Dict[Hashable, List[Dict]]) -> Dict[Hashable, List[Dict]]:
+        """Standardize many menus. Returns key -> standardized items for menus that succeeded"""
+        results = self.run(STANDARDIZE_INSTRUCTIONS, {key: format_menu_lines(items) for key, items in menus.items()})
+        return {key: items for key, items in results.items() if items}
+
+    def cleanup(self, menus: Dict[Hashable, List[Dict]]) -> Dict[Hashable, List[Dict]]:
+        """Deduplicate and clean many menus. Returns key -> cleaned items for menus that succeeded"""
+        results = self.run(CLEANUP_INSTRUCTIONS, {key: format_menu_lines(items) for key, items in menus.items()})
+        return {key: items for key, items in results.items() if items}
+
+    def extract(self, pages: Dict[Hashable, str], max_page_chars: int = 8000) -> Dict[Hashable, List[Dict]]:
+        """Extract menu items from many page texts. Returns key -> items (empty when no menu was found)"""
+        sections = {}
+        for key, page_text in pages.items():
+            lines = [line.strip() for line in (page_text or '')[:max_page_chars].split('\n') if line.strip()]
+            sections[key] = lines
+        return self.run(EXTRACT_INSTRUCTIONS, sections)
+
+    def run(self, instructions: str, sections: Dict[Hashable, List[str]]) -> Dict[Hashable, List[Dict]]:
+        """
+        Pack sections into batches, send them concurrently and merge the parsed results.
+        A menu is returned only if every part of it came back (possibly with no items);
+        menus missing from the result failed.
+        """
+        keys = [key for key, lines in sections.items() if lines]
+        if not keys or not self.openai_client:
+            return {}
+
+        # Section headers carry a single token, so menus are addressed by position
+        batches = pack_batches({str(index): sections[key] for index, key in enumerate(keys)}, self.max_batch_tokens)
+        logging.info(f"Batch menu processing: {len(keys)} menus in {len(batches)} requests")
+
+        parts_expected: Dict[str, int] = {}
+        for batch in batches:
+            for position, _ in batch:
+                parts_expected[position] = parts_expected.get(position, 0) + 1
+
+        merged: Dict[str, List[Dict]] = {}
+        parts_received: Dict[str, int] = {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+            futures = [executor.submit(self._process_batch, instructions, batch) for batch in batches]
+            for future in as_completed(futures):
+                for position, items in future.result().items():
+                    merged.setdefault(position, []).extend(items)
+                    parts_received[position] = parts_received.get(position, 0) + 1
+
+        results = {
+            keys[int(position)]: items for position, items in merged.items()
+            if parts_received.get(position) == parts_expected[position]
+        }
+        failed = len(keys) - len(results)
+        if failed:
+            logging.warning(f"Batch menu processing: {failed} of {len(keys)} menus got no response")
+        return results
+
+    def _process_batch(self, instructions: str, batch: List[Tuple[Hashable, List[str]]]) -> Dict[Hashable, List[Dict]]:
+        """Send one packed request and parse its sections; a failed request yields no results"""
+        keys = [key for key, _ in batch]
+        try:
+            self.rate_limiter.acquire()
+            if self.on_request:
+                self.on_request()
+            response = self.openai_client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": build_batch_prompt(instructions, batch)}],
+                max_tokens=self.max_output_tokens,
+                temperature=0
+            )
+            return parse_batch_response(response.choices[0].message.content or '', keys)
+        except Exception as e:
+            logging.error(f"Batch menu request failed for menus {keys}: {e}")
+            return {}
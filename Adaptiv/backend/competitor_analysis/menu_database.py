@@ -11,6 +11,7 @@ from typing import List, Dict, Optional
 import logging
 import os
 from openai import OpenAI
+from menu_batch import BatchMenuProcessor
 
 
 class MenuDatabase:
@@ -77,6 +78,12 @@ class MenuDatabase:
                 )
             ''')
             
+            # Hash of the menu as left by its last AI standardization (added in place on existing databases)
+            cursor.execute('PRAGMA table_info(restaurants)')
+            restaurant_columns = {row[1] for row in cursor.fetchall()}
+            if 'standardized_hash' not in restaurant_columns:
+                cursor.execute('ALTER TABLE restaurants ADD COLUMN standardized_hash TEXT')
+
             # Create indexes for better performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_restaurants_url ON restaurants(url)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_restaurants_type_location ON restaurants(restaurant_type, location)')
@@ -529,7 +536,7 @@ class MenuDatabase:
                 SELECT id, name, price, description
                 FROM menu_items
                 WHERE restaurant_id = ?
-                ORDER BY name
+                ORDER BY name, id
             ''', (restaurant_id,))
 
             current_items = cursor.fetchall()
@@ -550,57 +557,125 @@ class MenuDatabase:
             # Standardize the menu items
             standardized_items = self.standardize_menu_items(menu_items)
 
-            if not standardized_items or len(standardized_items) == 0:
+            # standardize_menu_items hands back its input when the AI call fails
+            if not standardized_items or standardized_items is menu_items:
                 logging.warning(f"Standardization returned no items for restaurant {restaurant_id}")
                 return False
 
             # Update the database with standardized items
-            updated_count = 0
-            for i, standardized_item in enumerate(standardized_items):
-                if i < len(current_items):
-                    item_id = current_items[i][0]  # Get the original item ID
-
-                    cursor.execute('''
-                        UPDATE menu_items
-                        SET name = ?, price = ?, description = ?
-                        WHERE id = ?
-                    ''', (
-                        standardized_item['name'],
-                        standardized_item['price'],
-                        standardized_item.get('description', ''),
-                        item_id
-                    ))
-                    updated_count += 1
+            self._apply_standardized_items(cursor, restaurant_id, menu_items, standardized_items)
 
             conn.commit()
-            logging.info(f"Standardized {updated_count} menu items for restaurant {restaurant_id}")
             return True
 
-    def standardize_all_menus(self) -> Dict[str, int]:
-        """Standardize menu items for all restaurants"""
+    def standardize_all_menus(self, force: bool = False, max_batch_tokens: int = 3000,
+                              max_concurrency: int = 4, requests_per_minute: float = 60) -> Dict[str, int]:
+        """
+        Standardize menu items for all restaurants in packed, concurrent AI requests.
+
+        Menus whose hash still matches the one recorded after their last
+        standardization are skipped unless force is True.
+        """
         if not self.openai_client:
             logging.error("OpenAI client not available for menu standardization")
-            return {'processed': 0, 'successful': 0, 'failed': 0}
+            return {'processed': 0, 'successful': 0, 'failed': 0, 'skipped': 0}
 
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
 
-            # Get all restaurant IDs
-            cursor.execute('SELECT DISTINCT id FROM restaurants')
-            restaurant_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute('SELECT id, standardized_hash FROM restaurants')
+            standardized_hashes = dict(cursor.fetchall())
 
-            results = {'processed': 0, 'successful': 0, 'failed': 0}
+            # Load every menu in one query
+            cursor.execute('''
+                SELECT restaurant_id, id, name, price, description
+                FROM menu_items
+                ORDER BY restaurant_id, name, id
+            ''')
+            menus: Dict[int, List[Dict]] = {}
+            for restaurant_id, item_id, name, price, description in cursor.fetchall():
+                menus.setdefault(restaurant_id, []).append({
+                    'id': item_id,
+                    'name': name,
+                    'price': price,
+                    'description': description
+                })
+
+            results = {'processed': 0, 'successful': 0, 'failed': 0, 'skipped': 0}
+
+            pending: Dict[int, List[Dict]] = {}
+            for restaurant_id, standardized_hash in standardized_hashes.items():
+                current_items = menus.get(restaurant_id)
+                if not current_items:
+                    results['processed'] += 1
+                    results['failed'] += 1
+                elif not force and standardized_hash == self._calculate_stored_menu_hash(current_items):
+                    results['skipped'] += 1
+                else:
+                    pending[restaurant_id] = current_items
 
-            for restaurant_id in restaurant_ids:
+            processor = BatchMenuProcessor(
+                self.openai_client,
+                max_batch_tokens=max_batch_tokens,
+                max_concurrency=max_concurrency,
+                requests_per_minute=requests_per_minute
+            )
+            standardized_menus = processor.standardize(pending)
+
+            for restaurant_id, current_items in pending.items():
                 results['processed'] += 1
-                if self.standardize_restaurant_menu(restaurant_id):
+                standardized_items = standardized_menus.get(restaurant_id)
+                if standardized_items:
+                    self._apply_standardized_items(cursor, restaurant_id, current_items, standardized_items)
                     results['successful'] += 1
                 else:
                     results['failed'] += 1
 
+            conn.commit()
             logging.info(f"Standardization complete: {results}")
             return results
 
+    def _calculate_stored_menu_hash(self, menu_items: List[Dict]) -> str:
+        """Menu hash over the stored item fields (row ids excluded)"""
+        return self._calculate_menu_hash([
+            {
+                'name': item.get('name') or '',
+                'price': item.get('price') or '',
+                'description': item.get('description') or ''
+            }
+            for item in menu_items
+        ])
+
+    def _apply_standardized_items(self, cursor, restaurant_id: int, current_items: List[Dict],
+                                  standardized_items: List[Dict]):
+        """
+        Write standardized items over the restaurant's rows in order and record
+        the resulting menu hash so an unchanged menu is skipped next time
+        """
+        resulting_items = []
+        for i, current_item in enumerate(current_items):
+            if i < len(standardized_items):
+                standardized_item = standardized_items[i]
+                cursor.execute('''
+                    UPDATE menu_items
+                    SET name = ?, price = ?, description = ?
+                    WHERE id = ?
+                ''', (
+                    standardized_item['name'],
+                    standardized_item['price'],
+                    standardized_item.get('description', ''),
+                    current_item['id']
+                ))
+                resulting_items.append(standardized_item)
+            else:
+                resulting_items.append(current_item)
+
+        cursor.execute(
+            'UPDATE restaurants SET standardized_hash = ? WHERE id = ?',
+            (self._calculate_stored_menu_hash(resulting_items), restaurant_id)
+        )
+        logging.info(f"Standardized {min(len(current_items), len(standardized_items))} menu items for restaurant {restaurant_id}")
+
     def clear_database(self) -> Dict[str, int]:
         """Clear all data from the database"""
         with sqlite3.connect(self.db_path) as conn:
@@ -640,29 +715,15 @@ class MenuDatabase:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
 
-            # Find duplicate restaurants by normalized URL
-            cursor.execute('''
-                SELECT url, COUNT(*) as count, GROUP_CONCAT(id) as ids
-                FROM restaurants
-                GROUP BY url
-                HAVING count > 1
-            ''')
-
-            duplicates = cursor.fetchall()
-            removed_count = 0
-
-            for url, _, ids_str in duplicates:
-                ids = [int(id_str) for id_str in ids_str.split(',')]
-                # Keep the first one, remove the rest
-                ids_to_remove = ids[1:]
-
-                for restaurant_id in ids_to_remove:
-                    # Delete menu items first
-                    cursor.execute('DELETE FROM menu_items WHERE restaurant_id = ?', (restaurant_id,))
-                    # Delete restaurant
-                    cursor.execute('DELETE FROM restaurants WHERE id = ?', (restaurant_id,))
-                    removed_count += 1
-                    logging.info(f"Removed duplicate restaurant ID {restaurant_id} for URL {url}")
+            # Keep the first restaurant per URL; delete the rest and their
+            # menu items in two set-based statements
+            duplicates = '''
+                SELECT id FROM restaurants
+                WHERE id NOT IN (SELECT MIN(id) FROM restaurants GROUP BY url)
+            '''
+            cursor.execute(f'DELETE FROM menu_items WHERE restaurant_id IN ({duplicates})')
+            cursor.execute(f'DELETE FROM restaurants WHERE id IN ({duplicates})')
+            removed_count = cursor.rowcount
 
             conn.commit()
             logging.info(f"Removed {removed_count} duplicate restaurants")
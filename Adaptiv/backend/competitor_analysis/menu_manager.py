@@ -101,7 +101,7 @@ def fix_restaurant_names(db: MenuDatabase):
     print(f"Successfully fixed {fixed_count} restaurant names.")
 
 
-def standardize_menu(db: MenuDatabase, restaurant_id: int = None):
+def standardize_menu(db: MenuDatabase, restaurant_id: int = None, force: bool = False):
     """Standardize menu items using AI"""
     if restaurant_id:
         print(f"Standardizing menu for restaurant ID {restaurant_id}...")
@@ -112,8 +112,9 @@ def standardize_menu(db: MenuDatabase, restaurant_id: int = None):
             print(f"Failed to standardize menu for restaurant {restaurant_id}")
     else:
         print("Standardizing all restaurant menus...")
-        results = db.standardize_all_menus()
-        print(f"Processed: {results['processed']}, Successful: {results['successful']}, Failed: {results['failed']}")
+        results = db.standardize_all_menus(force=force)
+        print(f"Processed: {results['processed']}, Successful: {results['successful']}, "
+              f"Failed: {results['failed']}, Skipped (unchanged): {results['skipped']}")
 
 
 def clear_database(db: MenuDatabase):
@@ -177,6 +178,7 @@ def main():
     standardize_parser = subparsers.add_parser('standardize', help='Standardize menu items using AI')
     standardize_parser.add_argument('--restaurant-id', type=int, help='Specific restaurant ID to standardize (optional)')
     standardize_parser.add_argument('--all', action='store_true', help='Standardize all restaurant menus')
+    standardize_parser.add_argument('--force', action='store_true', help='Also re-standardize menus unchanged since their last standardization')
 
     # Clear database
     clear_parser = subparsers.add_parser('clear', help='Clear all data from database (DESTRUCTIVE)')
@@ -214,7 +216,7 @@ def main():
         if args.restaurant_id:
             standardize_menu(db, args.restaurant_id)
         elif args.all:
-            standardize_menu(db)
+            standardize_menu(db, force=args.force)
         else:
             print("Please specify either --restaurant-id <ID> or --all")
             parser.print_help()
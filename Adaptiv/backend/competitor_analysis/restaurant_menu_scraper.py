@@ -35,9 +35,12 @@ import time
 import json
 import os
 import sys
+import threading
 from typing import List, Dict, Optional
 from openai import OpenAI
 from menu_database import MenuDatabase
+from menu_batch import BatchMenuProcessor
+from scrape_pipeline import ScrapePipeline
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -46,6 +49,7 @@ from config.database import SessionLocal
 import models
 import schemas
 from services.competitor_entity_service import CompetitorEntityService
+from services.competitor_stats_service import CompetitorStatsService
 
 
 class MenuScraper:
@@ -802,7 +806,74 @@ Return only the cleaned menu items, one per line, in the format "Item Name - $Pr
         except Exception as e:
             logging.error(f"Error cleaning menu with AI: {e}")
             return menu_items
-    
+
+    def _batch_processor(self, model: str, max_concurrency: int, requests_per_minute: float) -> BatchMenuProcessor:
+        """Batch processor whose requests count against this session's API call limit"""
+        lock = threading.Lock()
+
+        def count_request():
+            with lock:
+                self.api_call_count += 1
+
+        return BatchMenuProcessor(
+            self.openai_client,
+            model=model,
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            on_request=count_request
+        )
+
+    def cleanup_menus_with_ai(self, menus: Dict[str, List[Dict]], max_concurrency: int = 4,
+                              requests_per_minute: float = 60) -> Dict[str, List[Dict]]:
+        """
+        Batch version of cleanup_menu_with_ai for many restaurants at once.
+
+        Menus are packed into bounded-size requests that run concurrently.
+        Menus the AI fails to return keep their original items.
+        """
+        if not self.openai_client or not menus:
+            return menus
+
+        processor = self._batch_processor("gpt-4o-mini", max_concurrency, requests_per_minute)
+        cleaned_menus = processor.cleanup(menus)
+
+        results = {}
+        for key, menu_items in menus.items():
+            cleaned_items = cleaned_menus.get(key)
+            if not cleaned_items:
+                results[key] = menu_items
+                continue
+            results[key] = [
+                {
+                    'name': item['name'],
+                    'price': float(item['price'].lstrip('$')),
+                    'description': '',
+                    'category': ''
+                }
+                for item in cleaned_items
+            ]
+            logging.info(f"Menu cleanup ({key}): {len(menu_items)} → {len(cleaned_items)} items")
+        return results
+
+    def extract_menus_with_openai(self, pages: Dict[str, str], max_concurrency: int = 4,
+                                  requests_per_minute: float = 60) -> Dict[str, List[Dict]]:
+        """
+        Batch version of _extract_menu_with_openai: extract menu items from many
+        url -> page text entries in packed, concurrent requests.
+        Pages with no menu (or a failed request) map to an empty list.
+        """
+        if not self.openai_client or not pages or not self._can_make_api_call():
+            return {url: [] for url in pages}
+
+        processor = self._batch_processor("gpt-4.1", max_concurrency, requests_per_minute)
+        extracted = processor.extract(pages)
+
+        results = {}
+        for url in pages:
+            results[url] = extracted.get(url, [])
+            logging.info(f"OpenAI extracted {len(results[url])} menu items from {url}")
+        return results
+
     def save_competitor_data(self, competitor_name: str, location: str, menu_items: List[Dict], 
                            website_url: str = None, user_id: int = None) -> Dict:
         """
@@ -904,6 +975,7 @@ Return only the cleaned menu items, one per line, in the format "Item Name - $Pr
                 logging.info(f"💾 Committing {items_added} items to database...")
                 # Commit all changes
                 db.commit()
+                CompetitorStatsService(db).invalidate(user_id)
                 logging.info("✅ Database commit successful")
                 
                 # Debug: Print structured database output
@@ -996,22 +1068,15 @@ def main():
     successful_urls = []
     max_successful_urls = 3
 
-    for i, url in enumerate(urls):
-        if len(successful_urls) >= max_successful_urls:
-            break
-
-        try:
-            logging.info(f"Attempting to scrape URL {i+1}: {url}")
-            items = scraper.scrape_square_menu(url)
-            if items:
-                all_menu_items.extend(items)
-                successful_urls.append(url)
-                logging.info(f"Successfully scraped {len(items)} items from {url}")
-                logging.info(f"Found {len(successful_urls)}/{max_successful_urls} URLs with menu items")
-            else:
-                logging.info(f"No menu items found at {url}")
-        except Exception as e:
-            logging.warning(f"Failed to scrape {url}: {e}")
+    # Scrape all candidate URLs concurrently, cheapest extractor first
+    pipeline = ScrapePipeline(scraper)
+    try:
+        for result in pipeline.scrape_sync(urls, target_menus=max_successful_urls):
+            all_menu_items.extend(result.menu_items)
+            successful_urls.append(result.url)
+            logging.info(f"Successfully scraped {len(result.menu_items)} items from {result.url} ({result.extractor})")
+    finally:
+        pipeline.close()
 
     if not all_menu_items:
         error_msg = f"Could not extract menu from any URL for {args.restaurant_name}"
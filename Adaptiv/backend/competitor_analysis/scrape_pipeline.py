@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Concurrent menu scraping pipeline
+
+Replaces the one-URL-at-a-time loop over search results with a staged async
+pipeline built around MenuScraper's extractors:
+
+- One pooled httpx.AsyncClient (keep-alive connections reused across URLs)
+  with a global connection limit and a per-host concurrency limit
+- An on-disk HTTP cache keyed by URL + ETag; cached pages are revalidated
+  with If-None-Match / If-Modified-Since and served from disk on 304
+- Extractors run cheapest-first as stages over all remaining URLs:
+      static_html   parse the fetched HTML (no API calls)
+      page_text_ai  OpenAI extraction on the fetched page text (1 API call)
+      selenium      render in a warm Selenium browser, then parse
+      web_search    OpenAI web search extraction (most expensive)
+  As soon as enough URLs yield a valid menu, the remaining work is cancelled
+  and later stages never run.
+- A SeleniumPool that keeps browsers warm across URLs and restaurants
+
+Usage:
+    from scrape_pipeline import ScrapePipeline
+    pipeline = ScrapePipeline(scraper)
+    results = pipeline.scrape_sync(urls, target_menus=3)
+    print(pipeline.stats.to_dict())
+    pipeline.close()
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import httpx
+from bs4 import BeautifulSoup
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache')
+
+# Cheapest first: later stages only run for URLs the earlier ones could not handle
+EXTRACTOR_STAGES = ('static_html', 'page_text_ai', 'selenium', 'web_search')
+
+# Expensive stages only try this many of the remaining URLs
+EXPENSIVE_STAGES = {'selenium', 'web_search'}
+
+# Fewer items than this is not considered a valid menu (same threshold as the Selenium fallback)
+MIN_MENU_ITEMS = 3
+
+MENU_SELECTORS = [
+    "div[class*='menu']", "div[class*='item']", "div[class*='product']",
+    ".menu", ".menu-item", ".product", ".item", "[data-testid*='menu']"
+]
+
+
+@dataclass
+class FetchedPage:
+    url: str
+    final_url: str
+    status_code: int
+    html: str
+    from_cache: bool = False
+
+
+@dataclass
+class UrlMenu:
+    url: str
+    menu_items: List[Dict]
+    extractor: str
+
+
+@dataclass
+class ScrapeStats:
+    requests: int = 0
+    revalidated: int = 0
+    bytes_downloaded: int = 0
+    fetch_errors: int = 0
+    cancelled: int = 0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'revalidated': self.revalidated,
+            'bytes_downloaded': self.bytes_downloaded,
+            'fetch_errors': self.fetch_errors,
+            'cancelled': self.cancelled,
+            'stage_seconds': {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()}
+        }
+
+
+class HttpCache:
+    """
+    On-disk HTTP cache keyed by URL + ETag.
+
+    Each URL has a small JSON index entry pointing at the body stored for its
+    current validator (ETag, or Last-Modified when the server sends no ETag).
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _digest(value: str) -> str:
+        return hashlib.sha256(value.encode()).hexdigest()
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, f"{self._digest(url)}.json")
+
+    def _body_path(self, url: str, validator: str) -> str:
+        return os.path.join(self.cache_dir, f"{self._digest(url + '|' + validator)}.html")
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Index entry for a URL whose body is still on disk, or None"""
+        try:
+            with open(self._index_path(url)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(self._body_path(url, entry['validator'])):
+            return None
+        return entry
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read_body(self, url: str, entry: Dict) -> str:
+        with open(self._body_path(url, entry['validator']), encoding='utf-8') as f:
+            return f.read()
+
+    def store(self, url: str, final_url: str, response: httpx.Response):
+        """Store a 200 response if the server sent a validator to revalidate it with"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        validator = etag or last_modified
+        if not validator:
+            return
+
+        previous = self.lookup(url)
+        with open(self._body_path(url, validator), 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        with open(self._index_path(url), 'w') as f:
+            json.dump({
+                'url': url,
+                'final_url': final_url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'validator': validator,
+                'stored_at': time.time()
+            }, f)
+
+        # Drop the body cached under the previous validator
+        if previous and previous['validator'] != validator:
+            try:
+                os.remove(self._body_path(url, previous['validator']))
+            except OSError:
+                pass
+
+
+def _default_driver_factory():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.set_page_load_timeout(30)
+    return driver
+
+
+class SeleniumPool:
+    """
+    Keeps up to `size` browsers open and hands them out one render at a time.
+
+    Browsers are created lazily (or up front with warm()) and reused until
+    close(); a browser that errors is discarded and replaced on demand.
+    """
+
+    def __init__(self, size: int = 1, driver_factory: Callable = _default_driver_factory, wait_seconds: int = 15):
+        self.size = max(1, size)
+        self.driver_factory = driver_factory
+        self.wait_seconds = wait_seconds
+        self._idle: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def warm(self):
+        """Start browsers up to the pool size"""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self.driver_factory())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self.driver_factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    def _discard(self, driver):
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def render(self, url: str) -> str:
+        """Load a page in a pooled browser and return the rendered HTML"""
+        driver = self._acquire()
+        try:
+            driver.get(url)
+            self._wait_for_menu(driver)
+            html = driver.page_source
+        except Exception:
+            self._discard(driver)
+            raise
+        if self._closed:
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+        return html
+
+    def _wait_for_menu(self, driver):
+        try:
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
+        except ImportError:
+            return
+
+        wait = WebDriverWait(driver, self.wait_seconds)
+        for selector in MENU_SELECTORS:
+            try:
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+                break
+            except Exception:
+                continue
+
+    def close(self):
+        """Quit every idle browser; browsers in use are quit when returned"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+class ScrapePipeline:
+    """
+    Staged, concurrent menu scraping over a list of candidate URLs.
+
+    Args:
+        scraper: MenuScraper providing the extractors and OpenAI client
+        max_connections: Connection pool size shared by all hosts
+        per_host_limit: Concurrent requests allowed per host
+        cache_dir: On-disk HTTP cache directory (None disables caching)
+        selenium_pool: Shared SeleniumPool; one browser is created lazily if not given
+        stages: Extractor stages to run, cheapest first
+        expensive_stage_urls: How many remaining URLs the Selenium and web search stages try
+        timeout: Per-request timeout in seconds
+        transport: httpx transport for the pooled client (a MockTransport in tests)
+    """
+
+    def __init__(self, scraper, max_connections: int = 20, per_host_limit: int = 2,
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR, selenium_pool: Optional[SeleniumPool] = None,
+                 stages: Sequence[str] = EXTRACTOR_STAGES, expensive_stage_urls: int = 3,
+                 timeout: float = 30.0, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.scraper = scraper
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.cache = HttpCache(cache_dir) if cache_dir else None
+        self.selenium_pool = selenium_pool or SeleniumPool(size=1)
+        self.stages = [stage for stage in stages if stage in EXTRACTOR_STAGES]
+        self.expensive_stage_urls = expensive_stage_urls
+        self.timeout = timeout
+        self.transport = transport
+        self.stats = ScrapeStats()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def scrape_sync(self, urls: Sequence[str], target_menus: int = 1) -> List[UrlMenu]:
+        """Blocking wrapper around scrape() for synchronous callers"""
+        async def run():
+            try:
+                return await self.scrape(urls, target_menus)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run())
+
+    async def scrape(self, urls: Sequence[str], target_menus: int = 1) -> List[UrlMenu]:
+        """
+        Extract menus from up to target_menus of the given URLs.
+
+        Each stage runs concurrently over the URLs no earlier stage produced a
+        menu for. Once target_menus URLs have a valid menu, outstanding tasks
+        are cancelled (extractors already running in a worker thread finish in
+        the background, but their results are discarded).
+
+        Several scrape() calls may run concurrently on one event loop; they
+        share the connection pool, the per-host limits and the stats.
+        """
+        urls = list(dict.fromkeys(urls))
+        client = self._client_for_loop()
+        results: List[UrlMenu] = []
+        pages: Dict[str, Optional[FetchedPage]] = {}
+
+        for stage in self.stages:
+            found = {result.url for result in results}
+            remaining = [url for url in urls if url not in found]
+            if stage in EXPENSIVE_STAGES:
+                remaining = remaining[:self.expensive_stage_urls]
+            if not remaining or len(results) >= target_menus:
+                break
+
+            started = time.perf_counter()
+            tasks = [asyncio.create_task(self._run_stage(client, stage, url, pages)) for url in remaining]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    result = await next_done
+                    if result is not None:
+                        results.append(result)
+                        if len(results) >= target_menus:
+                            break
+            finally:
+                pending = [task for task in tasks if not task.done()]
+                for task in pending:
+                    task.cancel()
+                self.stats.cancelled += len(pending)
+                await asyncio.gather(*pending, return_exceptions=True)
+                elapsed = time.perf_counter() - started
+                self.stats.stage_seconds[stage] = self.stats.stage_seconds.get(stage, 0.0) + elapsed
+
+        logging.info(f"Scrape pipeline: {len(results)} menus from {len(urls)} URLs")
+        return results
+
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    def close(self):
+        """Shut down the warm Selenium browsers"""
+        self.selenium_pool.close()
+
+    def _client_for_loop(self) -> httpx.AsyncClient:
+        """The pooled client and host limits belong to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            self._client = httpx.AsyncClient(headers=dict(self.scraper.session.headers), limits=limits,
+                                             timeout=self.timeout, follow_redirects=True,
+                                             transport=self.transport)
+            self._host_limits = {}
+            self._loop = loop
+        return self._client
+
+    async def _run_stage(self, client: httpx.AsyncClient, stage: str, url: str,
+                         pages: Dict[str, Optional[FetchedPage]]) -> Optional[UrlMenu]:
+        """Run one extractor on one URL; None unless it produced a valid menu"""
+        try:
+            if stage == 'static_html':
+                page = await self._fetch(client, url)
+                pages[url] = page
+                if page is None:
+                    return None
+                items = await asyncio.to_thread(self._parse_menu_html, page.html)
+
+            elif stage == 'page_text_ai':
+                page = pages.get(url)
+                if page is None or not self._can_call_openai():
+                    return None
+                page_text = BeautifulSoup(page.html, 'html.parser').get_text()[:5000].strip()
+                if len(page_text) <= 100:
+                    return None
+                items = await asyncio.to_thread(self.scraper._extract_menu_with_openai, page.final_url, page_text)
+
+            elif stage == 'selenium':
+                page = pages.get(url)
+                html = await asyncio.to_thread(self.selenium_pool.render, page.final_url if page else url)
+                items = await asyncio.to_thread(self._parse_menu_html, html)
+
+            else:  # web_search
+                if not self._can_call_openai():
+                    return None
+                page = pages.get(url)
+                items = await asyncio.to_thread(self.scraper._extract_menu_with_web_search, page.final_url if page else url)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Extractor {stage} failed for {url}: {e}")
+            return None
+
+        if items and len(items) >= MIN_MENU_ITEMS:
+            logging.info(f"Extractor {stage} found {len(items)} items at {url}")
+            return UrlMenu(url=url, menu_items=items, extractor=stage)
+        return None
+
+    def _can_call_openai(self) -> bool:
+        return bool(self.scraper.openai_client) and self.scraper._can_make_api_call()
+
+    def _parse_menu_html(self, html: str) -> List[Dict]:
+        return self.scraper._extract_menu_items_generic(BeautifulSoup(html, 'html.parser'))
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> Optional[FetchedPage]:
+        """GET a page through the per-host limit, revalidating against the disk cache"""
+        entry = self.cache.lookup(url) if self.cache else None
+        try:
+            async with self._host_limit(url):
+                response = await client.get(url, headers=self.cache.conditional_headers(entry) if self.cache else None)
+        except httpx.HTTPError as e:
+            self.stats.fetch_errors += 1
+            logging.warning(f"Fetch failed for {url}: {e}")
+            return None
+
+        self.stats.requests += 1
+        if response.status_code == 304 and entry:
+            self.stats.revalidated += 1
+            html = await asyncio.to_thread(self.cache.read_body, url, entry)
+            return FetchedPage(url=url, final_url=entry.get('final_url') or url,
+                               status_code=200, html=html, from_cache=True)
+
+        if response.status_code >= 400:
+            self.stats.fetch_errors += 1
+            logging.info(f"Fetch of {url} returned HTTP {response.status_code}")
+            return None
+
+        self.stats.bytes_downloaded += len(response.content)
+        final_url = str(response.url)
+        if self.cache:
+            await asyncio.to_thread(self.cache.store, url, final_url, response)
+        return FetchedPage(url=url, final_url=final_url, status_code=response.status_code, html=response.text)
@@ -9,7 +9,7 @@ This package contains all configuration-related modules:
 - external_apis: External API configurations (OpenAI, Square, etc.)
 """
 
-from .database import engine, SessionLocal, Base, get_db
+from .database import engine, read_engine, SessionLocal, ReadSessionLocal, Base, get_db, get_read_db
 from .celery_config import celery_app
 from .auth_config import (
     SECRET_KEY, 
@@ -30,9 +30,12 @@ from .external_apis import (
 __all__ = [
     # Database
     "engine",
+    "read_engine",
     "SessionLocal", 
+    "ReadSessionLocal",
     "Base",
     "get_db",
+    "get_read_db",
     
     # Celery
     "celery_app",
@@ -1,8 +1,20 @@
 """
 Celery configuration for background task processing.
+
+Work is routed to dedicated queues so that long agent runs cannot starve
+Square syncs or CSV exports. Run one worker per queue, e.g.
+
+    CELERY_WORKER_QUEUE=agents celery -A config.celery_config worker -Q agents
+
+CELERY_WORKER_QUEUE picks that queue's concurrency from QUEUE_CONCURRENCY
+(override with CELERY_WORKER_CONCURRENCY). Periodic maintenance tasks stay
+on the default "celery" queue.
 """
 
 from celery import Celery
+from kombu import Queue
+from celery.schedules import crontab
+from celery.signals import worker_process_init
 import os
 from dotenv import load_dotenv
 
@@ -20,6 +32,33 @@ celery_app = Celery(
     include=["tasks"]  # This tells Celery to import the tasks module
 )
 
+# Worker processes per queue; each can be overridden with CELERY_CONCURRENCY_<QUEUE>
+QUEUE_CONCURRENCY = {
+    queue: int(os.getenv(f"CELERY_CONCURRENCY_{queue.upper()}", default))
+    for queue, default in {"celery": 2, "sync": 4, "agents": 2, "exports": 1, "scrape": 2}.items()
+}
+
+# Redis emulates priorities with one list per step; 0 is served first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+TASK_ROUTES = {
+    "adaptiv.tasks.sync_square_data_task": {"queue": "sync"},
+    "adaptiv.tasks.backfill_order_local_time_task": {"queue": "sync"},
+    "run_dynamic_pricing_analysis_task": {"queue": "agents"},
+    "adaptiv.tasks.run_tenant_pricing_task": {"queue": "agents"},
+    "adaptiv.tasks.extract_menu_data_task": {"queue": "agents"},
+    "generate_menu_suggestions_task": {"queue": "agents"},
+    "tasks.generate_user_csv_task": {"queue": "exports"},
+    "adaptiv.tasks.cleanup_old_csv_files": {"queue": "exports"},
+    "adaptiv.tasks.scrape_competitor_task": {"queue": "scrape"},
+    "fetch_competitor_menu_task": {"queue": "scrape"},
+    "adaptiv.tasks.refresh_competitor_prices_task": {"queue": "scrape"},
+}
+
+worker_queue = os.getenv("CELERY_WORKER_QUEUE", "celery")
+
 # Configure Celery
 celery_app.conf.update(
     task_serializer="json",
@@ -27,10 +66,48 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="America/New_York",  # Eastern Time Zone (EST/EDT)
     enable_utc=False,  # Don't use UTC
-    worker_concurrency=2,  # Adjust based on your server capacity
+    worker_concurrency=int(os.getenv("CELERY_WORKER_CONCURRENCY") or QUEUE_CONCURRENCY.get(worker_queue, 2)),
+    worker_prefetch_multiplier=1,  # Long tasks: don't reserve work another process could start
+    task_queues=[Queue(name) for name in QUEUE_CONCURRENCY],
+    task_default_queue="celery",
+    task_routes=TASK_ROUTES,
+    task_default_priority=PRIORITY_NORMAL,
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "queue_order_strategy": "priority",
+        "visibility_timeout": 4 * 3600,  # Longer than the latest wave's countdown
+    },
     task_track_started=True,
     task_time_limit=600,    # 10 minutes timeout for tasks
 )
 
+# Periodic tasks (run with: celery -A config.celery_config beat)
+celery_app.conf.beat_schedule = {
+    "materialize-admin-stats": {
+        "task": "adaptiv.tasks.materialize_admin_stats_task",
+        "schedule": 300.0,  # Every 5 minutes
+    },
+    "compact-competitor-items": {
+        "task": "adaptiv.tasks.compact_competitor_items_task",
+        "schedule": crontab(hour=3, minute=30),  # Daily, off-peak
+    },
+    "backfill-order-local-time": {
+        "task": "adaptiv.tasks.backfill_order_local_time_task",
+        "schedule": 900.0,  # Every 15 minutes; only touches orders without local buckets
+    },
+    "refresh-item-forecasts": {
+        "task": "adaptiv.tasks.refresh_item_forecasts_task",
+        "schedule": crontab(hour=2, minute=15),  # Daily, after the previous day closes
+    },
+}
+
+
+@worker_process_init.connect
+def _reset_database_pool(**kwargs):
+    """Forked worker processes must not reuse the parent's pooled connections"""
+    from config.database import dispose_engines
+    dispose_engines()
+
+
 if __name__ == "__main__":
     celery_app.start()
@@ -1,11 +1,27 @@
 """
 Database configuration and connection management.
+
+Pooling is configured per process role (DATABASE_ROLE=api|worker) from
+environment variables:
+
+- DB_POOL_SIZE / DB_MAX_OVERFLOW: persistent and burst connections per process
+  (worker defaults are smaller: Celery runs few concurrent tasks per process)
+- DB_POOL_TIMEOUT: seconds to wait for a free connection before failing
+- DB_POOL_RECYCLE: seconds after which a connection is replaced, so idle
+  connections killed by the server or a proxy are never handed out
+- DB_POOL_PRE_PING: test connections on checkout (default on)
+- DB_STATEMENT_TIMEOUT_MS: PostgreSQL statement_timeout for this role (0 = off)
+
+READ_REPLICA_DATABASE_URL, when set, backs ReadSessionLocal / get_read_db with
+a read-only engine for analytics reads. Without it they use the primary.
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -21,17 +37,99 @@ else:
     sqlite_path = os.path.join(backend_dir, "adaptiv.db")
     DATABASE_URL = f"sqlite:///{sqlite_path}"
 
-# Handle special case for Render's PostgreSQL URL format
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+
+def _normalize_url(url: Optional[str]) -> Optional[str]:
+    # Handle special case for Render's PostgreSQL URL format
+    if url and url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+DATABASE_URL = _normalize_url(DATABASE_URL)
+READ_REPLICA_DATABASE_URL = _normalize_url(os.getenv("READ_REPLICA_DATABASE_URL"))
+
+# Which process this is; selects the pool defaults below
+DATABASE_ROLE = os.getenv("DATABASE_ROLE", "api")
+
+# Pool defaults per role: the API serves many concurrent requests, Celery
+# workers run `worker_concurrency` tasks per process
+POOL_DEFAULTS: Dict[str, Dict[str, int]] = {
+    "api": {"pool_size": 10, "max_overflow": 20, "statement_timeout_ms": 30000},
+    "worker": {"pool_size": 3, "max_overflow": 2, "statement_timeout_ms": 0},
+}
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def pool_settings(role: str = DATABASE_ROLE) -> Dict[str, Any]:
+    """Effective pool settings for `role`, environment overrides applied"""
+    defaults = POOL_DEFAULTS.get(role, POOL_DEFAULTS["api"])
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", defaults["pool_size"]),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", defaults["max_overflow"]),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "statement_timeout_ms": _env_int("DB_STATEMENT_TIMEOUT_MS", defaults["statement_timeout_ms"]),
+    }
+
+
+def _json_serializer(value: Any) -> str:
+    # Imported lazily: utils imports models, which imports this module
+    from utils.json_utils import json_dumps_str
+    return json_dumps_str(value)
+
+
+def _json_deserializer(value: str) -> Any:
+    from utils.json_utils import json_loads
+    return json_loads(value)
+
+
+def create_db_engine(url: str, role: str = DATABASE_ROLE, read_only: bool = False) -> Engine:
+    """
+    Create an engine for `url` with the pool settings of `role`.
+
+    SQLite keeps SQLAlchemy's default pool (local development and tests);
+    PostgreSQL gets the sized, pre-pinged, recycled pool plus per-connection
+    statement_timeout and, for replicas, default_transaction_read_only.
+    JSON columns are encoded with orjson, so NumPy values and datetimes can
+    be written directly.
+    """
+    json_options = {"json_serializer": _json_serializer, "json_deserializer": _json_deserializer}
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False}, **json_options)
+
+    settings = pool_settings(role)
+    options = []
+    if settings["statement_timeout_ms"] > 0:
+        options.append(f"-c statement_timeout={settings['statement_timeout_ms']}")
+    if read_only:
+        options.append("-c default_transaction_read_only=on")
+    connect_args = {"options": " ".join(options)} if options and url.startswith("postgresql") else {}
+
+    return create_engine(
+        url,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_timeout=settings["pool_timeout"],
+        pool_recycle=settings["pool_recycle"],
+        pool_pre_ping=settings["pool_pre_ping"],
+        connect_args=connect_args,
+        **json_options,
+    )
+
 
 # Create engine with appropriate settings
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+engine = create_db_engine(DATABASE_URL)
+
+# Analytics reads go to the replica when one is configured
+read_engine = create_db_engine(READ_REPLICA_DATABASE_URL, read_only=True) if READ_REPLICA_DATABASE_URL else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -46,3 +144,30 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """
+    Dependency for read-only analytics endpoints.
+
+    Yields a session on the read replica when READ_REPLICA_DATABASE_URL is set,
+    otherwise on the primary. Replica data may lag by a few seconds, so use it
+    only for reporting reads, never to read back a write from the same request.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def dispose_engines():
+    """
+    Drop pooled connections inherited from a parent process.
+
+    Called in forked Celery worker processes so each child opens its own
+    connections instead of sharing the parent's sockets.
+    """
+    engine.dispose(close=False)
+    if read_engine is not engine:
+        read_engine.dispose(close=False)
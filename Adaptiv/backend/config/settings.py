@@ -52,6 +52,24 @@ class Settings(BaseSettings):
     app_version: str = "1.0.0"
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
     
+    # Performance instrumentation
+    query_profiler_enabled: bool = os.getenv("QUERY_PROFILER_ENABLED", "False").lower() == "true"
+    query_profiler_slow_request_ms: float = float(os.getenv("QUERY_PROFILER_SLOW_REQUEST_MS", "1000"))
+    
+    # Competitor data retention
+    competitor_batches_to_keep: int = int(os.getenv("COMPETITOR_BATCHES_TO_KEEP", "5"))
+    
+    # Fleet scheduling of the daily pricing analysis
+    fleet_wave_count: int = int(os.getenv("FLEET_WAVE_COUNT", "4"))
+    fleet_wave_spacing_minutes: int = int(os.getenv("FLEET_WAVE_SPACING_MINUTES", "20"))
+    
+    # Gemini competitor price refresh
+    gemini_max_concurrency: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+    gemini_requests_per_minute: int = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "300"))
+    
+    # Merchant-local order time buckets (used when a business has no timezone)
+    default_business_timezone: str = os.getenv("DEFAULT_BUSINESS_TIMEZONE", "America/New_York")
+    
     # CORS
     allowed_origins: list = [
         "http://localhost:3000",
@@ -15,6 +15,8 @@ import uuid
 from scipy import stats
 from ..base_agent import BaseAgent
 import models
+from utils.json_utils import json_dumps_str, to_jsonable
+from services.order_service import order_local_date
 import os
 # Import memory models directly from models.py
 from models import (
@@ -142,6 +144,8 @@ class DataCollectionAgent(BaseAgent):
                 }
             }
 
+            # One native encode/decode turns NumPy values, dates and item id keys into plain JSON
+            consolidated_data = to_jsonable(consolidated_data)
             
             # Save snapshot
             self._save_collection_snapshot(db, user_id, consolidated_data)
@@ -161,18 +165,11 @@ class DataCollectionAgent(BaseAgent):
             
             self.logger.info(f"Data collection completed for user {user_id}")
             
-            # Debug: Convert all data before returning
-            final_data = self._convert_numpy_types(consolidated_data)
-            
-            # Extra debug: Verify no numpy.bool_ types remain
-            self._debug_find_numpy_types(final_data)
-            
-            final_data_copy = self._convert_numpy_types(consolidated_data)
+            final_data_copy = dict(consolidated_data)
 
-            final_data_copy["menu_items"] = pos_data["items"]
+            final_data_copy["menu_items"] = consolidated_data["pos_data"]["items"]
             # Remove pos_data from the copy to reduce response size
-            if "pos_data" in final_data_copy:
-                del final_data_copy["pos_data"]
+            del final_data_copy["pos_data"]
 
             analyzed = self.analyze_with_llm(final_data_copy)
 
@@ -680,9 +677,10 @@ class DataCollectionAgent(BaseAgent):
         
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
         
-        # Get daily sales data for this item
+        # Get daily sales data for this item (merchant-local days)
+        local_date = order_local_date()
         daily_sales_query = db.query(
-            func.date(Order.order_date).label('date'),
+            local_date.label('date'),
             func.sum(OrderItem.quantity).label('quantity'),
             func.avg(OrderItem.unit_price).label('price')
         ).join(
@@ -691,9 +689,9 @@ class DataCollectionAgent(BaseAgent):
             OrderItem.item_id == item_id,
             Order.order_date >= cutoff_date
         ).group_by(
-            func.date(Order.order_date)
+            local_date
         ).order_by(
-            func.date(Order.order_date)
+            local_date
         )
         
         daily_sales = daily_sales_query.all()
@@ -746,7 +744,7 @@ class DataCollectionAgent(BaseAgent):
             
             # Get daily sales of the other item
             other_daily_sales = db.query(
-                func.date(Order.order_date).label('date'),
+                local_date.label('date'),
                 func.sum(OrderItem.quantity).label('quantity')
             ).join(
                 Order, OrderItem.order_id == Order.id
@@ -754,7 +752,7 @@ class DataCollectionAgent(BaseAgent):
                 OrderItem.item_id == other_item_id,
                 Order.order_date >= cutoff_date
             ).group_by(
-                func.date(Order.order_date)
+                local_date
             ).all()
             
             # Create maps for easy lookup
@@ -962,86 +960,9 @@ class DataCollectionAgent(BaseAgent):
         
         return basic_recommendations
         
-    def _debug_find_numpy_types(self, obj, path=""):
-        """Debug helper: Find any remaining numpy types in the data structure"""
-        import numpy as np
-        import inspect
-        
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                self._debug_find_numpy_types(v, f"{path}.{k}" if path else str(k))
-        elif isinstance(obj, (list, tuple)):
-            for i, item in enumerate(obj):
-                self._debug_find_numpy_types(item, f"{path}[{i}]")
-        else:
-            # Check if it's a numpy type
-            if hasattr(obj, '__module__') and obj.__module__ == 'numpy':
-                self.logger.error(f"Found numpy type at {path}: {type(obj)} - {obj}")
-                # Print more details to help debug
-                self.logger.error(f"Object representation: {repr(obj)}")
-                self.logger.error(f"Object dir: {dir(obj)}")
-                self.logger.error(f"Is numpy scalar: {isinstance(obj, np.generic)}")
-                if hasattr(obj, 'dtype'):
-                    self.logger.error(f"Dtype: {obj.dtype}")
-    
-    def _convert_numpy_types(self, obj):
-        """Recursively convert NumPy types to native Python types for JSON serialization"""
-        import numpy as np
-        
-        # Handle dictionaries
-        if isinstance(obj, dict):
-            return {self._convert_numpy_types(k): self._convert_numpy_types(v) 
-                   for k, v in obj.items()}
-        
-        # Handle lists and other iterables
-        elif isinstance(obj, list):
-            return [self._convert_numpy_types(item) for item in obj]
-        elif isinstance(obj, tuple):
-            return tuple(self._convert_numpy_types(item) for item in obj)
-        elif isinstance(obj, set):
-            return set(self._convert_numpy_types(item) for item in obj)
-        
-        # Handle numpy types more comprehensively
-        elif isinstance(obj, np.integer):
-            return int(obj)
-        elif isinstance(obj, np.floating):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return self._convert_numpy_types(obj.tolist())
-        # Check for boolean types by name as well as instance
-        elif isinstance(obj, np.bool_) or (hasattr(obj, 'dtype') and np.issubdtype(obj.dtype, np.bool_)):
-            return bool(obj)  # Convert numpy booleans to native Python boolean values
-        # Handle numpy scalar types generally
-        elif isinstance(obj, np.generic):
-            return obj.item()  # Convert any numpy scalar to its Python equivalent
-        # Additional type check by module name
-        elif hasattr(obj, '__module__') and obj.__module__ == 'numpy':
-            self.logger.warning(f"Converting unknown numpy type: {type(obj)}")
-            # Try different conversion methods
-            if hasattr(obj, 'tolist'):
-                return self._convert_numpy_types(obj.tolist())
-            elif hasattr(obj, 'item'):
-                return obj.item()
-            else:
-                return str(obj)  # Last resort - convert to string
-        
-        # Handle datetime objects
-        elif hasattr(obj, 'isoformat') and callable(getattr(obj, 'isoformat')):
-            return obj.isoformat()
-        
-        # Handle special types that might contain numpy values
-        elif hasattr(obj, '__dict__'):
-            # Convert custom objects with __dict__ attribute
-            return self._convert_numpy_types(obj.__dict__)
-        
-        # Return everything else as-is
-        else:
-            return obj
-
     def _save_collection_snapshot(self, db: Session, user_id: int, data: Dict[str, Any]):
-        """Save a snapshot of the collected data"""
-        # Convert NumPy types to native Python types for JSON serialization
-        converted_data = self._convert_numpy_types(data)
+        """Save a snapshot of the collected data (already converted with to_jsonable)"""
+        converted_data = data
         
         snapshot = DataCollectionSnapshot(
             user_id=user_id,
@@ -1468,9 +1389,10 @@ class DataCollectionAgent(BaseAgent):
         
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
         
-        # Get daily sales data for this item
+        # Get daily sales data for this item (merchant-local days)
+        local_date = order_local_date()
         daily_sales_query = db.query(
-            func.date(Order.order_date).label('date'),
+            local_date.label('date'),
             func.sum(OrderItem.quantity).label('quantity')
         ).join(
             Order, OrderItem.order_id == Order.id
@@ -1478,9 +1400,9 @@ class DataCollectionAgent(BaseAgent):
             OrderItem.item_id == item_id,
             Order.order_date >= cutoff_date
         ).group_by(
-            func.date(Order.order_date)
+            local_date
         ).order_by(
-            func.date(Order.order_date)
+            local_date
         )
         
         daily_sales = daily_sales_query.all()
@@ -1661,7 +1583,7 @@ class DataCollectionAgent(BaseAgent):
             
             MENU: {json.dumps(menu_items)}
 
-RAW DATA: {json.dumps(data)}
+RAW DATA: {json_dumps_str(data)}
             
             For each item in our menu, create a consolidated item profile with the following structure:
             1. ITEM BASICS - Provide a one-line summary with: ID, name, category, current price, cost, margin
@@ -11,6 +11,7 @@ from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from models import AgentMemory, PricingExperiment, ExperimentLearning
 from ..base_agent import BaseAgent
+from utils.json_utils import to_jsonable
 
 
 class ExperimentationAgent(BaseAgent):
@@ -314,23 +315,9 @@ class ExperimentationAgent(BaseAgent):
     
     def _convert_numpy_to_python(self, obj):
         """Convert NumPy types to standard Python types for JSON serialization"""
-        import numpy as np
-        
-        if isinstance(obj, dict):
-            return {k: self._convert_numpy_to_python(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._convert_numpy_to_python(item) for item in obj]
-        elif isinstance(obj, (np.int_, np.intc, np.intp, np.int8, np.int16, np.int32, np.int64, 
-                            np.uint8, np.uint16, np.uint32, np.uint64)):
-            return int(obj)
-        elif isinstance(obj, (np.float_, np.float16, np.float32, np.float64)):
-            return float(obj)
-        elif isinstance(obj, (np.bool_, np.bool)):
-            return bool(obj)
-        elif isinstance(obj, np.ndarray):
-            return self._convert_numpy_to_python(obj.tolist())
-        else:
-            return obj
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return to_jsonable(obj)
     
     def _generate_experiment_insights(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate insights from experiment data using LLM"""
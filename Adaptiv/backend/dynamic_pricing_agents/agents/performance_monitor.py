@@ -44,9 +44,10 @@ class PerformanceMonitorAgent(BaseAgent):
         # Get historical performance snapshots
         historical_snapshots = self._get_performance_history(db, user_id)
         
-        # Collect performance data
-        current_performance = self._collect_current_performance(db, user_id)
-        historical_baseline = self._establish_baseline_with_memory(db, user_id, memory_context)
+        # Collect performance data (current and baseline windows share one set of aggregate queries)
+        windows = self._load_performance_windows(db, user_id)
+        current_performance = self._collect_current_performance(db, user_id, windows)
+        historical_baseline = self._establish_baseline_with_memory(db, user_id, memory_context, windows)
         active_changes = self._track_active_price_changes_with_memory(db, user_id, memory_context)
         
         # Analyze performance
@@ -93,70 +94,134 @@ class PerformanceMonitorAgent(BaseAgent):
         
         return monitoring_results
     
-    def _collect_current_performance(self, db, user_id: int) -> Dict[str, Any]:
-        """Collect current performance data"""
+    # Rolling windows compared by the monitor: the last 7 days against the 21 days before
+    CURRENT_WINDOW_DAYS = 7
+    BASELINE_WINDOW_DAYS = 21
+    
+    def _load_performance_windows(self, db, user_id: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Load current and baseline window aggregates with two grouped queries.
+        
+        One query groups orders by (day, window) and one groups order lines by
+        item_id with conditional sums per window, so the cost is independent
+        of order volume. Per-window totals are folded with NumPy.
+        """
         import models
+        from sqlalchemy import func, case
+        from services.order_service import order_local_date
         
-        # Get recent orders (last 7 days)
-        recent_orders = db.query(models.Order).filter(
-            models.Order.user_id == user_id,
-            models.Order.order_date >= datetime.now() - timedelta(days=7)
-        ).all()
+        now = now or datetime.now()
+        current_start = now - timedelta(days=self.CURRENT_WINDOW_DAYS)
+        baseline_start = current_start - timedelta(days=self.BASELINE_WINDOW_DAYS)
         
-        # Get current item prices
-        items = db.query(models.Item).filter(models.Item.user_id == user_id).all()
+        is_current = case((models.Order.order_date >= current_start, 1), else_=0)
+        day = order_local_date()  # Merchant-local day, so weekday patterns match the business
+        
+        daily_rows = db.query(
+            day.label('day'),
+            is_current.label('is_current'),
+            func.coalesce(func.sum(models.Order.total_amount), 0.0).label('revenue'),
+            func.count(models.Order.id).label('orders')
+        ).filter(
+            models.Order.user_id == user_id,
+            models.Order.order_date >= baseline_start,
+            models.Order.order_date <= now
+        ).group_by('day', 'is_current').order_by('day').all()  # Group by labels so PostgreSQL sees one expression
+        
+        line_revenue = models.OrderItem.quantity * models.OrderItem.unit_price
+        in_current = models.Order.order_date >= current_start
+        item_rows = db.query(
+            models.OrderItem.item_id,
+            func.coalesce(func.sum(case((in_current, models.OrderItem.quantity), else_=0)), 0).label('current_quantity'),
+            func.coalesce(func.sum(case((in_current, line_revenue), else_=0.0)), 0.0).label('current_revenue'),
+            func.coalesce(func.sum(case((in_current, 0), else_=models.OrderItem.quantity)), 0).label('baseline_quantity'),
+            func.coalesce(func.sum(case((in_current, 0.0), else_=line_revenue)), 0.0).label('baseline_revenue')
+        ).join(
+            models.Order, models.OrderItem.order_id == models.Order.id
+        ).filter(
+            models.Order.user_id == user_id,
+            models.Order.order_date >= baseline_start,
+            models.Order.order_date <= now
+        ).group_by(models.OrderItem.item_id).all()
+        
+        # COGS, fixed costs and labour over the same days from the cached cost series
+        from services.cost_service import CostService
+        costs = CostService(db).get_series(user_id)
+        current_first_day = now.date() - timedelta(days=self.CURRENT_WINDOW_DAYS - 1)
+        current_costs = costs.total(current_first_day, now.date())
+        baseline_costs = costs.total(current_first_day - timedelta(days=self.BASELINE_WINDOW_DAYS),
+                                     current_first_day - timedelta(days=1))
+        
+        # Fold the (day, window) rows into per-window daily metrics
+        flags = np.array([int(r.is_current) for r in daily_rows], dtype=bool)
+        revenues = np.array([float(r.revenue or 0) for r in daily_rows], dtype=float)
+        order_counts = np.array([int(r.orders or 0) for r in daily_rows], dtype=float)
+        days = [r.day if isinstance(r.day, str) else r.day.isoformat() for r in daily_rows]
         
-        # Calculate current metrics
-        daily_metrics = self._calculate_daily_metrics(recent_orders)
-        item_performance = self._calculate_item_performance(recent_orders, items)
+        return {
+            "now": now,
+            "current_start": current_start,
+            "baseline_start": baseline_start,
+            "current_daily": self._calculate_daily_metrics(
+                [d for d, f in zip(days, flags) if f], revenues[flags], order_counts[flags]
+            ),
+            "baseline_daily": self._calculate_daily_metrics(
+                [d for d, f in zip(days, flags) if not f], revenues[~flags], order_counts[~flags]
+            ),
+            "current_revenue": float(revenues[flags].sum()),
+            "current_orders": int(order_counts[flags].sum()),
+            "baseline_revenue": float(revenues[~flags].sum()),
+            "baseline_orders": int(order_counts[~flags].sum()),
+            "current_costs": current_costs,
+            "baseline_costs": baseline_costs,
+            "item_rows": item_rows
+        }
+    
+    def _collect_current_performance(self, db, user_id: int, windows: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Collect current performance data"""
+        windows = windows or self._load_performance_windows(db, user_id)
+        item_performance = self._calculate_item_performance(windows["item_rows"])
         
         return {
             "period": {
-                "start": (datetime.now() - timedelta(days=7)).isoformat(),
-                "end": datetime.now().isoformat()
+                "start": windows["current_start"].isoformat(),
+                "end": windows["now"].isoformat()
             },
-            "daily_metrics": daily_metrics,
+            "daily_metrics": windows["current_daily"],
             "item_performance": item_performance,
             "summary": {
-                "total_revenue": sum(order.total_amount for order in recent_orders),
-                "total_orders": len(recent_orders),
-                "unique_items_sold": len(set(
-                    item.item_id for order in recent_orders 
-                    for item in db.query(models.OrderItem).filter(models.OrderItem.order_id == order.id).all()
-                ))
+                "total_revenue": windows["current_revenue"],
+                "total_orders": windows["current_orders"],
+                "unique_items_sold": sum(1 for perf in item_performance.values() if perf["quantity"] > 0),
+                "total_costs": windows["current_costs"],
+                "net_margin": self._net_margin(windows["current_revenue"], windows["current_costs"])
             }
         }
     
-    def _establish_baseline(self, db, user_id: int) -> Dict[str, Any]:
+    def _establish_baseline(self, db, user_id: int, windows: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Establish historical baseline for comparison"""
-        import models
-        
-        # Get historical orders (8-28 days ago)
-        baseline_orders = db.query(models.Order).filter(
-            models.Order.user_id == user_id,
-            models.Order.order_date >= datetime.now() - timedelta(days=28),
-            models.Order.order_date < datetime.now() - timedelta(days=7)
-        ).all()
-        
-        # Calculate baseline metrics
-        daily_metrics = self._calculate_daily_metrics(baseline_orders)
+        windows = windows or self._load_performance_windows(db, user_id)
         
         return {
             "period": {
-                "start": (datetime.now() - timedelta(days=28)).isoformat(),
-                "end": (datetime.now() - timedelta(days=7)).isoformat()
+                "start": windows["baseline_start"].isoformat(),
+                "end": windows["current_start"].isoformat()
             },
-            "daily_metrics": daily_metrics,
+            "daily_metrics": windows["baseline_daily"],
             "summary": {
-                "avg_daily_revenue": np.mean([m["revenue"] for m in daily_metrics]) if daily_metrics else 0,
-                "avg_daily_orders": np.mean([m["orders"] for m in daily_metrics]) if daily_metrics else 0
+                # Averages are over every day in the window, including days without orders
+                "avg_daily_revenue": windows["baseline_revenue"] / self.BASELINE_WINDOW_DAYS,
+                "avg_daily_orders": windows["baseline_orders"] / self.BASELINE_WINDOW_DAYS,
+                "avg_daily_costs": windows["baseline_costs"] / self.BASELINE_WINDOW_DAYS,
+                "net_margin": self._net_margin(windows["baseline_revenue"], windows["baseline_costs"])
             }
         }
     
-    def _establish_baseline_with_memory(self, db, user_id: int, memory_context: Dict[str, Any]) -> Dict[str, Any]:
+    def _establish_baseline_with_memory(self, db, user_id: int, memory_context: Dict[str, Any],
+                                        windows: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Establish historical baseline using both database and memory"""
         # Get baseline from database
-        baseline = self._establish_baseline(db, user_id)
+        baseline = self._establish_baseline(db, user_id, windows)
         
         # Enhance with memory data if available
         baseline_memories = memory_context.get('performance_baseline', [])
@@ -286,6 +351,10 @@ class PerformanceMonitorAgent(BaseAgent):
                 "change_percent": aov_change,
                 "trend": self._determine_trend(aov_change)
             },
+            "net_margin": {
+                "current": current_summary.get("net_margin"),
+                "baseline": baseline_summary.get("net_margin")
+            },
             "overall_health": self._calculate_overall_health(revenue_change, order_change, aov_change)
         }
         
@@ -611,7 +680,7 @@ class PerformanceMonitorAgent(BaseAgent):
         return 0.0
     
     def _detect_day_of_week_patterns(self, anomalies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Detect patterns in anomalies by day of week"""
+        """Detect patterns in anomalies by day of week (anomaly dates are merchant-local days)"""
         # Count anomalies by day of week
         day_counts = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0}  # Mon to Sun
         total_anomalies = 0
@@ -906,53 +975,74 @@ class PerformanceMonitorAgent(BaseAgent):
         return recommendations
     
     # Helper methods
-    def _calculate_daily_metrics(self, orders) -> List[Dict[str, Any]]:
-        """Calculate metrics by day"""
-        import models
-        from collections import defaultdict
-        
-        daily_data = defaultdict(lambda: {"revenue": 0, "orders": 0, "items": 0})
-        
-        for order in orders:
-            date = order.order_date.date().isoformat()
-            daily_data[date]["revenue"] += float(order.total_amount)
-            daily_data[date]["orders"] += 1
+    def _calculate_daily_metrics(self, days: List[str], revenues: np.ndarray, order_counts: np.ndarray) -> List[Dict[str, Any]]:
+        """Calculate metrics by day from aggregated (day, revenue, orders) rows"""
+        # A day can straddle the window boundary, so merge duplicate days first
+        unique_days, inverse = np.unique(np.array(days, dtype=object).astype(str), return_inverse=True)
+        day_revenue = np.bincount(inverse, weights=revenues, minlength=len(unique_days))
+        day_orders = np.bincount(inverse, weights=order_counts, minlength=len(unique_days))
         
         return [
             {
                 "date": date,
-                "revenue": data["revenue"],
-                "orders": data["orders"],
-                "avg_order_value": data["revenue"] / data["orders"] if data["orders"] > 0 else 0
+                "revenue": float(revenue),
+                "orders": int(orders),
+                "avg_order_value": float(revenue / orders) if orders > 0 else 0
             }
-            for date, data in sorted(daily_data.items())
+            for date, revenue, orders in zip(unique_days.tolist(), day_revenue, day_orders)
         ]
     
-    def _calculate_item_performance(self, orders, items) -> Dict[int, Dict[str, Any]]:
-        """Calculate performance metrics by item"""
-        import models
-        from collections import defaultdict
-        
-        item_data = defaultdict(lambda: {"revenue": 0, "quantity": 0})
-        
-        for order in orders:
-            order_items = order.order_items  # Assuming relationship is set up
-            for oi in order_items:
-                item_data[oi.item_id]["revenue"] += float(oi.price * oi.quantity)
-                item_data[oi.item_id]["quantity"] += oi.quantity
+    def _calculate_item_performance(self, item_rows) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate performance metrics by item.
+        
+        Trends compare the current window's daily average against the baseline
+        window's daily average, as a percentage.
+        """
+        if not item_rows:
+            return {}
+        
+        item_ids = [row.item_id for row in item_rows]
+        data = np.array([
+            [
+                float(row.current_quantity or 0),
+                float(row.current_revenue or 0),
+                float(row.baseline_quantity or 0),
+                float(row.baseline_revenue or 0)
+            ]
+            for row in item_rows
+        ], dtype=float)
+        
+        current_daily = data[:, 0:2] / self.CURRENT_WINDOW_DAYS
+        baseline_daily = data[:, 2:4] / self.BASELINE_WINDOW_DAYS
+        
+        # No baseline sales means there is nothing to compare against: report 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trends = np.where(
+                baseline_daily > 0,
+                (current_daily - baseline_daily) / baseline_daily * 100,
+                0.0
+            )
         
-        # Calculate trends (simplified - would compare to baseline in production)
         performance = {}
-        for item_id, data in item_data.items():
+        for idx, item_id in enumerate(item_ids):
             performance[str(item_id)] = {
-                "revenue": data["revenue"],
-                "quantity": data["quantity"],
-                "revenue_trend": 5.0,  # Placeholder - would calculate actual trend
-                "quantity_trend": -2.0  # Placeholder - would calculate actual trend
+                "revenue": float(data[idx, 1]),
+                "quantity": int(data[idx, 0]),
+                "baseline_revenue": float(data[idx, 3]),
+                "baseline_quantity": int(data[idx, 2]),
+                "revenue_trend": round(float(trends[idx, 1]), 2),
+                "quantity_trend": round(float(trends[idx, 0]), 2)
             }
         
         return performance
     
+    def _net_margin(self, revenue: float, costs: float) -> Optional[float]:
+        """Net margin percentage after all costs, or None without revenue or cost records"""
+        if revenue <= 0 or costs <= 0:
+            return None
+        return round((revenue - costs) / revenue * 100, 2)
+    
     def _determine_trend(self, change_percent: float) -> str:
         """Determine trend direction and strength"""
         if change_percent > 10:
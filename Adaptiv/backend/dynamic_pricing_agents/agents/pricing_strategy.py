@@ -12,6 +12,7 @@ import hashlib
 from sqlalchemy.orm import Session
 from ..base_agent import BaseAgent
 from models import PricingRecommendation, PricingDecision
+from services.item_feature_service import ItemFeatureService
 
 
 class PricingStrategyAgent(BaseAgent):
@@ -70,6 +71,11 @@ class PricingStrategyAgent(BaseAgent):
                 )
                 self.logger.info(f"Retrieved {sum(len(v) for v in memory_context.values())} memory items for user {user_id}")
             
+            # Refresh and load the per-item feature store in one pass
+            item_features = {}
+            if db:
+                item_features = self._load_item_features(db, user_id, market_analysis)
+            
             # Analyze current pricing performance, integrating past performance data
             self.logger.info("Step 2/7: Analyzing pricing performance")
             performance_analysis = self._analyze_pricing_performance(consolidated_data, memory_context)
@@ -81,7 +87,8 @@ class PricingStrategyAgent(BaseAgent):
                 consolidated_data,
                 market_analysis,
                 business_goals,
-                memory_context
+                memory_context,
+                item_features
             )
             self.logger.info(f"Generated strategies for {len(item_strategies)} items")
             
@@ -116,7 +123,7 @@ class PricingStrategyAgent(BaseAgent):
             
             # Process and store data
             performance = self._analyze_pricing_performance(consolidated_data, memory_context)
-            item_strategies = self._generate_item_strategies(consolidated_data, market_analysis, business_goals, memory_context)
+            item_strategies = self._generate_item_strategies(consolidated_data, market_analysis, business_goals, memory_context, item_features)
             bundle_strategies = self._develop_bundle_strategies(consolidated_data, market_analysis)
             category_strategies = self._develop_category_strategies(item_strategies)
             
@@ -150,6 +157,11 @@ class PricingStrategyAgent(BaseAgent):
                     self._store_bundle_recommendations(db, user_id, bundle_strategies)
                     self.logger.info("Bundle strategies stored in memory")
                     
+                    # Fold the new recommendations into the feature store
+                    ItemFeatureService(db).refresh_features(
+                        user_id, item_ids=[strategy["item_id"] for strategy in item_strategies]
+                    )
+                    
                     # Store insights about performance
                     self.save_memory(
                         db, user_id, 'insight',
@@ -191,6 +203,24 @@ class PricingStrategyAgent(BaseAgent):
                 "timestamp": datetime.now().isoformat()
             }
     
+    def _load_item_features(self, db: Session, user_id: int, market_analysis: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+        """Refresh the item feature store with the latest elasticities and read it back in one query"""
+        try:
+            elasticities = {
+                e["item_id"]: e
+                for e in market_analysis.get("price_elasticity", {}).get("item_elasticities", [])
+                if isinstance(e, dict) and "item_id" in e
+            }
+            feature_service = ItemFeatureService(db)
+            feature_service.refresh_features(user_id, elasticities=elasticities)
+            item_features = feature_service.get_features(user_id)
+            self.logger.info(f"Loaded features for {len(item_features)} items")
+            return item_features
+        except Exception as e:
+            db.rollback()
+            self.logger.error(f"Error loading item features, falling back to raw inputs: {e}")
+            return {}
+    
     def _default_business_goals(self) -> Dict[str, Any]:
         """Default business goals if none specified"""
         return {
@@ -273,8 +303,15 @@ class PricingStrategyAgent(BaseAgent):
             )
         }
     
-    def _generate_item_strategies(self, data: Dict[str, Any], market: Dict[str, Any], goals: Dict[str, Any], memory_context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Generate pricing strategies for each item, incorporating historical context"""
+    def _generate_item_strategies(self, data: Dict[str, Any], market: Dict[str, Any], goals: Dict[str, Any], memory_context: Dict[str, Any] = None,
+                                  item_features: Dict[int, Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Generate pricing strategies for each item, incorporating historical context.
+        
+        Precomputed features (see ItemFeatureService) take precedence over values
+        rebuilt from the raw consolidated data.
+        """
+        item_features = item_features or {}
         items = data.get("pos_data", {}).get("items", [])
         
         # In development mode, limit to first 5 items for faster testing
@@ -333,11 +370,22 @@ class PricingStrategyAgent(BaseAgent):
             item_name = item["name"]
             current_price = item["current_price"]
             elasticity_data = elasticities.get(item_id, {})
+            features = item_features.get(item_id)
+            competitor_stats = self._competitor_stats(features, competitor_prices.get(item_name, []))
+            
+            if features:
+                item = {**item, "sales_velocity": self._sales_velocity_from_features(features)}
+                if not elasticity_data and features.get("elasticity") is not None:
+                    elasticity_data = {
+                        "elasticity": features["elasticity"],
+                        "confidence": features.get("elasticity_confidence") or 0.5
+                    }
             
             # Incorporate historical context for this item
             item_history = {
                 'previous_recommendations': previous_recommendations.get(item_id, []),
-                'previous_outcomes': previous_outcomes.get(item_id, [])
+                'previous_outcomes': previous_outcomes.get(item_id, []),
+                'features': features
             }
             
             # Auto-detect coffee shop products based on name (if business type not explicitly set)
@@ -390,7 +438,8 @@ class PricingStrategyAgent(BaseAgent):
                     elasticity_data, 
                     competitor_prices.get(item_name, []),
                     goals,
-                    item_history
+                    item_history,
+                    competitor_stats=competitor_stats
                 )
             
             # Calculate base confidence with debug info
@@ -679,14 +728,15 @@ class PricingStrategyAgent(BaseAgent):
     def _analyze_price_change_impact(self, changes: List[Dict], orders: List[Dict]) -> Dict[str, Any]:
         """Analyze the impact of historical price changes"""
         impacts = []
+        sales_index = self._build_item_sales_index(orders) if changes else {}
         for change in changes:
             # Calculate sales before and after change
             change_date = datetime.fromisoformat(change["changed_at"].replace('Z', '+00:00'))
             before_sales = self._calculate_sales_in_period(
-                change["item_id"], orders, change_date - timedelta(days=30), change_date
+                change["item_id"], sales_index, change_date - timedelta(days=30), change_date
             )
             after_sales = self._calculate_sales_in_period(
-                change["item_id"], orders, change_date, change_date + timedelta(days=30)
+                change["item_id"], sales_index, change_date, change_date + timedelta(days=30)
             )
             
             if before_sales > 0:
@@ -704,16 +754,33 @@ class PricingStrategyAgent(BaseAgent):
             "successful_changes": len([i for i in impacts if i["sales_impact_percent"] > 0])
         }
     
-    def _calculate_sales_in_period(self, item_id: int, orders: List[Dict], start: datetime, end: datetime) -> float:
-        """Calculate total sales revenue for an item in a period"""
-        total = 0
+    def _build_item_sales_index(self, orders: List[Dict]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Index line revenue by item: sorted timestamps plus a cumulative revenue array,
+        so any period total is two binary searches instead of a scan over all orders.
+        """
+        per_item: Dict[int, List[Tuple[float, float]]] = {}
         for order in orders:
-            order_date = datetime.fromisoformat(order["date"].replace('Z', '+00:00'))
-            if start <= order_date <= end:
-                for item in order.get("items", []):
-                    if item["item_id"] == item_id:
-                        total += item["price"] * item["quantity"]
-        return total
+            timestamp = datetime.fromisoformat(order["date"].replace('Z', '+00:00')).timestamp()
+            for item in order.get("items", []):
+                per_item.setdefault(item["item_id"], []).append((timestamp, item["price"] * item["quantity"]))
+        
+        index = {}
+        for item_id, sales in per_item.items():
+            sales.sort(key=lambda sale: sale[0])
+            timestamps = np.array([sale[0] for sale in sales], dtype=float)
+            cumulative = np.concatenate(([0.0], np.cumsum([sale[1] for sale in sales], dtype=float)))
+            index[item_id] = (timestamps, cumulative)
+        return index
+    
+    def _calculate_sales_in_period(self, item_id: int, sales_index: Dict[int, Tuple[np.ndarray, np.ndarray]], start: datetime, end: datetime) -> float:
+        """Calculate total sales revenue for an item in a period (inclusive bounds)"""
+        if item_id not in sales_index:
+            return 0
+        timestamps, cumulative = sales_index[item_id]
+        lo = np.searchsorted(timestamps, start.timestamp(), side='left')
+        hi = np.searchsorted(timestamps, end.timestamp(), side='right')
+        return float(cumulative[hi] - cumulative[lo])
     
     def _identify_optimization_opportunities(self, revenue: Dict, margins: Dict, impact: Dict) -> List[str]:
         """Identify specific optimization opportunities"""
@@ -1032,7 +1099,8 @@ class PricingStrategyAgent(BaseAgent):
         # Return the final recommended price
         return round(rounded_price, 2)
     
-    def _generate_price_change_rationale(self, item: Dict, current_price: float, optimal_price: float, elasticity_data: Dict, competitor_prices: List[float], goals: Dict, item_history: List[Dict] = None) -> str:
+    def _generate_price_change_rationale(self, item: Dict, current_price: float, optimal_price: float, elasticity_data: Dict, competitor_prices: List[float], goals: Dict, item_history: List[Dict] = None,
+                                         competitor_stats: Dict[str, float] = None) -> str:
         """Generate rationale for price change using LLM to provide detailed, insightful explanations and reevaluation date"""
         # Check if we have an LLM-generated rationale from our pricing analysis
         if 'llm_pricing_analysis' in item and isinstance(item['llm_pricing_analysis'], dict) and 'rationale' in item['llm_pricing_analysis']:
@@ -1061,7 +1129,9 @@ class PricingStrategyAgent(BaseAgent):
         
         # Format competitor data
         competitor_info = "No competitor data available"
-        if competitor_prices and len(competitor_prices) > 0:
+        if competitor_stats:
+            competitor_info = f"Average: ${competitor_stats['avg']:.2f}, Range: ${competitor_stats['min']:.2f} - ${competitor_stats['max']:.2f}"
+        elif competitor_prices and len(competitor_prices) > 0:
             avg_competitor = sum(competitor_prices) / len(competitor_prices) if competitor_prices and len(competitor_prices) > 0 else 0
             min_competitor = min(competitor_prices)
             max_competitor = max(competitor_prices)
@@ -1450,18 +1520,7 @@ class PricingStrategyAgent(BaseAgent):
                 price_assessment += "This is a significant price adjustment."
             
             # Prepare historical context assessment
-            history_assessment = "No historical pricing data available."
-            if item_history:
-                prev_recs = len(item_history.get('previous_recommendations', []))
-                prev_outcomes = item_history.get('previous_outcomes', [])
-                successful_outcomes = [o for o in prev_outcomes if o.get('success_rating', 0) >= 4]
-                
-                if prev_recs > 0:
-                    history_assessment = f"We have made {prev_recs} previous price recommendations. "
-                    if successful_outcomes:
-                        history_assessment += f"{len(successful_outcomes)} previous price changes were successful."
-                    else:
-                        history_assessment += "No information on successful previous price changes."
+            history_assessment = self._assess_item_history(item_history)
             
             # Construct the LLM prompt
             prompt = f"""
@@ -1627,18 +1686,7 @@ class PricingStrategyAgent(BaseAgent):
                 price_assessment += "This is a significant price adjustment."
             
             # Prepare historical context assessment
-            history_assessment = "No historical pricing data available."
-            if item_history:
-                prev_recs = len(item_history.get('previous_recommendations', []))
-                prev_outcomes = item_history.get('previous_outcomes', [])
-                successful_outcomes = [o for o in prev_outcomes if o.get('success_rating', 0) >= 4]
-                
-                if prev_recs > 0:
-                    history_assessment = f"We have made {prev_recs} previous price recommendations. "
-                    if successful_outcomes:
-                        history_assessment += f"{len(successful_outcomes)} previous price changes were successful."
-                    else:
-                        history_assessment += "No information on successful previous price changes."
+            history_assessment = self._assess_item_history(item_history)
             
             # Construct the LLM prompt
             prompt = f"""
@@ -1711,6 +1759,57 @@ class PricingStrategyAgent(BaseAgent):
         
         return reeval_days
     
+    def _assess_item_history(self, item_history: Dict = None) -> str:
+        """Summarize recommendation history and the last measured outcome for LLM prompts"""
+        if not item_history:
+            return "No historical pricing data available."
+        
+        features = item_history.get('features') or {}
+        prev_recs = max(len(item_history.get('previous_recommendations', [])), features.get('recommendation_count', 0))
+        prev_outcomes = item_history.get('previous_outcomes', [])
+        successful_outcomes = [o for o in prev_outcomes if o.get('success_rating', 0) >= 4]
+        
+        if prev_recs == 0:
+            return "No historical pricing data available."
+        
+        assessment = f"We have made {prev_recs} previous price recommendations. "
+        if successful_outcomes:
+            assessment += f"{len(successful_outcomes)} previous price changes were successful."
+        else:
+            assessment += "No information on successful previous price changes."
+        
+        if features.get('last_outcome_revenue_change') is not None:
+            assessment += (f" The last implemented change moved revenue by {features['last_outcome_revenue_change']:.1f}%"
+                           f" and quantity by {(features.get('last_outcome_quantity_change') or 0):.1f}%.")
+        return assessment
+    
+    def _competitor_stats(self, features: Optional[Dict[str, Any]], raw_prices: List[float]) -> Optional[Dict[str, float]]:
+        """Competitor min/avg/max from the feature store, falling back to raw competitor prices"""
+        if features and features.get('competitor_count'):
+            return {
+                'min': features['competitor_price_min'],
+                'avg': features['competitor_price_avg'],
+                'max': features['competitor_price_max']
+            }
+        prices = [p for p in raw_prices if p is not None]
+        if not prices:
+            return None
+        return {'min': min(prices), 'avg': sum(prices) / len(prices), 'max': max(prices)}
+    
+    def _sales_velocity_from_features(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Express feature-store velocities in the sales_velocity shape used by the prompts"""
+        velocity_7d = features.get('velocity_7d', 0.0)
+        velocity_28d = features.get('velocity_28d', 0.0)
+        if velocity_28d > 0:
+            change = (velocity_7d - velocity_28d) / velocity_28d
+            trend = "increasing" if change > 0.1 else "decreasing" if change < -0.1 else "stable"
+        else:
+            trend = "increasing" if velocity_7d > 0 else "no recent sales"
+        return {
+            "value": f"{velocity_7d:.2f} units/day (28d: {velocity_28d:.2f}, 90d: {features.get('velocity_90d', 0.0):.2f})",
+            "trend": trend
+        }
+    
     def _get_top_items(self, revenue: Dict[int, float], n: int) -> List[Tuple[int, float]]:
         """Get top n items by revenue"""
         sorted_items = sorted(revenue.items(), key=lambda x: x[1], reverse=True)
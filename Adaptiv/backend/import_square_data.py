@@ -209,6 +209,9 @@ def import_square_orders(user_id: int, db: Session, catalog_mapping: Dict[str, i
     """
     from models import Recipe
     from sqlalchemy.orm import joinedload
+    from services.order_service import OrderService
+    order_service = OrderService(db)
+    business_tz = order_service.business_timezone(user_id)
     orders_created = 0
     
     try:
@@ -404,7 +407,8 @@ def import_square_orders(user_id: int, db: Session, catalog_mapping: Dict[str, i
                     updated_at=order_date,
                     total_cost=total_cost if total_cost > 0 else None,
                     gross_margin=gross_margin,
-                    net_margin=net_margin
+                    net_margin=net_margin,
+                    **order_service.local_time_buckets(order_date, user_id, business_tz)
                 )
                 db.add(new_order)
                 db.flush()  # Get ID
@@ -9,13 +9,15 @@ from fastapi import FastAPI
 from sqlalchemy.orm import Session
 from typing import List
 
-from config.database import get_db, engine, Base
+from config.database import get_db, engine, read_engine, Base
 import models, schemas
 from routers.auth import auth_router
 from routers.login_endpoint import login_router
 from routers.register_endpoint import register_router
 from authentication.google_auth import google_auth_router
-from middleware import setup_cors_middleware
+from middleware import setup_cors_middleware, setup_query_profiler
+from config.settings import get_settings
+from utils.json_utils import ORJSONResponse
 from routers.profile import profile_router
 from routers.items import items_router
 from routers.price_history import price_history_router
@@ -43,11 +45,16 @@ from routers.conversations import router as conversations_router
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Adaptiv API")
+app = FastAPI(title="Adaptiv API", default_response_class=ORJSONResponse)
 
 # Setup CORS middleware
 setup_cors_middleware(app)
 
+# Optional per-request SQL profiling (Server-Timing headers, /api/admin/perf)
+settings = get_settings()
+if settings.query_profiler_enabled:
+    setup_query_profiler(app, engine, read_engine, slow_request_ms=settings.query_profiler_slow_request_ms)
+
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(login_router, prefix="/api/auth", tags=["Authentication"])
@@ -5,11 +5,13 @@ This package contains all middleware components including:
 - CORS configuration
 - Authentication and subscription middleware
 - Custom middleware utilities
+- Per-request SQL query profiling
 """
 
 from .cors import setup_cors_middleware
 from .subscription import require_subscription, SUBSCRIPTION_FREE, SUBSCRIPTION_PREMIUM
 from .utils import setup_custom_middleware, TimingMiddleware, RequestLoggingMiddleware
+from .query_profiler import setup_query_profiler, QueryProfilerMiddleware, perf_aggregator
 
 __all__ = [
     'setup_cors_middleware',
@@ -18,5 +20,8 @@ __all__ = [
     'SUBSCRIPTION_PREMIUM',
     'setup_custom_middleware',
     'TimingMiddleware',
-    'RequestLoggingMiddleware'
+    'RequestLoggingMiddleware',
+    'setup_query_profiler',
+    'QueryProfilerMiddleware',
+    'perf_aggregator'
 ]
@@ -27,4 +27,5 @@ def setup_cors_middleware(app: FastAPI):
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Server-Timing"],
     )
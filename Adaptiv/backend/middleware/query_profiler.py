@@ -0,0 +1,247 @@
+"""
+Per-request SQL query profiling.
+
+SQLAlchemy cursor events on the application engine record every statement
+executed while a request is being served: how many, how long in total, the
+slowest ones, and statements repeated with different parameters (the
+signature of an N+1 loop). Each profiled response carries a Server-Timing
+header and emits one structured log line, and a process-wide aggregator keeps
+per-route statistics for /api/admin/perf.
+
+Enable with QUERY_PROFILER_ENABLED=true.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .utils import BaseHTTPMiddleware, MIDDLEWARE_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+# Slowest statements kept per request
+SLOWEST_PER_REQUEST = 5
+
+# A fingerprint executed at least this many times in one request is reported as repeated
+REPEATED_STATEMENT_THRESHOLD = 5
+
+# Request samples kept per route for percentiles
+SAMPLES_PER_ROUTE = 500
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|(?<!:):\w+|\$\d+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in parameters compare equal"""
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class RequestQueryProfile:
+    """Statements executed while serving one request"""
+    query_count: int = 0
+    db_time_ms: float = 0.0
+    slowest: List[Dict[str, Any]] = field(default_factory=list)
+    fingerprints: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def record(self, statement: str, duration_ms: float):
+        self.query_count += 1
+        self.db_time_ms += duration_ms
+
+        key = fingerprint(statement)
+        stats = self.fingerprints.setdefault(key, {"count": 0, "total_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+
+        if len(self.slowest) < SLOWEST_PER_REQUEST or duration_ms > self.slowest[-1]["ms"]:
+            self.slowest.append({"sql": key[:500], "ms": round(duration_ms, 2)})
+            self.slowest.sort(key=lambda s: s["ms"], reverse=True)
+            del self.slowest[SLOWEST_PER_REQUEST:]
+
+    def repeated(self) -> List[Dict[str, Any]]:
+        """Fingerprints executed often enough in this request to suggest an N+1 loop"""
+        repeated = [
+            {"sql": sql[:500], "count": int(stats["count"]), "total_ms": round(stats["total_ms"], 2)}
+            for sql, stats in self.fingerprints.items()
+            if stats["count"] >= REPEATED_STATEMENT_THRESHOLD
+        ]
+        return sorted(repeated, key=lambda r: r["count"], reverse=True)
+
+
+_current_profile: ContextVar[Optional[RequestQueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def current_profile() -> Optional[RequestQueryProfile]:
+    """Profile of the request being served in this context, if profiling is active"""
+    return _current_profile.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("query_profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    starts = conn.info.get("query_profiler_start")
+    if profile is None or not starts:
+        return
+    profile.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+
+def install_query_profiler(engine: Engine):
+    """Attach the cursor event hooks to `engine` (idempotent)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class PerfAggregator:
+    """Thread-safe per-route rollup of request profiles"""
+
+    def __init__(self, samples_per_route: int = SAMPLES_PER_ROUTE):
+        self.samples_per_route = samples_per_route
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._samples: Dict[str, Deque[Dict[str, float]]] = defaultdict(lambda: deque(maxlen=self.samples_per_route))
+        self._totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {"requests": 0, "queries": 0, "db_ms": 0.0})
+        self._repeated: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._slowest: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.since = time.time()
+
+    def record(self, route: str, duration_ms: float, profile: RequestQueryProfile):
+        with self._lock:
+            self._samples[route].append({
+                "duration_ms": duration_ms, "queries": profile.query_count, "db_ms": profile.db_time_ms
+            })
+            totals = self._totals[route]
+            totals["requests"] += 1
+            totals["queries"] += profile.query_count
+            totals["db_ms"] += profile.db_time_ms
+            for repeated in profile.repeated():
+                self._repeated[route][repeated["sql"]] += 1
+            slowest = self._slowest[route]
+            slowest.extend(profile.slowest)
+            slowest.sort(key=lambda s: s["ms"], reverse=True)
+            del slowest[SLOWEST_PER_REQUEST:]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-route statistics, heaviest total DB time first"""
+        with self._lock:
+            routes = []
+            for route, samples in self._samples.items():
+                durations = sorted(s["duration_ms"] for s in samples)
+                queries = sorted(s["queries"] for s in samples)
+                totals = self._totals[route]
+                routes.append({
+                    "route": route,
+                    "requests": int(totals["requests"]),
+                    "p50_ms": round(_percentile(durations, 0.50), 2),
+                    "p95_ms": round(_percentile(durations, 0.95), 2),
+                    "avg_queries": round(totals["queries"] / totals["requests"], 1),
+                    "max_queries": int(queries[-1]),
+                    "p95_queries": int(_percentile(queries, 0.95)),
+                    "total_db_ms": round(totals["db_ms"], 2),
+                    "avg_db_ms": round(totals["db_ms"] / totals["requests"], 2),
+                    "slowest_statements": list(self._slowest[route]),
+                    "repeated_statements": [
+                        {"sql": sql, "requests": count}
+                        for sql, count in sorted(self._repeated[route].items(), key=lambda kv: kv[1], reverse=True)[:5]
+                    ],
+                })
+            routes.sort(key=lambda r: r["total_db_ms"], reverse=True)
+            return {"since": self.since, "routes": routes}
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+perf_aggregator = PerfAggregator()
+
+
+class QueryProfilerMiddleware(BaseHTTPMiddleware):
+    """
+    Profiles the SQL issued by each request.
+
+    Adds `Server-Timing: db;dur=<ms>;desc="<n> queries", app;dur=<ms>` to the
+    response, logs one JSON line per request (WARNING when the request was
+    slow or repeated a statement), and feeds perf_aggregator.
+    """
+
+    def __init__(self, app, slow_request_ms: float = 1000.0):
+        super().__init__(app)
+        self.slow_request_ms = slow_request_ms
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        if not MIDDLEWARE_AVAILABLE:
+            return await call_next(request)
+
+        profile = RequestQueryProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _current_profile.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        response.headers["Server-Timing"] = (
+            f'db;dur={profile.db_time_ms:.1f};desc="{profile.query_count} queries", app;dur={duration_ms:.1f}'
+        )
+
+        route = request.scope.get("route")
+        route_path = f"{request.method} {getattr(route, 'path', request.url.path)}"
+        perf_aggregator.record(route_path, duration_ms, profile)
+
+        repeated = profile.repeated()
+        log_line = json.dumps({
+            "event": "request_profile",
+            "route": route_path,
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 2),
+            "queries": profile.query_count,
+            "db_ms": round(profile.db_time_ms, 2),
+            "slowest": profile.slowest[:3],
+            "repeated": repeated[:3],
+        })
+        if duration_ms >= self.slow_request_ms or repeated:
+            logger.warning(log_line)
+        else:
+            logger.info(log_line)
+
+        return response
+
+
+def setup_query_profiler(app, *engines: Engine, slow_request_ms: float = 1000.0):
+    """Install the hooks on each engine and the profiling middleware on `app`"""
+    for engine in engines:
+        install_query_profiler(engine)
+    app.add_middleware(QueryProfilerMiddleware, slow_request_ms=slow_request_ms)
+    logger.info("SQL query profiler enabled")
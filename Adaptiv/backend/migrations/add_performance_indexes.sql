@@ -1,5 +1,7 @@
 -- Performance optimization indexes for handling large datasets
 -- Run this SQL to optimize queries for tens of thousands of orders
+-- The orders/order_items indexes are also applied by the Alembic revision
+-- 20261018_0001 (alembic upgrade head), which uses the same index names
 
 -- Index for orders table - critical for date range queries
 CREATE INDEX IF NOT EXISTS idx_orders_user_date ON orders(user_id, order_date);
@@ -0,0 +1,69 @@
+"""Composite indexes for hot query shapes
+
+Adds the indexes declared on the models for the elasticity, dashboard,
+competitor history and recommendation paths, and applies the order indexes
+from add_performance_indexes.sql (same names, so databases where that file
+was run by hand are left as they are).
+
+This is the first Alembic revision: tables are still created by
+Base.metadata.create_all, and create_all does not add indexes to tables that
+already exist, which is why existing databases need this migration.
+
+On PostgreSQL the indexes are built CONCURRENTLY so large tables stay
+writable during the upgrade.
+
+Revision ID: 20261018_0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('idx_price_history_item_changed', 'price_history', ['item_id', 'changed_at']),
+    ('idx_orders_user_date', 'orders', ['user_id', 'order_date']),
+    ('idx_order_items_order_id', 'order_items', ['order_id']),
+    ('idx_order_items_item_order', 'order_items', ['item_id', 'order_id']),
+    ('idx_competitor_history_user_captured', 'competitor_price_histories', ['user_id', 'captured_at']),
+    ('idx_pricing_rec_user_date_batch', 'pricing_recommendations', ['user_id', 'recommendation_date', 'batch_id']),
+    ('idx_competitor_entity_batch', 'competitor_items', ['competitor_id', 'batch_id']),
+]
+
+# Already declared on the model before this revision; kept on downgrade
+PREEXISTING_INDEXES = {'idx_competitor_entity_batch'}
+
+
+def _existing_tables() -> Optional[set]:
+    """Tables present in the database, or None when generating offline SQL"""
+    if op.get_context().as_sql:
+        return None
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    tables = _existing_tables()
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if tables is not None and table not in tables:
+                continue
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    tables = _existing_tables()
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            if name in PREEXISTING_INDEXES or (tables is not None and table not in tables):
+                continue
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,51 @@
+"""Rolling summary columns on conversations
+
+Stores a summary of the messages that no longer fit in the LLM context
+window, so long conversations keep constant prompt size without losing
+their earlier history entirely.
+
+Revision ID: 20261018_0002
+Revises: 20261018_0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0002'
+down_revision: Union[str, None] = '20261018_0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns():
+    return [
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('summary_through_message_id', sa.Integer(), nullable=True),
+    ]
+
+
+def _existing_columns() -> set:
+    if op.get_context().as_sql:
+        return set()
+    inspector = sa.inspect(op.get_bind())
+    if 'conversations' not in inspector.get_table_names():
+        return {column.name for column in _columns()}  # Table is created later by create_all
+    return {column['name'] for column in inspector.get_columns('conversations')}
+
+
+def upgrade() -> None:
+    existing = _existing_columns()
+    for column in _columns():
+        if column.name not in existing:
+            op.add_column('conversations', column)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('conversations') as batch_op:
+        for column in reversed(_columns()):
+            batch_op.drop_column(column.name)
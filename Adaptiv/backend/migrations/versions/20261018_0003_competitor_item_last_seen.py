@@ -0,0 +1,41 @@
+"""last_seen_at on competitor items
+
+Competitor compaction collapses runs of unchanged items across scrape
+batches into the row of the batch they were first seen in; last_seen_at
+records the newest batch that row now stands for.
+
+Revision ID: 20261018_0003
+Revises: 20261018_0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0003'
+down_revision: Union[str, None] = '20261018_0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _needs_column() -> bool:
+    if op.get_context().as_sql:
+        return True
+    inspector = sa.inspect(op.get_bind())
+    if 'competitor_items' not in inspector.get_table_names():
+        return False  # Table is created later by create_all
+    return 'last_seen_at' not in {column['name'] for column in inspector.get_columns('competitor_items')}
+
+
+def upgrade() -> None:
+    if _needs_column():
+        op.add_column('competitor_items', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('competitor_items') as batch_op:
+        batch_op.drop_column('last_seen_at')
@@ -0,0 +1,64 @@
+"""Merchant-local time buckets on orders
+
+Adds local_date, local_hour and local_dow to orders (the order timestamp in
+the business timezone, computed at ingest), the business_profiles.timezone
+they are computed in, and an index so hourly, weekday and daily analytics
+are plain indexed GROUP BYs on SQLite and PostgreSQL alike.
+
+Existing orders are left NULL here and filled by the
+backfill-order-local-time beat entry (adaptiv.tasks.backfill_order_local_time_task),
+which only touches orders without buckets. Until then, readers fall back to
+the stored order_date (see services.order_service.order_local_date).
+
+Revision ID: 20261018_0004
+Revises: 20261018_0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0004'
+down_revision: Union[str, None] = '20261018_0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, type)
+COLUMNS = [
+    ('orders', 'local_date', sa.Date()),
+    ('orders', 'local_hour', sa.Integer()),
+    ('orders', 'local_dow', sa.Integer()),
+    ('business_profiles', 'timezone', sa.String()),
+]
+
+INDEX_NAME = 'idx_orders_user_local_date'
+INDEX_COLUMNS = ['user_id', 'local_date', 'local_hour', 'local_dow']
+
+
+def upgrade() -> None:
+    inspector = None if op.get_context().as_sql else sa.inspect(op.get_bind())
+    tables = None if inspector is None else set(inspector.get_table_names())
+    for table, name, type_ in COLUMNS:
+        if tables is not None:
+            if table not in tables:
+                continue  # Table is created later by create_all
+            if name in {column['name'] for column in inspector.get_columns(table)}:
+                continue
+        op.add_column(table, sa.Column(name, type_, nullable=True))
+
+    if tables is None or 'orders' in tables:
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX_NAME, 'orders', INDEX_COLUMNS, if_not_exists=True,
+                            postgresql_concurrently=True, postgresql_include=['total_amount'])
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(INDEX_NAME, table_name='orders', if_exists=True, postgresql_concurrently=True)
+    for table, name, _ in reversed(COLUMNS):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column(name)
@@ -1,11 +1,11 @@
 # Models package
-from .core import User, BusinessProfile, Item, PriceHistory, CompetitorEntity, CompetitorItem, ActionItem, COGS, FixedCost, Employee
+from .core import User, BusinessProfile, Item, PriceHistory, CompetitorEntity, CompetitorItem, ActionItem, COGS, FixedCost, Employee, AdminStatsSnapshot, ItemForecastModel, TenantJobRun, FleetWaveReport
 from .orders import Order, OrderItem
 from .agents import (
     CompetitorReport, CustomerReport, MarketReport, PricingReport, 
     ExperimentRecommendation, ExperimentPriceChange, PriceRecommendationAction,
     AgentMemory, DataCollectionSnapshot, MarketAnalysisSnapshot, 
-    CompetitorPriceHistory, PricingRecommendation, BundleRecommendation,
+    CompetitorPriceHistory, PricingRecommendation, ItemFeature, BundleRecommendation,
     PerformanceBaseline, PerformanceAnomaly, PricingExperiment, ExperimentLearning,
     PricingDecision, StrategyEvolution
 )
@@ -15,7 +15,7 @@ from .integrations import POSIntegration
 __all__ = [
     # Core models
     'User', 'BusinessProfile', 'Item', 'PriceHistory', 'CompetitorEntity', 'CompetitorItem', 
-    'ActionItem', 'COGS', 'FixedCost', 'Employee',
+    'ActionItem', 'COGS', 'FixedCost', 'Employee', 'AdminStatsSnapshot', 'ItemForecastModel', 'TenantJobRun', 'FleetWaveReport',
     
     # Order models
     'Order', 'OrderItem',
@@ -24,7 +24,7 @@ __all__ = [
     'CompetitorReport', 'CustomerReport', 'MarketReport', 'PricingReport',
     'ExperimentRecommendation', 'ExperimentPriceChange', 'PriceRecommendationAction',
     'AgentMemory', 'DataCollectionSnapshot', 'MarketAnalysisSnapshot',
-    'CompetitorPriceHistory', 'PricingRecommendation', 'BundleRecommendation',
+    'CompetitorPriceHistory', 'PricingRecommendation', 'ItemFeature', 'BundleRecommendation',
     'PerformanceBaseline', 'PerformanceAnomaly', 'PricingExperiment', 
     'ExperimentLearning', 'PricingDecision', 'StrategyEvolution',
     
@@ -18,6 +18,10 @@ class Conversation(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)
     
+    # Rolling summary of messages that fell out of the LLM context window
+    summary = Column(Text, nullable=True)
+    summary_through_message_id = Column(Integer, nullable=True)  # Last message folded into summary
+    
     # Relationship to User and Messages
     user = relationship("User", backref="conversations")
     messages = relationship("ConversationMessage", back_populates="conversation", cascade="all, delete-orphan", order_by="ConversationMessage.created_at")
@@ -287,6 +291,7 @@ class CompetitorPriceHistory(Base):
     # Add an index for efficient querying of competitor items over time
     __table_args__ = (
         Index('idx_competitor_item_date', 'competitor_name', 'item_name', 'captured_at'),
+        Index('idx_competitor_history_user_captured', 'user_id', 'captured_at'),
     )
 
 # Pricing Strategy Agent Memory
@@ -337,6 +342,50 @@ class PricingRecommendation(Base):
     # Relationships
     user = relationship("User", backref="pricing_recommendations")
     item = relationship("Item", backref="pricing_recommendations")
+    
+    # Latest-batch lookups filter by user and date, then batch
+    __table_args__ = (
+        Index('idx_pricing_rec_user_date_batch', 'user_id', 'recommendation_date', 'batch_id'),
+    )
+
+# Per-item feature store read by the Pricing Strategy Agent
+class ItemFeature(Base):
+    __tablename__ = 'item_features'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    item_id = Column(Integer, ForeignKey('items.id'), nullable=False, unique=True, index=True)
+    
+    # Elasticity (from the latest market analysis)
+    elasticity = Column(Float)
+    elasticity_confidence = Column(Float)
+    
+    # Competitor prices for items with the same name
+    competitor_price_min = Column(Float)
+    competitor_price_avg = Column(Float)
+    competitor_price_max = Column(Float)
+    competitor_count = Column(Integer, default=0)
+    
+    # Rolling sales velocity (units per day)
+    velocity_7d = Column(Float, default=0.0)
+    velocity_28d = Column(Float, default=0.0)
+    velocity_90d = Column(Float, default=0.0)
+    revenue_28d = Column(Float, default=0.0)
+    last_sold_at = Column(DateTime)
+    
+    # Recommendation history and last measured outcome
+    recommendation_count = Column(Integer, default=0)
+    last_recommendation_at = Column(DateTime)
+    last_recommended_price = Column(Float)
+    last_implementation_status = Column(String(50))
+    last_outcome_revenue_change = Column(Float)
+    last_outcome_quantity_change = Column(Float)
+    
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    user = relationship("User", backref="item_features")
+    item = relationship("Item", backref="features", uselist=False)
 
 # Bundle Recommendations
 class BundleRecommendation(Base):
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Text, Float, Enum, Index
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Date, Text, Float, Enum, Index, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from config.database import Base
@@ -39,6 +39,7 @@ class BusinessProfile(Base):
     state = Column(String, nullable=True)
     postal_code = Column(String, nullable=True)
     country = Column(String, nullable=True, default="USA")
+    timezone = Column(String, nullable=True)  # IANA name (e.g. "America/Chicago") for local order time buckets
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -82,6 +83,9 @@ class PriceHistory(Base):
     
     # Relationship to Item
     item = relationship("Item", back_populates="price_history")
+    
+    # Elasticity and analytics paths read an item's changes in date order
+    __table_args__ = (Index('idx_price_history_item_changed', 'item_id', 'changed_at'),)
 
 class CompetitorEntity(Base):
     __tablename__ = "competitor_entities"
@@ -126,6 +130,7 @@ class CompetitorItem(Base):
     url = Column(String, nullable=True)
     batch_id = Column(String, index=True)  # Unique identifier for a menu fetch batch
     sync_timestamp = Column(DateTime(timezone=True), index=True)  # When this batch was synced
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)  # Newest batch an unchanged item was collapsed from
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -202,3 +207,93 @@ class Employee(Base):
     
     # Relationship to User
     user = relationship("User", backref="employees")
+
+class AdminStatsSnapshot(Base):
+    __tablename__ = "admin_stats_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    computed_at = Column(DateTime(timezone=True), nullable=False, index=True)  # When the aggregator ran
+    
+    # User metrics
+    total_users = Column(Integer, default=0)
+    active_users = Column(Integer, default=0)
+    admin_users = Column(Integer, default=0)
+    users_last_30_days = Column(Integer, default=0)
+    subscription_breakdown = Column(JSON, nullable=True)  # Dict of tier -> user count
+    
+    # Catalog / integration metrics
+    total_businesses = Column(Integer, default=0)
+    total_items = Column(Integer, default=0)
+    pos_integrations = Column(Integer, default=0)
+    
+    # Order metrics
+    total_orders = Column(Integer, default=0)
+    total_revenue = Column(Float, default=0.0)
+    avg_order_value = Column(Float, default=0.0)
+    orders_last_30_days = Column(Integer, default=0)
+    revenue_last_30_days = Column(Float, default=0.0)
+    orders_today = Column(Integer, default=0)
+    revenue_today = Column(Float, default=0.0)
+
+class ItemForecastModel(Base):
+    __tablename__ = "item_forecast_models"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    method = Column(String, nullable=False)  # holt_winters, seasonal_naive
+    
+    # Smoothing parameters (Holt-Winters)
+    alpha = Column(Float, nullable=True)
+    beta = Column(Float, nullable=True)
+    gamma = Column(Float, nullable=True)
+    phi = Column(Float, nullable=True)  # Trend damping
+    
+    # Model state after the last observed day
+    level = Column(Float, default=0.0)
+    trend = Column(Float, default=0.0)
+    seasonal = Column(JSON, nullable=True)  # 7 weekday offsets, Monday first
+    recent = Column(JSON, nullable=True)  # Last 7 daily values, Monday first (seasonal naive)
+    last_observed_date = Column(Date, nullable=False)  # Last complete day folded into the state
+    
+    # Fit bookkeeping
+    history_days = Column(Integer, default=0)
+    backtest_mape = Column(Float, nullable=True)  # Holdout MAPE (%) of the chosen method
+    fitted_at = Column(DateTime(timezone=True), nullable=False)  # Last full refit
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TenantJobRun(Base):
+    __tablename__ = "tenant_job_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    job = Column(String, nullable=False, index=True)  # e.g. daily_pricing
+    fleet_run_id = Column(String, nullable=True, index=True)  # Scheduler run that last dispatched it
+    wave = Column(Integer, nullable=True)
+    status = Column(String, nullable=False, default="queued")  # queued, running, success, failed
+    data_fingerprint = Column(String, nullable=True)  # Tenant data version the last run saw
+    queued_at = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        UniqueConstraint('user_id', 'job', name='uq_tenant_job_runs_user_job'),
+    )
+
+class FleetWaveReport(Base):
+    __tablename__ = "fleet_wave_reports"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    fleet_run_id = Column(String, nullable=False, index=True)
+    job = Column(String, nullable=False)
+    wave = Column(Integer, nullable=False)
+    scheduled_for = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    tenants = Column(Integer, default=0)
+    succeeded = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)  # Unchanged tenants left out of the run
+    total_duration_seconds = Column(Float, default=0.0)
+    details = Column(JSON, nullable=True)  # Per-tenant outcomes
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, Float
+from sqlalchemy import Column, ForeignKey, Integer, String, Date, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from config.database import Base
@@ -17,12 +17,24 @@ class Order(Base):
     total_cost = Column(Float, nullable=True)
     gross_margin = Column(Float, nullable=True)
     net_margin = Column(Float, nullable=True)
+    # order_date in the business timezone, set at ingest (see OrderService.backfill_local_time_buckets)
+    local_date = Column(Date, nullable=True)
+    local_hour = Column(Integer, nullable=True)  # 0-23
+    local_dow = Column(Integer, nullable=True)  # 0=Sunday, 6=Saturday
     
     # Add relationship to User
     user = relationship("User", backref="orders")
     
     # Relationship to OrderItems
     items = relationship("OrderItem", back_populates="order")
+    
+    # Dashboard and sync queries filter a user's orders by date range;
+    # hourly, weekday and daily analytics group a user's orders by local buckets
+    __table_args__ = (
+        Index('idx_orders_user_date', 'user_id', 'order_date'),
+        Index('idx_orders_user_local_date', 'user_id', 'local_date', 'local_hour', 'local_dow',
+              postgresql_include=['total_amount']),
+    )
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -39,6 +51,12 @@ class OrderItem(Base):
     order = relationship("Order", back_populates="items")
     item = relationship("Item", back_populates="order_items")
     
+    # order_id for order -> lines joins; (item_id, order_id) for per-item sales
+    __table_args__ = (
+        Index('idx_order_items_order_id', 'order_id'),
+        Index('idx_order_items_item_order', 'item_id', 'order_id'),
+    )
+    
     @property
     def subtotal(self):
         return self.quantity * self.unit_price
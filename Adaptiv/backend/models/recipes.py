@@ -48,6 +48,9 @@ class Recipe(Base):
     def calculate_fixed_costs(cls, db, user_id):
         """Calculate fixed costs that can be reused across multiple recipes.
         
+        Rent, utilities and labour over the trailing 30 days come from the
+        user's cached daily cost series (see services.cost_service).
+        
         Args:
             db: Database session
             user_id: User ID for filtering costs
@@ -55,78 +58,9 @@ class Recipe(Base):
         Returns:
             Dict with fixed cost data including fixed cost per item
         """
-        from datetime import datetime, timedelta
-        from sqlalchemy import func
-        from models.core import FixedCost, Employee
-        from models.orders import Order, OrderItem
-        
-        # Get trailing month date range (last 30 days)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        
-        # Get the most recent fixed costs for each cost type
-        # We need to get the latest entry for each cost type (rent, utilities)
-        from sqlalchemy import and_
-        
-        # Get the most recent rent cost
-        latest_rent = db.query(FixedCost).filter(
-            FixedCost.user_id == user_id,
-            FixedCost.cost_type.ilike('rent')
-        ).order_by(
-            FixedCost.year.desc(),
-            FixedCost.month.desc()
-        ).first()
-        
-        # Get the most recent utilities cost
-        latest_utilities = db.query(FixedCost).filter(
-            FixedCost.user_id == user_id,
-            FixedCost.cost_type.ilike('utilities')
-        ).order_by(
-            FixedCost.year.desc(),
-            FixedCost.month.desc()
-        ).first()
-        
-        # Calculate total monthly fixed costs
-        total_rent = latest_rent.amount if latest_rent else 0
-        total_utilities = latest_utilities.amount if latest_utilities else 0
-        
-        # Get active employees
-        employees = db.query(Employee).filter(
-            Employee.user_id == user_id,
-            Employee.active == True
-        ).all()
+        from services.cost_service import CostService
         
-        # Calculate total monthly labor cost
-        total_monthly_labor = 0
-        for employee in employees:
-            if employee.pay_type == 'salary':
-                total_monthly_labor += employee.salary / 12  # Convert yearly to monthly
-            elif employee.pay_type == 'hourly' and employee.weekly_hours is not None:
-                # Assume 4.33 weeks per month on average
-                total_monthly_labor += employee.hourly_rate * employee.weekly_hours * 4.33
-        
-        # Calculate total items sold in the trailing month from order data
-        total_items_sold = db.query(func.sum(OrderItem.quantity)).join(Order).filter(
-            Order.user_id == user_id,
-            Order.order_date >= start_date,
-            Order.order_date <= end_date
-        ).scalar() or 0  # Default to 0 if no sales data
-        
-        # Calculate total monthly fixed costs (rent + utilities + labor)
-        total_monthly_fixed_costs = total_rent + total_utilities + total_monthly_labor
-        
-        # Calculate fixed cost per item based on actual sales volume
-        # Only calculate if we have both fixed costs and sales data
-        if total_monthly_fixed_costs > 0 and total_items_sold > 0:
-            fixed_cost_per_item = total_monthly_fixed_costs / total_items_sold
-        else:
-            fixed_cost_per_item = 0
-        
-        return {
-            'fixed_cost_per_item': fixed_cost_per_item,
-            'total_monthly_fixed_costs': total_monthly_fixed_costs,
-            'total_items_sold': total_items_sold
-        }
+        return CostService(db).fixed_costs_per_item(user_id)
     
     def calculate_net_margin(self, db, selling_price):
         """Calculate net margin for a recipe based on ingredient costs and fixed costs.
@@ -17,6 +17,10 @@ import io
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from config.database import get_db, Base
 from .auth import get_current_admin_user
+from services.admin_stats_service import AdminStatsService
+from services.web_search_service import web_search_cache
+from middleware.query_profiler import perf_aggregator
+from config.settings import get_settings
 import models
 import schemas
 
@@ -39,6 +43,8 @@ class AdminStats(BaseModel):
     subscription_breakdown: Dict[str, int]
     pos_integrations: int
     avg_order_value: float
+    computed_at: Optional[datetime] = None
+    age_seconds: Optional[float] = None
 
 class UserSummary(BaseModel):
     id: int
@@ -110,77 +116,38 @@ class DetailedUserInfo(BaseModel):
 
 @admin_router.get("/stats", response_model=AdminStats)
 async def get_admin_stats(
+    refresh: bool = Query(False, description="Recompute statistics instead of serving the materialized snapshot"),
     current_admin: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get comprehensive system statistics"""
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    today = datetime.utcnow().date()
-    
-    # Basic counts
-    total_users = db.query(models.User).count()
-    active_users = db.query(models.User).filter(models.User.is_active == True).count()
-    admin_users = db.query(models.User).filter(models.User.is_admin == True).count()
-    total_businesses = db.query(models.BusinessProfile).count()
-    total_orders = db.query(models.Order).count()
-    total_items = db.query(models.Item).count()
-    
-    # Revenue calculations
-    total_revenue = db.query(func.sum(models.Order.total_amount)).scalar() or 0.0
-    
-    # Recent activity (30 days)
-    users_last_30_days = db.query(models.User).filter(
-        models.User.created_at >= thirty_days_ago
-    ).count()
-    
-    orders_last_30_days = db.query(models.Order).filter(
-        models.Order.order_date >= thirty_days_ago
-    ).count()
-    
-    revenue_last_30_days = db.query(func.sum(models.Order.total_amount)).filter(
-        models.Order.order_date >= thirty_days_ago
-    ).scalar() or 0.0
-    
-    # Today's activity
-    orders_today = db.query(models.Order).filter(
-        func.date(models.Order.order_date) == today
-    ).count()
-    
-    revenue_today = db.query(func.sum(models.Order.total_amount)).filter(
-        func.date(models.Order.order_date) == today
-    ).scalar() or 0.0
-    
-    # Subscription breakdown
-    subscription_stats = db.query(
-        models.User.subscription_tier,
-        func.count(models.User.id)
-    ).group_by(models.User.subscription_tier).all()
-    
-    subscription_breakdown = {tier or 'free': count for tier, count in subscription_stats}
-    
-    # POS integrations
-    pos_integrations = db.query(models.POSIntegration).count()
-    
-    # Average order value
-    avg_order_value = db.query(func.avg(models.Order.total_amount)).scalar() or 0.0
-    
-    return AdminStats(
-        total_users=total_users,
-        active_users=active_users,
-        admin_users=admin_users,
-        total_businesses=total_businesses,
-        total_orders=total_orders,
-        total_items=total_items,
-        total_revenue=total_revenue,
-        users_last_30_days=users_last_30_days,
-        orders_last_30_days=orders_last_30_days,
-        revenue_last_30_days=revenue_last_30_days,
-        orders_today=orders_today,
-        revenue_today=revenue_today,
-        subscription_breakdown=subscription_breakdown,
-        pos_integrations=pos_integrations,
-        avg_order_value=avg_order_value
-    )
+    """
+    Get comprehensive system statistics.
+    
+    Served from the snapshot materialized by the periodic
+    materialize_admin_stats_task; computed_at/age_seconds report its freshness.
+    """
+    stats = AdminStatsService(db).get_stats(force_refresh=refresh)
+    return AdminStats(**stats)
+
+@admin_router.get("/perf")
+async def get_request_performance(
+    reset: bool = Query(False, description="Clear the collected statistics after returning them"),
+    current_admin: models.User = Depends(get_current_admin_user)
+):
+    """
+    Per-route request latency and SQL statistics collected by the query profiler.
+
+    Routes are ordered by total DB time. repeated_statements lists statement
+    fingerprints that ran many times within single requests (likely N+1 loops).
+    Only populated when QUERY_PROFILER_ENABLED is set; statistics are per process.
+    web_search_cache reports the agent web search cache hit rate.
+    """
+    snapshot = perf_aggregator.snapshot()
+    snapshot["enabled"] = get_settings().query_profiler_enabled
+    snapshot["web_search_cache"] = web_search_cache.stats()
+    if reset:
+        perf_aggregator.reset()
+    return snapshot
 
 @admin_router.get("/users", response_model=List[UserSummary])
 async def get_all_users(
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 import models
-from config.database import get_db
+from config.database import get_read_db
 from .auth import get_current_user
 from services.analytics_service import AnalyticsService
 
@@ -14,7 +14,7 @@ def get_optimized_sales_data(
     start_date: str,
     end_date: str,
     time_frame: str,  # 1d, 7d, 1m, 6m, 1yr
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
@@ -31,7 +31,7 @@ def get_optimized_sales_data(
 @analytics_router.get("/dashboard/product-performance-optimized")
 def get_optimized_product_performance(
     time_frame: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
@@ -6,6 +6,7 @@ import sqlalchemy as sa
 from config.database import get_db
 import models, schemas
 from .auth import get_current_user
+from services.cost_service import CostService
 
 cogs_router = APIRouter()
 
@@ -26,6 +27,7 @@ async def create_cogs(
         # Update existing entry
         existing_cogs.amount = cogs.amount
         db.commit()
+        CostService(db).invalidate(current_user.id)
         db.refresh(existing_cogs)
         return existing_cogs
     
@@ -38,6 +40,7 @@ async def create_cogs(
     )
     db.add(db_cogs)
     db.commit()
+    CostService(db).invalidate(current_user.id)
     db.refresh(db_cogs)
     return db_cogs
 
@@ -112,6 +115,7 @@ async def update_cogs(
     db_cogs.amount = cogs_update.amount
     
     db.commit()
+    CostService(db).invalidate(current_user.id)
     db.refresh(db_cogs)
     return db_cogs
 
@@ -131,4 +135,5 @@ async def delete_cogs(
     
     db.delete(db_cogs)
     db.commit()
+    CostService(db).invalidate(current_user.id)
     return None
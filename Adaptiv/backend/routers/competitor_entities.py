@@ -5,6 +5,7 @@ from config.database import get_db
 import models, schemas
 from .auth import get_current_user
 from services.competitor_entity_service import CompetitorEntityService
+from services.competitor_stats_service import CompetitorStatsService
 import sys
 import os
 from pydantic import BaseModel
@@ -140,23 +141,12 @@ def get_competitor_summary(
     Get summary statistics for competitors
     """
     try:
-        service = CompetitorEntityService(db)
-        
-        # Get all competitors
-        competitors = service.get_competitor_entities(user_id=current_user.id)
-        selected_count = sum(1 for c in competitors if c.is_selected)
-        
-        # Get total items count
-        total_items = db.query(models.CompetitorItem).join(
-            models.CompetitorEntity
-        ).filter(
-            models.CompetitorEntity.user_id == current_user.id
-        ).count()
+        summary = CompetitorStatsService(db).get_summary(current_user.id)
         
         return {
-            "total_competitors": len(competitors),
-            "selected_competitors": selected_count,
-            "total_items": total_items,
+            "total_competitors": summary["total_competitors"],
+            "selected_competitors": summary["selected_competitors"],
+            "total_items": summary["total_items"],
             "recent_activity": []
         }
     except Exception as e:
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from config.database import get_db
 import models, schemas
+from services.competitor_stats_service import CompetitorStatsService
 from .auth import get_current_user
 
 competitor_items_router = APIRouter()
@@ -85,6 +86,7 @@ def create_competitor_item(
     db_competitor_item = models.CompetitorItem(**competitor_item.dict())
     db.add(db_competitor_item)
     db.commit()
+    CompetitorStatsService(db).invalidate(current_user.id)
     db.refresh(db_competitor_item)
     return db_competitor_item
 
@@ -109,6 +111,7 @@ def update_competitor_item(
             setattr(db_competitor_item, key, value)
             
     db.commit()
+    CompetitorStatsService(db).invalidate(current_user.id)
     db.refresh(db_competitor_item)
     return db_competitor_item
 
@@ -127,6 +130,7 @@ def delete_competitor_item(
         
     db.delete(db_competitor_item)
     db.commit()
+    CompetitorStatsService(db).invalidate(current_user.id)
     return None
 
 @competitor_items_router.get("/category/{category}", response_model=List[schemas.CompetitorItem])
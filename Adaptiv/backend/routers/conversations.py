@@ -3,14 +3,14 @@ Conversation Management API Routes
 """
 
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Response, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from config.database import get_db
 from dependencies import get_current_user
 from models.core import User
-from services.conversation_service import ConversationService
+from services.conversation_service import ConversationService, DEFAULT_CONTEXT_TOKEN_BUDGET
 import logging
 
 logger = logging.getLogger(__name__)
@@ -89,36 +89,38 @@ async def create_conversation(
 
 @router.get("/", response_model=List[ConversationResponse])
 async def get_conversations(
+    response: Response,
     limit: int = 50,
     include_inactive: bool = False,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all conversations for the current user"""
+    """
+    Get conversations for the current user, most recently updated first.
+    
+    Paginated by keyset: when more conversations exist, the X-Next-Cursor
+    response header carries the cursor to pass back for the next page.
+    """
     try:
         service = ConversationService(db)
-        conversations = service.get_user_conversations(
-            user_id=current_user.id,
-            limit=limit,
-            include_inactive=include_inactive
-        )
+        try:
+            page, next_cursor = service.list_conversations_with_stats(
+                user_id=current_user.id,
+                limit=limit,
+                include_inactive=include_inactive,
+                cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
-        # Get summaries for each conversation
-        response = []
-        for conversation in conversations:
-            summary = service.get_conversation_summary(conversation.id, current_user.id)
-            response.append(ConversationResponse(
-                id=conversation.id,
-                title=conversation.title,
-                created_at=conversation.created_at.isoformat(),
-                updated_at=conversation.updated_at.isoformat(),
-                is_active=conversation.is_active,
-                message_count=summary.get("message_count", 0),
-                participating_agents=summary.get("participating_agents", [])
-            ))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
-        return response
+        return [ConversationResponse(**summary) for summary in page]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting conversations: {e}")
         raise HTTPException(
@@ -341,16 +343,18 @@ async def add_message(
 async def get_conversation_context(
     conversation_id: int,
     context_limit: int = 10,
+    token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get conversation context for LangGraph (formatted for API)"""
+    """Get the most recent conversation context for LangGraph (formatted for API)"""
     try:
         service = ConversationService(db)
         context = service.get_conversation_context(
             conversation_id, 
             current_user.id, 
-            context_limit
+            context_limit,
+            token_budget=token_budget
         )
         
         return {"context": context}
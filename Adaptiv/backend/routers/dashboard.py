@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-from config.database import get_db
+from config.database import get_read_db
 import models
 from datetime import datetime, timedelta
 import traceback
 import logging
 from .auth import get_current_user
 from services.dashboard_service import DashboardService
+from utils.json_utils import ORJSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +23,7 @@ def get_sales_data(
     time_frame: Optional[str] = None,
     include_item_details: Optional[bool] = False,
     account_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
@@ -39,14 +40,15 @@ def get_sales_data(
         top_selling_items = dashboard_service.get_product_performance(time_frame, user_id)
         sales_analytics["topSellingItems"] = top_selling_items
     
-    return sales_analytics
+    # Returned as a response so the payload skips jsonable_encoder
+    return ORJSONResponse(sales_analytics)
 
 
 @dashboard_router.get("/product-performance")
 def get_product_performance(
     time_frame: Optional[str] = None,
     account_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
@@ -54,5 +56,5 @@ def get_product_performance(
     """
     user_id = account_id if account_id else current_user.id
     dashboard_service = DashboardService(db)
-    return dashboard_service.get_product_performance(time_frame, user_id)
+    return ORJSONResponse(dashboard_service.get_product_performance(time_frame, user_id))
 
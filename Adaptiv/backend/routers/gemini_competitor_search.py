@@ -8,6 +8,7 @@ from .auth import get_current_user
 from services.competitor_service import CompetitorService
 import os
 import json
+import uuid
 from datetime import datetime, timedelta
 import google.generativeai as genai
 from openai import OpenAI
@@ -50,7 +51,7 @@ def get_competitor_data(
     """Get stored competitor data for an item"""
     try:
         competitor_service = CompetitorService(db)
-        return competitor_service.get_competitor_data(item_name, days)
+        return competitor_service.get_competitor_data(item_name, current_user.id, days)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -64,22 +65,58 @@ def get_market_analysis(
     """Get market analysis comparing current price to competitors"""
     try:
         competitor_service = CompetitorService(db)
-        return competitor_service.get_market_analysis(item_name, current_price)
+        return competitor_service.get_market_analysis(item_name, current_price, current_user.id)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def refresh_task_prefix(user_id: int) -> str:
+    """Celery task ids of a user's competitor price refreshes start with this"""
+    return f"competitor-refresh-{user_id}-"
+
 @gemini_competitor_router.post("/update-all-competitors")
 def update_all_competitor_prices(
-    db: Session = Depends(get_db),
+    location: str = Body(None, embed=True),
+    force: bool = Body(False, embed=True),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Update competitor prices for all user items"""
+    """
+    Queue a competitor price refresh for all user items. Poll
+    /update-all-competitors/status/{task_id} for progress and the result.
+    """
     try:
-        competitor_service = CompetitorService(db)
-        return competitor_service.update_competitor_prices(current_user.id)
+        from tasks import refresh_competitor_prices_task
+        
+        task = refresh_competitor_prices_task.apply_async(
+            args=[current_user.id, location, force], task_id=refresh_task_prefix(current_user.id) + uuid.uuid4().hex
+        )
+        return {
+            "success": True,
+            "status": "queued",
+            "task_id": task.id
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@gemini_competitor_router.get("/update-all-competitors/status/{task_id}")
+def get_update_all_competitors_status(
+    task_id: str,
+    current_user: models.User = Depends(get_current_user)
+):
+    """Progress (completed/total items) or result of a competitor price refresh"""
+    # Ownership comes from the task id, so it holds in every state, FAILURE included
+    if not task_id.startswith(refresh_task_prefix(current_user.id)):
+        raise HTTPException(status_code=404, detail="Task not found")
+    task_result = AsyncResult(task_id)
+    info = task_result.info if isinstance(task_result.info, dict) else {}
+    
+    if task_result.state == 'PROGRESS':
+        return {"status": "progress", **info}
+    if task_result.state == 'SUCCESS':
+        return {"status": info.get("status", "completed"), "result": info}
+    if task_result.state == 'FAILURE':
+        return {"status": "error", "error": str(task_result.info)}
+    return {"status": task_result.state.lower()}
+
 @gemini_competitor_router.get("/trends/{item_name}")
 def get_competitor_trends(
     item_name: str,
@@ -90,7 +127,7 @@ def get_competitor_trends(
     """Get competitor price trends over time"""
     try:
         competitor_service = CompetitorService(db)
-        return competitor_service.get_competitor_trends(item_name, days)
+        return competitor_service.get_competitor_trends(item_name, current_user.id, days)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-from config.database import get_db
+from config.database import get_db, get_read_db
 import models
-from sqlalchemy import func, text
+from sqlalchemy import func, select, text
 from datetime import datetime, timedelta
 import traceback
 import logging
 from .auth import get_current_user
 from services.item_analytics_service import ItemAnalyticsService
+from services.forecast_service import ForecastService
+from services.order_service import order_local_date, order_local_dow, order_local_hour
+from utils.json_utils import ORJSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,11 +19,35 @@ logger = logging.getLogger(__name__)
 
 item_analytics_router = APIRouter()
 
+
+def _item_owner(item_id: int):
+    """Owner of an item as a subquery, so order filters can use the user's order indexes"""
+    return select(models.Item.user_id).where(models.Item.id == item_id).scalar_subquery()
+
+
+@item_analytics_router.get("/analytics")
+def get_batch_item_analytics(
+    item_ids: Optional[List[int]] = Query(None),
+    days: int = 30,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Get comprehensive analytics for several items (?item_ids=1&item_ids=2),
+    or for the whole menu when no ids are given, in a fixed number of queries.
+    """
+    try:
+        analytics_service = ItemAnalyticsService(db)
+        return ORJSONResponse(analytics_service.get_batch_item_analytics(current_user.id, item_ids=item_ids, days=days))
+    except Exception as e:
+        logger.error(f"Error getting batch item analytics: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @item_analytics_router.get("/analytics/{item_id}")
 def get_comprehensive_item_analytics(
     item_id: int, 
     days: int = 30,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
@@ -28,7 +55,7 @@ def get_comprehensive_item_analytics(
     """
     try:
         analytics_service = ItemAnalyticsService(db)
-        return analytics_service.get_item_analytics(item_id, current_user.id, days)
+        return ORJSONResponse(analytics_service.get_item_analytics(item_id, current_user.id, days))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -39,7 +66,7 @@ def get_comprehensive_item_analytics(
 def get_top_performing_items(
     days: int = 30,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
@@ -47,7 +74,7 @@ def get_top_performing_items(
     """
     try:
         analytics_service = ItemAnalyticsService(db)
-        return analytics_service.get_top_performing_items(current_user.id, days, limit)
+        return ORJSONResponse(analytics_service.get_top_performing_items(current_user.id, days, limit))
     except Exception as e:
         logger.error(f"Error getting top performing items: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -335,21 +362,12 @@ def get_item_hourly_sales(
                 except ValueError:
                     logger.warning(f"Could not parse date {date}, using yesterday")
         
-        # Set the date range for the entire day
-        start_date = datetime.combine(target_date.date(), datetime.min.time())
-        end_date = datetime.combine(target_date.date(), datetime.max.time())
-        
-        # Build hour grouping based on database type
-        if 'sqlite' in db.bind.dialect.name:
-            # For SQLite
-            hour_group = func.strftime('%H', models.Order.order_date)
-        else:
-            # For PostgreSQL or others 
-            hour_group = func.date_part('hour', models.Order.order_date)
-        
-        # Query for hourly sales
+        # Group the merchant-local day's orders by local hour. A local day lies
+        # within a day either side of the UTC day, which bounds the order_date scan
+        target_day = target_date.date()
+        local_hour = order_local_hour()
         hourly_sales = db.query(
-            hour_group.label('hour'),
+            local_hour.label('hour'),
             func.sum(models.OrderItem.quantity).label('units'),
             func.sum(models.OrderItem.quantity * models.OrderItem.unit_price).label('sales')
         ).join(
@@ -357,14 +375,16 @@ def get_item_hourly_sales(
             models.OrderItem.order_id == models.Order.id
         ).filter(
             models.OrderItem.item_id == item_id,
-            models.Order.order_date >= start_date,
-            models.Order.order_date <= end_date
-        ).group_by(hour_group).order_by(hour_group).all()
+            models.Order.user_id == _item_owner(item_id),
+            models.Order.order_date >= datetime.combine(target_day - timedelta(days=1), datetime.min.time()),
+            models.Order.order_date < datetime.combine(target_day + timedelta(days=2), datetime.min.time()),
+            order_local_date() == target_day
+        ).group_by(local_hour).order_by(local_hour).all()
         
         # Format the results
         result = []
         for hour_data in hourly_sales:
-            hour_str = str(hour_data.hour).zfill(2) + ":00"
+            hour_str = str(int(hour_data.hour)).zfill(2) + ":00"
             
             result.append({
                 "hour": hour_str,
@@ -409,21 +429,13 @@ def get_item_weekly_sales(
     Get sales data for a specific item broken down by day of week
     """
     try:
-        # Use the most recent 7 days from our full year of data
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)  # Last 7 days
-        
-        # Build query based on database type
-        if 'sqlite' in db.bind.dialect.name:
-            # For SQLite, extract day of week (0=Sunday, 6=Saturday)
-            day_of_week = func.strftime('%w', models.Order.order_date)
-        else:
-            # For PostgreSQL
-            day_of_week = func.extract('dow', models.Order.order_date)
+        # Use the most recent 7 merchant-local days
+        start_date = datetime.now().date() - timedelta(days=6)
         
-        # Query for sales by day of week
+        # Query for sales by local day of week (0=Sunday, 6=Saturday)
+        local_dow = order_local_dow()
         daily_sales = db.query(
-            day_of_week.label('day_num'),
+            local_dow.label('day_num'),
             func.sum(models.OrderItem.quantity).label('units'),
             func.sum(models.OrderItem.quantity * models.OrderItem.unit_price).label('revenue')
         ).join(
@@ -431,9 +443,10 @@ def get_item_weekly_sales(
             models.OrderItem.order_id == models.Order.id
         ).filter(
             models.OrderItem.item_id == item_id,
-            models.Order.order_date >= start_date,
-            models.Order.order_date <= end_date
-        ).group_by(day_of_week).order_by(day_of_week).all()
+            models.Order.user_id == _item_owner(item_id),
+            models.Order.order_date >= datetime.combine(start_date - timedelta(days=1), datetime.min.time()),
+            order_local_date() >= start_date
+        ).group_by(local_dow).order_by(local_dow).all()
         
         # Map day numbers to day names
         day_names = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
@@ -479,125 +492,76 @@ def get_item_weekly_sales(
 @item_analytics_router.get("/forecast/{item_id}")
 def get_item_forecast(
     item_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
 ):
     """
-    Get historical sales data and forecast for a specific item
+    Get monthly revenue for the past 6 months and the current month to date,
+    plus a forecast for the next 3 months from the item's fitted model
     """
     try:
-        # Get historical data from the past 6 months (using our demo data constraint of 30 days)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)  # Using available data (30 days)
-        
-        # Build query based on database type
-        if 'sqlite' in db.bind.dialect.name:
-            # For SQLite - group by month
-            month_group = func.strftime('%Y-%m', models.Order.order_date)
-        else:
-            # For PostgreSQL
-            month_group = func.date_trunc('month', models.Order.order_date)
-        
-        # Query for monthly sales
-        monthly_sales = db.query(
-            month_group.label('month'),
-            func.sum(models.OrderItem.quantity * models.OrderItem.unit_price).label('revenue')
-        ).join(
-            models.Order,
-            models.OrderItem.order_id == models.Order.id
-        ).filter(
-            models.OrderItem.item_id == item_id,
-            models.Order.order_date >= start_date,
-            models.Order.order_date <= end_date
-        ).group_by(month_group).order_by(month_group).all()
-        
-        # Transform into months
-        now = datetime.now()
-        current_month = now.replace(day=1)
-        
-        # Dictionary to store revenue by month
-        monthly_data = {}
-        
-        # Process query results
-        for data in monthly_sales:
-            month_str = data.month
-            if isinstance(month_str, datetime):
-                month_str = month_str.strftime('%b')
-                
-            monthly_data[month_str] = round(float(data.revenue) if data.revenue is not None else 0.0, 2)
-        
-        # Generate past 6 months and next 3 months
-        result = []
+        forecast_service = ForecastService(db)
+        forecast = forecast_service.get_item_forecast(item_id, current_user.id)
+        if forecast is None:
+            raise HTTPException(status_code=404, detail="Item not found")
         
-        # Since we only have 30 days of data, we'll create some artificial history
-        # and generate some realistic forecasts
         month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        current_month_idx = now.month - 1  # 0-based index
-        
-        # Factor to scale our 30 days of data into 6 months of history with some growth
-        # Calculate total revenue for the item in our dataset
-        total_item_revenue = sum(monthly_data.values())
+        today = datetime.now().date()
+        
+        def month_start(months_ago: int):
+            year, month = divmod(today.year * 12 + today.month - 1 - months_ago, 12)
+            return today.replace(year=year, month=month + 1, day=1)
+        
+        # Actual revenue per month from the daily series
+        dates, revenue = forecast_service.get_daily_revenue(item_id, current_user.id, month_start(6), today)
+        actual_by_month: Dict[tuple, float] = {}
+        for day, value in zip(dates, revenue):
+            key = (day.year, day.month)
+            actual_by_month[key] = actual_by_month.get(key, 0.0) + float(value)
+        
+        # Forecast revenue per month from the daily forecast
+        forecast_by_month: Dict[tuple, float] = {}
+        for day, value in zip(forecast["dates"], forecast["values"]):
+            day = datetime.fromisoformat(day).date()
+            key = (day.year, day.month)
+            forecast_by_month[key] = forecast_by_month.get(key, 0.0) + value
         
-        # Create past 6 months with some variance and growth pattern
-        for i in range(6, 0, -1):
-            month_idx = (current_month_idx - i) % 12
-            month_name = month_names[month_idx]
-            
-            # For demo, create some realistic historical data with growth trend
-            growth_factor = 0.85 + (i * 0.03)  # Shows steady growth over time
-            variance = 0.9 + (hash(f"{item_id}_{month_name}") % 30) / 100  # Stable variance per item/month
-            
-            base_revenue = total_item_revenue * growth_factor * variance
-            
+        result = []
+        for months_ago in range(6, -1, -1):
+            start = month_start(months_ago)
             result.append({
-                "month": month_name,
-                "actual": round(base_revenue, 2),
+                "month": month_names[start.month - 1],
+                "actual": round(actual_by_month.get((start.year, start.month), 0.0), 2),
                 "forecast": None
             })
-        
-        # Add current month as actual (from our real data)
-        month_name = month_names[current_month_idx]
-        result.append({
-            "month": month_name,
-            "actual": round(total_item_revenue, 2),
-            "forecast": None
-        })
-        
-        # Add next 3 months as forecast
-        for i in range(1, 4):
-            month_idx = (current_month_idx + i) % 12
-            month_name = month_names[month_idx]
-            
-            # For demo, create forecasts with some growth and variability
-            # Base the forecast on the current month's revenue
-            seasonal_factor = 1.0 + (hash(f"{item_id}_{month_name}_f") % 25) / 100
-            growth = 1.05 + (i * 0.03)  # 5% baseline growth plus additional per month
-            
-            forecast_revenue = total_item_revenue * growth * seasonal_factor
-            
+        for months_ahead in range(1, 4):
+            start = month_start(-months_ahead)
             result.append({
-                "month": month_name,
+                "month": month_names[start.month - 1],
                 "actual": None,
-                "forecast": round(forecast_revenue, 2)
+                "forecast": round(forecast_by_month.get((start.year, start.month), 0.0), 2)
             })
         
-        # Calculate metrics
-        latest_actual = result[6]["actual"]
+        # Growth of next month's forecast over the last complete month
+        last_complete = result[5]["actual"]
         first_forecast = result[7]["forecast"]
+        growth_rate = ((first_forecast - last_complete) / last_complete) * 100 if last_complete > 0 else 0
         
-        # Calculate growth rate between current month and first forecast
-        growth_rate = ((first_forecast - latest_actual) / latest_actual) * 100 if latest_actual > 0 else 0
-        
-        # For forecast accuracy, generate a realistic number based on the item ID for consistency
-        forecast_accuracy = 80 + (hash(str(item_id)) % 15)  # Between 80% and 95%
+        # Accuracy from the holdout backtest of the chosen model
+        mape = forecast["backtest_mape"]
+        forecast_accuracy = round(max(0.0, 100 - mape), 1) if mape is not None else None
         
         return {
             "monthlyData": result,
             "metrics": {
                 "nextMonthForecast": first_forecast,
                 "growthRate": round(growth_rate, 1),
-                "forecastAccuracy": forecast_accuracy
+                "forecastAccuracy": forecast_accuracy,
+                "method": forecast["method"]
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         # Log the full error with stack trace
         logger.error(f"Forecast error: {str(e)}")
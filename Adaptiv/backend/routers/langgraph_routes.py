@@ -3,12 +3,14 @@ LangGraph Multi-Agent API Routes
 """
 
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from services.langgraph_service_v2 import LangGraphService, MultiAgentResponse
+from services.langgraph_service_v2 import LangGraphService, MultiAgentResponse, MAX_HISTORY_MESSAGES
+from services.conversation_service import ConversationService
 from dependencies import get_current_user
 from models.core import User
 from config.database import get_db
@@ -24,6 +26,7 @@ class MultiAgentRequest(BaseModel):
     context: str = ""
     architecture: str = "supervisor"  # "supervisor" or "swarm"
     previous_messages: List[Dict[str, Any]] = []  # Add conversation history
+    conversation_id: Optional[int] = None  # Load history server-side when previous_messages is empty
 
 @router.post("/stream")
 async def stream_multi_agent_task(
@@ -38,11 +41,31 @@ async def stream_multi_agent_task(
         # Create service with database session
         langgraph_service = LangGraphService(db_session=db)
         
+        previous_messages = request.previous_messages
+        if not previous_messages and request.conversation_id:
+            conversation_service = ConversationService(db)
+            # Once the history outgrows the prompt window, fold its older half
+            # into the rolling summary so it still reaches the agents
+            try:
+                await run_in_threadpool(
+                    conversation_service.update_rolling_summary,
+                    request.conversation_id,
+                    current_user.id,
+                    langgraph_service.summarize_history,
+                    keep_recent=MAX_HISTORY_MESSAGES // 2,
+                    fold_after=MAX_HISTORY_MESSAGES
+                )
+            except Exception as e:
+                logger.warning(f"Could not update summary of conversation {request.conversation_id}: {e}")
+            previous_messages = conversation_service.get_conversation_context(
+                request.conversation_id, current_user.id, context_limit=MAX_HISTORY_MESSAGES
+            )
+        
         async def generate_stream():
             async for chunk in langgraph_service.stream_supervisor_workflow(
                 task=request.task,
                 context=request.context,
-                previous_messages=request.previous_messages,
+                previous_messages=previous_messages,
                 user_id=current_user.id
             ):
                 yield f"data: {chunk}\n\n"
@@ -4,6 +4,7 @@ from typing import List, Optional
 from config.database import get_db
 import models, schemas
 from .auth import get_current_user
+from services.order_service import OrderService
 from sqlalchemy import func
 from datetime import datetime, timedelta
 
@@ -68,7 +69,8 @@ def create_order(
     db_order = models.Order(
         order_date=order.order_date,
         total_amount=total_amount,
-        user_id=current_user.id  # Associate with current user
+        user_id=current_user.id,  # Associate with current user
+        **OrderService(db).local_time_buckets(order.order_date, current_user.id)
     )
     db.add(db_order)
     db.flush()  # Flush to get the order ID
@@ -4,6 +4,7 @@ from typing import List, Optional
 from config.database import get_db
 from models import User, FixedCost, Employee
 from .auth import get_current_user
+from services.cost_service import CostService
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -78,6 +79,7 @@ def create_fixed_cost(
     
     db.add(db_fixed_cost)
     db.commit()
+    CostService(db).invalidate(current_user.id)
     db.refresh(db_fixed_cost)
     
     return db_fixed_cost
@@ -126,6 +128,7 @@ def update_fixed_cost(
     db_fixed_cost.notes = fixed_cost.notes
     
     db.commit()
+    CostService(db).invalidate(current_user.id)
     db.refresh(db_fixed_cost)
     
     return db_fixed_cost
@@ -149,6 +152,7 @@ def delete_fixed_cost(
     
     db.delete(db_fixed_cost)
     db.commit()
+    CostService(db).invalidate(current_user.id)
     
     return None
 
@@ -184,6 +188,7 @@ def create_employee(
     
     db.add(db_employee)
     db.commit()
+    CostService(db).invalidate(current_user.id)
     db.refresh(db_employee)
     
     return db_employee
@@ -258,6 +263,7 @@ def update_employee(
         db_employee.active = employee_update.active
     
     db.commit()
+    CostService(db).invalidate(current_user.id)
     db.refresh(db_employee)
     
     return db_employee
@@ -282,5 +288,6 @@ def delete_employee(
     # Soft delete - mark as inactive instead of removing from database
     db_employee.active = False
     db.commit()
+    CostService(db).invalidate(current_user.id)
     
     return None
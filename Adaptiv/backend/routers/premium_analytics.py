@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Tuple
+import asyncio
+import json
 import random
 
+from config.database import SessionLocal, get_db
 from middleware import require_subscription, SUBSCRIPTION_PREMIUM
-from .auth import get_current_user
+from .auth import get_current_user, oauth2_scheme
 from models import User
+from services.order_service import OrderService
+from services.realtime_metrics_service import realtime_metrics_hub
+
+# Real-time stream: how often to check for new events, and the keep-alive interval
+STREAM_POLL_SECONDS = 2.0
+STREAM_KEEPALIVE_SECONDS = 15.0
 
 router = APIRouter(
     prefix="/api/premium-analytics",
@@ -14,6 +24,24 @@ router = APIRouter(
 )
 
 
+async def get_stream_subscriber(token: str = Depends(oauth2_scheme)) -> Tuple[int, str]:
+    """
+    Authenticate a premium user for a streaming response and return their id
+    and business timezone.
+    
+    Yield dependencies such as get_db are only closed once a streaming
+    response ends, so a stream would hold a pooled connection for as long as
+    it stays open. This one uses a session that is closed before returning.
+    """
+    db = SessionLocal()
+    try:
+        user = await get_current_user(token=token, db=db)
+        await require_subscription(SUBSCRIPTION_PREMIUM)(current_user=user)
+        return user.id, OrderService(db).business_timezone(user.id)
+    finally:
+        db.close()
+
+
 @router.get("/market-insights", dependencies=[Depends(require_subscription(SUBSCRIPTION_PREMIUM))])
 async def get_market_insights(current_user: User = Depends(get_current_user)):
     """
@@ -72,25 +100,44 @@ async def get_ai_recommendations(current_user: User = Depends(get_current_user))
 
 
 @router.get("/real-time-metrics", dependencies=[Depends(require_subscription(SUBSCRIPTION_PREMIUM))])
-async def get_realtime_metrics(current_user: User = Depends(get_current_user)):
+async def get_realtime_metrics(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """
     Get real-time sales and performance metrics - requires Premium subscription
+    
+    Served from the in-memory rolling window fed by order ingestion events.
+    """
+    timezone = OrderService(db).business_timezone(current_user.id)
+    return await asyncio.to_thread(realtime_metrics_hub.get_metrics, current_user.id, timezone)
+
+
+@router.get("/real-time-metrics/stream")
+async def stream_realtime_metrics(request: Request, subscriber: Tuple[int, str] = Depends(get_stream_subscriber)):
     """
-    current_time = datetime.now()
+    Server-sent events stream of the real-time metrics - requires Premium subscription
     
-    # Mock real-time data for demonstration
-    return {
-        "timestamp": current_time.isoformat(),
-        "current_hour_sales": random.randint(350, 850),
-        "current_hour_orders": random.randint(25, 50),
-        "trending_items": [
-            {"name": "Cold Brew", "orders_last_hour": random.randint(10, 25)},
-            {"name": "Avocado Toast", "orders_last_hour": random.randint(8, 20)},
-            {"name": "Latte", "orders_last_hour": random.randint(15, 30)}
-        ],
-        "live_metrics": {
-            "avg_order_value": round(random.uniform(12.5, 18.5), 2),
-            "sales_vs_yesterday": f"+{random.randint(5, 15)}%",
-            "busiest_time_today": f"{random.randint(8, 11)}:00 AM"
-        }
-    }
+    Sends a `metrics` event whenever the numbers change and a comment line as
+    keep-alive otherwise. No database session is held while streaming.
+    """
+    user_id, timezone = subscriber
+    
+    async def events():
+        last_payload = None
+        idle_seconds = 0.0
+        while not await request.is_disconnected():
+            metrics = await asyncio.to_thread(realtime_metrics_hub.get_metrics, user_id, timezone)
+            payload = json.dumps({key: value for key, value in metrics.items() if key != "timestamp"})
+            if payload != last_payload:
+                last_payload = payload
+                idle_seconds = 0.0
+                yield f"event: metrics\ndata: {json.dumps(metrics)}\n\n"
+            elif idle_seconds >= STREAM_KEEPALIVE_SECONDS:
+                idle_seconds = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+            idle_seconds += STREAM_POLL_SECONDS
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
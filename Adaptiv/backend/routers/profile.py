@@ -2,10 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
+import logging
+
 import models, schemas
 from config.database import get_db
 from .auth import get_current_user
 
+logger = logging.getLogger(__name__)
+
 profile_router = APIRouter()
 
 @profile_router.post("/business", response_model=schemas.BusinessProfile)
@@ -61,10 +65,19 @@ async def update_business_profile(
     
     # Update fields that are provided
     update_data = profile.dict(exclude_unset=True)
+    timezone_changed = 'timezone' in update_data and update_data['timezone'] != current_user.business.timezone
     for key, value in update_data.items():
         setattr(current_user.business, key, value)
     
     db.commit()
     db.refresh(current_user.business)
     
+    if timezone_changed:
+        # Re-bucket existing orders in the new timezone
+        from tasks import backfill_order_local_time_task
+        try:
+            backfill_order_local_time_task.delay(user_id=current_user.id, force=True)
+        except Exception as e:
+            logger.warning(f"Could not queue order local time backfill for user {current_user.id}: {e}")
+    
     return current_user.business
@@ -20,6 +20,7 @@ import uuid
 import models, schemas
 from config.database import get_db
 from .auth import get_current_user
+from services.order_service import OrderService
 from services.square_service import SquareService
 
 # Configure logging
@@ -1284,6 +1285,10 @@ async def sync_initial_data(user_id: int, db: Session, force_sync: bool = False)
             existing_order_ids = {order.pos_id for order in existing_orders}
             logger.info(f"Found {len(existing_order_ids)} existing orders to skip")
         
+        # Orders are stored with merchant-local date/hour/weekday buckets
+        order_service = OrderService(db)
+        business_tz = order_service.business_timezone(user_id)
+        
         # Batch collections for bulk operations
         all_new_orders = []
         all_new_order_items = []
@@ -1431,7 +1436,8 @@ async def sync_initial_data(user_id: int, db: Session, force_sync: bool = False)
                         pos_id=square_order_id,
                         location_id=location_id,
                         created_at=datetime.now(),
-                        updated_at=datetime.now()
+                        updated_at=datetime.now(),
+                        **order_service.local_time_buckets(order_date, user_id, business_tz)
                     )
                     all_new_orders.append(new_order)
                     
@@ -3,8 +3,13 @@
 Daily Pricing Agent Runner
 
 This script is designed to run as a Render cron job at 12:01am each day.
-It fetches all active user accounts and runs the AggregatePricingAgent's process
-function for each account through the existing Celery task framework.
+It plans the AggregatePricingAgent run for all active user accounts with the
+fleet scheduler: tenants whose data has not changed since their last run are
+skipped, and the rest are dispatched in staggered waves to the Celery
+"agents" queue. Each wave writes a FleetWaveReport when it completes.
+
+With --eager the waves run inline in this process (no broker or workers
+needed), one after another.
 
 To set up in Render:
 1. Add this script to your repository
@@ -13,12 +18,12 @@ To set up in Render:
 4. Set the command to "cd /opt/render/project/src/Adaptiv/backend && python run_daily_pricing_agent.py"
 """
 
+import argparse
 import logging
 import sys
 import os
 import time
 from datetime import datetime
-from typing import Dict, Any, List
 
 # Configure logging
 logging.basicConfig(
@@ -36,74 +41,47 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-# Import database models and Celery task
+# Import database session, Celery app and the fleet scheduler
 from config.database import SessionLocal
-import models
-from tasks import run_dynamic_pricing_analysis_task
-
-def get_active_users() -> List[Dict[str, Any]]:
-    """
-    Get all active users from the database
-    
-    Returns:
-        List of user dictionaries with id and email
-    """
-    db = SessionLocal()
-    try:
-        users = db.query(models.User).filter(models.User.is_active == True).all()
-        # Added cutoff to only run for first 3 users
-        return [{"id": user.id, "email": user.email} for user in users]
-    except Exception as e:
-        logger.error(f"Error fetching active users: {str(e)}")
-        return []
-    finally:
-        db.close()
+from config.celery_config import celery_app
+from config.settings import get_settings
+from services.fleet_scheduler_service import FleetSchedulerService
 
 def main():
-    """Main function to run the AggregatePricingAgent for all active users"""
+    """Plan and dispatch the AggregatePricingAgent for all active users"""
+    parser = argparse.ArgumentParser(description="Dispatch the daily pricing agent across all tenants")
+    parser.add_argument("--force", action="store_true", help="Run tenants whose data is unchanged too")
+    parser.add_argument("--eager", action="store_true", help="Run every wave inline instead of on workers")
+    args = parser.parse_args()
     
+    if args.eager:
+        celery_app.conf.task_always_eager = True
+    
+    settings = get_settings()
     start_time = time.time()
     logger.info(f"Starting daily pricing agent run at {datetime.now().isoformat()}")
     
-    # Get all active users
-    users = get_active_users()
-    logger.info(f"Found {len(users)} active users")
-    
-    # Track success and failures
-    successes = 0
-    failures = 0
-    
-    # Run the pricing agent for each user
-    for user in users:
-        user_id = user["id"]
-        user_email = user["email"]
+    db = SessionLocal()
+    try:
+        service = FleetSchedulerService(db)
+        plan = service.plan(
+            wave_count=settings.fleet_wave_count,
+            wave_spacing_minutes=0 if args.eager else settings.fleet_wave_spacing_minutes,
+            force=args.force
+        )
+        logger.info(f"Planned {plan['tenants']} tenants in {len(plan['waves'])} waves, "
+                    f"{plan['skipped']} skipped as unchanged")
+        summary = service.dispatch(plan)
         
-        try:
-            logger.info(f"Running pricing agent for user {user_id} ({user_email})")
-            
-            # Run the task
-            # Note: This runs the task synchronously within this process
-            # If we were using Celery workers, we'd use .delay() instead
-            result = run_dynamic_pricing_analysis_task(user_id)
-            
-            if result.get("success"):
-                batch_id = result.get("batch_id")
-                recommendations_count = len(result.get("pricing_recommendations", []))
-                logger.info(f"✅ Success for user {user_id}: Generated {recommendations_count} recommendations (batch_id: {batch_id})")
-                successes += 1
-            else:
-                logger.error(f"❌ Task for user {user_id} returned error: {result.get('error')}")
-                failures += 1
-                
-        except Exception as e:
-            logger.error(f"❌ Error processing user {user_id}: {str(e)}")
-            failures += 1
+        if args.eager:
+            for report in service.get_run_reports(summary["fleet_run_id"]):
+                logger.info(f"Wave {report.wave}: {report.succeeded} succeeded, {report.failed} failed, "
+                            f"{report.skipped} skipped in {report.total_duration_seconds:.2f}s")
+    finally:
+        db.close()
     
-    # Log summary
-    end_time = time.time()
-    duration = end_time - start_time
-    logger.info(f"Daily pricing agent run completed in {duration:.2f} seconds")
-    logger.info(f"Summary: {successes} successes, {failures} failures out of {len(users)} users")
+    duration = time.time() - start_time
+    logger.info(f"Daily pricing agent dispatch completed in {duration:.2f} seconds: {summary}")
 
 if __name__ == "__main__":
     main()
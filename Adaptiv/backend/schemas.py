@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field, validator, ConfigDict
 from typing import Optional, List, Any, Dict
 from datetime import datetime
+import pytz
 
 # Auth Schemas
 class UserBase(BaseModel):
@@ -42,6 +43,13 @@ class BusinessProfileBase(BaseModel):
     state: Optional[str] = None
     postal_code: Optional[str] = None
     country: Optional[str] = 'USA'
+    timezone: Optional[str] = None
+    
+    @validator('timezone')
+    def validate_timezone(cls, v):
+        if v is not None and v not in pytz.all_timezones_set:
+            raise ValueError(f'Unknown timezone: {v}')
+        return v
 
 class BusinessProfileCreate(BusinessProfileBase):
     pass
@@ -58,6 +66,7 @@ class BusinessProfileUpdate(BusinessProfileBase):
     state: Optional[str] = None
     postal_code: Optional[str] = None
     country: Optional[str] = None
+    timezone: Optional[str] = None
 
 class BusinessProfile(BusinessProfileBase):
     id: int
@@ -0,0 +1,176 @@
+"""
+Admin statistics service - single-scan aggregation and snapshot materialization
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, select
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any
+import models
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long a materialized snapshot is served before the endpoint recomputes it
+SNAPSHOT_MAX_AGE_SECONDS = 15 * 60
+
+# Number of snapshot rows kept after each materialization run
+SNAPSHOTS_TO_KEEP = 1
+
+
+class AdminStatsService:
+    """Service for computing and materializing system-wide admin statistics"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def compute_stats(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Compute all admin statistics.
+
+        Order metrics come from a single conditional-aggregation scan over
+        the orders table. Date windows are expressed as half-open ranges on
+        order_date (never func.date(order_date)) so the order_date index stays usable.
+        """
+        now = now or datetime.utcnow()
+        thirty_days_ago = now - timedelta(days=30)
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        tomorrow_start = today_start + timedelta(days=1)
+
+        Order = models.Order
+        in_last_30_days = Order.order_date >= thirty_days_ago
+        in_today = (Order.order_date >= today_start) & (Order.order_date < tomorrow_start)
+
+        # One scan over orders for every order metric
+        order_row = self.db.query(
+            func.count(Order.id).label('total_orders'),
+            func.coalesce(func.sum(Order.total_amount), 0.0).label('total_revenue'),
+            func.coalesce(func.avg(Order.total_amount), 0.0).label('avg_order_value'),
+            func.count(case((in_last_30_days, Order.id))).label('orders_last_30_days'),
+            func.coalesce(func.sum(case((in_last_30_days, Order.total_amount))), 0.0).label('revenue_last_30_days'),
+            func.count(case((in_today, Order.id))).label('orders_today'),
+            func.coalesce(func.sum(case((in_today, Order.total_amount))), 0.0).label('revenue_today'),
+        ).one()
+
+        # One scan over users for every user metric
+        User = models.User
+        user_row = self.db.query(
+            func.count(User.id).label('total_users'),
+            func.count(case((User.is_active == True, User.id))).label('active_users'),
+            func.count(case((User.is_admin == True, User.id))).label('admin_users'),
+            func.count(case((User.created_at >= thirty_days_ago, User.id))).label('users_last_30_days'),
+        ).one()
+
+        subscription_stats = self.db.query(
+            User.subscription_tier,
+            func.count(User.id)
+        ).group_by(User.subscription_tier).all()
+
+        subscription_breakdown: Dict[str, int] = {}
+        for tier, count in subscription_stats:
+            key = tier or 'free'
+            subscription_breakdown[key] = subscription_breakdown.get(key, 0) + count
+
+        # Small tables: fetch their counts together as scalar subqueries
+        count_row = self.db.execute(select(
+            select(func.count(models.BusinessProfile.id)).scalar_subquery().label('total_businesses'),
+            select(func.count(models.Item.id)).scalar_subquery().label('total_items'),
+            select(func.count(models.POSIntegration.id)).scalar_subquery().label('pos_integrations'),
+        )).one()
+
+        return {
+            "total_users": int(user_row.total_users or 0),
+            "active_users": int(user_row.active_users or 0),
+            "admin_users": int(user_row.admin_users or 0),
+            "total_businesses": int(count_row.total_businesses or 0),
+            "total_orders": int(order_row.total_orders or 0),
+            "total_items": int(count_row.total_items or 0),
+            "total_revenue": float(order_row.total_revenue or 0.0),
+            "users_last_30_days": int(user_row.users_last_30_days or 0),
+            "orders_last_30_days": int(order_row.orders_last_30_days or 0),
+            "revenue_last_30_days": float(order_row.revenue_last_30_days or 0.0),
+            "orders_today": int(order_row.orders_today or 0),
+            "revenue_today": float(order_row.revenue_today or 0.0),
+            "subscription_breakdown": subscription_breakdown,
+            "pos_integrations": int(count_row.pos_integrations or 0),
+            "avg_order_value": float(order_row.avg_order_value or 0.0),
+        }
+
+    def materialize(self) -> models.AdminStatsSnapshot:
+        """
+        Compute the statistics and store them as the latest snapshot row.
+        Older snapshots are pruned so the table stays small.
+        """
+        stats = self.compute_stats()
+        snapshot = models.AdminStatsSnapshot(
+            computed_at=datetime.now(timezone.utc),
+            **stats
+        )
+        self.db.add(snapshot)
+        self.db.flush()
+
+        keep_ids = [
+            row.id for row in self.db.query(models.AdminStatsSnapshot.id)
+            .order_by(models.AdminStatsSnapshot.computed_at.desc(), models.AdminStatsSnapshot.id.desc())
+            .limit(SNAPSHOTS_TO_KEEP)
+        ]
+        self.db.query(models.AdminStatsSnapshot).filter(
+            ~models.AdminStatsSnapshot.id.in_(keep_ids)
+        ).delete(synchronize_session=False)
+
+        self.db.commit()
+        logger.info(f"Materialized admin stats snapshot {snapshot.id} at {snapshot.computed_at}")
+        return snapshot
+
+    def get_latest_snapshot(self) -> Optional[models.AdminStatsSnapshot]:
+        """Return the most recent materialized snapshot, if any"""
+        return self.db.query(models.AdminStatsSnapshot).order_by(
+            models.AdminStatsSnapshot.computed_at.desc(),
+            models.AdminStatsSnapshot.id.desc()
+        ).first()
+
+    def get_stats(self, max_age_seconds: int = SNAPSHOT_MAX_AGE_SECONDS, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get admin statistics from the materialized snapshot.
+
+        Falls back to computing (and storing) a fresh snapshot when none exists,
+        when the latest one is older than max_age_seconds, or when forced.
+        """
+        snapshot = None if force_refresh else self.get_latest_snapshot()
+
+        if snapshot is not None and self._age_seconds(snapshot.computed_at) > max_age_seconds:
+            logger.info("Admin stats snapshot is stale, recomputing")
+            snapshot = None
+
+        if snapshot is None:
+            snapshot = self.materialize()
+
+        return self._snapshot_to_dict(snapshot)
+
+    @staticmethod
+    def _age_seconds(computed_at: datetime) -> float:
+        """Age of a snapshot in seconds, tolerant of naive timestamps (SQLite)"""
+        if computed_at.tzinfo is None:
+            computed_at = computed_at.replace(tzinfo=timezone.utc)
+        return (datetime.now(timezone.utc) - computed_at).total_seconds()
+
+    def _snapshot_to_dict(self, snapshot: models.AdminStatsSnapshot) -> Dict[str, Any]:
+        """Convert a snapshot row into the AdminStats response shape"""
+        return {
+            "total_users": snapshot.total_users or 0,
+            "active_users": snapshot.active_users or 0,
+            "admin_users": snapshot.admin_users or 0,
+            "total_businesses": snapshot.total_businesses or 0,
+            "total_orders": snapshot.total_orders or 0,
+            "total_items": snapshot.total_items or 0,
+            "total_revenue": snapshot.total_revenue or 0.0,
+            "users_last_30_days": snapshot.users_last_30_days or 0,
+            "orders_last_30_days": snapshot.orders_last_30_days or 0,
+            "revenue_last_30_days": snapshot.revenue_last_30_days or 0.0,
+            "orders_today": snapshot.orders_today or 0,
+            "revenue_today": snapshot.revenue_today or 0.0,
+            "subscription_breakdown": snapshot.subscription_breakdown or {},
+            "pos_integrations": snapshot.pos_integrations or 0,
+            "avg_order_value": snapshot.avg_order_value or 0.0,
+            "computed_at": snapshot.computed_at,
+            "age_seconds": round(self._age_seconds(snapshot.computed_at), 1),
+        }
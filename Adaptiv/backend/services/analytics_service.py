@@ -2,7 +2,7 @@
 Analytics service for handling sales data analysis and reporting
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, select
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
 import models
@@ -281,3 +281,61 @@ class AnalyticsService:
             'avg_order_value': float(summary.avg_order_value) if summary.avg_order_value else 0.0,
             'period_days': days
         }
+
+    def get_kpi_summary(self, user_id: int, days: int = 30) -> Dict[str, Any]:
+        """
+        Headline KPIs in one aggregate statement: item and all-time order
+        counts, order count and revenue over the last `days` days, and the
+        best-selling item by quantity in that window. Only the single result
+        row is fetched; no ORM objects are loaded.
+        """
+        since = datetime.now() - timedelta(days=days)
+
+        total_items = select(func.count(models.Item.id)).where(
+            models.Item.user_id == user_id
+        ).scalar_subquery()
+        total_orders = select(func.count(models.Order.id)).where(
+            models.Order.user_id == user_id
+        ).scalar_subquery()
+        top_item = select(models.Item.name).join(
+            models.OrderItem, models.Item.id == models.OrderItem.item_id
+        ).join(
+            models.Order, models.OrderItem.order_id == models.Order.id
+        ).where(
+            models.Item.user_id == user_id,
+            models.Order.order_date >= since
+        ).group_by(
+            models.Item.id, models.Item.name
+        ).order_by(
+            func.sum(models.OrderItem.quantity).desc(), models.Item.id
+        ).limit(1).scalar_subquery()
+        # Always exactly one row, so the other KPIs are selected alongside it
+        recent = select(
+            func.count(models.Order.id).label('orders'),
+            func.coalesce(func.sum(models.Order.total_amount), 0).label('revenue')
+        ).where(
+            models.Order.user_id == user_id,
+            models.Order.order_date >= since
+        ).subquery()
+
+        row = self.db.execute(
+            select(
+                total_items.label('total_items'),
+                total_orders.label('total_orders'),
+                recent.c.orders,
+                recent.c.revenue,
+                top_item.label('top_item')
+            ).select_from(recent)
+        ).one()
+
+        recent_orders = int(row.orders or 0)
+        total_revenue = float(row.revenue or 0)
+        return {
+            'total_items': int(row.total_items or 0),
+            'total_orders': int(row.total_orders or 0),
+            'recent_orders_count': recent_orders,
+            'total_revenue': total_revenue,
+            'avg_order_value': total_revenue / recent_orders if recent_orders else 0.0,
+            'top_selling_item': row.top_item,
+            'period_days': days
+        }
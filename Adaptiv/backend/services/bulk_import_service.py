@@ -0,0 +1,359 @@
+"""
+Set-based CSV import for menu items, competitors and competitor items.
+
+Rows are streamed from the CSV and handled BATCH_SIZE at a time: each batch
+is validated, its duplicates are resolved with one IN lookup, and its new
+rows go out as one multi-row INSERT (existing rows as one bulk UPDATE). The
+whole import is a single transaction; invalid rows are reported by line
+number instead of aborting the import.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, func
+from datetime import datetime
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple, Union
+from io import StringIO
+import csv
+import uuid
+import models
+import logging
+
+from .competitor_stats_service import CompetitorStatsService
+
+from utils.validation_utils import validate_price, validate_positive_number, sanitize_string
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+MAX_ERRORS_REPORTED = 100
+
+DATA_TYPES = ("menu_items", "competitors", "competitor_items")
+
+# Whether rows matching an existing record update it (True) or are skipped
+DEFAULT_UPDATE_EXISTING = {
+    "menu_items": False,
+    "competitors": False,
+    "competitor_items": True,
+}
+
+
+class RowError(ValueError):
+    """A CSV row that cannot be imported"""
+
+
+def _text(row: Dict[str, Any], *columns: str, max_length: int = 255) -> Optional[str]:
+    for column in columns:
+        value = sanitize_string(row.get(column) or "", max_length=max_length)
+        if value:
+            return value
+    return None
+
+
+def _price(row: Dict[str, Any], column: str, required: bool = True) -> Optional[float]:
+    raw = (row.get(column) or "").strip().lstrip("$").replace(",", "")
+    if not raw:
+        if required:
+            raise RowError(f"'{column}' is required")
+        return None
+    if not validate_price(raw):
+        raise RowError(f"'{column}' must be a positive amount with at most 2 decimals, got '{raw}'")
+    return float(raw)
+
+
+def _cost(row: Dict[str, Any]) -> Optional[float]:
+    raw = (row.get("cost") or "").strip().lstrip("$").replace(",", "")
+    if not raw:
+        return None
+    if not validate_positive_number(raw, allow_zero=True):
+        raise RowError(f"'cost' must be a non-negative number, got '{raw}'")
+    return float(raw)
+
+
+def _required(value: Optional[str], column: str) -> str:
+    if not value:
+        raise RowError(f"'{column}' is required")
+    return value
+
+
+class BulkImportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_csv(
+        self,
+        user_id: int,
+        data_type: str,
+        source: Union[str, IO[str]],
+        update_existing: Optional[bool] = None,
+        batch_size: int = BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Import `data_type` rows from CSV text or a text file object.
+
+        Returns counts of inserted, updated and skipped rows plus an `errors`
+        list of {"line", "error"} entries (CSV line numbers, header is line 1).
+        Nothing is written if the import fails part way.
+        """
+        if data_type not in DATA_TYPES:
+            raise ValueError(f"Unknown data type '{data_type}', expected one of {', '.join(DATA_TYPES)}")
+        if update_existing is None:
+            update_existing = DEFAULT_UPDATE_EXISTING[data_type]
+
+        reader = csv.DictReader(StringIO(source) if isinstance(source, str) else source)
+        if not reader.fieldnames:
+            raise ValueError("No data found in CSV")
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+
+        import_batch = getattr(self, f"_import_{data_type}")
+        report = {"data_type": data_type, "rows": 0, "inserted": 0, "updated": 0, "skipped": 0, "errors": []}
+        state: Dict[str, Any] = {"seen": set(), "now": datetime.now()}
+        try:
+            for batch in self._batches(reader, batch_size):
+                report["rows"] += len(batch)
+                import_batch(user_id, batch, update_existing, state, report)
+            self.db.commit()
+            if data_type in ("competitors", "competitor_items"):
+                CompetitorStatsService(self.db).invalidate(user_id)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error importing {data_type} for user {user_id}: {e}")
+            raise
+
+        report["error_count"] = len(report["errors"])
+        report["errors"] = sorted(report["errors"], key=lambda error: error["line"])[:MAX_ERRORS_REPORTED]
+        logger.info(f"Imported {data_type} for user {user_id}: {report['inserted']} inserted, "
+                    f"{report['updated']} updated, {report['skipped']} skipped, {report['error_count']} errors")
+        return report
+
+    @staticmethod
+    def _batches(reader: csv.DictReader, batch_size: int) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+        batch = []
+        for row in reader:
+            batch.append((reader.line_num, row))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _validate(batch, parse, report) -> List[Tuple[int, Dict[str, Any]]]:
+        valid = []
+        for line, row in batch:
+            try:
+                valid.append((line, parse(row)))
+            except RowError as e:
+                report["errors"].append({"line": line, "error": str(e)})
+        return valid
+
+    @staticmethod
+    def _first_occurrence(valid, key, state, report) -> List[Tuple[int, Dict[str, Any]]]:
+        """Drop rows repeating a key seen earlier in the same file"""
+        unique = []
+        for line, values in valid:
+            row_key = key(values)
+            if row_key in state["seen"]:
+                report["errors"].append({"line": line, "error": f"Duplicate of an earlier row: {values['name']}"})
+                continue
+            state["seen"].add(row_key)
+            unique.append((line, values))
+        return unique
+
+    # Menu items
+
+    @staticmethod
+    def _parse_menu_item(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": _required(_text(row, "name", "item_name"), "name"),
+            "current_price": _price(row, "price"),
+            "cost": _cost(row),
+            "category": _text(row, "category"),
+            "description": _text(row, "description", max_length=2000),
+        }
+
+    def _import_menu_items(self, user_id, batch, update_existing, state, report) -> None:
+        valid = self._validate(batch, self._parse_menu_item, report)
+        valid = self._first_occurrence(valid, lambda values: values["name"].lower(), state, report)
+        if not valid:
+            return
+
+        existing = {
+            name.lower(): (item_id, price)
+            for item_id, name, price in self.db.execute(
+                select(models.Item.id, models.Item.name, models.Item.current_price).where(
+                    models.Item.user_id == user_id,
+                    func.lower(models.Item.name).in_([values["name"].lower() for _, values in valid])
+                )
+            )
+        }
+
+        now = state["now"]
+        inserts, updates, price_changes = [], [], []
+        for _, values in valid:
+            match = existing.get(values["name"].lower())
+            if match is None:
+                inserts.append({**values, "category": values["category"] or "Uncategorized",
+                                "user_id": user_id, "created_at": now, "updated_at": now})
+            elif update_existing:
+                item_id, previous_price = match
+                changes = {key: value for key, value in values.items() if value is not None and key != "name"}
+                updates.append({**changes, "id": item_id, "updated_at": now})
+                if previous_price != values["current_price"]:
+                    price_changes.append({
+                        "item_id": item_id, "user_id": user_id, "previous_price": previous_price,
+                        "new_price": values["current_price"], "change_reason": "Bulk import", "changed_at": now,
+                    })
+            else:
+                report["skipped"] += 1
+
+        self._write(models.Item, inserts, updates, report)
+        if price_changes:
+            self.db.execute(insert(models.PriceHistory), price_changes)
+
+    # Competitors
+
+    @staticmethod
+    def _parse_competitor(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": _required(_text(row, "name", "competitor_name"), "name"),
+            "address": _text(row, "address", "location"),
+            "category": _text(row, "category"),
+            "phone": _text(row, "phone"),
+            "website": _text(row, "website", "url"),
+        }
+
+    def _import_competitors(self, user_id, batch, update_existing, state, report) -> None:
+        valid = self._validate(batch, self._parse_competitor, report)
+        valid = self._first_occurrence(valid, lambda values: values["name"].lower(), state, report)
+        if not valid:
+            return
+
+        existing = {
+            name.lower(): competitor_id
+            for competitor_id, name in self.db.execute(
+                select(models.CompetitorEntity.id, models.CompetitorEntity.name).where(
+                    models.CompetitorEntity.user_id == user_id,
+                    func.lower(models.CompetitorEntity.name).in_([values["name"].lower() for _, values in valid])
+                )
+            )
+        }
+
+        now = state["now"]
+        inserts, updates = [], []
+        for _, values in valid:
+            competitor_id = existing.get(values["name"].lower())
+            if competitor_id is None:
+                inserts.append({**values, "user_id": user_id, "created_at": now, "updated_at": now})
+            elif update_existing:
+                changes = {key: value for key, value in values.items() if value is not None and key != "name"}
+                updates.append({**changes, "id": competitor_id, "updated_at": now})
+            else:
+                report["skipped"] += 1
+
+        self._write(models.CompetitorEntity, inserts, updates, report)
+
+    # Competitor items
+
+    @staticmethod
+    def _parse_competitor_item(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "competitor": _required(_text(row, "competitor_name", "competitor"), "competitor_name"),
+            "name": _required(_text(row, "item_name", "name"), "item_name"),
+            "price": _price(row, "price"),
+            "category": _text(row, "category"),
+            "description": _text(row, "description", max_length=2000),
+            "url": _text(row, "url", max_length=2000),
+        }
+
+    def _competitor_batches(self, state, competitor_ids) -> Dict[int, Tuple[Optional[str], Optional[datetime]]]:
+        """Latest menu batch of each competitor; imported items join it"""
+        batches = state.setdefault("batches", {})
+        missing = [competitor_id for competitor_id in competitor_ids if competitor_id not in batches]
+        if missing:
+            for competitor_id, batch_id, synced_at in self.db.execute(
+                select(models.CompetitorItem.competitor_id, models.CompetitorItem.batch_id,
+                       func.max(models.CompetitorItem.sync_timestamp)).where(
+                    models.CompetitorItem.competitor_id.in_(missing)
+                ).group_by(models.CompetitorItem.competitor_id, models.CompetitorItem.batch_id)
+            ):
+                current = batches.get(competitor_id)
+                if current is None or (synced_at and (current[1] is None or synced_at > current[1])):
+                    batches[competitor_id] = (batch_id, synced_at)
+            for competitor_id in missing:
+                # No menu yet: start a batch for this import
+                batches.setdefault(competitor_id, (f"import-{uuid.uuid4().hex[:12]}", state["now"]))
+        return batches
+
+    def _import_competitor_items(self, user_id, batch, update_existing, state, report) -> None:
+        valid = self._validate(batch, self._parse_competitor_item, report)
+        valid = self._first_occurrence(
+            valid, lambda values: (values["competitor"].lower(), values["name"].lower()), state, report
+        )
+        if not valid:
+            return
+
+        competitors = state.setdefault("competitors", {})
+        unknown = {values["competitor"].lower() for _, values in valid} - competitors.keys()
+        if unknown:
+            for competitor_id, name in self.db.execute(
+                select(models.CompetitorEntity.id, models.CompetitorEntity.name).where(
+                    models.CompetitorEntity.user_id == user_id,
+                    func.lower(models.CompetitorEntity.name).in_(unknown)
+                )
+            ):
+                competitors[name.lower()] = (competitor_id, name)
+
+        resolved = []
+        for line, values in valid:
+            competitor = competitors.get(values["competitor"].lower())
+            if competitor is None:
+                report["errors"].append({"line": line, "error": f"Competitor '{values['competitor']}' not found"})
+            else:
+                resolved.append((competitor, values))
+        if not resolved:
+            return
+
+        competitor_ids = {competitor_id for (competitor_id, _), _ in resolved}
+        batches = self._competitor_batches(state, competitor_ids)
+        existing = {}
+        for item_id, competitor_id, item_name, batch_id in self.db.execute(
+            select(models.CompetitorItem.id, models.CompetitorItem.competitor_id,
+                   models.CompetitorItem.item_name, models.CompetitorItem.batch_id).where(
+                models.CompetitorItem.competitor_id.in_(competitor_ids),
+                func.lower(models.CompetitorItem.item_name).in_({values["name"].lower() for _, values in resolved})
+            )
+        ):
+            if batch_id == batches[competitor_id][0]:
+                existing[(competitor_id, item_name.lower())] = item_id
+
+        now = state["now"]
+        inserts, updates = [], []
+        for (competitor_id, competitor_name), values in resolved:
+            fields = {key: values[key] for key in ("price", "category", "description", "url")}
+            item_id = existing.get((competitor_id, values["name"].lower()))
+            if item_id is None:
+                batch_id, synced_at = batches[competitor_id]
+                inserts.append({
+                    **fields, "competitor_id": competitor_id, "competitor_name": competitor_name,
+                    "item_name": values["name"], "batch_id": batch_id, "sync_timestamp": synced_at or now,
+                    "created_at": now, "updated_at": now,
+                })
+            elif update_existing:
+                changes = {key: value for key, value in fields.items() if value is not None}
+                updates.append({**changes, "id": item_id, "updated_at": now})
+            else:
+                report["skipped"] += 1
+
+        self._write(models.CompetitorItem, inserts, updates, report)
+
+    def _write(self, model, inserts: List[Dict[str, Any]], updates: List[Dict[str, Any]], report) -> None:
+        if inserts:
+            self.db.execute(insert(model), inserts)
+            report["inserted"] += len(inserts)
+        if updates:
+            # Group by column set: bulk UPDATE by primary key needs uniform rows
+            by_columns: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for row in updates:
+                by_columns.setdefault(tuple(sorted(row)), []).append(row)
+            for rows in by_columns.values():
+                self.db.execute(update(model), rows)
+            report["updated"] += len(updates)
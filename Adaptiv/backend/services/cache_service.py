@@ -73,5 +73,17 @@ class CacheService:
         sorted_ids = sorted(item_ids)
         return self._generate_key("price_history", item_ids=sorted_ids)
 
+    def get_competitor_stats_key(self, user_id: int) -> str:
+        """Generate cache key for a user's competitor stats"""
+        return self._generate_key("competitor_stats", user_id=user_id)
+
+    def get_item_forecast_key(self, user_id: int, item_id: int) -> str:
+        """Generate cache key for an item's daily forecast"""
+        return self._generate_key("item_forecast", user_id=user_id, item_id=item_id)
+
+    def get_cost_series_key(self, user_id: int) -> str:
+        """Generate cache key for a user's daily cost series"""
+        return self._generate_key("cost_series", user_id=user_id)
+
 # Global cache instance
 cache_service = CacheService()
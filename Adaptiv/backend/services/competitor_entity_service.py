@@ -1,9 +1,9 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
 from typing import List, Optional, Dict, Any
 import models, schemas
 from fastapi import HTTPException
 from sqlalchemy.orm import Session, joinedload, noload, lazyload
+from .competitor_stats_service import CompetitorStatsService
 
 class CompetitorEntityService:
     """Service layer for CompetitorEntity business logic"""
@@ -85,6 +85,7 @@ class CompetitorEntityService:
         )
         self.db.add(db_competitor)
         self.db.commit()
+        CompetitorStatsService(self.db).invalidate(user_id)
         self.db.refresh(db_competitor)
         return db_competitor
     
@@ -123,6 +124,7 @@ class CompetitorEntityService:
             setattr(db_competitor, field, value)
         
         self.db.commit()
+        CompetitorStatsService(self.db).invalidate(user_id)
         self.db.refresh(db_competitor)
         return db_competitor
     
@@ -142,6 +144,7 @@ class CompetitorEntityService:
         
         self.db.delete(db_competitor)
         self.db.commit()
+        CompetitorStatsService(self.db).invalidate(user_id)
         return True
     
     def toggle_competitor_selection(
@@ -161,6 +164,7 @@ class CompetitorEntityService:
         
         db_competitor.is_selected = is_selected
         self.db.commit()
+        CompetitorStatsService(self.db).invalidate(user_id)
         self.db.refresh(db_competitor)
         return db_competitor
     
@@ -196,57 +200,11 @@ class CompetitorEntityService:
         competitor_id: int,
         user_id: int
     ) -> Dict[str, Any]:
-        """Get statistics for a specific competitor"""
-        # Verify competitor belongs to current user
-        competitor = self.db.query(models.CompetitorEntity).filter(
-            models.CompetitorEntity.id == competitor_id,
-            models.CompetitorEntity.user_id == user_id
-        ).first()
-        
-        if not competitor:
+        """Get latest-batch statistics for a specific competitor"""
+        stats = CompetitorStatsService(self.db).get_competitor_stats(competitor_id, user_id)
+        if stats is None:
             raise HTTPException(status_code=404, detail="Competitor not found")
-        
-        # Get item statistics
-        total_items = self.db.query(models.CompetitorItem).filter(
-            models.CompetitorItem.competitor_id == competitor_id
-        ).count()
-        
-        # Get category breakdown
-        category_stats = self.db.query(
-            models.CompetitorItem.category,
-            func.count(models.CompetitorItem.id).label('count'),
-            func.avg(models.CompetitorItem.price).label('avg_price')
-        ).filter(
-            models.CompetitorItem.competitor_id == competitor_id
-        ).group_by(models.CompetitorItem.category).all()
-        
-        # Get price statistics
-        price_stats = self.db.query(
-            func.min(models.CompetitorItem.price).label('min_price'),
-            func.max(models.CompetitorItem.price).label('max_price'),
-            func.avg(models.CompetitorItem.price).label('avg_price')
-        ).filter(
-            models.CompetitorItem.competitor_id == competitor_id
-        ).first()
-        
-        return {
-            "competitor_id": competitor_id,
-            "competitor_name": competitor.name,
-            "total_items": total_items,
-            "price_stats": {
-                "min_price": float(price_stats.min_price) if price_stats.min_price else 0,
-                "max_price": float(price_stats.max_price) if price_stats.max_price else 0,
-                "avg_price": float(price_stats.avg_price) if price_stats.avg_price else 0
-            },
-            "category_breakdown": [
-                {
-                    "category": stat.category,
-                    "item_count": stat.count,
-                    "avg_price": float(stat.avg_price) if stat.avg_price else 0
-                }
-                for stat in category_stats
-            ]
-        }
+        return stats
     
     def get_selected_competitors(self, user_id: int) -> List[models.CompetitorEntity]:
         """Get all competitors selected for tracking by a user"""
@@ -309,6 +267,7 @@ class CompetitorEntityService:
             migrated_count += 1
         
         self.db.commit()
+        CompetitorStatsService(self.db).invalidate(user_id)
         
         return {
             "migrated_competitors": migrated_count,
@@ -0,0 +1,242 @@
+"""
+Competitor item retention - set-based compaction of scrape batches.
+
+Every competitor scrape writes a full batch of CompetitorItem rows, most of
+them identical to the previous batch. Compaction runs over all competitors
+in one pass with a handful of set-based statements:
+
+1. Expire: rows of batches older than the newest `keep_batches` batches of
+   their competitor are deleted, unless the row was collapsed and still
+   stands for a retained batch (last_seen_at inside the window).
+2. Collapse: outside each competitor's latest batch, consecutive rows of the
+   same item (competitor, item_name, category) with an unchanged price and
+   description are folded into the row of the batch the item was first seen
+   in, whose last_seen_at is extended to cover them.
+
+The latest batch is never collapsed, so latest-batch queries still see the
+full current menu.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, update, func, case, and_, or_, text, true
+from datetime import datetime
+from typing import Optional, Dict, Any
+import models
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CompetitorRetentionService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.items = models.CompetitorItem.__table__
+
+    def compact(
+        self,
+        keep_batches: int = 5,
+        user_id: Optional[int] = None,
+        dry_run: bool = False,
+        vacuum: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Expire old batches and collapse unchanged items for every competitor
+        (or only those of `user_id`). Returns rows and bytes reclaimed.
+        """
+        if keep_batches < 1:
+            raise ValueError("keep_batches must be at least 1")
+
+        started = datetime.now()
+        try:
+            rows_before = self._row_count()
+            bytes_before = self._table_bytes()
+
+            expired = self.db.execute(self._expire_statement(keep_batches, user_id)).rowcount
+            extended = self.db.execute(self._extend_statement(user_id)).rowcount
+            collapsed = self.db.execute(self._collapse_statement(user_id)).rowcount
+
+            if dry_run:
+                self.db.rollback()
+            else:
+                self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error compacting competitor items: {e}")
+            raise
+
+        if vacuum and not dry_run:
+            self._vacuum()
+
+        rows_deleted = expired + collapsed
+        bytes_after = self._table_bytes()
+        report = {
+            "dry_run": dry_run,
+            "keep_batches": keep_batches,
+            "user_id": user_id,
+            "rows_before": rows_before,
+            "rows_after": rows_before - rows_deleted,
+            "rows_deleted": rows_deleted,
+            "rows_expired": expired,
+            "rows_collapsed": collapsed,
+            "rows_extended": extended,
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            # Space only returns to the OS after VACUUM; until then it is
+            # reused for new rows. The estimate assumes average-sized rows.
+            "bytes_reclaimed": (bytes_before - bytes_after) if bytes_before is not None and bytes_after is not None else None,
+            "estimated_bytes_freed": int(bytes_before * rows_deleted / rows_before) if bytes_before and rows_before else 0,
+            "duration_seconds": round((datetime.now() - started).total_seconds(), 3),
+        }
+        logger.info(f"Competitor item compaction: {report}")
+        return report
+
+    def _scope(self, user_id: Optional[int]):
+        """Restrict a statement to one user's competitors"""
+        if user_id is None:
+            return true()
+        return self.items.c.competitor_id.in_(
+            select(models.CompetitorEntity.id).where(models.CompetitorEntity.user_id == user_id)
+        )
+
+    def _ranked_batches(self, user_id: Optional[int]):
+        """One row per (competitor, batch), ranked newest first"""
+        items = self.items
+        batches = select(
+            items.c.competitor_id,
+            items.c.batch_id,
+            func.max(items.c.sync_timestamp).label("synced_at"),
+            func.max(items.c.id).label("max_id"),
+        ).where(self._scope(user_id)).group_by(items.c.competitor_id, items.c.batch_id).subquery()
+
+        return select(
+            batches.c.competitor_id,
+            batches.c.batch_id,
+            batches.c.synced_at,
+            func.row_number().over(
+                partition_by=batches.c.competitor_id,
+                order_by=(batches.c.synced_at.desc().nullslast(), batches.c.max_id.desc())
+            ).label("batch_rank"),
+        ).subquery()
+
+    def _expire_statement(self, keep_batches: int, user_id: Optional[int]):
+        items = self.items
+        ranked = self._ranked_batches(user_id)
+        cutoff = select(ranked.c.competitor_id, ranked.c.synced_at.label("cutoff")).where(
+            ranked.c.batch_rank == keep_batches
+        ).subquery()
+
+        represented_until = func.coalesce(items.c.last_seen_at, items.c.sync_timestamp)
+        expired_ids = select(items.c.id).join(
+            ranked, and_(items.c.competitor_id == ranked.c.competitor_id,
+                         items.c.batch_id.is_not_distinct_from(ranked.c.batch_id))
+        ).outerjoin(
+            cutoff, items.c.competitor_id == cutoff.c.competitor_id
+        ).where(
+            ranked.c.batch_rank > keep_batches,
+            or_(represented_until.is_(None), cutoff.c.cutoff.is_(None), represented_until < cutoff.c.cutoff)
+        )
+        return delete(items).where(items.c.id.in_(expired_ids))
+
+    def _islands(self, user_id: Optional[int]):
+        """
+        Rows outside the latest batch, numbered into runs ("islands") of the
+        same item with unchanged price and description. The first row of each
+        run is its anchor (is_change = 1).
+        """
+        items = self.items
+        ranked = self._ranked_batches(user_id)
+        latest = select(ranked.c.competitor_id, ranked.c.batch_id).where(ranked.c.batch_rank == 1).subquery()
+
+        item_key = (items.c.competitor_id, items.c.item_name, items.c.category)
+        order = (items.c.sync_timestamp, items.c.id)
+
+        def previous(column):
+            return func.lag(column).over(partition_by=item_key, order_by=order)
+
+        is_change = case(
+            (and_(
+                previous(items.c.id).isnot(None),
+                previous(items.c.sync_timestamp) < items.c.sync_timestamp,
+                previous(items.c.price).is_not_distinct_from(items.c.price),
+                previous(items.c.description).is_not_distinct_from(items.c.description),
+            ), 0),
+            else_=1
+        )
+        rows = select(
+            items.c.id,
+            items.c.competitor_id,
+            items.c.item_name,
+            items.c.category,
+            items.c.sync_timestamp,
+            func.coalesce(items.c.last_seen_at, items.c.sync_timestamp).label("represented_until"),
+            is_change.label("is_change"),
+        ).outerjoin(
+            latest, and_(items.c.competitor_id == latest.c.competitor_id,
+                         items.c.batch_id.is_not_distinct_from(latest.c.batch_id))
+        ).where(
+            self._scope(user_id),
+            latest.c.competitor_id.is_(None),
+            items.c.sync_timestamp.isnot(None),
+        ).subquery()
+
+        run_key = (rows.c.competitor_id, rows.c.item_name, rows.c.category)
+        return select(
+            rows.c.id,
+            rows.c.competitor_id,
+            rows.c.item_name,
+            rows.c.category,
+            rows.c.represented_until,
+            rows.c.is_change,
+            func.sum(rows.c.is_change).over(
+                partition_by=run_key,
+                order_by=(rows.c.sync_timestamp, rows.c.id),
+                rows=(None, 0)
+            ).label("island"),
+        ).subquery()
+
+    def _extend_statement(self, user_id: Optional[int]):
+        """Set each anchor's last_seen_at to the newest batch of its run"""
+        items = self.items
+        islands = self._islands(user_id)
+        spans = select(
+            func.min(case((islands.c.is_change == 1, islands.c.id))).label("anchor_id"),
+            func.max(islands.c.represented_until).label("represented_until"),
+        ).group_by(
+            islands.c.competitor_id, islands.c.item_name, islands.c.category, islands.c.island
+        ).having(func.count() > 1).subquery()
+
+        return update(items).where(
+            items.c.id == spans.c.anchor_id
+        ).values(last_seen_at=spans.c.represented_until)
+
+    def _collapse_statement(self, user_id: Optional[int]):
+        """Delete the non-anchor rows of every run"""
+        islands = self._islands(user_id)
+        return delete(self.items).where(
+            self.items.c.id.in_(select(islands.c.id).where(islands.c.is_change == 0))
+        )
+
+    def _row_count(self) -> int:
+        return self.db.execute(select(func.count()).select_from(self.items)).scalar() or 0
+
+    def _table_bytes(self) -> Optional[int]:
+        """On-disk size of competitor_items and its indexes, where the database can tell"""
+        dialect = self.db.get_bind().dialect.name
+        try:
+            if dialect == "postgresql":
+                return self.db.execute(text("SELECT pg_total_relation_size('competitor_items')")).scalar()
+            if dialect == "sqlite":
+                return self.db.execute(text(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name = 'competitor_items' "
+                    "OR name IN (SELECT name FROM sqlite_master WHERE tbl_name = 'competitor_items')"
+                )).scalar()
+        except Exception as e:
+            logger.warning(f"Could not measure competitor_items size: {e}")
+            self.db.rollback()
+        return None
+
+    def _vacuum(self) -> None:
+        """Return freed pages (SQLite) or mark them reusable and refresh stats (PostgreSQL)"""
+        engine = self.db.get_bind()
+        statement = "VACUUM ANALYZE competitor_items" if engine.dialect.name == "postgresql" else "VACUUM"
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql(statement)
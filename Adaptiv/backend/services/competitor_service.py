@@ -1,15 +1,114 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from sqlalchemy import and_, desc, func, select, insert
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import models
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
+import copy
+import json
 import logging
-import requests
+import re
+import threading
+import time
 import os
 import google.generativeai as genai
 
+from config.settings import get_settings
+from services.web_search_service import web_search_cache
+from utils.redis_client import redis_client
+
 logger = logging.getLogger(__name__)
 
+SEARCH_TYPE = "competitor_prices"
+
+# Items with observations newer than this are not searched again unless forced
+REFRESH_INTERVAL_HOURS = 24
+
+EMPTY_RESULT = {
+    "competitors": [],
+    "market_analysis": {
+        "average_price": 0.00,
+        "price_range": {"min": 0.00, "max": 0.00},
+        "confidence": "low"
+    }
+}
+
+
+def parse_competitor_response(response_text: str) -> Dict[str, Any]:
+    """Extract the JSON body of a Gemini answer (it may be wrapped in prose)"""
+    json_match = re.search(r'\{.*\}', response_text or "", re.DOTALL)
+    if not json_match:
+        return copy.deepcopy(EMPTY_RESULT)
+    try:
+        data = json.loads(json_match.group())
+    except ValueError:
+        logger.warning("Could not parse competitor search response as JSON")
+        return copy.deepcopy(EMPTY_RESULT)
+    data.setdefault("competitors", [])
+    return data
+
+
+def _price_value(value: Any) -> Optional[float]:
+    try:
+        price = float(str(value).replace("$", "").replace(",", "").strip())
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+
+class RateLimiter:
+    """
+    Token bucket shared by worker threads: bursts up to a minute's budget.
+
+    With a `shared_key`, each request also counts against a per-minute window
+    in Redis, so every worker process together stays within `per_minute`.
+    While Redis is unavailable only this process is limited.
+    """
+
+    def __init__(self, per_minute: int, shared_key: Optional[str] = None):
+        self.per_minute = max(per_minute, 1)
+        self.rate = self.per_minute / 60.0
+        self.capacity = float(self.per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.shared_key = shared_key
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        self._acquire_local()
+        while self.shared_key:
+            now = time.time()
+            count = redis_client.increment_counter(f"{self.shared_key}:{int(now // 60)}", ttl=120)
+            if count is None or count <= self.per_minute:
+                return
+            time.sleep(60 - now % 60)
+
+    def _acquire_local(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_gemini_limiter: Optional[RateLimiter] = None
+_gemini_limiter_lock = threading.Lock()
+
+
+def gemini_rate_limiter() -> RateLimiter:
+    """The process-wide Gemini limiter, so concurrent refreshes share GEMINI_REQUESTS_PER_MINUTE"""
+    global _gemini_limiter
+    with _gemini_limiter_lock:
+        if _gemini_limiter is None:
+            _gemini_limiter = RateLimiter(get_settings().gemini_requests_per_minute, shared_key="gemini:requests")
+        return _gemini_limiter
+
+
 class CompetitorService:
     def __init__(self, db: Session):
         self.db = db
@@ -25,17 +124,9 @@ class CompetitorService:
             self.model = None
             logger.warning("GEMINI_API_KEY not found, competitor search will be limited")
     
-    def search_competitors(self, item_name: str, user_id: int, location: str = None) -> Dict[str, Any]:
-        """
-        Search for competitor pricing using AI-powered search.
-        """
-        try:
-            if not self.model:
-                raise ValueError("Gemini AI not configured")
-            
-            # Create search prompt
-            location_context = f" in {location}" if location else ""
-            prompt = f"""
+    def _search_prompt(self, item_name: str, location: Optional[str]) -> str:
+        location_context = f" in {location}" if location else ""
+        return f"""
             Find competitor pricing information for the product: "{item_name}"{location_context}.
             
             Please search for similar products from major retailers and provide:
@@ -63,11 +154,33 @@ class CompetitorService:
                 }}
             }}
             """
+
+    def _search_item(self, item_name: str, location: Optional[str] = None,
+                     limiter: Optional[RateLimiter] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Gemini search for one item, memoized across tenants for the search TTL.
+        `force` always searches and replaces the memoized answer.
+        """
+        def search():
+            if limiter is not None:
+                limiter.acquire()
+            response = self.model.generate_content(self._search_prompt(item_name, location))
+            return parse_competitor_response(response.text)
+
+        return web_search_cache.get_or_search(
+            f"{item_name} {location or ''}", SEARCH_TYPE, search, compact=None, refresh=force
+        )
+
+    def search_competitors(self, item_name: str, user_id: int, location: str = None) -> Dict[str, Any]:
+        """
+        Search for competitor pricing using AI-powered search.
+        """
+        try:
+            if not self.model:
+                raise ValueError("Gemini AI not configured")
             
-            response = self.model.generate_content(prompt)
-            
-            # Parse AI response (this would need more robust parsing in production)
-            competitor_data = self._parse_competitor_response(response.text, item_name, user_id)
+            competitor_data = self._search_item(item_name, location)
+            self._store_price_observations(user_id, {item_name: competitor_data})
             
             return competitor_data
             
@@ -75,92 +188,85 @@ class CompetitorService:
             logger.error(f"Error searching competitors: {str(e)}")
             raise
     
-    def _parse_competitor_response(self, response_text: str, item_name: str, user_id: int) -> Dict[str, Any]:
+    def _store_price_observations(self, user_id: int, results: Dict[str, Dict[str, Any]]) -> int:
         """
-        Parse AI response and store competitor data.
+        Write one CompetitorPriceHistory row per (source, item) found, in a
+        single insert, with the change from that pair's previous observation.
         """
+        item_names = list(results)
+        if not item_names:
+            return 0
+        history = models.CompetitorPriceHistory
         try:
-            import json
-            import re
-            
-            # Extract JSON from response (AI responses might have extra text)
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-            else:
-                # Fallback if no JSON found
-                data = {
-                    "competitors": [],
-                    "market_analysis": {
-                        "average_price": 0.00,
-                        "price_range": {"min": 0.00, "max": 0.00},
-                        "confidence": "low"
+            latest = select(
+                history.competitor_name, history.item_name, func.max(history.captured_at).label("captured_at")
+            ).where(
+                history.user_id == user_id, history.item_name.in_(item_names)
+            ).group_by(history.competitor_name, history.item_name).subquery()
+            previous = {
+                (competitor_name, item_name): price
+                for competitor_name, item_name, price in self.db.execute(
+                    select(history.competitor_name, history.item_name, history.price).join(latest, and_(
+                        history.competitor_name == latest.c.competitor_name,
+                        history.item_name == latest.c.item_name,
+                        history.captured_at == latest.c.captured_at
+                    )).where(history.user_id == user_id)
+                )
+            }
+
+            captured_at = datetime.utcnow()
+            rows = {}
+            for item_name, data in results.items():
+                for competitor in data.get("competitors") or []:
+                    price = _price_value(competitor.get("price"))
+                    source = (competitor.get("source") or "Unknown")[:255]
+                    if price is None:
+                        continue
+                    last_price = previous.get((source, item_name))
+                    rows[(source, item_name)] = {
+                        "user_id": user_id,
+                        "competitor_name": source,
+                        "item_name": item_name[:255],
+                        "price": price,
+                        "captured_at": captured_at,
+                        "price_change_from_last": round(price - last_price, 2) if last_price else None,
+                        "percent_change_from_last": (
+                            round((price - last_price) / last_price * 100, 2) if last_price else None
+                        ),
                     }
-                }
-            
-            # Store competitor data in database
-            for competitor in data.get('competitors', []):
-                existing_competitor = self.db.query(models.CompetitorItem).filter(
-                    and_(
-                        models.CompetitorItem.item_name.ilike(f"%{item_name}%"),
-                        models.CompetitorItem.source == competitor.get('source', 'Unknown')
-                    )
-                ).first()
-                
-                if existing_competitor:
-                    # Update existing
-                    existing_competitor.price = competitor.get('price', 0)
-                    existing_competitor.last_updated = datetime.now()
-                else:
-                    # Create new
-                    new_competitor = models.CompetitorItem(
-                        item_name=competitor.get('product_name', item_name),
-                        price=competitor.get('price', 0),
-                        source=competitor.get('source', 'Unknown'),
-                        url=competitor.get('url'),
-                        last_updated=datetime.now(),
-                        created_at=datetime.now()
-                    )
-                    self.db.add(new_competitor)
-            
+
+            if rows:
+                self.db.execute(insert(history), list(rows.values()))
             self.db.commit()
-            return data
-            
+            return len(rows)
         except Exception as e:
-            logger.error(f"Error parsing competitor response: {str(e)}")
-            # Return empty data structure on parsing error
-            return {
-                "competitors": [],
-                "market_analysis": {
-                    "average_price": 0.00,
-                    "price_range": {"min": 0.00, "max": 0.00},
-                    "confidence": "low"
-                }
-            }
+            self.db.rollback()
+            logger.error(f"Error storing competitor prices for user {user_id}: {str(e)}")
+            raise
     
-    def get_competitor_data(self, item_name: str, days: int = 30) -> List[Dict[str, Any]]:
+    def get_competitor_data(self, item_name: str, user_id: int, days: int = 30) -> List[Dict[str, Any]]:
         """
-        Get stored competitor data for an item.
+        Get stored competitor price observations for an item.
         """
         try:
-            start_date = datetime.now() - timedelta(days=days)
+            start_date = datetime.utcnow() - timedelta(days=days)
+            history = models.CompetitorPriceHistory
             
-            competitors = self.db.query(models.CompetitorItem).filter(
-                and_(
-                    models.CompetitorItem.item_name.ilike(f"%{item_name}%"),
-                    models.CompetitorItem.last_updated >= start_date
-                )
-            ).order_by(desc(models.CompetitorItem.last_updated)).all()
+            competitors = self.db.query(history).filter(
+                history.user_id == user_id,
+                history.item_name.ilike(f"%{item_name}%"),
+                history.captured_at >= start_date
+            ).order_by(desc(history.captured_at)).all()
             
             return [
                 {
                     'id': comp.id,
                     'item_name': comp.item_name,
                     'price': float(comp.price or 0),
-                    'source': comp.source,
-                    'url': comp.url,
-                    'last_updated': comp.last_updated.isoformat() if comp.last_updated else None,
-                    'created_at': comp.created_at.isoformat() if comp.created_at else None
+                    'source': comp.competitor_name,
+                    'last_updated': comp.captured_at.isoformat() if comp.captured_at else None,
+                    'price_change_from_last': comp.price_change_from_last,
+                    'percent_change_from_last': comp.percent_change_from_last
                 }
                 for comp in competitors
             ]
@@ -169,12 +275,12 @@ class CompetitorService:
             logger.error(f"Error getting competitor data: {str(e)}")
             raise
     
-    def get_market_analysis(self, item_name: str, current_price: float) -> Dict[str, Any]:
+    def get_market_analysis(self, item_name: str, current_price: float, user_id: int) -> Dict[str, Any]:
         """
         Get market analysis comparing current price to competitors.
         """
         try:
-            competitors = self.get_competitor_data(item_name)
+            competitors = self.get_competitor_data(item_name, user_id)
             
             if not competitors:
                 return {
@@ -236,65 +342,102 @@ class CompetitorService:
             logger.error(f"Error getting market analysis: {str(e)}")
             raise
     
-    def update_competitor_prices(self, user_id: int) -> Dict[str, Any]:
+    def update_competitor_prices(
+        self,
+        user_id: int,
+        location: Optional[str] = None,
+        force: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
         """
-        Update competitor prices for all user items.
+        Refresh competitor prices for all of a user's items.
+
+        Items observed within REFRESH_INTERVAL_HOURS are skipped unless
+        `force` is set. The rest are searched concurrently (bounded by
+        GEMINI_MAX_CONCURRENCY and rate limited to GEMINI_REQUESTS_PER_MINUTE),
+        items searched recently by any tenant come from the search cache
+        (a forced refresh searches again and updates it), and all
+        observations are written with one insert. `progress` is
+        called with (completed, total) as searches finish.
         """
         try:
-            # Get all user items
-            items = self.db.query(models.Item).filter(models.Item.user_id == user_id).all()
+            if not self.model:
+                raise ValueError("Gemini AI not configured")
             
-            updated_items = 0
-            total_competitors = 0
+            item_names = sorted(set(self.db.execute(
+                select(models.Item.name).where(models.Item.user_id == user_id, models.Item.name.isnot(None))
+            ).scalars()))
+            recent = set() if force else self._recently_refreshed(user_id, item_names)
+            to_search = [name for name in item_names if name not in recent]
             
-            for item in items:
-                try:
-                    # Search for competitors for this item
-                    competitor_data = self.search_competitors(item.name, user_id)
-                    competitors_found = len(competitor_data.get('competitors', []))
-                    
-                    if competitors_found > 0:
-                        updated_items += 1
-                        total_competitors += competitors_found
-                        
-                except Exception as e:
-                    logger.error(f"Error updating competitors for item {item.name}: {str(e)}")
-                    continue
+            settings = get_settings()
+            limiter = gemini_rate_limiter()
+            results, errors = {}, {}
+            if to_search:
+                with ThreadPoolExecutor(max_workers=min(settings.gemini_max_concurrency, len(to_search))) as pool:
+                    futures = {pool.submit(self._search_item, name, location, limiter, force): name for name in to_search}
+                    for completed, future in enumerate(as_completed(futures), 1):
+                        name = futures[future]
+                        try:
+                            results[name] = future.result()
+                        except Exception as e:
+                            logger.error(f"Error updating competitors for item {name}: {str(e)}")
+                            errors[name] = str(e)
+                        if progress:
+                            progress(completed, len(to_search))
+            
+            observations = self._store_price_observations(user_id, results)
             
             return {
-                'items_processed': len(items),
-                'items_updated': updated_items,
-                'total_competitors_found': total_competitors
+                'items_processed': len(item_names),
+                'items_searched': len(to_search),
+                'items_skipped_recent': len(recent),
+                'items_updated': sum(1 for data in results.values() if data.get('competitors')),
+                'total_competitors_found': observations,
+                'errors': errors
             }
             
         except Exception as e:
             logger.error(f"Error updating competitor prices: {str(e)}")
             raise
     
-    def get_competitor_trends(self, item_name: str, days: int = 90) -> Dict[str, Any]:
+    def _recently_refreshed(self, user_id: int, item_names: List[str]) -> set:
+        if not item_names:
+            return set()
+        history = models.CompetitorPriceHistory
+        cutoff = datetime.utcnow() - timedelta(hours=REFRESH_INTERVAL_HOURS)
+        return set(self.db.execute(
+            select(history.item_name).where(
+                history.user_id == user_id,
+                history.item_name.in_(item_names),
+                history.captured_at >= cutoff
+            ).distinct()
+        ).scalars())
+    
+    def get_competitor_trends(self, item_name: str, user_id: int, days: int = 90) -> Dict[str, Any]:
         """
         Get competitor price trends over time.
         """
         try:
-            start_date = datetime.now() - timedelta(days=days)
+            start_date = datetime.utcnow() - timedelta(days=days)
+            history = models.CompetitorPriceHistory
             
             # Get historical competitor data
-            competitors = self.db.query(models.CompetitorItem).filter(
-                and_(
-                    models.CompetitorItem.item_name.ilike(f"%{item_name}%"),
-                    models.CompetitorItem.last_updated >= start_date
-                )
-            ).order_by(models.CompetitorItem.last_updated).all()
+            competitors = self.db.query(history).filter(
+                history.user_id == user_id,
+                history.item_name.ilike(f"%{item_name}%"),
+                history.captured_at >= start_date
+            ).order_by(history.captured_at).all()
             
             # Group by source and track price changes
             trends_by_source = {}
             for comp in competitors:
-                source = comp.source
+                source = comp.competitor_name
                 if source not in trends_by_source:
                     trends_by_source[source] = []
                 
                 trends_by_source[source].append({
-                    'date': comp.last_updated.isoformat(),
+                    'date': comp.captured_at.isoformat(),
                     'price': float(comp.price or 0)
                 })
             
@@ -0,0 +1,176 @@
+"""
+Competitor statistics over each competitor's latest menu batch.
+
+Every scrape writes a new batch of CompetitorItem rows, so aggregating over
+all rows mixes current prices with every historical batch. The stats here
+are computed for all of a user's competitors in one grouped query: a window
+over sync_timestamp picks each competitor's latest batch_id, and the outer
+query groups that batch by (competitor, category).
+
+Results are cached per user and stay valid until the user's competitor data
+changes. Everything that writes a batch or edits competitors or their items
+calls invalidate(), which drops this process's entry and bumps a per-user
+version counter in Redis; other processes see the new version on their next
+read (one Redis GET) and recompute. While Redis is unavailable, entries in
+other processes are only refreshed by STATS_CACHE_TTL.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Dict, Any, Optional
+import models
+import logging
+
+from utils.redis_client import redis_client
+from .cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long a cached entry is trusted, even if no batch is written
+STATS_CACHE_TTL = 3600
+
+VERSION_KEY = "competitor_stats:version:{user_id}"
+
+
+class CompetitorStatsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_user_competitor_stats(self, user_id: int, use_cache: bool = True) -> Dict[int, Dict[str, Any]]:
+        """
+        Latest-batch stats for every competitor of a user, keyed by competitor id.
+        Competitors without items are included with zero counts.
+        """
+        try:
+            version = self._data_version(user_id)
+            cache_key = cache_service.get_competitor_stats_key(user_id)
+            if use_cache:
+                cached = cache_service.get(cache_key)
+                if cached and cached["version"] == version:
+                    return cached["stats"]
+
+            stats = self._compute_stats(user_id)
+            cache_service.set(cache_key, {"version": version, "stats": stats}, ttl=STATS_CACHE_TTL)
+            return stats
+        except Exception as e:
+            logger.error(f"Error computing competitor stats for user {user_id}: {e}")
+            raise
+
+    def get_competitor_stats(self, competitor_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+        """Latest-batch stats for one competitor, or None if the user doesn't own it"""
+        return self.get_user_competitor_stats(user_id).get(competitor_id)
+
+    def get_summary(self, user_id: int) -> Dict[str, Any]:
+        """Competitor counts and latest-batch item totals for a user"""
+        stats = self.get_user_competitor_stats(user_id)
+        return {
+            "total_competitors": len(stats),
+            "selected_competitors": sum(1 for s in stats.values() if s["is_selected"]),
+            "total_items": sum(s["total_items"] for s in stats.values()),
+            "competitors": list(stats.values()),
+        }
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Drop the cached stats for a user, in this process and (through the
+        version counter) in every other one. Call after committing the write.
+        """
+        redis_client.increment_counter(VERSION_KEY.format(user_id=user_id))
+        cache_service.invalidate_pattern(cache_service.get_competitor_stats_key(user_id))
+
+    def _data_version(self, user_id: int) -> Optional[int]:
+        """The user's stats version, or None while Redis is unavailable"""
+        return redis_client.get_counter(VERSION_KEY.format(user_id=user_id))
+
+    def _compute_stats(self, user_id: int) -> Dict[int, Dict[str, Any]]:
+        item = models.CompetitorItem
+        entity = models.CompetitorEntity
+
+        # Each item row tagged with its competitor's latest batch (newest
+        # sync_timestamp, ties broken by the newest row)
+        ranked = self.db.query(
+            item.competitor_id,
+            item.category,
+            item.price,
+            item.batch_id,
+            item.sync_timestamp,
+            func.first_value(item.batch_id).over(
+                partition_by=item.competitor_id,
+                order_by=(item.sync_timestamp.desc().nullslast(), item.id.desc())
+            ).label("latest_batch_id"),
+        ).join(
+            entity, item.competitor_id == entity.id
+        ).filter(
+            entity.user_id == user_id
+        ).subquery()
+
+        latest = self.db.query(ranked).filter(
+            ranked.c.batch_id.is_not_distinct_from(ranked.c.latest_batch_id)
+        ).subquery()
+
+        rows = self.db.query(
+            entity.id,
+            entity.name,
+            entity.is_selected,
+            latest.c.category,
+            func.max(latest.c.batch_id).label("batch_id"),
+            func.max(latest.c.sync_timestamp).label("last_sync"),
+            func.count(latest.c.competitor_id).label("item_count"),
+            func.count(latest.c.price).label("priced_count"),
+            func.sum(latest.c.price).label("price_total"),
+            func.min(latest.c.price).label("min_price"),
+            func.max(latest.c.price).label("max_price"),
+        ).outerjoin(
+            latest, latest.c.competitor_id == entity.id
+        ).filter(
+            entity.user_id == user_id
+        ).group_by(
+            entity.id, entity.name, entity.is_selected, latest.c.category
+        ).all()
+
+        stats: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            entry = stats.get(row.id)
+            if entry is None:
+                entry = stats[row.id] = {
+                    "competitor_id": row.id,
+                    "competitor_name": row.name,
+                    "is_selected": bool(row.is_selected),
+                    "batch_id": None,
+                    "last_sync": None,
+                    "total_items": 0,
+                    "_priced": 0,
+                    "_price_total": 0.0,
+                    "price_stats": {"min_price": None, "max_price": None, "avg_price": 0},
+                    "category_breakdown": [],
+                }
+            if not row.item_count:
+                continue
+
+            entry["batch_id"] = entry["batch_id"] or row.batch_id
+            if row.last_sync and (entry["last_sync"] is None or row.last_sync > entry["last_sync"]):
+                entry["last_sync"] = row.last_sync
+            entry["total_items"] += row.item_count
+            entry["_priced"] += row.priced_count
+            entry["_price_total"] += float(row.price_total or 0)
+
+            price_stats = entry["price_stats"]
+            if row.min_price is not None:
+                low, high = price_stats["min_price"], price_stats["max_price"]
+                price_stats["min_price"] = float(row.min_price) if low is None else min(low, float(row.min_price))
+                price_stats["max_price"] = float(row.max_price) if high is None else max(high, float(row.max_price))
+
+            entry["category_breakdown"].append({
+                "category": row.category,
+                "item_count": row.item_count,
+                "avg_price": float(row.price_total) / row.priced_count if row.priced_count else 0,
+            })
+
+        for entry in stats.values():
+            priced = entry.pop("_priced")
+            price_total = entry.pop("_price_total")
+            price_stats = entry["price_stats"]
+            price_stats["min_price"] = price_stats["min_price"] or 0
+            price_stats["max_price"] = price_stats["max_price"] or 0
+            price_stats["avg_price"] = price_total / priced if priced else 0
+
+        return stats
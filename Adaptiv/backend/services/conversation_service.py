@@ -2,10 +2,11 @@
 Conversation Service for managing persistent conversations and messages
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Callable
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
+from sqlalchemy import desc, and_, or_, func
 from datetime import datetime
+import base64
 import logging
 
 from models.agents import Conversation, ConversationMessage
@@ -13,6 +14,41 @@ from models.core import User
 
 logger = logging.getLogger(__name__)
 
+# Default prompt budget for conversation history (roughly 4 characters per token)
+DEFAULT_CONTEXT_TOKEN_BUDGET = 6000
+
+
+def estimate_tokens(text: Any) -> int:
+    """Rough token count for budgeting prompt history"""
+    if not isinstance(text, str):
+        text = str(text or "")
+    return len(text) // 4 + 1
+
+
+def fit_to_token_budget(messages: List[Dict[str, Any]], token_budget: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    Keep the newest messages (oldest first) whose content fits in
+    `token_budget`. The newest message is always kept, truncated from the
+    front if it alone exceeds the budget.
+    """
+    if not token_budget or not messages:
+        return list(messages)
+
+    kept: List[Dict[str, Any]] = []
+    used = 0
+    for message in reversed(messages):
+        tokens = estimate_tokens(message.get("content"))
+        if used + tokens > token_budget:
+            if not kept:
+                content = str(message.get("content") or "")
+                kept.append({**message, "content": "..." + content[-token_budget * 4:]})
+            break
+        kept.append(message)
+        used += tokens
+    kept.reverse()
+    return kept
+
+
 class ConversationService:
     def __init__(self, db: Session):
         self.db = db
@@ -56,6 +92,97 @@ class ConversationService:
             logger.error(f"Error getting user conversations: {e}")
             raise
 
+    def list_conversations_with_stats(
+        self,
+        user_id: int,
+        limit: int = 50,
+        include_inactive: bool = False,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of a user's conversations, most recently updated first, each
+        with its message count and participating agents.
+
+        Uses keyset pagination on (updated_at, id): pass the returned cursor
+        to get the next page. Costs two queries per page regardless of size.
+        """
+        try:
+            query = self.db.query(Conversation).filter(Conversation.user_id == user_id)
+
+            if not include_inactive:
+                query = query.filter(Conversation.is_active == True)
+
+            if cursor:
+                updated_at, conversation_id = decode_conversation_cursor(cursor)
+                query = query.filter(or_(
+                    Conversation.updated_at < updated_at,
+                    and_(Conversation.updated_at == updated_at, Conversation.id < conversation_id)
+                ))
+
+            # Fetch one extra row to know whether another page exists
+            conversations = query.order_by(
+                desc(Conversation.updated_at), desc(Conversation.id)
+            ).limit(limit + 1).all()
+            has_more = len(conversations) > limit
+            conversations = conversations[:limit]
+
+            stats = self.get_conversation_stats([c.id for c in conversations])
+            page = [self._summarize(conversation, stats.get(conversation.id)) for conversation in conversations]
+
+            next_cursor = None
+            if has_more and conversations:
+                last = conversations[-1]
+                next_cursor = encode_conversation_cursor(last.updated_at, last.id)
+
+            logger.info(f"Retrieved {len(page)} conversations for user {user_id}")
+            return page, next_cursor
+
+        except Exception as e:
+            logger.error(f"Error listing conversations: {e}")
+            raise
+
+    def get_conversation_stats(self, conversation_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Message counts and participating agents for many conversations in one
+        grouped query: rows are (conversation_id, agent_name, count).
+        """
+        if not conversation_ids:
+            return {}
+
+        rows = self.db.query(
+            ConversationMessage.conversation_id,
+            ConversationMessage.agent_name,
+            func.count(ConversationMessage.id)
+        ).filter(
+            ConversationMessage.conversation_id.in_(conversation_ids)
+        ).group_by(
+            ConversationMessage.conversation_id,
+            ConversationMessage.agent_name
+        ).all()
+
+        stats: Dict[int, Dict[str, Any]] = {}
+        for conversation_id, agent_name, count in rows:
+            entry = stats.setdefault(conversation_id, {"message_count": 0, "participating_agents": []})
+            entry["message_count"] += count
+            if agent_name:
+                entry["participating_agents"].append(agent_name)
+
+        for entry in stats.values():
+            entry["participating_agents"].sort()
+        return stats
+
+    def _summarize(self, conversation: Conversation, stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        stats = stats or {"message_count": 0, "participating_agents": []}
+        return {
+            "id": conversation.id,
+            "title": conversation.title,
+            "created_at": conversation.created_at.isoformat(),
+            "updated_at": conversation.updated_at.isoformat(),
+            "is_active": conversation.is_active,
+            "message_count": stats["message_count"],
+            "participating_agents": stats["participating_agents"]
+        }
+
     def get_conversation(self, conversation_id: int, user_id: int) -> Optional[Conversation]:
         """Get a specific conversation with user validation"""
         try:
@@ -202,29 +329,136 @@ class ConversationService:
             logger.error(f"Error archiving conversation: {e}")
             raise
 
-    def get_conversation_context(self, conversation_id: int, user_id: int, context_limit: int = 10) -> List[Dict[str, Any]]:
-        """Get conversation context for LangGraph (last N messages formatted for API)"""
+    def get_conversation_context(
+        self,
+        conversation_id: int,
+        user_id: int,
+        context_limit: int = 10,
+        token_budget: Optional[int] = DEFAULT_CONTEXT_TOKEN_BUDGET,
+        include_summary: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get conversation context for LangGraph: the most recent messages,
+        oldest first, formatted for the API.
+
+        Loads only the tail window (a descending LIMIT query on
+        idx_conversation_created), then drops the oldest messages that do not
+        fit in `token_budget`. When earlier messages fall outside the window
+        and the conversation has a rolling summary, it is prepended as a
+        system message.
+        """
         try:
-            messages = self.get_conversation_messages(conversation_id, user_id, limit=context_limit)
-            
-            # Convert to format expected by LangGraph
-            context = []
-            for message in messages[-context_limit:]:  # Get last N messages
-                context.append({
-                    "role": message.role,
-                    "content": message.content,
-                    "agent_name": message.agent_name,
-                    "tools_used": message.tools_used,
-                    "created_at": message.created_at.isoformat()
+            conversation = self.get_conversation(conversation_id, user_id)
+            if not conversation:
+                return []
+
+            tail = self.db.query(ConversationMessage).filter(
+                ConversationMessage.conversation_id == conversation_id
+            ).order_by(
+                desc(ConversationMessage.created_at), desc(ConversationMessage.id)
+            ).limit(context_limit).all()
+            tail.reverse()
+
+            window = fit_to_token_budget(
+                [self._context_entry(message) for message in tail], token_budget
+            )
+
+            first_in_window = tail[len(tail) - len(window)].id if window else None
+            if (include_summary and conversation.summary and first_in_window is not None
+                    and (conversation.summary_through_message_id or 0) < first_in_window):
+                window.insert(0, {
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation: {conversation.summary}",
+                    "agent_name": None,
+                    "tools_used": None,
+                    "created_at": None
                 })
-            
-            logger.info(f"Retrieved context with {len(context)} messages for conversation {conversation_id}")
-            return context
+
+            logger.info(f"Retrieved context with {len(window)} messages for conversation {conversation_id}")
+            return window
             
         except Exception as e:
             logger.error(f"Error getting conversation context: {e}")
             raise
 
+    def _context_entry(self, message: ConversationMessage) -> Dict[str, Any]:
+        return {
+            "role": message.role,
+            "content": message.content,
+            "agent_name": message.agent_name,
+            "tools_used": message.tools_used,
+            "created_at": message.created_at.isoformat()
+        }
+
+    def update_rolling_summary(
+        self,
+        conversation_id: int,
+        user_id: int,
+        summarize: Callable[[Optional[str], List[Dict[str, Any]]], str],
+        keep_recent: int = 10,
+        fold_after: Optional[int] = None
+    ) -> Optional[Conversation]:
+        """
+        Fold messages older than the last `keep_recent` into the conversation's
+        rolling summary.
+
+        `summarize(previous_summary, messages)` returns the new summary text;
+        it only receives messages not yet covered by the previous summary.
+        With `fold_after`, nothing is folded until more than that many
+        messages are uncovered, so the summarizer runs once per batch rather
+        than on every turn. Writing the summary leaves `updated_at` alone.
+        """
+        try:
+            conversation = self.get_conversation(conversation_id, user_id)
+            if not conversation:
+                return None
+
+            if fold_after is not None:
+                uncovered = self.db.query(func.count(ConversationMessage.id)).filter(
+                    ConversationMessage.conversation_id == conversation_id,
+                    ConversationMessage.id > (conversation.summary_through_message_id or 0)
+                ).scalar()
+                if uncovered <= fold_after:
+                    return conversation
+
+            # Id of the oldest message that stays verbatim in the context window
+            boundary = self.db.query(ConversationMessage.id).filter(
+                ConversationMessage.conversation_id == conversation_id
+            ).order_by(
+                desc(ConversationMessage.created_at), desc(ConversationMessage.id)
+            ).offset(keep_recent - 1).limit(1).scalar()
+            if boundary is None:
+                return conversation
+
+            pending = self.db.query(ConversationMessage).filter(
+                ConversationMessage.conversation_id == conversation_id,
+                ConversationMessage.id < boundary,
+                ConversationMessage.id > (conversation.summary_through_message_id or 0)
+            ).order_by(ConversationMessage.created_at, ConversationMessage.id).all()
+            if not pending:
+                return conversation
+
+            summary = summarize(
+                conversation.summary, [self._context_entry(message) for message in pending]
+            )
+            # Assign updated_at explicitly so its onupdate does not fire: a
+            # background summary must not reorder the conversation list
+            self.db.query(Conversation).filter(Conversation.id == conversation_id).update({
+                Conversation.summary: summary,
+                Conversation.summary_through_message_id: pending[-1].id,
+                Conversation.updated_at: Conversation.updated_at
+            }, synchronize_session=False)
+            self.db.commit()
+            self.db.refresh(conversation)
+
+            logger.info(f"Folded {len(pending)} messages into the summary of conversation {conversation_id}")
+            return conversation
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error updating conversation summary: {e}")
+            raise
+
     def get_conversation_summary(self, conversation_id: int, user_id: int) -> Dict[str, Any]:
         """Get a summary of the conversation (message count, participants, etc.)"""
         try:
@@ -232,29 +466,8 @@ class ConversationService:
             if not conversation:
                 return {}
 
-            message_count = self.db.query(ConversationMessage).filter(
-                ConversationMessage.conversation_id == conversation_id
-            ).count()
-            
-            # Get unique agents that participated
-            agents = self.db.query(ConversationMessage.agent_name).filter(
-                and_(
-                    ConversationMessage.conversation_id == conversation_id,
-                    ConversationMessage.agent_name.isnot(None)
-                )
-            ).distinct().all()
-            
-            agent_names = [agent[0] for agent in agents if agent[0]]
-            
-            summary = {
-                "id": conversation.id,
-                "title": conversation.title,
-                "created_at": conversation.created_at.isoformat(),
-                "updated_at": conversation.updated_at.isoformat(),
-                "is_active": conversation.is_active,
-                "message_count": message_count,
-                "participating_agents": agent_names
-            }
+            stats = self.get_conversation_stats([conversation_id])
+            summary = self._summarize(conversation, stats.get(conversation_id))
             
             logger.info(f"Generated summary for conversation {conversation_id}")
             return summary
@@ -262,3 +475,19 @@ class ConversationService:
         except Exception as e:
             logger.error(f"Error getting conversation summary: {e}")
             raise
+
+
+def encode_conversation_cursor(updated_at: datetime, conversation_id: int) -> str:
+    """Opaque keyset cursor for list_conversations_with_stats"""
+    raw = f"{updated_at.isoformat()}|{conversation_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_conversation_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_conversation_cursor; raises ValueError on malformed input"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, conversation_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(updated_at), int(conversation_id)
+    except Exception as e:
+        raise ValueError(f"Invalid conversation cursor: {cursor}") from e
@@ -0,0 +1,265 @@
+"""
+Daily cost time series for a user's COGS, fixed costs and labour.
+
+Each cost record is spread over the days it covers in one dense NumPy array
+per component: a week of COGS over its 7 days, a month's fixed cost over
+the days of that month, and active employees' pay evenly over every day.
+Rent and utilities recur, so a month's amount carries forward until a newer
+month is recorded; other fixed cost types only count in their own month.
+
+Prefix sums over the arrays make any range total O(1), so day, week and
+month bucketing are all a handful of subtractions. Series are cached per
+user until one of their cost records changes.
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import models
+from .cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+COMPONENTS = ("cogs", "rent", "utilities", "other_fixed", "labor")
+RECURRING_COST_TYPES = ("rent", "utilities")
+HISTORY_DAYS = 731  # Series always cover at least the last two years
+SERIES_CACHE_TTL = 3600
+
+DateLike = Union[date, datetime]
+
+
+def _as_date(value: DateLike) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+class CostSeries:
+    """Dense daily cost arrays for one user, with prefix sums for range totals"""
+
+    def __init__(self, start: date, daily: Dict[str, np.ndarray]):
+        self.start = start
+        self.days = len(next(iter(daily.values())))
+        self.end = start + timedelta(days=self.days - 1)
+        self._daily = daily
+        self._prefix = {
+            name: np.concatenate(([0.0], np.cumsum(values)))
+            for name, values in daily.items()
+        }
+
+    def _components(self, components: Optional[Union[str, Sequence[str]]]) -> Sequence[str]:
+        if components is None:
+            return COMPONENTS
+        return (components,) if isinstance(components, str) else components
+
+    def _offsets(self, start: DateLike, end: DateLike) -> Tuple[int, int]:
+        """Array offsets [lo, hi) of an inclusive date range, clamped to the series"""
+        lo = (_as_date(start) - self.start).days
+        hi = (_as_date(end) - self.start).days + 1
+        return min(max(lo, 0), self.days), min(max(hi, 0), self.days)
+
+    def total(self, start: DateLike, end: DateLike,
+              components: Optional[Union[str, Sequence[str]]] = None) -> float:
+        """Total cost from start to end inclusive (days outside the series count as zero)"""
+        lo, hi = self._offsets(start, end)
+        if hi <= lo:
+            return 0.0
+        return float(sum(self._prefix[name][hi] - self._prefix[name][lo] for name in self._components(components)))
+
+    def daily(self, start: DateLike, end: DateLike,
+              components: Optional[Union[str, Sequence[str]]] = None) -> np.ndarray:
+        """Cost of every day from start to end inclusive"""
+        start, end = _as_date(start), _as_date(end)
+        result = np.zeros(max((end - start).days + 1, 0))
+        lo, hi = self._offsets(start, end)
+        if hi > lo:
+            shift = (self.start - start).days
+            for name in self._components(components):
+                result[lo + shift:hi + shift] += self._daily[name][lo:hi]
+        return result
+
+    def bucket_totals(self, start: DateLike, end: DateLike, freq: str = "month",
+                      components: Optional[Union[str, Sequence[str]]] = None) -> List[Tuple[date, float]]:
+        """
+        Totals per day, week (Monday start) or month between start and end
+        inclusive, keyed by the bucket start. Partial buckets at either end
+        only count the days inside the range.
+        """
+        start, end = _as_date(start), _as_date(end)
+        if end < start:
+            return []
+        days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+        if freq == "day":
+            keys = days
+        elif freq == "week":
+            # 1970-01-01 was a Thursday: shift so weeks start on Monday
+            keys = days - ((days.astype(np.int64) + 3) % 7)
+        elif freq == "month":
+            keys = days.astype("datetime64[M]").astype("datetime64[D]")
+        else:
+            raise ValueError(f"Unknown bucket frequency: {freq}")
+
+        # First day of each bucket inside the range, and the day after its last
+        firsts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        lasts = np.r_[firsts[1:], len(days)]
+        base = (start - self.start).days
+        lo = np.clip(firsts + base, 0, self.days)
+        hi = np.clip(lasts + base, 0, self.days)
+
+        totals = np.zeros(len(firsts))
+        for name in self._components(components):
+            totals += self._prefix[name][hi] - self._prefix[name][lo]
+        return [(key.astype(date), float(total)) for key, total in zip(keys[firsts], totals)]
+
+
+class CostService:
+    """Builds and caches a user's CostSeries"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_series(self, user_id: int, use_cache: bool = True) -> CostSeries:
+        """A user's daily cost series, rebuilt only when their cost records change"""
+        try:
+            version = (date.today(),) + self._data_version(user_id)
+            cache_key = cache_service.get_cost_series_key(user_id)
+            if use_cache:
+                cached = cache_service.get(cache_key)
+                if cached and cached["version"] == version:
+                    return cached["series"]
+
+            series = self._build_series(user_id)
+            cache_service.set(cache_key, {"version": version, "series": series}, ttl=SERIES_CACHE_TTL)
+            return series
+        except Exception as e:
+            logger.error(f"Error building cost series for user {user_id}: {e}")
+            raise
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop the cached series for a user"""
+        cache_service.invalidate_pattern(cache_service.get_cost_series_key(user_id))
+
+    def fixed_costs_per_item(self, user_id: int, days: int = 30) -> Dict[str, Any]:
+        """
+        Trailing rent, utilities and labour spread over the items sold in the
+        same window (the fixed cost share used for recipe net margins).
+        """
+        end = datetime.now()
+        start = end - timedelta(days=days)
+        total_fixed = self.get_series(user_id).total(
+            end.date() - timedelta(days=days - 1), end.date(), ("rent", "utilities", "labor")
+        )
+        total_items_sold = self.db.query(func.sum(models.OrderItem.quantity)).join(models.Order).filter(
+            models.Order.user_id == user_id,
+            models.Order.order_date >= start,
+            models.Order.order_date <= end
+        ).scalar() or 0
+
+        if total_fixed > 0 and total_items_sold > 0:
+            fixed_cost_per_item = total_fixed / total_items_sold
+        else:
+            fixed_cost_per_item = 0
+
+        return {
+            'fixed_cost_per_item': fixed_cost_per_item,
+            'total_monthly_fixed_costs': total_fixed,
+            'total_items_sold': total_items_sold
+        }
+
+    def _data_version(self, user_id: int) -> Tuple:
+        """
+        Cheap fingerprint of a user's cost records: counts catch deletes, max
+        ids catch inserts and max updated_at catches edits.
+        """
+        columns = []
+        for model in (models.COGS, models.FixedCost, models.Employee):
+            for aggregate in (func.count(model.id), func.max(model.id),
+                              func.max(func.coalesce(model.updated_at, model.created_at))):
+                columns.append(select(aggregate).where(model.user_id == user_id).scalar_subquery())
+        row = self.db.execute(select(*columns)).one()
+        return tuple(str(value) if isinstance(value, datetime) else value for value in row)
+
+    def _build_series(self, user_id: int) -> CostSeries:
+        cogs_rows = self.db.query(models.COGS.week_start_date, models.COGS.amount).filter(
+            models.COGS.user_id == user_id,
+            models.COGS.week_start_date.isnot(None),
+            models.COGS.amount.isnot(None)
+        ).all()
+        fixed_rows = self.db.query(
+            models.FixedCost.cost_type, models.FixedCost.year, models.FixedCost.month, models.FixedCost.amount
+        ).filter(
+            models.FixedCost.user_id == user_id,
+            models.FixedCost.year.isnot(None),
+            models.FixedCost.month.between(1, 12),
+            models.FixedCost.amount.isnot(None)
+        ).order_by(models.FixedCost.id).all()
+        employees = self.db.query(
+            models.Employee.pay_type, models.Employee.salary,
+            models.Employee.hourly_rate, models.Employee.weekly_hours
+        ).filter(
+            models.Employee.user_id == user_id,
+            models.Employee.active == True
+        ).all()
+
+        # Span: every recorded cost plus at least the last HISTORY_DAYS up to today
+        today = date.today()
+        week_starts = np.array([_as_date(row.week_start_date) for row in cogs_rows], dtype="datetime64[D]")
+        fixed_months = np.array([f"{row.year:04d}-{row.month:02d}" for row in fixed_rows], dtype="datetime64[M]")
+        bounds = [np.datetime64(today - timedelta(days=HISTORY_DAYS), "D"), np.datetime64(today, "D")]
+        if len(week_starts):
+            bounds += [week_starts.min(), week_starts.max() + 6]
+        if len(fixed_months):
+            bounds += [fixed_months.min().astype("datetime64[D]"),
+                       (fixed_months.max() + 1).astype("datetime64[D]") - 1]
+        start, end = min(bounds), max(bounds)
+        days = np.arange(start, end + 1)
+        n_days = len(days)
+
+        daily = {name: np.zeros(n_days) for name in COMPONENTS}
+
+        # COGS: each week's amount over its 7 days
+        if len(week_starts):
+            offsets = ((week_starts - start).astype(np.int64)[:, None] + np.arange(7)).ravel()
+            amounts = np.repeat(np.array([float(row.amount) for row in cogs_rows]) / 7, 7)
+            np.add.at(daily["cogs"], offsets, amounts)
+
+        # Fixed costs: monthly amounts over the days of each month
+        day_months = days.astype("datetime64[M]")
+        first_month = day_months[0]
+        month_index = (day_months - first_month).astype(np.int64)
+        month_days = ((day_months + 1).astype("datetime64[D]") - day_months.astype("datetime64[D]")).astype(np.int64)
+        n_months = int(month_index[-1]) + 1
+        fixed_by_component = {"rent": [], "utilities": [], "other_fixed": []}
+        for month, row in zip(fixed_months, fixed_rows):
+            cost_type = (row.cost_type or "").lower()
+            component = cost_type if cost_type in RECURRING_COST_TYPES else "other_fixed"
+            fixed_by_component[component].append((int((month - first_month).astype(np.int64)), float(row.amount)))
+        for component, entries in fixed_by_component.items():
+            if not entries:
+                continue
+            monthly = np.zeros(n_months)
+            if component in RECURRING_COST_TYPES:
+                # The latest entry for a month wins and carries forward to later months
+                recorded = np.full(n_months, -1)
+                for index, amount in entries:
+                    monthly[index] = amount
+                    recorded[index] = index
+                last = np.maximum.accumulate(recorded)
+                monthly = np.where(last >= 0, monthly[np.maximum(last, 0)], 0.0)
+            else:
+                for index, amount in entries:
+                    monthly[index] += amount
+            daily[component] = monthly[month_index] / month_days
+
+        # Labour: active employees' pay spread evenly over every day
+        labor_per_day = 0.0
+        for employee in employees:
+            if employee.pay_type == 'salary' and employee.salary:
+                labor_per_day += employee.salary / 365
+            elif employee.pay_type == 'hourly' and employee.hourly_rate and employee.weekly_hours:
+                labor_per_day += employee.hourly_rate * employee.weekly_hours / 7
+        daily["labor"][:] = labor_per_day
+
+        return CostSeries(start.astype(date), daily)
@@ -4,11 +4,13 @@ Dashboard service for handling dashboard data operations
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text, or_, and_
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import Optional, Any
 import models
 import traceback
 import logging
+from .analytics_service import AnalyticsService
 from .cache_service import cache_service
+from .cost_service import CostService
 
 logger = logging.getLogger(__name__)
 
@@ -117,14 +119,10 @@ class DashboardService:
                 
                 monthly_results = query.all()
                 
-                # Get COGS data for the period
-                cogs_data = self.db.query(models.COGS).filter(
-                    models.COGS.user_id == user_id,
-                    models.COGS.week_start_date >= start_date_obj.date() - timedelta(days=7),
-                    models.COGS.week_start_date <= end_date_obj.date()
-                ).all()
-                
-                daily_cogs = self._convert_weekly_cogs_to_daily(cogs_data)
+                # COGS per calendar month of the period
+                monthly_cogs = dict(CostService(self.db).get_series(user_id).bucket_totals(
+                    start_date_obj, end_date_obj, "month", "cogs"
+                ))
                 
                 # Process monthly data
                 sales_data = []
@@ -143,11 +141,7 @@ class DashboardService:
                     monthly_revenue = float(row.revenue or 0)
                     monthly_order_count = row.order_count or 0
                     
-                    # Calculate monthly COGS
-                    monthly_cogs_amount = 0
-                    for date, cogs_amount in daily_cogs.items():
-                        if date.year == month_date.year and date.month == month_date.month:
-                            monthly_cogs_amount += cogs_amount
+                    monthly_cogs_amount = monthly_cogs.get(month_date.date(), 0)
                     
                     # Calculate profit margin
                     profit_margin = None
@@ -181,14 +175,10 @@ class DashboardService:
                 
                 daily_results = query.all()
                 
-                # Get COGS data
-                cogs_data = self.db.query(models.COGS).filter(
-                    models.COGS.user_id == user_id,
-                    models.COGS.week_start_date >= start_date_obj.date() - timedelta(days=7),
-                    models.COGS.week_start_date <= end_date_obj.date()
-                ).all()
-                
-                daily_cogs = self._convert_weekly_cogs_to_daily(cogs_data)
+                # COGS for each day of the period
+                daily_cogs = CostService(self.db).get_series(user_id).daily(
+                    start_date_obj, end_date_obj, "cogs"
+                ).tolist()
                 
                 # Create a map of actual sales data
                 sales_map = {}
@@ -206,7 +196,7 @@ class DashboardService:
                 total_orders = 0
                 
                 current_date = start_date_obj.date()
-                while current_date <= end_date_obj.date():
+                for daily_cogs_amount in daily_cogs:
                     row = sales_map.get(current_date)
                     
                     if row:
@@ -216,9 +206,6 @@ class DashboardService:
                         daily_revenue = 0
                         daily_order_count = 0
                     
-                    # Get COGS for this date
-                    daily_cogs_amount = daily_cogs.get(current_date, 0)
-                    
                     # Calculate profit margin
                     profit_margin = None
                     if daily_revenue > 0 and daily_cogs_amount > 0:
@@ -366,67 +353,18 @@ class DashboardService:
             logger.error(traceback.format_exc())
             raise
 
-    def _convert_weekly_cogs_to_daily(self, cogs_data: List[models.COGS]) -> Dict[datetime.date, float]:
-        """
-        Convert weekly COGS data to daily values by distributing each week's costs evenly across days
-        """
-        daily_cogs = {}
-        
-        for cogs in cogs_data:
-            if cogs.week_start_date and cogs.amount:
-                # Distribute the weekly amount across 7 days
-                daily_amount = float(cogs.amount) / 7
-                
-                # Add to each day of the week
-                for i in range(7):
-                    date = cogs.week_start_date + timedelta(days=i)
-                    daily_cogs[date] = daily_amount
-        
-        return daily_cogs
-
     def get_dashboard_summary(self, user_id: int):
         """Get summary statistics for dashboard"""
         try:
-            # Get basic counts
-            total_items = self.db.query(models.Item).filter(models.Item.user_id == user_id).count()
-            total_orders = self.db.query(models.Order).filter(models.Order.user_id == user_id).count()
-            
-            # Get revenue for last 30 days
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            recent_orders = self.db.query(models.Order).filter(
-                models.Order.user_id == user_id,
-                models.Order.order_date >= thirty_days_ago
-            ).all()
-            
-            total_revenue = sum(order.total_amount or 0 for order in recent_orders)
-            avg_order_value = total_revenue / len(recent_orders) if recent_orders else 0
-            
-            # Get top selling item
-            top_item_query = self.db.query(
-                models.Item.name,
-                func.sum(models.OrderItem.quantity).label('total_sold')
-            ).join(
-                models.OrderItem, models.Item.id == models.OrderItem.item_id
-            ).join(
-                models.Order, models.OrderItem.order_id == models.Order.id
-            ).filter(
-                models.Item.user_id == user_id,
-                models.Order.order_date >= thirty_days_ago
-            ).group_by(
-                models.Item.id, models.Item.name
-            ).order_by(
-                func.sum(models.OrderItem.quantity).desc()
-            ).first()
-            
-            top_item = top_item_query.name if top_item_query else "No sales data"
+            kpis = AnalyticsService(self.db).get_kpi_summary(user_id, days=30)
             
             return {
-                "total_items": total_items,
-                "total_orders": total_orders,
-                "total_revenue_30d": round(total_revenue, 2),
-                "avg_order_value": round(avg_order_value, 2),
-                "top_selling_item": top_item,
-                "recent_orders_count": len(recent_orders)
+                "total_items": kpis["total_items"],
+                "total_orders": kpis["total_orders"],
+                "total_revenue_30d": round(kpis["total_revenue"], 2),
+                "avg_order_value": round(kpis["avg_order_value"], 2),
+                "top_selling_item": kpis["top_selling_item"] or "No sales data",
+                "recent_orders_count": kpis["recent_orders_count"]
             }
             
         except Exception as e:
@@ -0,0 +1,273 @@
+"""
+Fleet scheduler - fans the daily pricing analysis out across all tenants.
+
+Instead of one process looping over every active user, the scheduler:
+
+1. Fingerprints each tenant's data (orders, items, competitor items) with a
+   few grouped queries and skips tenants whose fingerprint matches their
+   last successful run.
+2. Shards the remaining tenants into waves by user id, so a tenant runs at
+   the same time every day, and staggers the waves with a countdown.
+3. Dispatches each wave as a chord of per-tenant tasks on the "agents"
+   queue (prioritised by subscription tier) whose callback writes a
+   FleetWaveReport.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+import uuid
+import models
+import logging
+
+from config.celery_config import PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+
+logger = logging.getLogger(__name__)
+
+JOB_DAILY_PRICING = "daily_pricing"
+
+# A tenant queued or running for less than this is not dispatched again
+IN_FLIGHT_HOURS = 12
+
+TIER_PRIORITY = {
+    "premium": PRIORITY_HIGH,
+    "basic": PRIORITY_NORMAL,
+}
+
+
+class FleetSchedulerService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def data_fingerprints(self, user_ids: Optional[List[int]] = None) -> Dict[int, str]:
+        """
+        Per-tenant data version: row counts and newest ids of orders, items
+        and competitor items, plus the newest item edit. Any new, deleted or
+        edited row changes it.
+        """
+        def scoped(query, column):
+            return query.where(column.in_(user_ids)) if user_ids is not None else query
+
+        orders = scoped(select(
+            models.Order.user_id, func.count(models.Order.id), func.max(models.Order.id)
+        ), models.Order.user_id).group_by(models.Order.user_id)
+        items = scoped(select(
+            models.Item.user_id, func.count(models.Item.id), func.max(models.Item.id), func.max(models.Item.updated_at)
+        ), models.Item.user_id).group_by(models.Item.user_id)
+        competitor_items = scoped(select(
+            models.CompetitorEntity.user_id, func.count(models.CompetitorItem.id), func.max(models.CompetitorItem.id)
+        ).join(
+            models.CompetitorItem, models.CompetitorItem.competitor_id == models.CompetitorEntity.id
+        ), models.CompetitorEntity.user_id).group_by(models.CompetitorEntity.user_id)
+
+        parts: Dict[int, Dict[str, str]] = {}
+        for name, query in (("orders", orders), ("items", items), ("competitors", competitor_items)):
+            for user_id, *values in self.db.execute(query):
+                parts.setdefault(user_id, {})[name] = ":".join("" if v is None else str(v) for v in values)
+
+        return {
+            user_id: "|".join(f"{name}={values.get(name, '')}" for name in ("orders", "items", "competitors"))
+            for user_id, values in parts.items()
+        }
+
+    def plan(
+        self,
+        job: str = JOB_DAILY_PRICING,
+        wave_count: int = 4,
+        wave_spacing_minutes: int = 20,
+        force: bool = False,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Decide which active tenants run and in which wave. Tenants whose data
+        is unchanged since their last successful run are skipped unless
+        `force` is set.
+        """
+        if wave_count < 1:
+            raise ValueError("wave_count must be at least 1")
+
+        now = now or datetime.now()
+        users = self.db.execute(
+            select(models.User.id, models.User.subscription_tier).where(models.User.is_active == True)
+        ).all()
+        fingerprints = self.data_fingerprints()
+        last_runs = {
+            run.user_id: run for run in self.db.query(models.TenantJobRun).filter(models.TenantJobRun.job == job)
+        }
+
+        waves = [{
+            "wave": n,
+            "scheduled_for": (now + timedelta(minutes=n * wave_spacing_minutes)).isoformat(),
+            "countdown": n * wave_spacing_minutes * 60,
+            "tenants": [],
+            "skipped": [],
+        } for n in range(wave_count)]
+
+        for user_id, tier in users:
+            wave = waves[user_id % wave_count]
+            fingerprint = fingerprints.get(user_id, "")
+            last_run = last_runs.get(user_id)
+            if last_run and self._in_flight(last_run, now):
+                # Already queued or running from an earlier dispatch today
+                wave["skipped"].append(user_id)
+                continue
+            if not force and last_run and last_run.status == "success" and last_run.data_fingerprint == fingerprint:
+                wave["skipped"].append(user_id)
+                continue
+            wave["tenants"].append({
+                "user_id": user_id,
+                "priority": TIER_PRIORITY.get(tier or "free", PRIORITY_LOW),
+                "fingerprint": fingerprint,
+            })
+
+        for wave in waves:
+            wave["tenants"].sort(key=lambda tenant: (tenant["priority"], tenant["user_id"]))
+
+        return {
+            "fleet_run_id": f"{job}-{now.strftime('%Y%m%d%H%M')}-{uuid.uuid4().hex[:6]}",
+            "job": job,
+            "planned_at": now.isoformat(),
+            "waves": waves,
+            "tenants": sum(len(wave["tenants"]) for wave in waves),
+            "skipped": sum(len(wave["skipped"]) for wave in waves),
+        }
+
+    @staticmethod
+    def _in_flight(run: models.TenantJobRun, now: datetime) -> bool:
+        if run.status not in ("queued", "running") or run.queued_at is None:
+            return False
+        queued_at = run.queued_at.replace(tzinfo=None) if run.queued_at.tzinfo else run.queued_at
+        return now - queued_at < timedelta(hours=IN_FLIGHT_HOURS)
+
+    def dispatch(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Mark planned tenants as queued, then send one chord per wave: the
+        tenant tasks run on the agents queue after the wave's countdown and
+        the callback writes the wave report. Waves with no tenants to run get
+        their (all-skipped) report immediately.
+        """
+        from celery import chord
+        from tasks import run_tenant_pricing_task, fleet_wave_report_task
+
+        fleet_run_id, job = plan["fleet_run_id"], plan["job"]
+        try:
+            self._mark_queued(plan)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error queueing fleet run {fleet_run_id}: {e}")
+            raise
+
+        dispatched = []
+        for wave in plan["waves"]:
+            report_args = (fleet_run_id, job, wave["wave"], wave["scheduled_for"], wave["skipped"])
+            if not wave["tenants"]:
+                if wave["skipped"]:
+                    self.write_wave_report([], *report_args)
+                continue
+
+            header = [
+                run_tenant_pricing_task.s(tenant["user_id"], fleet_run_id, tenant["fingerprint"]).set(
+                    queue="agents", priority=tenant["priority"], countdown=wave["countdown"]
+                )
+                for tenant in wave["tenants"]
+            ]
+            chord(header)(fleet_wave_report_task.s(*report_args))
+            dispatched.append({"wave": wave["wave"], "tenants": len(wave["tenants"]), "countdown": wave["countdown"]})
+            logger.info(f"Fleet run {fleet_run_id}: wave {wave['wave']} with {len(wave['tenants'])} tenants "
+                        f"scheduled for {wave['scheduled_for']}")
+
+        return {
+            "fleet_run_id": fleet_run_id,
+            "job": job,
+            "tenants": plan["tenants"],
+            "skipped": plan["skipped"],
+            "waves": dispatched,
+        }
+
+    def _mark_queued(self, plan: Dict[str, Any]) -> None:
+        job = plan["job"]
+        runs = {
+            run.user_id: run for run in self.db.query(models.TenantJobRun).filter(models.TenantJobRun.job == job)
+        }
+        now = datetime.now()
+        for wave in plan["waves"]:
+            for tenant in wave["tenants"]:
+                run = runs.get(tenant["user_id"])
+                if run is None:
+                    run = models.TenantJobRun(user_id=tenant["user_id"], job=job)
+                    self.db.add(run)
+                run.fleet_run_id = plan["fleet_run_id"]
+                run.wave = wave["wave"]
+                run.status = "queued"
+                run.queued_at = now
+                run.error = None
+        self.db.commit()
+
+    def record_start(self, user_id: int, job: str = JOB_DAILY_PRICING) -> None:
+        self.db.query(models.TenantJobRun).filter(
+            models.TenantJobRun.user_id == user_id, models.TenantJobRun.job == job
+        ).update({"status": "running", "started_at": datetime.now()}, synchronize_session=False)
+        self.db.commit()
+
+    def record_result(
+        self,
+        user_id: int,
+        success: bool,
+        fingerprint: Optional[str],
+        duration_seconds: float,
+        error: Optional[str] = None,
+        job: str = JOB_DAILY_PRICING
+    ) -> None:
+        """Store the outcome; only a success remembers the fingerprint the run saw"""
+        values = {
+            "status": "success" if success else "failed",
+            "completed_at": datetime.now(),
+            "duration_seconds": duration_seconds,
+            "error": error,
+        }
+        if success:
+            values["data_fingerprint"] = fingerprint
+        self.db.query(models.TenantJobRun).filter(
+            models.TenantJobRun.user_id == user_id, models.TenantJobRun.job == job
+        ).update(values, synchronize_session=False)
+        self.db.commit()
+
+    def write_wave_report(
+        self,
+        results: List[Dict[str, Any]],
+        fleet_run_id: str,
+        job: str,
+        wave: int,
+        scheduled_for: Optional[str],
+        skipped: List[int]
+    ) -> models.FleetWaveReport:
+        """Summarise one wave's tenant results"""
+        try:
+            report = models.FleetWaveReport(
+                fleet_run_id=fleet_run_id,
+                job=job,
+                wave=wave,
+                scheduled_for=datetime.fromisoformat(scheduled_for) if scheduled_for else None,
+                completed_at=datetime.now(),
+                tenants=len(results),
+                succeeded=sum(1 for result in results if result.get("success")),
+                failed=sum(1 for result in results if not result.get("success")),
+                skipped=len(skipped),
+                total_duration_seconds=round(sum(result.get("duration_seconds") or 0 for result in results), 3),
+                details={"results": results, "skipped_user_ids": skipped},
+            )
+            self.db.add(report)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error writing wave report for {fleet_run_id} wave {wave}: {e}")
+            raise
+
+        logger.info(f"Fleet run {fleet_run_id} wave {wave}: {report.succeeded} succeeded, "
+                    f"{report.failed} failed, {report.skipped} skipped")
+        return report
+
+    def get_run_reports(self, fleet_run_id: str) -> List[models.FleetWaveReport]:
+        return self.db.query(models.FleetWaveReport).filter(
+            models.FleetWaveReport.fleet_run_id == fleet_run_id
+        ).order_by(models.FleetWaveReport.wave).all()
@@ -0,0 +1,426 @@
+"""
+Item revenue forecasting - vectorized exponential smoothing on daily series.
+
+All of a user's items are fitted at once: daily revenue is loaded into an
+(items x days) matrix with one grouped query, and additive damped
+Holt-Winters with weekly seasonality is run over it with NumPy, vectorized
+across items and across a grid of smoothing parameters. Each item keeps the
+method (Holt-Winters or seasonal naive) that scored the lower MAPE on a
+holdout backtest.
+
+Fitted parameters and the smoothing state after the last observed day are
+stored in item_forecast_models. New days are folded into the state with the
+stored parameters (no refit), and a full refit happens every
+REFIT_AFTER_DAYS. Forecasts computed from the state are cached in memory.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import product
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+import models
+import logging
+
+from .cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+SEASON = 7  # Weekly seasonality on daily data
+DAMPING = 0.98  # Trend damping so long horizons don't run away
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5)
+BETAS = (0.0, 0.01, 0.05, 0.1)
+GAMMAS = (0.05, 0.1, 0.2, 0.3)
+
+HISTORY_DAYS = 365  # Days of history used for a full fit
+MIN_HOLT_WINTERS_DAYS = 3 * SEASON  # Shorter histories use seasonal naive
+BACKTEST_DAYS = 28
+REFIT_AFTER_DAYS = 7
+FORECAST_HORIZON_DAYS = 130  # Covers the rest of this month and the next three
+FORECAST_CACHE_TTL = 3600
+
+
+@dataclass
+class FittedModels:
+    """Per-item parameters and state, as arrays over items"""
+    method: np.ndarray  # 'holt_winters' / 'seasonal_naive'
+    alpha: np.ndarray
+    beta: np.ndarray
+    gamma: np.ndarray
+    level: np.ndarray
+    trend: np.ndarray
+    seasonal: np.ndarray  # (items, 7) weekday offsets, Monday first
+    recent: np.ndarray  # (items, 7) last value seen per weekday
+    mape: np.ndarray  # Holdout MAPE (%) of the chosen method, nan if unknown
+
+
+def _initial_state(Y: np.ndarray, weekdays: np.ndarray, starts: np.ndarray):
+    """Level, trend and weekday offsets from the first two weeks after each item's first sale"""
+    N, T = Y.shape
+    rows = np.arange(N)[:, None]
+    window = np.minimum(starts[:, None] + np.arange(2 * SEASON), T - 1)
+    first = Y[rows, window]
+
+    level = first[:, :SEASON].mean(axis=1)
+    trend = (first[:, SEASON:].mean(axis=1) - level) / SEASON
+    trend = np.where(starts + 2 * SEASON <= T, trend, 0.0)
+
+    seasonal = np.zeros((N, SEASON))
+    np.put_along_axis(seasonal, weekdays[window[:, :SEASON]], first[:, :SEASON] - level[:, None], axis=1)
+    return level, trend, seasonal
+
+
+def _smooth(Y, weekdays, mask, alpha, beta, gamma, level, trend, seasonal, score_from=None):
+    """
+    Run additive damped Holt-Winters over Y (items x days). Parameters and
+    state broadcast against a leading grid axis, so one pass scores every
+    parameter combination for every item. Days where mask is False leave the
+    state untouched. Returns the final state and the one-step squared error
+    summed over days at or after score_from.
+    """
+    level, trend, seasonal = level.copy(), trend.copy(), seasonal.copy()
+    sse = np.zeros(np.broadcast(level, alpha).shape)
+    for t in range(Y.shape[1]):
+        y, observed, day = Y[:, t], mask[:, t], weekdays[t]
+        season = seasonal[..., day]
+        base = level + DAMPING * trend
+        if score_from is not None:
+            scored = observed & (t >= score_from)
+            sse += np.where(scored, (y - base - season) ** 2, 0.0)
+        new_level = alpha * (y - season) + (1 - alpha) * base
+        new_trend = beta * (new_level - level) + (1 - beta) * DAMPING * trend
+        seasonal[..., day] = np.where(observed, gamma * (y - new_level) + (1 - gamma) * season, season)
+        level = np.where(observed, new_level, level)
+        trend = np.where(observed, new_trend, trend)
+    return level, trend, seasonal, sse
+
+
+def _fit_holt_winters(Y: np.ndarray, weekdays: np.ndarray):
+    """Grid-search smoothing parameters per item; returns (params, state)"""
+    N, T = Y.shape
+    has_sales = (Y > 0).any(axis=1)
+    starts = np.where(has_sales, (Y > 0).argmax(axis=1), 0)
+    mask = np.arange(T)[None, :] >= starts[:, None]
+    level, trend, seasonal = _initial_state(Y, weekdays, starts)
+
+    grid = np.array(list(product(ALPHAS, BETAS, GAMMAS)))
+    alpha, beta, gamma = (grid[:, i][:, None] for i in range(3))
+    G = len(grid)
+    level_g, trend_g, seasonal_g, sse = _smooth(
+        Y, weekdays, mask, alpha, beta, gamma,
+        np.broadcast_to(level, (G, N)), np.broadcast_to(trend, (G, N)),
+        np.broadcast_to(seasonal, (G, N, SEASON)),
+        score_from=starts[None, :] + SEASON
+    )
+
+    best = sse.argmin(axis=0)
+    items = np.arange(N)
+    return (grid[best, 0], grid[best, 1], grid[best, 2]), \
+        (level_g[best, items], trend_g[best, items], seasonal_g[best, items])
+
+
+def _recent_by_weekday(Y: np.ndarray, weekdays: np.ndarray) -> np.ndarray:
+    recent = np.zeros((Y.shape[0], SEASON))
+    tail = slice(max(0, Y.shape[1] - SEASON), Y.shape[1])
+    recent[:, weekdays[tail]] = Y[:, tail]
+    return recent
+
+
+def _future_weekdays(last_date: date, horizon: int) -> np.ndarray:
+    return (last_date.weekday() + np.arange(1, horizon + 1)) % SEASON
+
+
+def forecast_models(fitted: FittedModels, last_date: date, horizon: int) -> np.ndarray:
+    """(items x horizon) daily forecasts starting the day after last_date"""
+    days = _future_weekdays(last_date, horizon)
+    damped = np.cumsum(DAMPING ** np.arange(1, horizon + 1))
+    holt_winters = fitted.level[:, None] + fitted.trend[:, None] * damped[None, :] + fitted.seasonal[:, days]
+    naive = fitted.recent[:, days]
+    forecast = np.where((fitted.method == "holt_winters")[:, None], holt_winters, naive)
+    return np.clip(forecast, 0.0, None)
+
+
+def mape(actual: np.ndarray, forecast: np.ndarray) -> np.ndarray:
+    """Per-item MAPE (%) over days with positive actuals; nan when there are none"""
+    positive = actual > 0
+    errors = np.where(positive, np.abs(actual - forecast) / np.where(positive, actual, 1.0), 0.0)
+    counts = positive.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, errors.sum(axis=1) / counts * 100, np.nan)
+
+
+def fit_series(Y: np.ndarray, dates: List[date], choose_method: bool = True) -> FittedModels:
+    """
+    Fit every row of Y (items x consecutive days ending at dates[-1]). With
+    choose_method, each item keeps the method with the lower holdout MAPE.
+    """
+    Y = np.asarray(Y, dtype=float)
+    N, T = Y.shape
+    weekdays = np.array([d.weekday() for d in dates])
+    method = np.full(N, "seasonal_naive", dtype=object)
+    nan = np.full(N, np.nan)
+    fitted = FittedModels(method, nan.copy(), nan.copy(), nan.copy(), np.zeros(N), np.zeros(N),
+                          np.zeros((N, SEASON)), _recent_by_weekday(Y, weekdays), nan.copy())
+    if T < MIN_HOLT_WINTERS_DAYS:
+        return fitted
+
+    (fitted.alpha, fitted.beta, fitted.gamma), (fitted.level, fitted.trend, fitted.seasonal) = \
+        _fit_holt_winters(Y, weekdays)
+    fitted.method = np.full(N, "holt_winters", dtype=object)
+
+    if choose_method:
+        report = backtest(Y, dates)
+        use_naive = report["seasonal_naive_mape"] < report["holt_winters_mape"]
+        fitted.method = np.where(use_naive, "seasonal_naive", "holt_winters").astype(object)
+        fitted.mape = np.where(use_naive, report["seasonal_naive_mape"], report["holt_winters_mape"])
+
+    # Items whose history is too short for Holt-Winters
+    active_days = T - np.where((Y > 0).any(axis=1), (Y > 0).argmax(axis=1), T)
+    fitted.method = np.where(active_days < MIN_HOLT_WINTERS_DAYS, "seasonal_naive", fitted.method).astype(object)
+    return fitted
+
+
+def update_models(fitted: FittedModels, Y_new: np.ndarray, new_dates: List[date]) -> FittedModels:
+    """Fold new consecutive days into the state with the stored parameters"""
+    Y_new = np.asarray(Y_new, dtype=float)
+    weekdays = np.array([d.weekday() for d in new_dates])
+    hw = fitted.method == "holt_winters"
+    mask = np.broadcast_to(hw[:, None], Y_new.shape)
+    level, trend, seasonal, _ = _smooth(
+        Y_new, weekdays, mask,
+        np.nan_to_num(fitted.alpha), np.nan_to_num(fitted.beta), np.nan_to_num(fitted.gamma),
+        fitted.level, fitted.trend, fitted.seasonal
+    )
+    recent = fitted.recent.copy()
+    tail = slice(max(0, len(new_dates) - SEASON), len(new_dates))
+    recent[:, weekdays[tail]] = Y_new[:, tail]
+    return FittedModels(fitted.method, fitted.alpha, fitted.beta, fitted.gamma,
+                        level, trend, seasonal, recent, fitted.mape)
+
+
+def backtest(Y: np.ndarray, dates: List[date], holdout: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Hold out the last `holdout` days, fit both methods on the rest and score
+    them. Returns per-item MAPE arrays and their means.
+    """
+    Y = np.asarray(Y, dtype=float)
+    T = Y.shape[1]
+    holdout = holdout or min(BACKTEST_DAYS, T // 4)
+    train, actual = Y[:, :T - holdout], Y[:, T - holdout:]
+
+    fitted = fit_series(train, dates[:T - holdout], choose_method=False)
+    fitted.method = np.full(Y.shape[0], "holt_winters", dtype=object)
+    holt_winters = forecast_models(fitted, dates[T - holdout - 1], holdout)
+    fitted.method = np.full(Y.shape[0], "seasonal_naive", dtype=object)
+    naive = forecast_models(fitted, dates[T - holdout - 1], holdout)
+
+    hw_mape, naive_mape = mape(actual, holt_winters), mape(actual, naive)
+    # Items with no positive actuals can't be scored; prefer Holt-Winters for them
+    naive_mape = np.where(np.isnan(naive_mape), np.inf, naive_mape)
+    hw_mape = np.where(np.isnan(hw_mape), np.inf, hw_mape)
+    best = np.minimum(hw_mape, naive_mape)
+
+    def mean(values):
+        finite = values[np.isfinite(values)]
+        return float(finite.mean()) if finite.size else None
+
+    return {
+        "holdout_days": holdout,
+        "items": int(Y.shape[0]),
+        "scored_items": int(np.isfinite(best).sum()),
+        "holt_winters_mape": hw_mape,
+        "seasonal_naive_mape": naive_mape,
+        "mean_holt_winters_mape": mean(hw_mape),
+        "mean_seasonal_naive_mape": mean(naive_mape),
+        "mean_selected_mape": mean(best),
+    }
+
+
+class ForecastService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_item_forecast(self, item_id: int, user_id: int,
+                          horizon: int = FORECAST_HORIZON_DAYS) -> Optional[Dict[str, Any]]:
+        """
+        Daily revenue forecast for one of a user's items, from the cache when
+        possible. Fits (or incrementally refreshes) the user's models on a
+        miss. Returns None if the user has no such item.
+        """
+        cache_key = cache_service.get_item_forecast_key(user_id, item_id)
+        cached = cache_service.get(cache_key)
+        if cached is not None and len(cached["values"]) >= horizon:
+            return cached
+
+        try:
+            item = self.db.query(models.Item.id).filter(
+                models.Item.id == item_id,
+                models.Item.user_id == user_id
+            ).first()
+            if not item:
+                return None
+
+            yesterday = date.today() - timedelta(days=1)
+            row = self._load_models([item_id]).get(item_id)
+            if row is None or row.last_observed_date < yesterday:
+                self.refresh_user_models(user_id, as_of=yesterday)
+                row = self._load_models([item_id]).get(item_id)
+            if row is None:
+                return None
+
+            fitted = self._to_arrays([row])
+            values = forecast_models(fitted, row.last_observed_date, max(horizon, FORECAST_HORIZON_DAYS))[0]
+            start = row.last_observed_date + timedelta(days=1)
+            result = {
+                "item_id": item_id,
+                "method": row.method,
+                "backtest_mape": row.backtest_mape,
+                "start_date": start.isoformat(),
+                "dates": [(start + timedelta(days=i)).isoformat() for i in range(len(values))],
+                "values": [round(float(v), 2) for v in values],
+            }
+            cache_service.set(cache_key, result, ttl=FORECAST_CACHE_TTL)
+            return result
+        except Exception as e:
+            logger.error(f"Error forecasting item {item_id}: {e}")
+            raise
+
+    def refresh_user_models(self, user_id: int, as_of: Optional[date] = None, full: bool = False) -> Dict[str, Any]:
+        """
+        Bring every item model of a user up to `as_of` (default yesterday):
+        new or stale items are refitted together, the rest are updated
+        incrementally with the days they haven't seen.
+        """
+        as_of = as_of or date.today() - timedelta(days=1)
+        try:
+            item_ids = [item_id for (item_id,) in self.db.query(models.Item.id).filter(models.Item.user_id == user_id)]
+            existing = self._load_models(item_ids)
+
+            refit, incremental = [], {}
+            for item_id in item_ids:
+                row = existing.get(item_id)
+                if full or row is None or (as_of - row.fitted_at.date()).days >= REFIT_AFTER_DAYS \
+                        or row.last_observed_date < as_of - timedelta(days=HISTORY_DAYS):
+                    refit.append(item_id)
+                elif row.last_observed_date < as_of:
+                    incremental.setdefault(row.last_observed_date, []).append(row)
+
+            now = datetime.utcnow()
+            if refit:
+                start = as_of - timedelta(days=HISTORY_DAYS - 1)
+                dates, Y = self._daily_revenue(user_id, refit, start, as_of)
+                fitted = fit_series(Y, dates)
+                for n, item_id in enumerate(refit):
+                    row = existing.get(item_id) or models.ItemForecastModel(item_id=item_id, user_id=user_id)
+                    self._store(row, fitted, n, as_of)
+                    row.history_days = len(dates)
+                    row.fitted_at = now
+                    self.db.add(row)
+
+            for last_observed, rows in incremental.items():
+                dates, Y = self._daily_revenue(user_id, [r.item_id for r in rows],
+                                               last_observed + timedelta(days=1), as_of)
+                fitted = update_models(self._to_arrays(rows), Y, dates)
+                for n, row in enumerate(rows):
+                    self._store(row, fitted, n, as_of)
+                    row.history_days = min((row.history_days or 0) + len(dates), HISTORY_DAYS)
+
+            self.db.commit()
+            for item_id in item_ids:
+                cache_service.invalidate_pattern(cache_service.get_item_forecast_key(user_id, item_id))
+
+            return {
+                "user_id": user_id,
+                "as_of": as_of.isoformat(),
+                "refitted": len(refit),
+                "updated": sum(len(rows) for rows in incremental.values()),
+            }
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error refreshing forecast models for user {user_id}: {e}")
+            raise
+
+    def refresh_all(self, as_of: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Refresh the models of every user with items"""
+        user_ids = [user_id for (user_id,) in self.db.query(models.Item.user_id).distinct()]
+        return [self.refresh_user_models(user_id, as_of=as_of) for user_id in user_ids]
+
+    def get_daily_revenue(self, item_id: int, user_id: int, start: date, end: date) -> Tuple[List[date], np.ndarray]:
+        """Daily revenue of one of a user's items (zeros included) between two dates, inclusive"""
+        dates, Y = self._daily_revenue(user_id, [item_id], start, end)
+        return dates, Y[0]
+
+    def backtest_user(self, user_id: int, days: int = HISTORY_DAYS, holdout: int = BACKTEST_DAYS) -> Dict[str, Any]:
+        """Backtest both methods on a user's items over the last `days` days"""
+        end = date.today() - timedelta(days=1)
+        item_ids = [item_id for (item_id,) in self.db.query(models.Item.id).filter(models.Item.user_id == user_id)]
+        dates, Y = self._daily_revenue(user_id, item_ids, end - timedelta(days=days - 1), end)
+        report = backtest(Y, dates, holdout)
+        report["item_ids"] = item_ids
+        return report
+
+    def _daily_revenue(self, user_id: Optional[int], item_ids: List[int], start: date, end: date) -> Tuple[List[date], np.ndarray]:
+        """(items x days) revenue matrix from one grouped query"""
+        dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        Y = np.zeros((len(item_ids), len(dates)))
+        if not item_ids or not dates:
+            return dates, Y
+
+        day = func.date(models.Order.order_date)
+        filters = [
+            models.OrderItem.item_id.in_(item_ids),
+            models.Order.order_date >= datetime.combine(start, datetime.min.time()),
+            models.Order.order_date < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+        ]
+        if user_id is not None:
+            filters.append(models.Order.user_id == user_id)
+
+        rows = self.db.query(
+            models.OrderItem.item_id,
+            day.label('day'),
+            func.sum(models.OrderItem.quantity * models.OrderItem.unit_price).label('revenue')
+        ).join(
+            models.Order, models.OrderItem.order_id == models.Order.id
+        ).filter(and_(*filters)).group_by(models.OrderItem.item_id, day).all()
+
+        positions = {item_id: n for n, item_id in enumerate(item_ids)}
+        for row in rows:
+            row_day = row.day if isinstance(row.day, date) else date.fromisoformat(str(row.day)[:10])
+            Y[positions[row.item_id], (row_day - start).days] = float(row.revenue or 0)
+        return dates, Y
+
+    def _load_models(self, item_ids: List[int]) -> Dict[int, models.ItemForecastModel]:
+        if not item_ids:
+            return {}
+        rows = self.db.query(models.ItemForecastModel).filter(models.ItemForecastModel.item_id.in_(item_ids)).all()
+        return {row.item_id: row for row in rows}
+
+    @staticmethod
+    def _to_arrays(rows: List[models.ItemForecastModel]) -> FittedModels:
+        def column(name):
+            return np.array([getattr(row, name) if getattr(row, name) is not None else np.nan for row in rows], dtype=float)
+
+        return FittedModels(
+            method=np.array([row.method for row in rows], dtype=object),
+            alpha=column("alpha"), beta=column("beta"), gamma=column("gamma"),
+            level=np.nan_to_num(column("level")), trend=np.nan_to_num(column("trend")),
+            seasonal=np.array([row.seasonal or [0.0] * SEASON for row in rows], dtype=float),
+            recent=np.array([row.recent or [0.0] * SEASON for row in rows], dtype=float),
+            mape=column("backtest_mape"),
+        )
+
+    @staticmethod
+    def _store(row: models.ItemForecastModel, fitted: FittedModels, n: int, as_of: date) -> None:
+        def scalar(values):
+            value = float(values[n])
+            return None if np.isnan(value) or np.isinf(value) else value
+
+        row.method = str(fitted.method[n])
+        row.alpha, row.beta, row.gamma = scalar(fitted.alpha), scalar(fitted.beta), scalar(fitted.gamma)
+        row.phi = DAMPING
+        row.level, row.trend = float(fitted.level[n]), float(fitted.trend[n])
+        row.seasonal = [float(v) for v in fitted.seasonal[n]]
+        row.recent = [float(v) for v in fitted.recent[n]]
+        row.backtest_mape = scalar(fitted.mape)
+        row.last_observed_date = as_of
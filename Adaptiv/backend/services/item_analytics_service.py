@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
+from sqlalchemy import func, and_, desc, case
 import models
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
@@ -16,134 +16,227 @@ class ItemAnalyticsService:
         Get comprehensive analytics for a specific item.
         """
         try:
-            # Get the item
-            item = self.db.query(models.Item).filter(
-                and_(
-                    models.Item.id == item_id,
-                    models.Item.user_id == user_id
-                )
-            ).first()
-            
-            if not item:
+            result = self.get_batch_item_analytics(user_id, item_ids=[item_id], days=days)
+            if not result['items']:
                 raise ValueError(f"Item {item_id} not found for user {user_id}")
+            return result['items'][0]
             
-            start_date = datetime.now() - timedelta(days=days)
-            
-            # Get sales data
-            sales_data = self._get_sales_analytics(item_id, user_id, start_date)
+        except Exception as e:
+            logger.error(f"Error getting item analytics for item {item_id}: {str(e)}")
+            raise
+    
+    def get_batch_item_analytics(
+        self,
+        user_id: int,
+        item_ids: Optional[List[int]] = None,
+        days: int = 30
+    ) -> Dict[str, Any]:
+        """
+        Get comprehensive analytics for several items at once (or the whole
+        menu when item_ids is None).
+        
+        The query count does not depend on the number of items: one query for
+        the items, one conditional-aggregation query for the current and
+        previous windows, one for the daily trend, and one IN query each for
+        price histories and competitor matches.
+        """
+        try:
+            query = self.db.query(models.Item).filter(models.Item.user_id == user_id)
+            if item_ids is not None:
+                if not item_ids:
+                    return {'items': [], 'missing_item_ids': [], 'period_days': days}
+                query = query.filter(models.Item.id.in_(item_ids))
+            items = query.order_by(models.Item.id).all()
+            ids = [item.id for item in items]
             
-            # Get price history
-            price_history = self._get_price_history_analytics(item_id, user_id, start_date)
+            now = datetime.now()
+            start_date = now - timedelta(days=days)
+            previous_start = start_date - timedelta(days=days)
             
-            # Get competitor data
-            competitor_data = self._get_competitor_analytics(item.name)
+            windows = self._get_window_metrics(ids, user_id, start_date, previous_start)
+            daily_trends = self._get_daily_trends(ids, user_id, start_date)
+            price_histories = self._get_price_histories(ids, user_id, start_date)
+            competitor_matches = self._get_competitor_matches(ids, user_id)
             
-            # Get performance metrics
-            performance_metrics = self._get_performance_metrics(item_id, user_id, start_date)
+            by_id = {}
+            for item in items:
+                window = windows.get(item.id, {})
+                by_id[item.id] = {
+                    'item': {
+                        'id': item.id,
+                        'name': item.name,
+                        'category': item.category,
+                        'current_price': float(item.current_price or 0),
+                        'cost': float(item.cost or 0)
+                    },
+                    'sales_analytics': {
+                        'total_quantity': window.get('quantity', 0),
+                        'total_revenue': window.get('revenue', 0.0),
+                        'total_orders': window.get('orders', 0),
+                        'average_price': window.get('avg_price', 0.0),
+                        'daily_trend': daily_trends.get(item.id, [])
+                    },
+                    'price_history': self._summarize_price_history(price_histories.get(item.id, [])),
+                    'competitor_analysis': self._summarize_competitors(competitor_matches.get(item.id, [])),
+                    'performance_metrics': self._performance_metrics(window),
+                    'period_days': days
+                }
             
+            # Keep the caller's order; the whole menu comes back by id
+            ordered_ids = [i for i in dict.fromkeys(item_ids) if i in by_id] if item_ids is not None else ids
             return {
-                'item': {
-                    'id': item.id,
-                    'name': item.name,
-                    'category': item.category,
-                    'current_price': float(item.current_price or 0),
-                    'cost': float(item.cost or 0)
-                },
-                'sales_analytics': sales_data,
-                'price_history': price_history,
-                'competitor_analysis': competitor_data,
-                'performance_metrics': performance_metrics,
+                'items': [by_id[i] for i in ordered_ids],
+                'missing_item_ids': [i for i in dict.fromkeys(item_ids or []) if i not in by_id],
                 'period_days': days
             }
             
         except Exception as e:
-            logger.error(f"Error getting item analytics for item {item_id}: {str(e)}")
+            logger.error(f"Error getting batch item analytics for user {user_id}: {str(e)}")
             raise
     
-    def _get_sales_analytics(self, item_id: int, user_id: int, start_date: datetime) -> Dict[str, Any]:
+    def _get_window_metrics(
+        self,
+        item_ids: List[int],
+        user_id: int,
+        start_date: datetime,
+        previous_start: datetime
+    ) -> Dict[int, Dict[str, Any]]:
         """
-        Get sales analytics for an item.
+        Current and previous window sales per item from one scan over the
+        two windows, split with conditional aggregation.
         """
-        # Get overall sales data
-        sales_summary = self.db.query(
-            func.sum(models.OrderItem.quantity).label('total_quantity'),
-            func.sum(models.OrderItem.quantity * models.OrderItem.unit_price).label('total_revenue'),
-            func.count(models.OrderItem.id).label('total_orders'),
-            func.avg(models.OrderItem.unit_price).label('avg_price')
+        if not item_ids:
+            return {}
+        
+        in_current = models.Order.order_date >= start_date
+        line_revenue = models.OrderItem.quantity * models.OrderItem.unit_price
+        
+        rows = self.db.query(
+            models.OrderItem.item_id,
+            func.sum(case((in_current, models.OrderItem.quantity), else_=0)).label('quantity'),
+            func.sum(case((in_current, line_revenue), else_=0)).label('revenue'),
+            func.count(case((in_current, models.OrderItem.id))).label('orders'),
+            func.avg(case((in_current, models.OrderItem.unit_price))).label('avg_price'),
+            func.sum(case((in_current, 0), else_=models.OrderItem.quantity)).label('previous_quantity'),
+            func.sum(case((in_current, 0), else_=line_revenue)).label('previous_revenue')
         ).join(
             models.Order, models.OrderItem.order_id == models.Order.id
         ).filter(
             and_(
-                models.OrderItem.item_id == item_id,
+                models.OrderItem.item_id.in_(item_ids),
                 models.Order.user_id == user_id,
-                models.Order.order_date >= start_date
+                models.Order.order_date >= previous_start
             )
-        ).first()
+        ).group_by(models.OrderItem.item_id).all()
+        
+        return {
+            row.item_id: {
+                'quantity': int(row.quantity or 0),
+                'revenue': float(row.revenue or 0),
+                'orders': int(row.orders or 0),
+                'avg_price': float(row.avg_price or 0),
+                'previous_quantity': int(row.previous_quantity or 0),
+                'previous_revenue': float(row.previous_revenue or 0)
+            }
+            for row in rows
+        }
+    
+    def _get_daily_trends(self, item_ids: List[int], user_id: int, start_date: datetime) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Daily quantity and revenue per item in the current window.
+        """
+        if not item_ids:
+            return {}
         
-        # Get daily sales trend
-        daily_sales = self.db.query(
-            func.date(models.Order.order_date).label('date'),
+        day = func.date(models.Order.order_date)
+        rows = self.db.query(
+            models.OrderItem.item_id,
+            day.label('date'),
             func.sum(models.OrderItem.quantity).label('quantity'),
             func.sum(models.OrderItem.quantity * models.OrderItem.unit_price).label('revenue')
         ).join(
             models.Order, models.OrderItem.order_id == models.Order.id
         ).filter(
             and_(
-                models.OrderItem.item_id == item_id,
+                models.OrderItem.item_id.in_(item_ids),
                 models.Order.user_id == user_id,
                 models.Order.order_date >= start_date
             )
-        ).group_by(func.date(models.Order.order_date)).order_by('date').all()
+        ).group_by(models.OrderItem.item_id, day).order_by(models.OrderItem.item_id, day).all()
         
-        return {
-            'total_quantity': int(sales_summary.total_quantity or 0),
-            'total_revenue': float(sales_summary.total_revenue or 0),
-            'total_orders': int(sales_summary.total_orders or 0),
-            'average_price': float(sales_summary.avg_price or 0),
-            'daily_trend': [
-                {
-                    'date': str(day.date),
-                    'quantity': int(day.quantity or 0),
-                    'revenue': float(day.revenue or 0)
-                }
-                for day in daily_sales
-            ]
-        }
+        trends: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            trends.setdefault(row.item_id, []).append({
+                'date': str(row.date),
+                'quantity': int(row.quantity or 0),
+                'revenue': float(row.revenue or 0)
+            })
+        return trends
     
-    def _get_price_history_analytics(self, item_id: int, user_id: int, start_date: datetime) -> Dict[str, Any]:
+    def _get_price_histories(self, item_ids: List[int], user_id: int, start_date: datetime) -> Dict[int, List[models.PriceHistory]]:
         """
-        Get price history analytics for an item.
+        Price changes in the window for all items, newest first.
         """
+        if not item_ids:
+            return {}
+        
         price_changes = self.db.query(models.PriceHistory).filter(
             and_(
-                models.PriceHistory.item_id == item_id,
+                models.PriceHistory.item_id.in_(item_ids),
                 models.PriceHistory.user_id == user_id,
                 models.PriceHistory.changed_at >= start_date
             )
         ).order_by(models.PriceHistory.changed_at.desc()).all()
         
+        histories: Dict[int, List[models.PriceHistory]] = {}
+        for change in price_changes:
+            histories.setdefault(change.item_id, []).append(change)
+        return histories
+    
+    def _get_competitor_matches(self, item_ids: List[int], user_id: int) -> Dict[int, List[models.CompetitorItem]]:
+        """
+        Competitor items whose name contains the item's name, for all items
+        in one join. Only the user's own competitors are considered.
+        """
+        if not item_ids:
+            return {}
+        
+        rows = self.db.query(
+            models.Item.id, models.CompetitorItem
+        ).join(
+            models.CompetitorItem,
+            models.CompetitorItem.item_name.ilike('%' + models.Item.name + '%')
+        ).join(
+            models.CompetitorEntity,
+            models.CompetitorItem.competitor_id == models.CompetitorEntity.id
+        ).filter(
+            and_(
+                models.Item.id.in_(item_ids),
+                models.CompetitorEntity.user_id == user_id
+            )
+        ).all()
+        
+        matches: Dict[int, List[models.CompetitorItem]] = {}
+        for item_id, competitor_item in rows:
+            matches.setdefault(item_id, []).append(competitor_item)
+        return matches
+    
+    def _summarize_price_history(self, price_changes: List[models.PriceHistory]) -> Dict[str, Any]:
         return {
             'total_changes': len(price_changes),
             'changes': [
                 {
                     'date': change.changed_at.isoformat(),
-                    'old_price': float(change.old_price or 0),
+                    'old_price': float(change.previous_price or 0),
                     'new_price': float(change.new_price or 0),
-                    'change_percent': ((float(change.new_price or 0) - float(change.old_price or 0)) / float(change.old_price or 1)) * 100,
-                    'reason': change.reason or 'Manual update'
+                    'change_percent': ((float(change.new_price or 0) - float(change.previous_price or 0)) / float(change.previous_price or 1)) * 100,
+                    'reason': change.change_reason or 'Manual update'
                 }
                 for change in price_changes
             ]
         }
     
-    def _get_competitor_analytics(self, item_name: str) -> Dict[str, Any]:
-        """
-        Get competitor analysis for an item.
-        """
-        competitors = self.db.query(models.CompetitorItem).filter(
-            models.CompetitorItem.item_name.ilike(f"%{item_name}%")
-        ).all()
-        
+    def _summarize_competitors(self, competitors: List[models.CompetitorItem]) -> Dict[str, Any]:
         if not competitors:
             return {
                 'competitors_found': 0,
@@ -163,55 +256,20 @@ class ItemAnalyticsService:
             },
             'competitors': [
                 {
-                    'source': comp.source or 'Unknown',
+                    'source': comp.competitor_name or 'Unknown',
                     'name': comp.item_name,
                     'price': float(comp.price or 0),
-                    'last_updated': comp.last_updated.isoformat() if comp.last_updated else None
+                    'last_updated': comp.sync_timestamp.isoformat() if comp.sync_timestamp else None
                 }
                 for comp in competitors
             ]
         }
     
-    def _get_performance_metrics(self, item_id: int, user_id: int, start_date: datetime) -> Dict[str, Any]:
-        """
-        Get performance metrics for an item.
-        """
-        # Get current period data
-        current_data = self.db.query(
-            func.sum(models.OrderItem.quantity).label('quantity'),
-            func.sum(models.OrderItem.quantity * models.OrderItem.unit_price).label('revenue')
-        ).join(
-            models.Order, models.OrderItem.order_id == models.Order.id
-        ).filter(
-            and_(
-                models.OrderItem.item_id == item_id,
-                models.Order.user_id == user_id,
-                models.Order.order_date >= start_date
-            )
-        ).first()
-        
-        # Get previous period data for comparison
-        period_length = (datetime.now() - start_date).days
-        previous_start = start_date - timedelta(days=period_length)
-        
-        previous_data = self.db.query(
-            func.sum(models.OrderItem.quantity).label('quantity'),
-            func.sum(models.OrderItem.quantity * models.OrderItem.unit_price).label('revenue')
-        ).join(
-            models.Order, models.OrderItem.order_id == models.Order.id
-        ).filter(
-            and_(
-                models.OrderItem.item_id == item_id,
-                models.Order.user_id == user_id,
-                models.Order.order_date >= previous_start,
-                models.Order.order_date < start_date
-            )
-        ).first()
-        
-        current_quantity = int(current_data.quantity or 0)
-        current_revenue = float(current_data.revenue or 0)
-        previous_quantity = int(previous_data.quantity or 0)
-        previous_revenue = float(previous_data.revenue or 0)
+    def _performance_metrics(self, window: Dict[str, Any]) -> Dict[str, Any]:
+        current_quantity = window.get('quantity', 0)
+        current_revenue = window.get('revenue', 0.0)
+        previous_quantity = window.get('previous_quantity', 0)
+        previous_revenue = window.get('previous_revenue', 0.0)
         
         # Calculate growth rates
         quantity_growth = ((current_quantity - previous_quantity) / previous_quantity * 100) if previous_quantity > 0 else 0
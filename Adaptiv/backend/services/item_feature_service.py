@@ -0,0 +1,328 @@
+"""
+Item feature service - maintains the per-item feature table used by the pricing strategy agent
+"""
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, case, and_, or_
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Any, Iterable
+import models
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rolling windows (days) used for sales velocity
+VELOCITY_WINDOWS = (7, 28, 90)
+
+# Feature rows older than this are recomputed even without new activity, so
+# the velocity windows keep sliding for items that stopped selling
+FEATURE_MAX_AGE = timedelta(days=1)
+
+
+class ItemFeatureService:
+    """
+    Service for refreshing and reading precomputed per-item pricing features.
+
+    Every refresh runs a fixed number of grouped queries for the user (sales
+    velocity, competitor prices, recommendation history) regardless of how many
+    items or orders they have, then upserts the item_features rows. By default
+    only items touched since their row was last refreshed are recomputed.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh_features(self, user_id: int, item_ids: Optional[Iterable[int]] = None,
+                         elasticities: Optional[Dict[int, Dict[str, Any]]] = None,
+                         now: Optional[datetime] = None, full: bool = False) -> int:
+        """
+        Recompute features for a user's items and upsert them.
+
+        Args:
+            user_id: Owner of the items
+            item_ids: Restrict the refresh to these items. If None, the items
+                changed since their last refresh (see _changed_item_ids) plus
+                those in `elasticities`.
+            elasticities: Optional item_id -> {"elasticity", "confidence"} from a market analysis.
+                Items without an entry keep their previously stored elasticity.
+            now: Reference time for the rolling windows
+            full: Recompute every item of the user when item_ids is None
+
+        Returns:
+            Number of feature rows written
+        """
+        now = now or datetime.utcnow()
+        item_ids = list(item_ids) if item_ids is not None else None
+        elasticities = elasticities or {}
+
+        if item_ids is None and not full:
+            item_ids = self._changed_item_ids(user_id, now) | set(elasticities)
+
+        item_query = self.db.query(models.Item.id).filter(models.Item.user_id == user_id)
+        if item_ids is not None:
+            if not item_ids:
+                return 0
+            item_query = item_query.filter(models.Item.id.in_(item_ids))
+        target_ids = [row.id for row in item_query]
+        if not target_ids:
+            return 0
+
+        velocity = self._load_velocity(user_id, target_ids, now)
+        competitor_stats = self._load_competitor_stats(user_id, target_ids)
+        recommendations = self._load_recommendation_history(user_id, target_ids)
+
+        existing = {
+            feature.item_id: feature
+            for feature in self.db.query(models.ItemFeature).filter(
+                models.ItemFeature.user_id == user_id,
+                models.ItemFeature.item_id.in_(target_ids)
+            )
+        }
+
+        for item_id in target_ids:
+            feature = existing.get(item_id)
+            if feature is None:
+                feature = models.ItemFeature(user_id=user_id, item_id=item_id)
+                self.db.add(feature)
+
+            sales = velocity.get(item_id, {})
+            feature.velocity_7d = sales.get('qty_7', 0.0) / 7
+            feature.velocity_28d = sales.get('qty_28', 0.0) / 28
+            feature.velocity_90d = sales.get('qty_90', 0.0) / 90
+            feature.revenue_28d = sales.get('revenue_28', 0.0)
+            feature.last_sold_at = sales.get('last_sold_at')
+
+            comp = competitor_stats.get(item_id)
+            feature.competitor_price_min = comp['min'] if comp else None
+            feature.competitor_price_avg = comp['avg'] if comp else None
+            feature.competitor_price_max = comp['max'] if comp else None
+            feature.competitor_count = comp['count'] if comp else 0
+
+            rec = recommendations.get(item_id)
+            feature.recommendation_count = rec['count'] if rec else 0
+            feature.last_recommendation_at = rec['recommendation_date'] if rec else None
+            feature.last_recommended_price = rec['recommended_price'] if rec else None
+            feature.last_implementation_status = rec['implementation_status'] if rec else None
+            feature.last_outcome_revenue_change = rec['actual_revenue_change'] if rec else None
+            feature.last_outcome_quantity_change = rec['actual_quantity_change'] if rec else None
+
+            elasticity = elasticities.get(item_id)
+            if elasticity and elasticity.get('elasticity') is not None:
+                feature.elasticity = float(elasticity['elasticity'])
+                feature.elasticity_confidence = elasticity.get('confidence')
+
+            feature.refreshed_at = now
+
+        self.db.commit()
+        logger.info(f"Refreshed {len(target_ids)} item features for user {user_id}")
+        return len(target_ids)
+
+    def _changed_item_ids(self, user_id: int, now: datetime) -> set:
+        """
+        Items whose features may differ from their stored row, in one query:
+        no row yet, a row older than FEATURE_MAX_AGE, or an item edit, order,
+        recommendation or same-named competitor price recorded after the row
+        was refreshed.
+        """
+        Item, ItemFeature = models.Item, models.ItemFeature
+        Order, OrderItem = models.Order, models.OrderItem
+        CompetitorItem, CompetitorEntity = models.CompetitorItem, models.CompetitorEntity
+        PricingRecommendation = models.PricingRecommendation
+
+        stale_rows = self.db.query(Item.id.label('item_id')).outerjoin(
+            ItemFeature, ItemFeature.item_id == Item.id
+        ).filter(
+            Item.user_id == user_id,
+            or_(
+                ItemFeature.id.is_(None),
+                ItemFeature.refreshed_at < now - FEATURE_MAX_AGE,
+                Item.updated_at > ItemFeature.refreshed_at
+            )
+        )
+
+        new_orders = self.db.query(OrderItem.item_id.label('item_id')).join(
+            Order, OrderItem.order_id == Order.id
+        ).join(
+            ItemFeature, ItemFeature.item_id == OrderItem.item_id
+        ).filter(
+            Order.user_id == user_id,
+            func.coalesce(Order.updated_at, Order.created_at) > ItemFeature.refreshed_at
+        )
+
+        new_recommendations = self.db.query(PricingRecommendation.item_id.label('item_id')).join(
+            ItemFeature, ItemFeature.item_id == PricingRecommendation.item_id
+        ).filter(
+            PricingRecommendation.user_id == user_id,
+            or_(
+                PricingRecommendation.created_at > ItemFeature.refreshed_at,
+                PricingRecommendation.outcome_measured_at > ItemFeature.refreshed_at
+            )
+        )
+
+        new_competitor_prices = self.db.query(Item.id.label('item_id')).join(
+            ItemFeature, ItemFeature.item_id == Item.id
+        ).join(
+            CompetitorItem, func.lower(CompetitorItem.item_name) == func.lower(Item.name)
+        ).join(
+            CompetitorEntity, CompetitorItem.competitor_id == CompetitorEntity.id
+        ).filter(
+            Item.user_id == user_id,
+            CompetitorEntity.user_id == user_id,
+            func.coalesce(CompetitorItem.updated_at, CompetitorItem.created_at) > ItemFeature.refreshed_at
+        )
+
+        rows = stale_rows.union(new_orders, new_recommendations, new_competitor_prices).all()
+        return {row[0] for row in rows}
+
+    def get_features(self, user_id: int) -> Dict[int, Dict[str, Any]]:
+        """Read all of a user's item features in one query, keyed by item_id"""
+        rows = self.db.query(models.ItemFeature).filter(
+            models.ItemFeature.user_id == user_id
+        ).all()
+        return {row.item_id: self._feature_to_dict(row) for row in rows}
+
+    def _load_velocity(self, user_id: int, item_ids: List[int], now: datetime) -> Dict[int, Dict[str, Any]]:
+        """Units sold per rolling window and 28-day revenue, one grouped query"""
+        OrderItem, Order = models.OrderItem, models.Order
+        window_starts = {days: now - timedelta(days=days) for days in VELOCITY_WINDOWS}
+
+        columns = [
+            func.coalesce(func.sum(case((Order.order_date >= start, OrderItem.quantity), else_=0)), 0).label(f'qty_{days}')
+            for days, start in window_starts.items()
+        ]
+        columns.append(func.coalesce(func.sum(case(
+            (Order.order_date >= window_starts[28], OrderItem.quantity * OrderItem.unit_price), else_=0.0
+        )), 0.0).label('revenue_28'))
+        columns.append(func.max(Order.order_date).label('last_sold_at'))
+
+        rows = self.db.query(OrderItem.item_id, *columns).join(
+            Order, OrderItem.order_id == Order.id
+        ).filter(
+            Order.user_id == user_id,
+            Order.order_date >= window_starts[max(VELOCITY_WINDOWS)],
+            Order.order_date <= now,
+            OrderItem.item_id.in_(item_ids)
+        ).group_by(OrderItem.item_id).all()
+
+        return {
+            row.item_id: {
+                **{f'qty_{days}': float(getattr(row, f'qty_{days}') or 0) for days in VELOCITY_WINDOWS},
+                'revenue_28': float(row.revenue_28 or 0),
+                'last_sold_at': row.last_sold_at
+            }
+            for row in rows
+        }
+
+    def _load_competitor_stats(self, user_id: int, item_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Min/avg/max competitor price for same-named items, using only each
+        competitor's latest scrape batch. One grouped query.
+        """
+        CompetitorItem, CompetitorEntity, Item = models.CompetitorItem, models.CompetitorEntity, models.Item
+
+        latest_sync = self.db.query(
+            CompetitorItem.competitor_id.label('competitor_id'),
+            func.max(CompetitorItem.sync_timestamp).label('latest_sync')
+        ).join(
+            CompetitorEntity, CompetitorItem.competitor_id == CompetitorEntity.id
+        ).filter(
+            CompetitorEntity.user_id == user_id
+        ).group_by(CompetitorItem.competitor_id).subquery()
+
+        rows = self.db.query(
+            Item.id.label('item_id'),
+            func.min(CompetitorItem.price).label('min_price'),
+            func.avg(CompetitorItem.price).label('avg_price'),
+            func.max(CompetitorItem.price).label('max_price'),
+            func.count(CompetitorItem.id).label('price_count')
+        ).join(
+            CompetitorItem, func.lower(CompetitorItem.item_name) == func.lower(Item.name)
+        ).join(
+            latest_sync, and_(
+                latest_sync.c.competitor_id == CompetitorItem.competitor_id,
+                latest_sync.c.latest_sync == CompetitorItem.sync_timestamp
+            )
+        ).filter(
+            Item.user_id == user_id,
+            Item.id.in_(item_ids),
+            CompetitorItem.price.isnot(None)
+        ).group_by(Item.id).all()
+
+        return {
+            row.item_id: {
+                'min': float(row.min_price),
+                'avg': float(row.avg_price),
+                'max': float(row.max_price),
+                'count': int(row.price_count)
+            }
+            for row in rows
+        }
+
+    def _load_recommendation_history(self, user_id: int, item_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Recommendation count, the latest recommendation and the latest measured
+        outcome per item, in one query
+        """
+        PricingRecommendation = models.PricingRecommendation
+        LatestOutcome = aliased(PricingRecommendation)
+
+        history = self.db.query(
+            PricingRecommendation.item_id.label('item_id'),
+            func.count(PricingRecommendation.id).label('rec_count'),
+            func.max(PricingRecommendation.id).label('latest_id'),
+            func.max(case(
+                (PricingRecommendation.actual_revenue_change.isnot(None), PricingRecommendation.id)
+            )).label('latest_outcome_id')
+        ).filter(
+            PricingRecommendation.user_id == user_id,
+            PricingRecommendation.item_id.in_(item_ids)
+        ).group_by(PricingRecommendation.item_id).subquery()
+
+        rows = self.db.query(
+            history.c.item_id,
+            history.c.rec_count,
+            PricingRecommendation.recommendation_date,
+            PricingRecommendation.recommended_price,
+            PricingRecommendation.implementation_status,
+            LatestOutcome.actual_revenue_change,
+            LatestOutcome.actual_quantity_change
+        ).join(
+            PricingRecommendation, PricingRecommendation.id == history.c.latest_id
+        ).outerjoin(
+            LatestOutcome, LatestOutcome.id == history.c.latest_outcome_id
+        ).all()
+
+        return {
+            row.item_id: {
+                'count': int(row.rec_count),
+                'recommendation_date': row.recommendation_date,
+                'recommended_price': row.recommended_price,
+                'implementation_status': row.implementation_status,
+                'actual_revenue_change': row.actual_revenue_change,
+                'actual_quantity_change': row.actual_quantity_change
+            }
+            for row in rows
+        }
+
+    def _feature_to_dict(self, feature: models.ItemFeature) -> Dict[str, Any]:
+        """Convert a feature row into the dict shape consumed by the agents"""
+        return {
+            "item_id": feature.item_id,
+            "elasticity": feature.elasticity,
+            "elasticity_confidence": feature.elasticity_confidence,
+            "competitor_price_min": feature.competitor_price_min,
+            "competitor_price_avg": feature.competitor_price_avg,
+            "competitor_price_max": feature.competitor_price_max,
+            "competitor_count": feature.competitor_count or 0,
+            "velocity_7d": feature.velocity_7d or 0.0,
+            "velocity_28d": feature.velocity_28d or 0.0,
+            "velocity_90d": feature.velocity_90d or 0.0,
+            "revenue_28d": feature.revenue_28d or 0.0,
+            "last_sold_at": feature.last_sold_at.isoformat() if feature.last_sold_at else None,
+            "recommendation_count": feature.recommendation_count or 0,
+            "last_recommendation_at": feature.last_recommendation_at.isoformat() if feature.last_recommendation_at else None,
+            "last_recommended_price": feature.last_recommended_price,
+            "last_implementation_status": feature.last_implementation_status,
+            "last_outcome_revenue_change": feature.last_outcome_revenue_change,
+            "last_outcome_quantity_change": feature.last_outcome_quantity_change,
+            "refreshed_at": feature.refreshed_at.isoformat() if feature.refreshed_at else None
+        }
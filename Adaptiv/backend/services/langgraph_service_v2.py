@@ -30,11 +30,16 @@ from langchain_community.agent_toolkits import SQLDatabaseToolkit
 from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
 
 from services.database_service import DatabaseService
+from services.web_search_service import web_search_cache
+from services.conversation_service import fit_to_token_budget, DEFAULT_CONTEXT_TOKEN_BUDGET
 from config.database import get_db
 from config.external_apis import get_langsmith_client, LANGSMITH_TRACING, LANGSMITH_PROJECT
 
 logger = logging.getLogger(__name__)
 
+# Most recent history messages considered when building a workflow prompt
+MAX_HISTORY_MESSAGES = 20
+
 # Initialize LangSmith tracing if enabled
 if LANGSMITH_TRACING:
     langsmith_client = get_langsmith_client()
@@ -262,49 +267,18 @@ class DatabaseWriteTools:
             csv_content: CSV formatted string with headers
         """
         try:
-            import csv
-            from io import StringIO
-            
-            # Parse CSV
-            reader = csv.DictReader(StringIO(csv_content))
-            rows = list(reader)
+            from services.bulk_import_service import BulkImportService
             
-            if not rows:
+            report = BulkImportService(self.db_session).import_csv(self.user_id, data_type, csv_content)
+            if not report["rows"]:
                 return "❌ No data found in CSV"
             
-            results = []
-            errors = []
-            
-            if data_type == 'menu_items':
-                for row in rows:
-                    try:
-                        result = self.add_menu_item(
-                            name=row.get('name'),
-                            price=float(row.get('price', 0)),
-                            category=row.get('category', 'Uncategorized'),
-                            description=row.get('description'),
-                            cost=float(row.get('cost')) if row.get('cost') else None
-                        )
-                        results.append(result)
-                    except Exception as e:
-                        errors.append(f"Row {row}: {str(e)}")
-            
-            elif data_type == 'competitors':
-                for row in rows:
-                    try:
-                        result = self.add_competitor(
-                            name=row.get('name'),
-                            location=row.get('location', ''),
-                            category=row.get('category', ''),
-                            notes=row.get('notes')
-                        )
-                        results.append(result)
-                    except Exception as e:
-                        errors.append(f"Row {row}: {str(e)}")
-            
-            summary = f"Imported {len(results)} items successfully."
-            if errors:
-                summary += f"\n{len(errors)} errors occurred:\n" + "\n".join(errors[:5])
+            summary = (f"Imported {report['inserted']} new and updated {report['updated']} existing "
+                       f"{data_type.replace('_', ' ')}; {report['skipped']} already existed.")
+            if report["error_count"]:
+                summary += f"\n{report['error_count']} rows were not imported:\n" + "\n".join(
+                    f"Line {error['line']}: {error['error']}" for error in report["errors"][:5]
+                )
             
             return summary
             
@@ -314,10 +288,12 @@ class DatabaseWriteTools:
 class PricingTools:
     """Tools for pricing agents with real web search"""
     
-    def __init__(self):
-        # Initialize Tavily client
+    def __init__(self, search_backend=None):
+        # Initialize Tavily client; any object with a Tavily-style search() can stand in
         self.tavily_api_key = os.getenv("TAVILY_API_KEY") or TAVILY_API_KEY
-        if self.tavily_api_key:
+        if search_backend is not None:
+            self.tavily = search_backend
+        elif self.tavily_api_key:
             self.tavily = TavilyClient(api_key=self.tavily_api_key)
         else:
             self.tavily = None
@@ -335,10 +311,10 @@ class PricingTools:
             # Configure search parameters based on type
             search_params = self._get_search_params_for_type(search_type)
             
-            # Perform search with optimized parameters
-            search_results = self.tavily.search(
-                query=optimized_query,
-                **search_params
+            # Identical searches (after normalization) within the type's TTL share one Tavily call
+            search_results = web_search_cache.get_or_search(
+                query, search_type,
+                lambda: self.tavily.search(query=optimized_query, **search_params)
             )
             
             # Format results based on search type
@@ -469,19 +445,19 @@ class PricingTools:
     @tool
     def search_web_for_pricing(self, query: str) -> str:
         """Search the web for pricing information and market data"""
-        return self.search_web(query, "pricing")
+        return self._search_web_impl(query, "pricing")
     
     @tool
     def search_competitor_analysis(self, product_name: str, category: str) -> str:
         """Search for competitor pricing and positioning analysis"""
         query = f"{product_name} {category} competitors"
-        return self.search_web(query, "competitor")
+        return self._search_web_impl(query, "competitor")
     
     @tool
     def get_market_trends(self, category: str) -> str:
         """Get current market trends and consumer behavior"""
         query = f"{category} market trends 2024 2025 consumer behavior pricing elasticity demand"
-        return self.search_web(query, "market_trends")
+        return self._search_web_impl(query, "market_trends")
 
     @staticmethod
     @tool
@@ -626,6 +602,21 @@ class LangGraphService:
         # Log initialization
         logger.info(f"LangGraphService initialized with db_session: {bool(db_session)}")
     
+    def summarize_history(self, previous_summary: Optional[str], messages: List[Dict[str, Any]]) -> str:
+        """Fold older conversation messages into a short running summary (see ConversationService.update_rolling_summary)"""
+        transcript = "\n".join(
+            f"{message.get('role')}: {message.get('content')}" for message in messages
+        )
+        prompt = (
+            "Update the running summary of a pricing assistant conversation. Keep the facts, "
+            "numbers, decisions and open questions the assistant needs to continue; drop small talk. "
+            "Answer with the summary only, in at most 200 words.\n\n"
+            f"Current summary:\n{previous_summary or '(none)'}\n\n"
+            f"New messages:\n{transcript}"
+        )
+        response = self.model.invoke([HumanMessage(content=prompt)])
+        return self._safe_extract_content(response.content).strip()
+    
     def _initialize_agents_with_context(self, user_id: int):
         """Initialize or reinitialize agents with user context"""
         logger.info(f"Initializing agents with user context for user_id: {user_id}")
@@ -1406,10 +1397,12 @@ Remember: Your algorithm selection can make or break a pricing strategy. Be deci
             # Build initial state with conversation history
             messages = []
             if previous_messages:
-                logger.warning(previous_messages)
-                logger.info(f"Processing {len(previous_messages)} previous messages")
-                for i, msg in enumerate(previous_messages):
-                    logger.info(f"Message {i}: role={msg.get('role')}, has_tool_calls={bool(msg.get('tool_calls') or msg.get('additional_kwargs', {}).get('tool_calls'))}, content_length={len(msg.get('content', ''))}")
+                # Only the tail of the history can reach the prompt; never walk more than that
+                received = len(previous_messages)
+                previous_messages = fit_to_token_budget(
+                    previous_messages[-MAX_HISTORY_MESSAGES:], DEFAULT_CONTEXT_TOKEN_BUDGET
+                )
+                logger.info(f"Processing {len(previous_messages)} of {received} previous messages")
                 
                 # Improved message processing to avoid orphaned tool calls
                 # We'll build a clean conversation history by only including complete exchanges
@@ -1425,6 +1418,13 @@ Remember: Your algorithm selection can make or break a pricing strategy. Be deci
                         i -= 1
                         continue
                     
+                    # Rolling summary of older history from ConversationService; passed as a
+                    # human turn because agents prepend their own system prompt
+                    elif msg.get('role') == 'system':
+                        clean_messages.insert(0, HumanMessage(content=msg.get('content', '')))
+                        i -= 1
+                        continue
+                    
                     # For assistant messages, check if they're part of a tool call chain
                     elif msg.get('role') == 'assistant':
                         tool_calls = msg.get('tool_calls') or msg.get('additional_kwargs', {}).get('tool_calls', [])
@@ -1469,10 +1469,6 @@ Remember: Your algorithm selection can make or break a pricing strategy. Be deci
                 
                 messages = clean_messages
                 logger.info(f"Final conversation history has {len(messages)} clean messages")
-                for i, msg in enumerate(messages):
-                    # Handle different content types for logging
-                    content_preview = str(msg.content)[:50] if msg.content else "No content"
-                    logger.info(f"History message {i}: {type(msg).__name__} - {content_preview}...")
             
             # Add the new user message
             messages.append(HumanMessage(content=task))
@@ -1,12 +1,35 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import extract, func, update
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import models, schemas
 import logging
+from config.settings import get_settings
+from utils.datetime_utils import get_local_time_buckets
+from services.realtime_metrics_service import order_event, publish_order_events
 
 logger = logging.getLogger(__name__)
 
+
+# Readers of the local buckets fall back to the stored (UTC) timestamp for
+# orders the backfill has not reached yet, so those orders are bucketed as
+# before rather than dropped.
+
+def order_local_date():
+    """Order.local_date, or the order_date's day when it is not filled yet"""
+    return func.coalesce(models.Order.local_date, func.date(models.Order.order_date))
+
+
+def order_local_hour():
+    """Order.local_hour, or the order_date's hour when it is not filled yet"""
+    return func.coalesce(models.Order.local_hour, extract('hour', models.Order.order_date))
+
+
+def order_local_dow():
+    """Order.local_dow (0=Sunday), or the order_date's weekday when it is not filled yet"""
+    return func.coalesce(models.Order.local_dow, extract('dow', models.Order.order_date))
+
+
 class OrderService:
     def __init__(self, db: Session):
         self.db = db
@@ -44,12 +67,14 @@ class OrderService:
             db_order = models.Order(
                 order_date=order_data.order_date,
                 total_amount=total_amount,
-                user_id=user_id
+                user_id=user_id,
+                **self.local_time_buckets(order_data.order_date, user_id)
             )
             self.db.add(db_order)
             self.db.flush()  # Flush to get the order ID
             
             # Create order items
+            event_items = []
             for item in order_data.items:
                 # Verify item exists and belongs to the user
                 db_item = self.db.query(models.Item).filter(
@@ -66,9 +91,13 @@ class OrderService:
                     unit_price=item.unit_price
                 )
                 self.db.add(order_item)
+                event_items.append((item.item_id, db_item.name, item.quantity))
             
             self.db.commit()
             self.db.refresh(db_order)
+            
+            if db_order.order_date:
+                publish_order_events(user_id, [order_event(db_order.id, db_order.order_date, total_amount, event_items)])
             return db_order
             
         except Exception as e:
@@ -135,3 +164,74 @@ class OrderService:
         return self.db.query(models.Order).filter(
             models.Order.user_id == user_id
         ).order_by(models.Order.order_date.desc()).limit(limit).all()
+
+    def business_timezone(self, user_id: Optional[int]) -> str:
+        """
+        Get the timezone a user's orders are bucketed in.
+        """
+        profile = self.db.query(models.BusinessProfile.timezone).filter(
+            models.BusinessProfile.user_id == user_id
+        ).first()
+        return (profile and profile.timezone) or get_settings().default_business_timezone
+
+    def local_time_buckets(self, order_date: Optional[datetime], user_id: Optional[int],
+                           timezone: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the local_date/local_hour/local_dow column values for a new order.
+        """
+        if order_date is None:
+            return {}
+        return get_local_time_buckets(order_date, timezone or self.business_timezone(user_id))
+
+    def backfill_local_time_buckets(
+        self,
+        user_id: Optional[int] = None,
+        force: bool = False,
+        batch_size: int = 5000
+    ) -> Dict[str, Any]:
+        """
+        Fill the local time buckets of orders saved before they were computed
+        at ingest. With force, every order is recomputed (e.g. after the
+        business timezone changed). Orders are read in id order and written
+        with one bulk UPDATE per batch.
+        """
+        try:
+            users_query = self.db.query(models.Order.user_id).distinct()
+            if user_id is not None:
+                users_query = users_query.filter(models.Order.user_id == user_id)
+            if not force:
+                users_query = users_query.filter(models.Order.local_date.is_(None))
+            user_ids = [row.user_id for row in users_query.all()]
+            
+            updated = 0
+            for order_user_id in user_ids:
+                timezone = self.business_timezone(order_user_id)
+                last_id = 0
+                while True:
+                    query = self.db.query(models.Order.id, models.Order.order_date).filter(
+                        models.Order.user_id == order_user_id,
+                        models.Order.order_date.isnot(None),
+                        models.Order.id > last_id
+                    )
+                    if not force:
+                        query = query.filter(models.Order.local_date.is_(None))
+                    rows = query.order_by(models.Order.id).limit(batch_size).all()
+                    if not rows:
+                        break
+                    
+                    self.db.execute(update(models.Order), [
+                        {"id": row.id, **get_local_time_buckets(row.order_date, timezone)}
+                        for row in rows
+                    ])
+                    self.db.commit()
+                    updated += len(rows)
+                    last_id = rows[-1].id
+                
+                logger.info(f"Backfilled local time buckets for user {order_user_id} ({timezone})")
+            
+            return {"users": len(user_ids), "orders_updated": updated}
+            
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error backfilling order local time buckets: {str(e)}")
+            raise
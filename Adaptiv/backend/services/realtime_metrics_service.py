@@ -0,0 +1,267 @@
+"""
+Real-time sales metrics fed by order ingestion events.
+
+Order ingestion (Square sync, manual order creation) publishes one compact
+event per order to the user's Redis stream `orders:events:<user_id>`,
+trimmed to the last STREAM_RETENTION_HOURS. Each API process keeps a
+RollingMetrics per user in memory: on first use it replays the retained
+stream, afterwards it only reads entries past the last one it applied. The
+metrics endpoints therefore never scan orders in SQL. Stream reads hold only
+that user's lock, so one slow read never blocks other users.
+
+"Today" and the busiest hour are in the business timezone.
+
+Without Redis (local development, tests) events are applied straight to
+this process's aggregator instead.
+"""
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from collections import Counter, OrderedDict
+import heapq
+import json
+import threading
+import time
+import logging
+
+import pytz
+
+from config.settings import get_settings
+from utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "orders:events:{user_id}"
+STREAM_RETENTION_HOURS = 48  # Enough to compare today with yesterday
+WINDOW_SECONDS = 3600  # Rolling "current hour"
+BUCKET_SECONDS = 300
+TRENDING_LIMIT = 5
+MAX_TRACKED_USERS = 1000
+
+
+def order_event(order_id: Any, ordered_at: datetime, total: float, items: List[Tuple[int, str, int]]) -> Dict[str, Any]:
+    """Compact event for one order; items are (item_id, name, quantity)"""
+    return {
+        "order_id": order_id,
+        "ts": ordered_at.timestamp(),
+        "total": round(float(total or 0), 2),
+        "items": [[item_id, name, int(quantity or 0)] for item_id, name, quantity in items],
+    }
+
+
+def _encode(event: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "order_id": str(event["order_id"]),
+        "ts": repr(event["ts"]),
+        "total": repr(event["total"]),
+        "items": json.dumps(event["items"]),
+    }
+
+
+def _decode(fields: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "order_id": fields.get("order_id"),
+        "ts": float(fields.get("ts", 0)),
+        "total": float(fields.get("total", 0)),
+        "items": json.loads(fields.get("items") or "[]"),
+    }
+
+
+def _stream_id(ts: float) -> str:
+    return str(int(ts * 1000))
+
+
+def _hour_label(hour: int) -> str:
+    return f"{hour % 12 or 12}:00 {'AM' if hour < 12 else 'PM'}"
+
+
+def _business_tz(timezone: Optional[str]):
+    try:
+        return pytz.timezone(timezone or get_settings().default_business_timezone)
+    except pytz.UnknownTimeZoneError:
+        return pytz.timezone(get_settings().default_business_timezone)
+
+
+def publish_order_events(user_id: int, events: List[Dict[str, Any]]) -> None:
+    """
+    Publish order events for the real-time metrics. Events older than the
+    retention window are dropped; failures never affect order ingestion.
+    """
+    cutoff = time.time() - STREAM_RETENTION_HOURS * 3600
+    events = [event for event in events if event["ts"] >= cutoff]
+    if not events:
+        return
+
+    try:
+        published = redis_client.client is not None and redis_client.add_stream_events(
+            STREAM_KEY.format(user_id=user_id), [_encode(event) for event in events], min_id=_stream_id(cutoff)
+        )
+        if not published:
+            realtime_metrics_hub.apply(user_id, events)
+    except Exception as e:
+        logger.warning(f"Failed to publish order events for user {user_id}: {e}")
+
+
+class RollingMetrics:
+    """
+    One user's live sales: a rolling WINDOW_SECONDS window (sales, orders,
+    item counts) kept incrementally as events arrive and expire, plus
+    BUCKET_SECONDS sales buckets for the retention period.
+    """
+
+    def __init__(self):
+        self.window: List[Tuple[float, int, Dict[str, Any]]] = []  # Min-heap on order time
+        self.sales = 0.0
+        self.orders = 0
+        self.item_orders: Counter = Counter()
+        self.item_quantity: Counter = Counter()
+        self.item_names: Dict[int, str] = {}
+        self.buckets: Dict[int, List[float]] = {}  # bucket start -> [sales, orders]
+        self.last_event_at: Optional[float] = None
+        self.last_stream_id: Optional[str] = None  # Last Redis stream entry applied
+        self.lock = threading.Lock()
+        self._seq = 0
+
+    def apply(self, event: Dict[str, Any], now: Optional[float] = None) -> None:
+        now = now or time.time()
+        ts = event["ts"]
+        if ts < now - STREAM_RETENTION_HOURS * 3600:
+            return
+
+        bucket = self.buckets.setdefault(int(ts // BUCKET_SECONDS) * BUCKET_SECONDS, [0.0, 0])
+        bucket[0] += event["total"]
+        bucket[1] += 1
+        self.last_event_at = max(self.last_event_at or ts, ts)
+
+        if ts >= now - WINDOW_SECONDS:
+            self._seq += 1
+            heapq.heappush(self.window, (ts, self._seq, event))
+            self._count(event, 1)
+
+    def _count(self, event: Dict[str, Any], sign: int) -> None:
+        self.sales += sign * event["total"]
+        self.orders += sign
+        for item_id, name, quantity in event["items"]:
+            self.item_orders[item_id] += sign
+            self.item_quantity[item_id] += sign * quantity
+            if sign > 0:
+                self.item_names[item_id] = name
+            elif self.item_orders[item_id] <= 0:
+                del self.item_orders[item_id]
+                self.item_quantity.pop(item_id, None)
+                self.item_names.pop(item_id, None)
+
+    def expire(self, now: float) -> None:
+        while self.window and self.window[0][0] < now - WINDOW_SECONDS:
+            _, _, event = heapq.heappop(self.window)
+            self._count(event, -1)
+        if not self.window:
+            # Reset float drift once the window empties
+            self.sales = 0.0
+        oldest = now - STREAM_RETENTION_HOURS * 3600
+        for start in [start for start in self.buckets if start + BUCKET_SECONDS <= oldest]:
+            del self.buckets[start]
+
+    def snapshot(self, now: Optional[float] = None, timezone: Optional[str] = None) -> Dict[str, Any]:
+        """Current metrics; today and its hours are in `timezone` (the business timezone)"""
+        now = now or time.time()
+        self.expire(now)
+
+        tz = _business_tz(timezone)
+        local_now = datetime.fromtimestamp(now, tz)
+        today = tz.localize(datetime.combine(local_now.date(), datetime.min.time())).timestamp()
+        sales_today = sum(sales for start, (sales, _) in self.buckets.items() if start >= today)
+        sales_yesterday = sum(
+            sales for start, (sales, _) in self.buckets.items() if today - 86400 <= start < now - 86400
+        )
+        hourly: Counter = Counter()
+        for start, (sales, _) in self.buckets.items():
+            if start >= today:
+                hourly[datetime.fromtimestamp(start, tz).hour] += sales
+
+        trending = sorted(self.item_orders.items(), key=lambda entry: (-entry[1], -self.item_quantity[entry[0]]))
+        return {
+            "timestamp": local_now.isoformat(),
+            "current_hour_sales": round(self.sales, 2),
+            "current_hour_orders": self.orders,
+            "trending_items": [
+                {
+                    "item_id": item_id,
+                    "name": self.item_names.get(item_id),
+                    "orders_last_hour": orders,
+                    "quantity_last_hour": self.item_quantity[item_id],
+                }
+                for item_id, orders in trending[:TRENDING_LIMIT]
+            ],
+            "live_metrics": {
+                "avg_order_value": round(self.sales / self.orders, 2) if self.orders else 0.0,
+                "sales_today": round(sales_today, 2),
+                "sales_vs_yesterday": (
+                    f"{(sales_today - sales_yesterday) / sales_yesterday * 100:+.0f}%" if sales_yesterday else None
+                ),
+                "busiest_time_today": _hour_label(hourly.most_common(1)[0][0]) if hourly else None,
+            },
+            "last_event_at": datetime.fromtimestamp(self.last_event_at, tz).isoformat() if self.last_event_at else None,
+        }
+
+
+class RealtimeMetricsHub:
+    """
+    Per-process registry of RollingMetrics, caught up from the Redis streams
+    on read. The registry lock only guards the user map; stream reads and
+    updates hold the user's own RollingMetrics lock.
+    """
+
+    def __init__(self, max_users: int = MAX_TRACKED_USERS):
+        self.max_users = max_users
+        self._metrics: "OrderedDict[int, RollingMetrics]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, user_id: int) -> RollingMetrics:
+        with self._lock:
+            metrics = self._metrics.get(user_id)
+            if metrics is None:
+                metrics = self._metrics[user_id] = RollingMetrics()
+                while len(self._metrics) > self.max_users:
+                    self._metrics.popitem(last=False)
+            self._metrics.move_to_end(user_id)
+            return metrics
+
+    def apply(self, user_id: int, events: List[Dict[str, Any]]) -> None:
+        """Apply events directly (used when Redis is unavailable)"""
+        metrics = self._get(user_id)
+        with metrics.lock:
+            for event in events:
+                metrics.apply(event)
+
+    def _catch_up(self, user_id: int, metrics: RollingMetrics) -> None:
+        key = STREAM_KEY.format(user_id=user_id)
+        if metrics.last_stream_id is None:
+            entries = redis_client.read_stream_events(
+                key, "0", min_id=_stream_id(time.time() - STREAM_RETENTION_HOURS * 3600)
+            )
+        else:
+            entries = redis_client.read_stream_events(key, metrics.last_stream_id)
+        if not entries:
+            return
+        for entry_id, fields in entries:
+            metrics.apply(_decode(fields))
+        metrics.last_stream_id = entries[-1][0]
+
+    def get_metrics(self, user_id: int, timezone: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Current metrics for a user, after applying any new stream entries.
+        `timezone` is the business timezone (OrderService.business_timezone).
+        """
+        metrics = self._get(user_id)
+        with metrics.lock:
+            if redis_client.client is not None:
+                self._catch_up(user_id, metrics)
+            return metrics.snapshot(timezone=timezone)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+
+# Global instance
+realtime_metrics_hub = RealtimeMetricsHub()
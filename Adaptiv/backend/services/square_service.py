@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select, insert, update
 import models
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional, Tuple
@@ -8,6 +8,8 @@ import requests
 import os
 import json
 from utils.redis_client import redis_client
+from services.order_service import OrderService
+from services.realtime_metrics_service import order_event, publish_order_events
 
 logger = logging.getLogger(__name__)
 
@@ -320,6 +322,14 @@ class SquareService:
             # Use the first location as primary
             primary_location_id = location_ids[0]
             
+            # Bucket orders in the primary location's timezone unless the business set one
+            primary_timezone = next((loc.get('timezone') for loc in locations if loc.get('id') == primary_location_id), None)
+            profile = self.db.query(models.BusinessProfile).filter(
+                models.BusinessProfile.user_id == user_id
+            ).first()
+            if primary_timezone and profile and not profile.timezone:
+                profile.timezone = primary_timezone
+            
             # Update the integration with location data
             integration.pos_id = primary_location_id  # Primary location
             integration.location_ids = json.dumps(location_ids)  # All locations as JSON
@@ -440,81 +450,162 @@ class SquareService:
             self.db.rollback()
             return False
     
-    def sync_square_catalog(self, user_id: int) -> Dict[str, Any]:
+    def sync_square_catalog(self, user_id: int, full: bool = False) -> Dict[str, Any]:
         """
         Sync Square catalog items to local database.
+
+        Each item variation is one local Item keyed by its variation id in
+        pos_id (the id order line items reference). The first sync (or
+        `full=True`) follows every /v2/catalog/list page; later syncs search
+        only objects updated since the previous sync's latest_time. Local rows
+        are preloaded in one query and only changed rows are written, in bulk.
         """
         try:
             integration = self.get_user_square_integration(user_id)
             if not integration:
                 raise ValueError("Square integration not found for user")
-            
-            # Get catalog items from Square using HTTP request
-            response = self._make_square_request_with_refresh(
-                '/v2/catalog/list?types=ITEM',
-                user_id
-            )
-            
-            items_created = 0
-            items_updated = 0
-            
-            for catalog_object in response.get('objects', []):
-                if catalog_object.get('type') == 'ITEM':
-                    item_data = catalog_object.get('item_data', {})
-                    
-                    # Get the first variation (most items have one variation)
-                    variations = item_data.get('variations', [])
-                    if not variations:
-                        continue
-                    
-                    variation = variations[0].get('item_variation_data', {})
-                    price_money = variation.get('price_money', {})
-                    
-                    # Convert Square price (cents) to dollars
-                    price = float(price_money.get('amount', 0)) / 100 if price_money.get('amount') else 0
-                    
-                    # Check if item already exists
-                    existing_item = self.db.query(models.Item).filter(
-                        and_(
-                            models.Item.user_id == user_id,
-                            models.Item.pos_id == catalog_object.get('id')
-                        )
-                    ).first()
-                    
-                    if existing_item:
-                        # Update existing item
-                        existing_item.name = item_data.get('name', existing_item.name)
-                        existing_item.current_price = price
-                        existing_item.category = item_data.get('category_id', existing_item.category)
-                        existing_item.updated_at = datetime.now()
-                        items_updated += 1
-                    else:
-                        # Create new item
-                        new_item = models.Item(
-                            user_id=user_id,
-                            name=item_data.get('name', 'Unknown Item'),
-                            current_price=price,
-                            category=item_data.get('category_id'),
-                            pos_id=catalog_object.get('id'),
-                            created_at=datetime.now(),
-                            updated_at=datetime.now()
-                        )
-                        self.db.add(new_item)
-                        items_created += 1
-            
+
+            meta = self._read_sync_meta(integration)
+            begin_time = None if full else meta.get('catalog', {}).get('latest_time')
+
+            objects, categories, pages = self._fetch_catalog_objects(user_id, begin_time)
+            rows, deleted = self._catalog_rows(objects, categories)
+
+            existing = {}
+            for item_id, pos_id, name, category, price in self.db.execute(
+                select(models.Item.id, models.Item.pos_id, models.Item.name, models.Item.category,
+                       models.Item.current_price).where(
+                    models.Item.user_id == user_id,
+                    models.Item.pos_id.isnot(None)
+                )
+            ):
+                existing[pos_id] = {'id': item_id, 'name': name, 'category': category, 'current_price': price}
+
+            now = datetime.now()
+            inserts = []
+            updates = []
+            for variation_id, row in rows.items():
+                current = existing.get(variation_id)
+                pos_id = variation_id
+                if current is None and row['parent_id'] in existing:
+                    # Rows from older syncs were keyed by the ITEM id; adopt
+                    # one for the first variation seen so history is kept
+                    current = existing.pop(row['parent_id'])
+                    pos_id = None
+                values = {'name': row['name'], 'category': row['category'], 'current_price': row['current_price']}
+                if current is None:
+                    inserts.append({**values, 'user_id': user_id, 'pos_id': variation_id,
+                                    'created_at': now, 'updated_at': now})
+                elif pos_id is None or any(current[key] != value for key, value in values.items()):
+                    updates.append({**values, 'id': current['id'], 'pos_id': variation_id, 'updated_at': now})
+
+            if inserts:
+                self.db.execute(insert(models.Item), inserts)
+            if updates:
+                self.db.execute(update(models.Item), updates)
+
+            latest_time = max((obj.get('updated_at') or '' for obj in objects), default='') or begin_time
+            meta['catalog'] = {
+                'latest_time': latest_time,
+                'last_synced_at': self._now_iso(),
+                'mode': 'incremental' if begin_time else 'full'
+            }
+            integration.sync_metadata = meta
             self.db.commit()
-            
+
             return {
-                'items_created': items_created,
-                'items_updated': items_updated,
-                'total_processed': items_created + items_updated
+                'items_created': len(inserts),
+                'items_updated': len(updates),
+                'items_unchanged': len(rows) - len(inserts) - len(updates),
+                'variations_deleted': len(deleted),
+                'pages_fetched': pages,
+                'mode': 'incremental' if begin_time else 'full',
+                'total_processed': len(inserts) + len(updates)
             }
-            
+
         except Exception as e:
             logger.error(f"Error syncing Square catalog: {str(e)}")
             self.db.rollback()
             raise
-    
+
+    def _fetch_catalog_objects(
+        self, user_id: int, begin_time: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, str], int]:
+        """
+        Page through the catalog: every ITEM and CATEGORY when `begin_time` is
+        None, otherwise only ITEMs changed since then (deletions included).
+        Returns item objects, category names by id and the number of pages.
+        """
+        objects: List[Dict[str, Any]] = []
+        categories: Dict[str, str] = {}
+        cursor = None
+        pages = 0
+        while True:
+            if begin_time:
+                body = {
+                    'object_types': ['ITEM'],
+                    'begin_time': begin_time,
+                    'include_deleted_objects': True,
+                    'include_related_objects': True,
+                    'limit': 1000
+                }
+                if cursor:
+                    body['cursor'] = cursor
+                response = self._make_square_request_with_refresh('/v2/catalog/search', user_id, 'POST', body)
+            else:
+                params = {'types': 'ITEM,CATEGORY'}
+                if cursor:
+                    params['cursor'] = cursor
+                response = self._make_square_request_with_refresh('/v2/catalog/list', user_id, 'GET', params)
+            pages += 1
+
+            for obj in response.get('objects', []) + response.get('related_objects', []):
+                if obj.get('type') == 'ITEM':
+                    objects.append(obj)
+                elif obj.get('type') == 'CATEGORY':
+                    categories[obj.get('id')] = obj.get('category_data', {}).get('name')
+
+            cursor = response.get('cursor')
+            if not cursor:
+                break
+
+        # related_objects may repeat items already listed
+        unique = {obj.get('id'): obj for obj in objects}
+        return list(unique.values()), categories, pages
+
+    def _catalog_rows(
+        self, objects: List[Dict[str, Any]], categories: Dict[str, str]
+    ) -> Tuple[Dict[str, Dict[str, Any]], set]:
+        """Flatten ITEM objects into one row per live variation, keyed by variation id"""
+        rows: Dict[str, Dict[str, Any]] = {}
+        deleted = set()
+        for obj in objects:
+            item_data = obj.get('item_data', {})
+            variations = item_data.get('variations', [])
+            category_id = item_data.get('category_id') or next(
+                (category.get('id') for category in item_data.get('categories', [])), None
+            )
+            category = categories.get(category_id, category_id)
+
+            for variation in variations:
+                if obj.get('is_deleted') or variation.get('is_deleted'):
+                    # Keep the local row: historical orders still reference it
+                    deleted.add(variation.get('id'))
+                    continue
+                variation_data = variation.get('item_variation_data', {})
+                amount = variation_data.get('price_money', {}).get('amount')
+                name = item_data.get('name', 'Unknown Item')
+                if len(variations) > 1 and variation_data.get('name'):
+                    name = f"{name} ({variation_data['name']})"
+                rows[variation.get('id')] = {
+                    'parent_id': obj.get('id'),
+                    'name': name,
+                    'category': category,
+                    # Convert Square price (cents) to dollars
+                    'current_price': float(amount) / 100 if amount else 0
+                }
+        return rows, deleted
+
     def sync_square_orders(self, user_id: int, days: int = 30) -> Dict[str, Any]:
         """
         Sync Square orders to local database.
@@ -603,6 +694,10 @@ class SquareService:
                 if item.pos_id:
                     items_map[item.pos_id] = item
             
+            # Orders are stored with merchant-local date/hour/weekday buckets
+            order_service = OrderService(self.db)
+            business_tz = order_service.business_timezone(user_id)
+            
             orders_created = 0
             orders_updated = 0
             cursor = None
@@ -693,7 +788,8 @@ class SquareService:
                         order_date=order_date,
                         total_amount=total_amount,
                         created_at=datetime.now(),
-                        updated_at=datetime.now()
+                        updated_at=datetime.now(),
+                        **order_service.local_time_buckets(order_date, user_id, business_tz)
                     )
                     new_orders.append(new_order)
                     
@@ -712,6 +808,7 @@ class SquareService:
                         new_order_items.append({
                             'order': new_order,
                             'item_id': item.id,
+                            'name': item.name,
                             'quantity': quantity,
                             'unit_price': unit_price
                         })
@@ -800,6 +897,18 @@ class SquareService:
             self.db.commit()
             logger.info(f"Orders sync completed for user {user_id}: {orders_created} created, {orders_updated} updated across {page_count} pages")
             
+            # Feed recent orders to the real-time metrics stream
+            if new_orders:
+                lines_by_order: Dict[int, List[Tuple[int, str, int]]] = {}
+                for item_data in new_order_items:
+                    lines_by_order.setdefault(id(item_data['order']), []).append(
+                        (item_data['item_id'], item_data['name'], item_data['quantity'])
+                    )
+                publish_order_events(user_id, [
+                    order_event(order.pos_id, order.order_date, order.total_amount, lines_by_order.get(id(order), []))
+                    for order in new_orders
+                ])
+            
             return {
                 'orders_created': orders_created,
                 'orders_updated': orders_updated,
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import logging
 from services.square_service import SquareService
+from services.item_feature_service import ItemFeatureService
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +41,7 @@ class TaskService:
             # Step 1: Sync catalog (20% progress)
             try:
                 logger.info(f"Syncing catalog for user {user_id}")
-                catalog_result = square_service.sync_square_catalog(user_id)
+                catalog_result = square_service.sync_square_catalog(user_id, full=force_sync)
                 results['catalog_sync'] = catalog_result
                 results['total_items_processed'] = catalog_result.get('total_processed', 0)
                 logger.info(f"Catalog sync completed: {catalog_result}")
@@ -63,6 +64,13 @@ class TaskService:
                 logger.error(error_msg)
                 results['errors'].append(error_msg)
             
+            # Step 3: Refresh the per-item feature store with the newly synced sales
+            try:
+                results['features_refreshed'] = ItemFeatureService(self.db).refresh_features(user_id)
+            except Exception as e:
+                self.db.rollback()
+                logger.warning(f"Item feature refresh failed for user {user_id}: {str(e)}")
+            
             # Final results
             results['sync_completed'] = datetime.now().isoformat()
             results['success'] = len(results['errors']) == 0
@@ -0,0 +1,198 @@
+"""
+Shared cache for agent web searches.
+
+Searches are keyed by search type and the normalized query (case,
+punctuation, spacing and word order ignored), so "Latte prices, Brooklyn"
+from one tenant and "brooklyn latte prices" from another share one entry.
+Entries expire after a per-type TTL: news goes stale within the hour while
+market trend research holds for days.
+
+Results are trimmed to the fields the formatter shows and kept in a bounded
+in-process LRU, with Redis as a second tier shared across workers. Identical
+searches that arrive while one is already running wait for its result
+instead of calling the search API again.
+"""
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+import hashlib
+import re
+import threading
+import time
+import logging
+
+from utils.json_utils import json_dumps_str, json_loads
+from utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = "websearch:{search_type}:{digest}"
+MAX_ENTRIES = 1000
+MAX_RESULTS = 5
+MAX_CONTENT_CHARS = 300  # Longest excerpt the formatter shows
+STATS_LOG_EVERY = 100
+
+SEARCH_TTL_SECONDS = {
+    "news": 30 * 60,
+    "events": 6 * 3600,
+    "general": 6 * 3600,
+    "pricing": 24 * 3600,
+    "competitor": 24 * 3600,
+    "market_trends": 7 * 86400,
+    "competitor_prices": 24 * 3600,  # Gemini competitor price searches
+}
+DEFAULT_TTL_SECONDS = 6 * 3600
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and sort the distinct words"""
+    words = re.findall(r"[\w$%.-]+", query.lower())
+    return " ".join(sorted(set(word.strip(".-") for word in words) - {""}))
+
+
+def compact_results(search_results: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only what the result formatter uses"""
+    results = []
+    for result in (search_results.get("results") or [])[:MAX_RESULTS]:
+        compact = {"score": round(result.get("score") or 0, 3)}
+        for field in ("title", "url", "published_date"):
+            if result.get(field):
+                compact[field] = result[field]
+        if result.get("content"):
+            compact["content"] = result["content"][:MAX_CONTENT_CHARS]
+        results.append(compact)
+    return {"answer": search_results.get("answer"), "results": results}
+
+
+class WebSearchCache:
+    """Two-tier TTL cache with in-flight coalescing and hit-rate counters"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, use_redis: bool = True):
+        self.max_entries = max_entries
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "memory_hits": 0, "redis_hits": 0, "coalesced": 0, "misses": 0, "errors": 0}
+
+    @staticmethod
+    def key(query: str, search_type: str) -> str:
+        digest = hashlib.sha1(normalize_query(query).encode()).hexdigest()
+        return REDIS_KEY.format(search_type=search_type, digest=digest)
+
+    def get_or_search(
+        self,
+        query: str,
+        search_type: str,
+        search: Callable[[], Dict[str, Any]],
+        compact: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = compact_results,
+        refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Results for `query`, calling `search()` only on a miss. The response
+        is stored after `compact` (Tavily trimming by default; None stores it
+        as is). With `refresh`, cached results are ignored and the fresh
+        response replaces them. Failures are not cached and are raised to
+        every caller waiting on the same search.
+        """
+        key = self.key(query, search_type)
+        ttl = SEARCH_TTL_SECONDS.get(search_type, DEFAULT_TTL_SECONDS)
+
+        with self._lock:
+            self._count("lookups")
+            cached = None if refresh else self._get_local(key)
+            if cached is not None:
+                self._count("memory_hits")
+                return cached
+            waiting = None if refresh else self._in_flight.get(key)
+            if waiting is None:
+                owner = self._in_flight[key] = Future()
+            else:
+                self._count("coalesced")
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            results = None if refresh else self._get_redis(key)
+            if results is not None:
+                self._count("redis_hits")
+            else:
+                self._count("misses")
+                results = search()
+                if compact is not None:
+                    results = compact(results)
+                self._set_redis(key, results, ttl)
+            with self._lock:
+                self._set_local(key, results, ttl)
+            owner.set_result(results)
+            return results
+        except Exception as e:
+            self._count("errors")
+            owner.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                # A refresh may have replaced this search as the one in flight
+                if self._in_flight.get(key) is owner:
+                    del self._in_flight[key]
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return results
+
+    def _set_local(self, key: str, results: Dict[str, Any], ttl: int) -> None:
+        self._entries[key] = (time.time() + ttl, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_redis(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.use_redis or redis_client.client is None:
+            return None
+        try:
+            value = redis_client.client.get(key)
+            return json_loads(value) if value else None
+        except Exception as e:
+            logger.warning(f"Web search cache read failed for {key}: {e}")
+            return None
+
+    def _set_redis(self, key: str, results: Dict[str, Any], ttl: int) -> None:
+        if not self.use_redis or redis_client.client is None:
+            return
+        try:
+            redis_client.client.setex(key, ttl, json_dumps_str(results))
+        except Exception as e:
+            logger.warning(f"Web search cache write failed for {key}: {e}")
+
+    def _count(self, name: str) -> None:
+        # Counters are best effort; lookups are counted under the lock
+        self._stats[name] += 1
+        if name == "lookups" and self._stats["lookups"] % STATS_LOG_EVERY == 0:
+            stats = self.stats()
+            logger.info(f"Web search cache: {stats['lookups']} lookups, hit rate {stats['hit_rate']:.0%}, "
+                        f"{stats['coalesced']} coalesced, {stats['misses']} searches")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since start (per process); hits include coalesced lookups"""
+        stats = dict(self._stats)
+        hits = stats["memory_hits"] + stats["redis_hits"] + stats["coalesced"]
+        stats["hit_rate"] = round(hits / stats["lookups"], 4) if stats["lookups"] else 0.0
+        stats["entries"] = len(self._entries)
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+
+# Global instance
+web_search_cache = WebSearchCache()
@@ -10,6 +10,7 @@ import asyncio
 import os
 import logging
 import re
+import time
 from openai import OpenAI
 from dotenv import load_dotenv
 # Import datetime at the module level since it's used in multiple places
@@ -1790,3 +1791,245 @@ def get_competitor_scrape_status(task_id: str, user_id: int) -> Dict[str, Any]:
             'error': str(e),
             'message': 'Failed to check task status'
         }
+
+
+@celery_app.task(name="adaptiv.tasks.materialize_admin_stats_task")
+def materialize_admin_stats_task() -> Dict[str, Any]:
+    """
+    Periodic task that recomputes the system-wide admin statistics and stores
+    them in the admin_stats_snapshots table read by /api/admin/stats.
+    """
+    from services.admin_stats_service import AdminStatsService
+    
+    db = SessionLocal()
+    try:
+        snapshot = AdminStatsService(db).materialize()
+        return {
+            "status": "success",
+            "snapshot_id": snapshot.id,
+            "computed_at": snapshot.computed_at.isoformat()
+        }
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error materializing admin stats: {e}")
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+    finally:
+        db.close()
+
+
+@celery_app.task(name="adaptiv.tasks.compact_competitor_items_task")
+def compact_competitor_items_task(keep_batches: int = None, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Periodic task that expires old competitor scrape batches and collapses
+    unchanged items for all users, then vacuums the competitor_items table.
+    """
+    from services.competitor_retention_service import CompetitorRetentionService
+    from config.settings import get_settings
+    
+    db = SessionLocal()
+    try:
+        report = CompetitorRetentionService(db).compact(
+            keep_batches=keep_batches or get_settings().competitor_batches_to_keep,
+            dry_run=dry_run,
+            vacuum=True
+        )
+        return {"status": "success", **report}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error compacting competitor items: {e}")
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+    finally:
+        db.close()
+
+
+@celery_app.task(name="adaptiv.tasks.refresh_item_forecasts_task")
+def refresh_item_forecasts_task() -> Dict[str, Any]:
+    """
+    Periodic task that folds yesterday's sales into every item forecast model
+    (refitting models that are due) for all users.
+    """
+    from services.forecast_service import ForecastService
+    
+    db = SessionLocal()
+    try:
+        reports = ForecastService(db).refresh_all()
+        return {
+            "status": "success",
+            "users": len(reports),
+            "refitted": sum(r["refitted"] for r in reports),
+            "updated": sum(r["updated"] for r in reports)
+        }
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error refreshing item forecasts: {e}")
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+    finally:
+        db.close()
+
+
+@celery_app.task(name="adaptiv.tasks.refresh_competitor_prices_task", bind=True)
+def refresh_competitor_prices_task(self, user_id: int, location: str = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Refresh Gemini competitor prices for all of a user's items, reporting
+    PROGRESS as item searches complete.
+    """
+    from services.competitor_service import CompetitorService
+    
+    def report_progress(completed: int, total: int):
+        # About 20 state updates per run
+        if completed == total or completed % max(1, total // 20) == 0:
+            self.update_state(state='PROGRESS', meta={
+                'user_id': user_id,
+                'completed': completed,
+                'total': total,
+                'progress': round(completed / total * 100),
+                'status': f'Searched {completed} of {total} items'
+            })
+    
+    db = SessionLocal()
+    try:
+        result = CompetitorService(db).update_competitor_prices(
+            user_id, location=location, force=force, progress=report_progress
+        )
+        return {"status": "completed", "success": True, "user_id": user_id, **result}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error refreshing competitor prices for user {user_id}: {e}")
+        return {"status": "error", "success": False, "user_id": user_id, "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="adaptiv.tasks.backfill_order_local_time_task")
+def backfill_order_local_time_task(user_id: int = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Fill the merchant-local date/hour/weekday buckets of orders saved before
+    they were computed at ingest (all users by default). With force, a user's
+    orders are recomputed, e.g. after their business timezone changed.
+    """
+    from services.order_service import OrderService
+    
+    db = SessionLocal()
+    try:
+        report = OrderService(db).backfill_local_time_buckets(user_id=user_id, force=force)
+        return {"status": "success", **report}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error backfilling order local time buckets: {e}")
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+    finally:
+        db.close()
+
+
+@celery_app.task(name="adaptiv.tasks.schedule_daily_pricing_fleet_task")
+def schedule_daily_pricing_fleet_task(force: bool = False) -> Dict[str, Any]:
+    """
+    Periodic task that plans the daily pricing analysis for all active
+    tenants and dispatches it in staggered waves on the agents queue.
+    """
+    from services.fleet_scheduler_service import FleetSchedulerService
+    from config.settings import get_settings
+    
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        service = FleetSchedulerService(db)
+        plan = service.plan(
+            wave_count=settings.fleet_wave_count,
+            wave_spacing_minutes=settings.fleet_wave_spacing_minutes,
+            force=force
+        )
+        return {"status": "success", **service.dispatch(plan)}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error scheduling daily pricing fleet: {e}")
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+    finally:
+        db.close()
+
+
+@celery_app.task(name="adaptiv.tasks.run_tenant_pricing_task")
+def run_tenant_pricing_task(user_id: int, fleet_run_id: str, fingerprint: str = None) -> Dict[str, Any]:
+    """
+    Run the dynamic pricing analysis for one tenant of a fleet wave and
+    record the outcome. Returns a compact result for the wave report.
+    """
+    from services.fleet_scheduler_service import FleetSchedulerService
+    
+    db = SessionLocal()
+    service = FleetSchedulerService(db)
+    started = time.time()
+    try:
+        service.record_start(user_id)
+        result = run_dynamic_pricing_analysis_task(user_id)
+        success = bool(result.get("success"))
+        error = None if success else result.get("error")
+        recommendations = len(result.get("pricing_recommendations") or [])
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error running pricing analysis for user {user_id} in {fleet_run_id}: {e}")
+        success, error, recommendations = False, str(e), 0
+    
+    duration = round(time.time() - started, 3)
+    try:
+        service.record_result(user_id, success, fingerprint, duration, error)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error recording pricing run for user {user_id}: {e}")
+    finally:
+        db.close()
+    
+    return {
+        "user_id": user_id,
+        "success": success,
+        "recommendations": recommendations,
+        "duration_seconds": duration,
+        "error": error
+    }
+
+
+@celery_app.task(name="adaptiv.tasks.fleet_wave_report_task")
+def fleet_wave_report_task(results: List[Dict[str, Any]], fleet_run_id: str, job: str, wave: int,
+                           scheduled_for: str = None, skipped: List[int] = None) -> Dict[str, Any]:
+    """
+    Chord callback of a fleet wave: stores the wave's completion report.
+    """
+    from services.fleet_scheduler_service import FleetSchedulerService
+    
+    db = SessionLocal()
+    try:
+        report = FleetSchedulerService(db).write_wave_report(
+            results, fleet_run_id, job, wave, scheduled_for, skipped or []
+        )
+        return {
+            "status": "success",
+            "fleet_run_id": fleet_run_id,
+            "wave": wave,
+            "succeeded": report.succeeded,
+            "failed": report.failed,
+            "skipped": report.skipped
+        }
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error writing fleet wave report: {e}")
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+    finally:
+        db.close()
@@ -0,0 +1,45 @@
+"""
+Shared database setup for the backend tests.
+
+The tests also run as plain scripts (python tests/test_x.py), where pytest
+fixtures are not available, so the in-memory database comes from plain
+functions imported directly: `from conftest import memory_session`. The
+tests directory is on sys.path both under pytest and when a test file is run
+as a script.
+"""
+
+import os
+import sys
+from typing import List, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def memory_engine() -> Engine:
+    """In-memory SQLite engine with the full schema, shared across threads"""
+    import models  # noqa: F401  (registers every table on Base.metadata)
+    from config.database import Base
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def record_statements(engine: Engine) -> List[str]:
+    """List that receives the SQL of every statement executed on `engine`"""
+    statements: List[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def memory_session() -> Tuple[Session, List[str]]:
+    """Session on a fresh in-memory database plus its executed statements"""
+    engine = memory_engine()
+    statements = record_statements(engine)
+    return sessionmaker(bind=engine)(), statements
@@ -23,6 +23,7 @@ sys.path.append(backend_dir)
 os.chdir(backend_dir)
 from models import Item, Order, OrderItem
 from config.database import SessionLocal, engine, Base
+from services.order_service import OrderService
 
 # Configure logging
 logging.basicConfig(
@@ -184,6 +185,7 @@ def seed_test_orders(user_id: int, months: int = 12, orders_per_month_avg: int =
                 
         # Commit all changes
         db.commit()
+        OrderService(db).backfill_local_time_buckets(user_id)
         logger.info(f"Successfully generated {total_orders} test orders for user {user_id}")
         
     except Exception as e:
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Checks the admin statistics snapshot: the aggregates match the fixture rows
+(including the half-open today / last-30-days windows), a fresh snapshot is
+served without recomputing, a stale or forced one is recomputed, and only the
+latest snapshot row is kept.
+
+Usage:
+    python tests/test_admin_stats.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from services.admin_stats_service import AdminStatsService
+
+
+def seed(db, now):
+    users = [
+        models.User(email="owner@test.local", hashed_password="x", subscription_tier="premium"),
+        models.User(email="free@test.local", hashed_password="x"),
+        models.User(email="admin@test.local", hashed_password="x", is_admin=True, is_active=False),
+    ]
+    db.add_all(users)
+    db.flush()
+    db.add(models.Item(user_id=users[0].id, name="Latte", current_price=4.0))
+    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for when, amount in ((start_of_today, 10.0), (now - timedelta(days=3), 20.0), (now - timedelta(days=45), 30.0),
+                         (start_of_today + timedelta(days=1), 40.0)):
+        db.add(models.Order(user_id=users[0].id, order_date=when, total_amount=amount))
+    db.commit()
+    return users[0].id
+
+
+def test_compute_stats_windows():
+    db, _ = memory_session()
+    now = datetime(2026, 3, 29, 12, 0)
+    seed(db, now)
+    stats = AdminStatsService(db).compute_stats(now=now)
+
+    assert (stats["total_users"], stats["active_users"], stats["admin_users"]) == (3, 2, 1)
+    assert stats["subscription_breakdown"] == {"premium": 1, "free": 2}
+    assert (stats["total_orders"], stats["total_revenue"], stats["avg_order_value"]) == (4, 100.0, 25.0)
+    # Today is [midnight, next midnight): the order at the next midnight is not today
+    assert (stats["orders_today"], stats["revenue_today"]) == (1, 10.0)
+    # The 45-day-old order is outside the last 30 days; the future one is inside
+    assert (stats["orders_last_30_days"], stats["revenue_last_30_days"]) == (3, 70.0)
+    assert stats["total_items"] == 1
+
+
+def test_snapshot_served_until_stale():
+    db, statements = memory_session()
+    owner_id = seed(db, datetime.utcnow())
+    service = AdminStatsService(db)
+
+    first = service.get_stats()
+    assert first["total_orders"] == 4
+
+    # A fresh snapshot is read back with one query, even after new orders
+    db.add(models.Order(user_id=owner_id, order_date=datetime.utcnow(), total_amount=5.0))
+    db.commit()
+    statements.clear()
+    assert service.get_stats()["total_orders"] == 4
+    assert len(statements) == 1, statements
+
+    # Forced or stale snapshots are recomputed, and only the latest row is kept
+    assert service.get_stats(force_refresh=True)["total_orders"] == 5
+    snapshot = service.get_latest_snapshot()
+    snapshot.computed_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.commit()
+    db.add(models.Order(user_id=owner_id, order_date=datetime.utcnow(), total_amount=5.0))
+    db.commit()
+    assert service.get_stats()["total_orders"] == 6
+    assert db.query(models.AdminStatsSnapshot).count() == 1
+
+
+if __name__ == "__main__":
+    test_compute_stats_windows()
+    test_snapshot_served_until_stale()
+    print("Admin stats checks passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Checks the set-based CSV import: a 2,000-row menu costs a handful of
+statements per batch instead of two per row, invalid and repeated rows are
+reported by line, existing records are skipped or updated, and competitor
+items join their competitor's latest menu batch, with cached competitor stats
+refreshed afterwards.
+
+Usage:
+    python tests/test_bulk_import.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from services.bulk_import_service import BulkImportService
+from services.competitor_stats_service import CompetitorStatsService
+
+
+def make_db():
+    db, statements = memory_session()
+    user = models.User(email="import@test.local", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return db, user.id, statements
+
+
+def test_menu_import_is_set_based():
+    db, user_id, statements = make_db()
+    db.add(models.Item(user_id=user_id, name="Item 5", current_price=1.0))
+    db.commit()
+
+    rows = ["name,price,category,cost"] + [f"Item {n},{4 + n % 3}.50,Coffee,1.25" for n in range(2000)]
+    rows += ["Item 7,5.50,Coffee,", ",3.00,Tea,", "Chai,free,Tea,"]
+    statements.clear()
+    report = BulkImportService(db).import_csv(user_id, "menu_items", "\n".join(rows))
+
+    assert (report["rows"], report["inserted"], report["skipped"], report["error_count"]) == (2003, 1999, 1, 3)
+    assert [error["line"] for error in report["errors"]] == [2002, 2003, 2004]
+    assert "Duplicate" in report["errors"][0]["error"] and "'name' is required" in report["errors"][1]["error"]
+    # One lookup and one multi-row insert per 500-row batch
+    assert len(statements) <= 12, len(statements)
+    assert db.query(models.Item).filter(models.Item.user_id == user_id).count() == 2000
+
+    report = BulkImportService(db).import_csv(user_id, "menu_items", "name,price\nItem 5,9.00\n", update_existing=True)
+    assert report["updated"] == 1
+    history = db.query(models.PriceHistory).one()
+    assert (history.previous_price, history.new_price) == (1.0, 9.0)
+    item = db.query(models.Item).filter(models.Item.name == "Item 5").one()
+    assert (item.current_price, item.category) == (9.0, None)
+
+
+def test_competitor_items_upsert_into_latest_batch():
+    db, user_id, _ = make_db()
+    service = BulkImportService(db)
+    report = service.import_csv(user_id, "competitors", "name,location,category\nBean Co,1 Main St,cafe\n")
+    assert report["inserted"] == 1
+    competitor = db.query(models.CompetitorEntity).one()
+    assert competitor.address == "1 Main St"
+
+    synced = datetime.now() - timedelta(days=1)
+    for batch_id, when in (("old", synced - timedelta(days=7)), ("new", synced)):
+        db.add(models.CompetitorItem(competitor_id=competitor.id, competitor_name="Bean Co", item_name="Latte",
+                                     price=4.0, batch_id=batch_id, sync_timestamp=when))
+    db.commit()
+
+    csv_content = "competitor_name,item_name,price\nbean co,latte,4.25\nBean Co,Mocha,4.75\nNope,Latte,3.00\n"
+    report = service.import_csv(user_id, "competitor_items", csv_content)
+    assert (report["inserted"], report["updated"], report["error_count"]) == (1, 1, 1)
+    items = {(item.batch_id, item.item_name): item.price for item in db.query(models.CompetitorItem)}
+    assert items == {("old", "Latte"): 4.0, ("new", "Latte"): 4.25, ("new", "Mocha"): 4.75}
+
+    # Cached competitor stats see prices updated in place
+    stats = CompetitorStatsService(db)
+    assert stats.get_competitor_stats(competitor.id, user_id)["price_stats"]["max_price"] == 4.75
+    service.import_csv(user_id, "competitor_items", "competitor_name,item_name,price\nBean Co,Mocha,5.50\n")
+    assert stats.get_competitor_stats(competitor.id, user_id)["price_stats"]["max_price"] == 5.5
+
+
+if __name__ == "__main__":
+    test_menu_import_is_set_based()
+    test_competitor_items_upsert_into_latest_batch()
+    print("Bulk import checks passed")
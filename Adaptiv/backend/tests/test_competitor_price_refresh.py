@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Checks the Gemini competitor price refresh with a fake model: item searches
+run concurrently (the refresh takes about one batch of searches, not their
+sum), observations are written with one insert, recently refreshed items are
+skipped, another tenant's identical items come from the search cache, and a
+forced refresh searches again and updates the cache.
+Also checks that refreshes share one rate limiter and that refresh status is
+only reported to the task's owner.
+
+Usage:
+    python tests/test_competitor_price_refresh.py
+"""
+
+import os
+import sys
+import time
+from unittest import mock
+
+from fastapi import HTTPException
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from benchmarks.fakes import FakeGeminiModel
+from conftest import memory_session
+from routers.gemini_competitor_search import get_update_all_competitors_status, refresh_task_prefix
+from services.competitor_service import CompetitorService, RateLimiter, gemini_rate_limiter
+from services.web_search_service import WebSearchCache
+
+ITEMS = [f"Drink {n}" for n in range(24)]
+
+
+def make_db():
+    db, statements = memory_session()
+    users = [models.User(email=f"gemini{n}@test.local", hashed_password="x") for n in range(2)]
+    db.add_all(users)
+    db.flush()
+    for user in users:
+        db.add_all(models.Item(user_id=user.id, name=name, current_price=4.0) for name in ITEMS)
+    db.commit()
+    return db, [user.id for user in users], statements
+
+
+def test_refresh_is_concurrent_memoized_and_bulk_written():
+    db, (first, second), statements = make_db()
+    gemini = FakeGeminiModel(latency=0.2)
+    service = CompetitorService(db)
+    service.model = gemini
+    progress = []
+
+    cache = WebSearchCache(use_redis=False)
+    with mock.patch("services.competitor_service.web_search_cache", cache):
+        started = time.perf_counter()
+        statements.clear()
+        result = service.update_competitor_prices(first, progress=lambda done, total: progress.append((done, total)))
+        elapsed = time.perf_counter() - started
+
+        # 24 searches of 0.2s with 8 workers: ~3 rounds instead of 4.8s
+        assert elapsed < 1.5, elapsed
+        assert (result["items_searched"], result["items_updated"], result["total_competitors_found"]) == (24, 24, 48)
+        assert progress[-1] == (24, 24) and len(progress) == 24
+        assert sum(1 for sql in statements if sql.startswith("INSERT")) == 1
+
+        # Same tenant again: everything was refreshed within the interval
+        assert service.update_competitor_prices(first)["items_skipped_recent"] == 24
+
+        # Another tenant with the same menu reuses the cached searches
+        result = service.update_competitor_prices(second)
+        assert len(gemini.prompts) == 24 and result["total_competitors_found"] == 48
+
+        # A forced refresh searches again despite the cached answers, records
+        # the change from the previous observation and refreshes the cache
+        gemini.prompts.clear()
+        service.update_competitor_prices(first, force=True)
+        assert len(gemini.prompts) == 24 and cache.stats()["misses"] == 48
+        service._search_item("Drink 1")
+        assert len(gemini.prompts) == 24
+
+    data = service.get_competitor_data("Drink 1", first)
+    assert {row["source"] for row in data} == {"Corner Cafe", "Bean Co"}
+    assert any(row["price_change_from_last"] == 0.0 for row in data)
+    trends = service.get_competitor_trends("Drink 10", first)
+    assert trends["trend_analysis"]["Bean Co"]["trend"] == "stable"
+
+
+def test_limiter_is_shared_across_refreshes_and_processes():
+    assert gemini_rate_limiter() is gemini_rate_limiter()
+
+    # The Redis window is full for the rest of this minute: wait for the next one
+    limiter = RateLimiter(2, shared_key="gemini:test")
+    counts = iter([3, 1])
+    with mock.patch("services.competitor_service.redis_client.increment_counter", side_effect=lambda *a, **k: next(counts)), \
+            mock.patch("services.competitor_service.time.sleep") as sleep:
+        limiter.acquire()
+    assert sleep.call_count == 1 and 0 < sleep.call_args[0][0] <= 60
+
+
+def test_status_is_only_reported_to_the_owner():
+    db, (first, second), _ = make_db()
+    owner, other = db.get(models.User, first), db.get(models.User, second)
+    task_id = refresh_task_prefix(first) + "abc"
+    failed = mock.Mock(state="FAILURE", info=RuntimeError("Gemini quota exceeded for user@example.com"))
+
+    with mock.patch("routers.gemini_competitor_search.AsyncResult", return_value=failed):
+        assert get_update_all_competitors_status(task_id, current_user=owner)["status"] == "error"
+        try:
+            get_update_all_competitors_status(task_id, current_user=other)
+            assert False, "another user's failed task must not be reported"
+        except HTTPException as e:
+            assert e.status_code == 404
+
+
+if __name__ == "__main__":
+    test_refresh_is_concurrent_memoized_and_bulk_written()
+    test_limiter_is_shared_across_refreshes_and_processes()
+    test_status_is_only_reported_to_the_owner()
+    print("Competitor price refresh checks passed")
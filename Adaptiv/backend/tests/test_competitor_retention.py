@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Checks competitor item compaction: batches beyond the retention window are
+expired, unchanged items collapse into the row of their first-seen batch,
+the latest batch stays complete, and repeated runs keep collapsed history.
+
+Usage:
+    python tests/test_competitor_retention.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from services.competitor_retention_service import CompetitorRetentionService
+
+START = datetime(2026, 1, 1)
+
+
+def seed(db):
+    user = models.User(email="retention@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    cafe = models.CompetitorEntity(user_id=user.id, name="Cafe")
+    db.add(cafe)
+    db.flush()
+    return cafe.id
+
+
+def add_batch(db, competitor_id, n, prices):
+    db.add_all([
+        models.CompetitorItem(competitor_id=competitor_id, item_name=name, category="Drinks", price=price,
+                              batch_id=f"batch-{n}", sync_timestamp=START + timedelta(days=n))
+        for name, price in prices.items()
+    ])
+    db.commit()
+
+
+def latest_menu(db, competitor_id, n):
+    return {item.item_name: item.price for item in db.query(models.CompetitorItem).filter(
+        models.CompetitorItem.competitor_id == competitor_id,
+        models.CompetitorItem.batch_id == f"batch-{n}"
+    )}
+
+
+def test_collapse_keeps_latest_batch_complete():
+    db, _ = memory_session()
+    competitor_id = seed(db)
+    for n in range(4):
+        # Coffee never changes; tea changes price in batch 2
+        add_batch(db, competitor_id, n, {"Coffee": 3.0, "Tea": 2.0 if n < 2 else 2.5})
+
+    report = CompetitorRetentionService(db).compact(keep_batches=10)
+    assert report["rows_before"] == 8
+    assert report["rows_expired"] == 0
+    # Coffee in batches 1-2 and tea in batch 1 fold into their first-seen rows
+    assert report["rows_collapsed"] == 3
+    assert report["rows_after"] == db.query(models.CompetitorItem).count() == 5
+    assert latest_menu(db, competitor_id, 3) == {"Coffee": 3.0, "Tea": 2.5}
+
+    coffee = db.query(models.CompetitorItem).filter_by(item_name="Coffee", batch_id="batch-0").one()
+    assert coffee.last_seen_at == START + timedelta(days=2)
+
+
+def test_expiry_respects_collapsed_rows_across_runs():
+    db, _ = memory_session()
+    competitor_id = seed(db)
+    service = CompetitorRetentionService(db)
+    for n in range(6):
+        add_batch(db, competitor_id, n, {"Coffee": 3.0, f"Special {n}": 5.0})
+        service.compact(keep_batches=3)
+
+    items = db.query(models.CompetitorItem).all()
+    # Coffee's first-seen row still stands for the retained batches
+    coffee = [item for item in items if item.item_name == "Coffee"]
+    assert sorted(item.batch_id for item in coffee) == ["batch-0", "batch-5"]
+    assert coffee[0].last_seen_at == START + timedelta(days=4)
+    # Specials of expired batches are gone
+    assert sorted(item.item_name for item in items if item.item_name.startswith("Special")) == \
+        ["Special 3", "Special 4", "Special 5"]
+    assert latest_menu(db, competitor_id, 5) == {"Coffee": 3.0, "Special 5": 5.0}
+
+
+def test_dry_run_changes_nothing():
+    db, _ = memory_session()
+    competitor_id = seed(db)
+    for n in range(5):
+        add_batch(db, competitor_id, n, {"Coffee": 3.0})
+
+    report = CompetitorRetentionService(db).compact(keep_batches=2, dry_run=True)
+    assert report["rows_expired"] == 3
+    assert report["bytes_before"] is not None
+    assert db.query(models.CompetitorItem).count() == 5
+
+
+if __name__ == "__main__":
+    test_collapse_keeps_latest_batch_complete()
+    test_expiry_respects_collapsed_rows_across_runs()
+    test_dry_run_changes_nothing()
+    print("Competitor retention checks passed")
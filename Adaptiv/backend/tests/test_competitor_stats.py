@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Checks the latest-batch competitor stats: older scrape batches are ignored,
+all competitors are computed in one grouped query, and the cached result is
+reused without touching the database until a new batch is written or a
+competitor or item is edited, in this process or (through the Redis version
+counter, faked here) in another one.
+
+Usage:
+    python tests/test_competitor_stats.py
+"""
+
+import os
+import sys
+from datetime import datetime
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+import schemas
+from conftest import memory_session
+from routers.competitor_items import update_competitor_item
+from services.cache_service import cache_service
+from services.competitor_entity_service import CompetitorEntityService
+from services.competitor_stats_service import VERSION_KEY, CompetitorStatsService
+
+
+class FakeCounters:
+    """The counter half of RedisClient, shared by every "process" in a test"""
+
+    def __init__(self):
+        self.values = {}
+
+    def increment_counter(self, key, ttl=None):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def get_counter(self, key):
+        return self.values.get(key, 0)
+
+
+def shared_counters():
+    return mock.patch("services.competitor_stats_service.redis_client", FakeCounters())
+
+
+def add_batch(db, competitor, batch_id, synced_at, prices):
+    """Write a scrape batch the way the scraper does: commit, then invalidate"""
+    db.add_all([
+        models.CompetitorItem(competitor_id=competitor.id, competitor_name=competitor.name,
+                              item_name=f"{category} {n}", category=category, price=price,
+                              batch_id=batch_id, sync_timestamp=synced_at)
+        for n, (category, price) in enumerate(prices)
+    ])
+    db.commit()
+    CompetitorStatsService(db).invalidate(competitor.user_id)
+
+
+def seed(db):
+    user = models.User(email="stats@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    cafe = models.CompetitorEntity(user_id=user.id, name="Cafe", is_selected=True)
+    bakery = models.CompetitorEntity(user_id=user.id, name="Bakery", is_selected=False)
+    empty = models.CompetitorEntity(user_id=user.id, name="Not scraped yet", is_selected=False)
+    db.add_all([cafe, bakery, empty])
+    db.flush()
+
+    old, new = datetime(2026, 1, 1), datetime(2026, 2, 1)
+    add_batch(db, cafe, "cafe-1", old, [("Coffee", 1.0), ("Coffee", 1.0), ("Tea", 1.0)])
+    add_batch(db, cafe, "cafe-2", new, [("Coffee", 4.0), ("Coffee", 6.0), ("Pastry", 3.0)])
+    add_batch(db, bakery, "bakery-1", new, [("Bread", 5.0)])
+    return user.id, cafe, bakery, empty
+
+
+def test_latest_batch_only_in_one_query():
+    cache_service.clear()
+    db, statements = memory_session()
+    user_id, cafe, bakery, empty = seed(db)
+
+    statements.clear()
+    with shared_counters():
+        stats = CompetitorStatsService(db).get_user_competitor_stats(user_id)
+    assert len(statements) == 1, len(statements)
+
+    cafe_stats = stats[cafe.id]
+    assert cafe_stats["batch_id"] == "cafe-2"
+    assert cafe_stats["total_items"] == 3
+    assert cafe_stats["price_stats"] == {"min_price": 3.0, "max_price": 6.0, "avg_price": 13.0 / 3}
+    breakdown = {c["category"]: (c["item_count"], c["avg_price"]) for c in cafe_stats["category_breakdown"]}
+    assert breakdown == {"Coffee": (2, 5.0), "Pastry": (1, 3.0)}
+
+    assert stats[bakery.id]["total_items"] == 1
+    assert stats[empty.id]["total_items"] == 0
+    assert stats[empty.id]["category_breakdown"] == []
+
+    summary = CompetitorStatsService(db).get_summary(user_id)
+    assert (summary["total_competitors"], summary["selected_competitors"], summary["total_items"]) == (3, 1, 4)
+
+
+def test_cache_reused_until_new_batch():
+    cache_service.clear()
+    db, statements = memory_session()
+    with shared_counters() as counters:
+        user_id, cafe, bakery, _ = seed(db)
+        service = CompetitorStatsService(db)
+        service.get_user_competitor_stats(user_id)
+        bakery_id = bakery.id
+
+        # Cache hits do not query the database
+        statements.clear()
+        assert service.get_competitor_stats(bakery_id, user_id)["total_items"] == 1
+        assert statements == []
+
+        add_batch(db, bakery, "bakery-2", datetime(2026, 3, 1), [("Bread", 6.0), ("Cake", 8.0)])
+        refreshed = service.get_competitor_stats(bakery_id, user_id)
+        assert refreshed["batch_id"] == "bakery-2"
+        assert refreshed["total_items"] == 2
+        assert service.get_competitor_stats(cafe.id, user_id + 1) is None
+
+        # A batch written by another process only bumps the shared version,
+        # leaving this process's entry in place: it is recomputed all the same
+        db.add(models.CompetitorItem(competitor_id=bakery_id, competitor_name="Bakery", item_name="Pie",
+                                     category="Cake", price=9.0, batch_id="bakery-2",
+                                     sync_timestamp=datetime(2026, 3, 1)))
+        db.commit()
+        counters.increment_counter(VERSION_KEY.format(user_id=user_id))
+        assert service.get_competitor_stats(bakery_id, user_id)["total_items"] == 3
+
+
+def test_cache_refreshed_after_edits():
+    cache_service.clear()
+    db, _ = memory_session()
+    with shared_counters():
+        user_id, cafe, bakery, _ = seed(db)
+        service = CompetitorStatsService(db)
+        assert service.get_summary(user_id)["selected_competitors"] == 1
+
+        CompetitorEntityService(db).toggle_competitor_selection(bakery.id, user_id, True)
+        assert service.get_summary(user_id)["selected_competitors"] == 2
+
+        # Item edits through the competitor items API
+        bread = db.query(models.CompetitorItem).filter(models.CompetitorItem.batch_id == "bakery-1").one()
+        update_competitor_item(bread.id, schemas.CompetitorItemUpdate(price=7.0), db=db,
+                               current_user=db.get(models.User, user_id))
+        assert service.get_competitor_stats(bakery.id, user_id)["price_stats"]["max_price"] == 7.0
+
+
+if __name__ == "__main__":
+    test_latest_batch_only_in_one_query()
+    test_cache_reused_until_new_batch()
+    test_cache_refreshed_after_edits()
+    print("Competitor stats checks passed")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Checks the tail-window conversation context loader: the most recent messages
+are returned oldest first, the token budget drops the oldest ones, and the
+rolling summary stands in for messages outside the window.
+
+Usage:
+    python tests/test_conversation_context.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from models.agents import Conversation, ConversationMessage
+from services.conversation_service import ConversationService
+
+
+def seed(messages=200):
+    db, _ = memory_session()
+    user = models.User(email="context@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    conversation = Conversation(user_id=user.id, title="Long chat", is_active=True)
+    db.add(conversation)
+    db.flush()
+    start = datetime(2026, 1, 1)
+    db.add_all([
+        ConversationMessage(conversation_id=conversation.id, role="user" if n % 2 == 0 else "assistant",
+                            content=f"message {n} " + "x" * 40, created_at=start + timedelta(seconds=n))
+        for n in range(messages)
+    ])
+    db.commit()
+    return db, user.id, conversation.id
+
+
+def test_returns_most_recent_messages_in_order():
+    db, user_id, conversation_id = seed()
+    context = ConversationService(db).get_conversation_context(conversation_id, user_id, context_limit=10)
+    assert [m["content"].split()[1] for m in context] == [str(n) for n in range(190, 200)]
+
+
+def test_token_budget_drops_oldest_messages():
+    db, user_id, conversation_id = seed()
+    # Each message is ~14 tokens, so a 45 token budget keeps the newest three
+    context = ConversationService(db).get_conversation_context(
+        conversation_id, user_id, context_limit=10, token_budget=45
+    )
+    assert [m["content"].split()[1] for m in context] == ["197", "198", "199"]
+
+
+def test_rolling_summary_covers_messages_outside_window():
+    db, user_id, conversation_id = seed()
+    service = ConversationService(db)
+    folded = []
+
+    def summarize(previous, messages):
+        folded.extend(messages)
+        return f"{len(folded)} earlier messages"
+
+    service.update_rolling_summary(conversation_id, user_id, summarize, keep_recent=10)
+    assert len(folded) == 190
+    # A second pass has nothing new to fold
+    service.update_rolling_summary(conversation_id, user_id, summarize, keep_recent=10)
+    assert len(folded) == 190
+
+    context = service.get_conversation_context(conversation_id, user_id, context_limit=10)
+    assert context[0]["role"] == "system" and "190 earlier messages" in context[0]["content"]
+    assert len(context) == 11
+
+
+def test_summary_folds_in_batches_without_touching_updated_at():
+    db, user_id, conversation_id = seed(messages=20)
+    service = ConversationService(db)
+    calls = []
+
+    def summarize(previous, messages):
+        calls.append(len(messages))
+        return f"summary of {sum(calls)} messages"
+
+    # Twenty uncovered messages do not exceed fold_after yet
+    service.update_rolling_summary(conversation_id, user_id, summarize, keep_recent=10, fold_after=20)
+    assert calls == []
+
+    service.add_message(conversation_id, user_id, "user", "message 20")
+    touched = service.get_conversation(conversation_id, user_id).updated_at
+    conversation = service.update_rolling_summary(conversation_id, user_id, summarize, keep_recent=10, fold_after=20)
+    assert calls == [11]
+    assert conversation.summary == "summary of 11 messages"
+    # The summary is background bookkeeping: the conversation keeps its place in the list
+    assert conversation.updated_at == touched
+
+
+if __name__ == "__main__":
+    test_returns_most_recent_messages_in_order()
+    test_token_budget_drops_oldest_messages()
+    test_rolling_summary_covers_messages_outside_window()
+    test_summary_folds_in_batches_without_touching_updated_at()
+    print("Conversation context checks passed")
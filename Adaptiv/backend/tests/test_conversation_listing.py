@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Checks the batched conversation listing: stats for a whole page come from one
+grouped query, and keyset pagination walks every conversation exactly once
+(including conversations sharing the same updated_at).
+
+Usage:
+    python tests/test_conversation_listing.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from models.agents import Conversation, ConversationMessage
+from services.conversation_service import ConversationService
+
+AGENTS = ["pricing", "competitor", None]
+
+
+def seed(db, conversations=23):
+    user = models.User(email="listing@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    base = datetime(2026, 1, 1)
+    expected = {}
+    for n in range(conversations):
+        # Pairs of conversations share an updated_at to exercise the id tie-breaker
+        conversation = Conversation(user_id=user.id, title=f"Chat {n}", is_active=True,
+                                    created_at=base, updated_at=base + timedelta(minutes=n // 2))
+        db.add(conversation)
+        db.flush()
+        for m in range(n % 5):
+            db.add(ConversationMessage(conversation_id=conversation.id, role="assistant",
+                                       content=f"message {m}", agent_name=AGENTS[m % len(AGENTS)]))
+        expected[conversation.id] = (n % 5, sorted({AGENTS[m % len(AGENTS)] for m in range(n % 5)} - {None}))
+    db.commit()
+    return user.id, expected
+
+
+def test_listing_uses_constant_queries_and_correct_stats():
+    db, statements = memory_session()
+    user_id, expected = seed(db)
+    service = ConversationService(db)
+
+    statements.clear()
+    page, _ = service.list_conversations_with_stats(user_id, limit=20)
+    assert len(statements) == 2, len(statements)
+
+    for summary in page:
+        count, agents = expected[summary["id"]]
+        assert summary["message_count"] == count
+        assert summary["participating_agents"] == agents
+
+
+def test_keyset_pagination_visits_every_conversation_once():
+    db, _ = memory_session()
+    user_id, expected = seed(db)
+    service = ConversationService(db)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = service.list_conversations_with_stats(user_id, limit=4, cursor=cursor)
+        seen.extend(summary["id"] for summary in page)
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(expected)
+    assert len(seen) == len(set(seen))
+    updated = {c.id: (c.updated_at, c.id) for c in db.query(Conversation).all()}
+    assert [updated[i] for i in seen] == sorted((updated[i] for i in seen), reverse=True)
+
+
+if __name__ == "__main__":
+    test_listing_uses_constant_queries_and_correct_stats()
+    test_keyset_pagination_visits_every_conversation_once()
+    print("Conversation listing checks passed")
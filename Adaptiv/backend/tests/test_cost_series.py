@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Checks the daily cost series: weekly COGS, monthly fixed costs and labour
+are spread over their days, range and bucket totals match a day-by-day
+sum, the dashboard and recipe net margins read from it, and a cached series
+is rebuilt when a cost record changes.
+
+Usage:
+    python tests/test_cost_series.py
+"""
+
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from services.cost_service import CostService
+from services.dashboard_service import DashboardService
+
+
+def make_db():
+    db, _ = memory_session()
+    user = models.User(email="costs@test.local", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return db, user.id
+
+
+def test_series_spreads_costs_and_buckets_by_prefix_sums():
+    db, user_id = make_db()
+    rng = random.Random(7)
+    monday = date.today() - timedelta(days=date.today().weekday() + 70)
+    weeks = {monday + timedelta(weeks=n): rng.randint(300, 900) for n in range(10)}
+    db.add_all(models.COGS(user_id=user_id, week_start_date=datetime.combine(start, datetime.min.time()),
+                           week_end_date=datetime.combine(start + timedelta(days=6), datetime.min.time()),
+                           amount=amount) for start, amount in weeks.items())
+    db.add(models.FixedCost(user_id=user_id, cost_type="Rent", amount=3100, month=1, year=2026))
+    db.add(models.FixedCost(user_id=user_id, cost_type="insurance", amount=280, month=2, year=2026))
+    db.add(models.Employee(user_id=user_id, name="Sam", pay_type="hourly", hourly_rate=20, weekly_hours=35, active=True))
+    db.commit()
+
+    series = CostService(db).get_series(user_id)
+    # Rent carries forward into later months; insurance only counts in February
+    assert round(series.total(date(2026, 3, 1), date(2026, 3, 31), "rent"), 6) == 3100
+    assert round(series.total(date(2026, 2, 1), date(2026, 3, 31), "other_fixed"), 6) == 280
+    assert round(series.total(date(2026, 3, 1), date(2026, 3, 7), "labor"), 6) == 700
+
+    # Bucket totals agree with summing the daily values
+    start, end = monday + timedelta(days=3), monday + timedelta(days=66)
+    daily = series.daily(start, end)
+    for freq in ("day", "week", "month"):
+        buckets = series.bucket_totals(start, end, freq)
+        assert abs(sum(total for _, total in buckets) - daily.sum()) < 1e-6
+    weekly = dict(series.bucket_totals(start, end, "week", "cogs"))
+    assert round(weekly[monday + timedelta(weeks=2)], 6) == weeks[monday + timedelta(weeks=2)]
+    assert round(weekly[monday], 6) == round(weeks[monday] * 4 / 7, 6)
+
+    # Cached until a cost record changes
+    assert CostService(db).get_series(user_id) is series
+    db.add(models.FixedCost(user_id=user_id, cost_type="utilities", amount=400, month=3, year=2026))
+    db.commit()
+    assert CostService(db).get_series(user_id) is not series
+
+
+def test_dashboard_and_recipe_margins_use_series():
+    db, user_id = make_db()
+    week_start = date.today() - timedelta(days=date.today().weekday() + 7)
+    db.add(models.COGS(user_id=user_id, week_start_date=datetime.combine(week_start, datetime.min.time()),
+                       week_end_date=datetime.combine(week_start + timedelta(days=6), datetime.min.time()),
+                       amount=700))
+    db.add(models.Employee(user_id=user_id, name="Alex", pay_type="salary", salary=36500, active=True))
+    item = models.Item(user_id=user_id, name="Latte", category="Coffee", current_price=5.0)
+    db.add(item)
+    db.flush()
+    order = models.Order(user_id=user_id, order_date=datetime.now() - timedelta(days=1), total_amount=50.0)
+    db.add(order)
+    db.flush()
+    db.add(models.OrderItem(order_id=order.id, item_id=item.id, quantity=10, unit_price=5.0))
+    db.commit()
+
+    sales = DashboardService(db).get_sales_data(user_id=user_id, time_frame="1m")["salesByDay"]
+    by_day = {row["date"]: row["totalCost"] for row in sales}
+    assert by_day[week_start.isoformat()] == 100.0 and by_day[(week_start + timedelta(days=7)).isoformat()] == 0.0
+    # Monthly rows only cover months with orders; COGS days are counted in their own month
+    monthly = DashboardService(db).get_sales_data(user_id=user_id, time_frame="1yr")["salesByDay"]
+    order_month = order.order_date.date().replace(day=1)
+    expected = 100.0 * sum(1 for n in range(7) if (week_start + timedelta(days=n)).replace(day=1) == order_month)
+    assert [row["totalCost"] for row in monthly] == [expected]
+
+    fixed = models.Recipe.calculate_fixed_costs(db, user_id)
+    assert round(fixed["total_monthly_fixed_costs"], 6) == 3000 and fixed["total_items_sold"] == 10
+    assert round(fixed["fixed_cost_per_item"], 6) == 300
+
+
+if __name__ == "__main__":
+    test_series_spreads_costs_and_buckets_by_prefix_sums()
+    test_dashboard_and_recipe_margins_use_series()
+    print("Cost series checks passed")
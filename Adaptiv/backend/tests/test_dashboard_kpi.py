@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Checks the dashboard KPI query: the summary comes from a single aggregate
+SELECT with no Order or Item objects loaded into the session, the numbers
+match the orders written, and a tenant without orders gets zeros.
+
+Usage:
+    python tests/test_dashboard_kpi.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from services.analytics_service import AnalyticsService
+from services.dashboard_service import DashboardService
+
+
+def make_db():
+    db, statements = memory_session()
+    users = [models.User(email=f"kpi{n}@test.local", hashed_password="x") for n in range(2)]
+    db.add_all(users)
+    db.commit()
+    return db, [user.id for user in users], statements
+
+
+def test_summary_is_one_aggregate_statement():
+    db, (user_id, other_id), statements = make_db()
+    latte = models.Item(user_id=user_id, name="Latte", category="Coffee", current_price=5.0)
+    scone = models.Item(user_id=user_id, name="Scone", category="Food", current_price=3.0)
+    db.add_all([latte, scone, models.Item(user_id=other_id, name="Mocha", current_price=6.0)])
+    db.flush()
+    now = datetime.now()
+    # Three recent orders and one outside the 30-day window, which only counts towards total_orders
+    for days_ago, lattes, scones in ((1, 1, 2), (5, 2, 0), (20, 0, 3), (60, 9, 0)):
+        order = models.Order(user_id=user_id, order_date=now - timedelta(days=days_ago),
+                             total_amount=lattes * 5.0 + scones * 3.0)
+        db.add(order)
+        db.flush()
+        for item, quantity in ((latte, lattes), (scone, scones)):
+            if quantity:
+                db.add(models.OrderItem(order_id=order.id, item_id=item.id, quantity=quantity, unit_price=item.current_price))
+    db.add(models.Order(user_id=other_id, order_date=now, total_amount=99.0))
+    db.commit()
+    db.expunge_all()
+
+    statements.clear()
+    summary = DashboardService(db).get_dashboard_summary(user_id)
+    assert len(statements) == 1 and statements[0].lstrip().upper().startswith("SELECT")
+    assert len(db.identity_map) == 0
+    assert summary == {
+        "total_items": 2,
+        "total_orders": 4,
+        "total_revenue_30d": 30.0,
+        "avg_order_value": 10.0,
+        "top_selling_item": "Scone",
+        "recent_orders_count": 3
+    }
+
+    kpis = AnalyticsService(db).get_kpi_summary(user_id, days=90)
+    assert (kpis["recent_orders_count"], kpis["total_revenue"], kpis["top_selling_item"]) == (4, 75.0, "Latte")
+
+
+def test_tenant_without_orders_gets_zeros():
+    db, (user_id, _), _ = make_db()
+    summary = DashboardService(db).get_dashboard_summary(user_id)
+    assert summary == {
+        "total_items": 0,
+        "total_orders": 0,
+        "total_revenue_30d": 0.0,
+        "avg_order_value": 0.0,
+        "top_selling_item": "No sales data",
+        "recent_orders_count": 0
+    }
+
+
+if __name__ == "__main__":
+    test_summary_is_one_aggregate_statement()
+    test_tenant_without_orders_gets_zeros()
+    print("Dashboard KPI checks passed")
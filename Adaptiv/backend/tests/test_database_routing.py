@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Checks engine configuration and read-replica routing in config.database.
+
+Each scenario imports config.database in a fresh interpreter with its own
+environment, using SQLite files as stand-ins for the primary and the replica.
+
+Usage:
+    python tests/test_database_routing.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import inspect
+import json
+from sqlalchemy import text
+from config import database
+from routers.dashboard import get_sales_data
+from fastapi.params import Depends
+
+db = next(database.get_read_db())
+replica_rows = db.execute(text("SELECT name FROM sqlite_master WHERE name = 'replica_marker'")).fetchall()
+dependency = [p.default.dependency for p in inspect.signature(get_sales_data).parameters.values()
+              if isinstance(p.default, Depends) and p.name == 'db'][0]
+print(json.dumps({
+    "primary_url": str(database.engine.url),
+    "read_url": str(database.read_engine.url),
+    "same_engine": database.read_engine is database.engine,
+    "read_session_on_replica": bool(replica_rows),
+    "dashboard_dependency": dependency.__name__,
+    "api_pool": database.pool_settings("api"),
+    "worker_pool": database.pool_settings("worker"),
+}))
+"""
+
+
+def probe(env_overrides):
+    env = {k: v for k, v in os.environ.items()
+           if not k.startswith("DB_") and k not in ("READ_REPLICA_DATABASE_URL", "DATABASE_ROLE")}
+    env.update(env_overrides)
+    env.setdefault("OPENAI_API_KEY", "test")
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=backend_dir, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_without_replica_reads_use_primary():
+    with tempfile.TemporaryDirectory() as tmp:
+        info = probe({"DATABASE_URL": f"sqlite:///{tmp}/primary.db"})
+    assert info["same_engine"]
+    assert info["read_url"] == info["primary_url"]
+    assert info["dashboard_dependency"] == "get_read_db"
+
+
+def test_replica_url_routes_read_sessions():
+    import sqlite3
+    with tempfile.TemporaryDirectory() as tmp:
+        replica = os.path.join(tmp, "replica.db")
+        sqlite3.connect(replica).execute("CREATE TABLE replica_marker (id INTEGER)").connection.commit()
+        info = probe({
+            "DATABASE_URL": f"sqlite:///{tmp}/primary.db",
+            "READ_REPLICA_DATABASE_URL": f"sqlite:///{replica}",
+        })
+    assert not info["same_engine"]
+    assert info["read_url"].endswith("replica.db")
+    assert info["read_session_on_replica"]
+
+
+def test_pool_settings_per_role_and_overrides():
+    with tempfile.TemporaryDirectory() as tmp:
+        defaults = probe({"DATABASE_URL": f"sqlite:///{tmp}/primary.db"})
+        overridden = probe({"DATABASE_URL": f"sqlite:///{tmp}/primary.db",
+                            "DB_POOL_SIZE": "4", "DB_POOL_RECYCLE": "60", "DB_POOL_PRE_PING": "false"})
+    assert defaults["worker_pool"]["pool_size"] < defaults["api_pool"]["pool_size"]
+    assert defaults["api_pool"]["pool_pre_ping"] is True
+    assert overridden["api_pool"]["pool_size"] == 4
+    assert overridden["worker_pool"]["pool_size"] == 4
+    assert overridden["api_pool"]["pool_recycle"] == 60
+    assert overridden["api_pool"]["pool_pre_ping"] is False
+
+
+if __name__ == "__main__":
+    test_without_replica_reads_use_primary()
+    test_replica_url_routes_read_sessions()
+    test_pool_settings_per_role_and_overrides()
+    print("Database routing checks passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Checks the fleet scheduler in Celery eager mode: tenants are sharded into
+waves, each wave writes a completion report, tenants with unchanged data are
+skipped on the next run, and a data change brings a tenant back. The pricing
+agent itself is replaced by a canned result.
+
+Usage:
+    python tests/test_fleet_scheduler.py
+"""
+
+import os
+import sys
+from datetime import datetime
+from unittest import mock
+
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+import tasks
+from config.celery_config import celery_app, PRIORITY_HIGH, PRIORITY_LOW
+from conftest import memory_engine
+from services.fleet_scheduler_service import FleetSchedulerService
+
+
+def seed(db, tenants=6):
+    users = [models.User(email=f"fleet{n}@test.local", hashed_password="x",
+                         subscription_tier="premium" if n == 0 else "free") for n in range(tenants)]
+    db.add_all(users)
+    db.flush()
+    for user in users:
+        db.add(models.Item(user_id=user.id, name="Latte", current_price=4.0))
+    db.commit()
+    return [user.id for user in users]
+
+
+def fake_analysis(user_id, parameters=None):
+    if user_id == fake_analysis.failing:
+        return {"success": False, "error": "agent failed"}
+    return {"success": True, "pricing_recommendations": [{"item_id": 1}]}
+
+
+def run_fleet(Session, force=False):
+    db = Session()
+    try:
+        service = FleetSchedulerService(db)
+        plan = service.plan(wave_count=3, wave_spacing_minutes=0, force=force)
+        summary = service.dispatch(plan)
+        return plan, summary, [
+            (report.wave, report.tenants, report.succeeded, report.failed, report.skipped)
+            for report in service.get_run_reports(summary["fleet_run_id"])
+        ]
+    finally:
+        db.close()
+
+
+def test_waves_reports_and_change_detection():
+    Session = sessionmaker(bind=memory_engine())
+    db = Session()
+    user_ids = seed(db)
+    fake_analysis.failing = user_ids[1]
+
+    celery_app.conf.task_always_eager = True
+    try:
+        with mock.patch.object(tasks, "SessionLocal", Session), \
+                mock.patch.object(tasks, "run_dynamic_pricing_analysis_task", side_effect=fake_analysis):
+            plan, summary, reports = run_fleet(Session)
+            assert summary["tenants"] == 6
+            # Tenants land in wave user_id % 3, premium tenants first
+            for wave in plan["waves"]:
+                assert all(t["user_id"] % 3 == wave["wave"] for t in wave["tenants"])
+            premium = next(t for w in plan["waves"] for t in w["tenants"] if t["user_id"] == user_ids[0])
+            assert premium["priority"] == PRIORITY_HIGH
+            assert plan["waves"][user_ids[1] % 3]["tenants"][-1]["priority"] == PRIORITY_LOW
+            assert sum(r[2] for r in reports) == 5 and sum(r[3] for r in reports) == 1
+
+            # Nothing changed: only the failed tenant runs again
+            db.add(models.Order(user_id=user_ids[2], order_date=datetime.now(), total_amount=4.0))
+            db.commit()
+            _, summary, reports = run_fleet(Session)
+            assert (summary["tenants"], summary["skipped"]) == (2, 4)
+            assert len(reports) == 3 and sum(r[4] for r in reports) == 4
+
+            states = {run.user_id: run.status for run in db.query(models.TenantJobRun)}
+            assert states[user_ids[1]] == "failed" and states[user_ids[2]] == "success"
+    finally:
+        celery_app.conf.task_always_eager = False
+
+
+def test_in_flight_tenants_are_not_dispatched_twice():
+    Session = sessionmaker(bind=memory_engine())
+    db = Session()
+    user_ids = seed(db, tenants=2)
+    db.add(models.TenantJobRun(user_id=user_ids[0], job="daily_pricing", status="queued", queued_at=datetime.now()))
+    db.commit()
+
+    plan = FleetSchedulerService(db).plan(wave_count=1, force=True)
+    assert [t["user_id"] for t in plan["waves"][0]["tenants"]] == [user_ids[1]]
+    assert plan["waves"][0]["skipped"] == [user_ids[0]]
+
+
+if __name__ == "__main__":
+    test_waves_reports_and_change_detection()
+    test_in_flight_tenants_are_not_dispatched_twice()
+    print("Fleet scheduler checks passed")
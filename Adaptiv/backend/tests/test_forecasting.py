@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Checks the forecasting engine: Holt-Winters recovers a trending weekly
+pattern, incremental updates match fitting the extended series with the same
+parameters, stored models are refreshed incrementally from the database,
+and forecasts are only served (and fitted) for the item's owner.
+
+Usage:
+    python tests/test_forecasting.py
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from fastapi import HTTPException
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from routers.item_analytics import get_item_forecast
+from services.forecast_service import ForecastService, backtest, fit_series, forecast_models, update_models
+
+WEEKLY = np.array([10.0, 12.0, 14.0, 16.0, 30.0, 40.0, 20.0])
+
+
+def series(days, start=date(2026, 1, 5), noise=0.0, seed=0):
+    """Items x days: a flat and a trending weekly pattern, Monday first"""
+    dates = [start + timedelta(days=i) for i in range(days)]
+    pattern = WEEKLY[[d.weekday() for d in dates]]
+    rng = np.random.default_rng(seed)
+    Y = np.vstack([pattern, pattern + 0.2 * np.arange(days)])
+    return dates, Y + rng.normal(0, noise, Y.shape)
+
+
+def test_holt_winters_fits_weekly_pattern():
+    dates, Y = series(120, noise=1.0)
+    report = backtest(Y, dates, holdout=28)
+    assert report["mean_holt_winters_mape"] < 10, report["mean_holt_winters_mape"]
+
+    fitted = fit_series(Y, dates)
+    forecast = forecast_models(fitted, dates[-1], 14)
+    _, future = series(134)
+    assert np.abs(forecast - future[:, 120:]).mean() < 3
+
+
+def test_incremental_update_matches_refolding():
+    dates, Y = series(90, noise=1.0)
+    fitted = fit_series(Y[:, :80], dates[:80], choose_method=False)
+    updated = update_models(fitted, Y[:, 80:], dates[80:])
+
+    # Folding the same days one at a time gives the same state
+    stepwise = fitted
+    for t in range(80, 90):
+        stepwise = update_models(stepwise, Y[:, t:t + 1], dates[t:t + 1])
+    assert np.allclose(updated.level, stepwise.level)
+    assert np.allclose(updated.seasonal, stepwise.seasonal)
+    assert np.array_equal(updated.recent[:, [d.weekday() for d in dates[-7:]]], Y[:, -7:])
+
+
+def test_models_refresh_incrementally():
+    db, _ = memory_session()
+    user = models.User(email="forecast@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    item = models.Item(user_id=user.id, name="Latte", current_price=4.0)
+    db.add(item)
+    db.flush()
+
+    end = date.today() - timedelta(days=1)
+    for offset in range(60):
+        day = end - timedelta(days=offset)
+        order = models.Order(user_id=user.id, order_date=datetime.combine(day, datetime.min.time()) + timedelta(hours=9))
+        db.add(order)
+        db.flush()
+        db.add(models.OrderItem(order_id=order.id, item_id=item.id, quantity=int(WEEKLY[day.weekday()]), unit_price=1.0))
+    db.commit()
+
+    service = ForecastService(db)
+    first = service.refresh_user_models(user.id, as_of=end - timedelta(days=3))
+    assert (first["refitted"], first["updated"]) == (1, 0)
+    second = service.refresh_user_models(user.id, as_of=end)
+    assert (second["refitted"], second["updated"]) == (0, 1)
+
+    forecast = service.get_item_forecast(item.id, user.id)
+    assert forecast["start_date"] == date.today().isoformat()
+    expected = WEEKLY[[(date.today() + timedelta(days=i)).weekday() for i in range(7)]]
+    assert np.abs(np.array(forecast["values"][:7]) - expected).max() < 2
+    assert service.get_item_forecast(item.id, user.id) is forecast
+
+    # Another tenant can neither read the forecast nor fit models for the item
+    other = models.User(email="other@test.local", hashed_password="x")
+    db.add(other)
+    db.commit()
+    assert service.get_item_forecast(item.id, other.id) is None
+    try:
+        get_item_forecast(item.id, db=db, current_user=other)
+        raise AssertionError("forecast of another tenant's item must 404")
+    except HTTPException as e:
+        assert e.status_code == 404
+    assert db.query(models.ItemForecastModel).filter(models.ItemForecastModel.user_id == other.id).count() == 0
+    assert len(get_item_forecast(item.id, db=db, current_user=user)["monthlyData"]) == 10
+
+
+if __name__ == "__main__":
+    test_holt_winters_fits_weekly_pattern()
+    test_incremental_update_matches_refolding()
+    test_models_refresh_incrementally()
+    print("Forecasting checks passed")
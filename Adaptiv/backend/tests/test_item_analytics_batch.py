@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Checks batch item analytics: current and previous window metrics per item
+come from a fixed number of queries regardless of how many items are asked
+for, and competitor matches only include the user's own competitors.
+
+Usage:
+    python tests/test_item_analytics_batch.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from services.item_analytics_service import ItemAnalyticsService
+
+
+def seed(db, items=12):
+    users = [models.User(email=f"batch{n}@test.local", hashed_password="x") for n in range(2)]
+    db.add_all(users)
+    db.flush()
+    user_id, other_id = users[0].id, users[1].id
+
+    menu = [models.Item(user_id=user_id, name=f"Latte {n}", category="Coffee", current_price=4.0) for n in range(items)]
+    db.add_all(menu)
+    db.flush()
+
+    now = datetime.now()
+    for n, item in enumerate(menu):
+        # n units in the current window, 2n in the previous one
+        for when, quantity in ((now - timedelta(days=5), n), (now - timedelta(days=40), 2 * n)):
+            if not quantity:
+                continue
+            order = models.Order(user_id=user_id, order_date=when, total_amount=quantity * 4.0)
+            db.add(order)
+            db.flush()
+            db.add(models.OrderItem(order_id=order.id, item_id=item.id, quantity=quantity, unit_price=4.0))
+
+    mine = models.CompetitorEntity(user_id=user_id, name="Mine")
+    theirs = models.CompetitorEntity(user_id=other_id, name="Theirs")
+    db.add_all([mine, theirs])
+    db.flush()
+    db.add_all([
+        models.CompetitorItem(competitor_id=mine.id, item_name="Latte 1 (large)", price=5.0),
+        models.CompetitorItem(competitor_id=theirs.id, item_name="Latte 1", price=9.0),
+    ])
+    db.commit()
+    return user_id, [item.id for item in menu]
+
+
+def test_window_metrics_per_item():
+    db, _ = memory_session()
+    user_id, item_ids = seed(db)
+    result = ItemAnalyticsService(db).get_batch_item_analytics(user_id, item_ids=[item_ids[3], item_ids[1], 999999])
+
+    assert [entry["item"]["id"] for entry in result["items"]] == [item_ids[3], item_ids[1]]
+    assert result["missing_item_ids"] == [999999]
+
+    latte3 = result["items"][0]
+    assert latte3["sales_analytics"]["total_quantity"] == 3
+    assert latte3["performance_metrics"]["previous_period"] == {"quantity": 6, "revenue": 24.0}
+    assert latte3["performance_metrics"]["growth_rates"]["quantity_growth_percent"] == -50.0
+
+    latte1 = result["items"][1]
+    assert latte1["competitor_analysis"]["competitors_found"] == 1
+    assert latte1["competitor_analysis"]["average_competitor_price"] == 5.0
+
+
+def test_query_count_independent_of_item_count():
+    db, statements = memory_session()
+    user_id, item_ids = seed(db)
+    service = ItemAnalyticsService(db)
+
+    statements.clear()
+    service.get_batch_item_analytics(user_id, item_ids=item_ids[:2])
+    few = len(statements)
+
+    statements.clear()
+    result = service.get_batch_item_analytics(user_id)
+    assert len(result["items"]) == len(item_ids)
+    assert len(statements) == few == 5, (few, len(statements))
+
+
+if __name__ == "__main__":
+    test_window_metrics_per_item()
+    test_query_count_independent_of_item_count()
+    print("Batch item analytics checks passed")
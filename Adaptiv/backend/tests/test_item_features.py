@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Checks the item feature store refresh: the first run computes every item,
+later runs only recompute items touched since their row was refreshed (new
+orders, recommendations, competitor prices or item edits) and rows past
+FEATURE_MAX_AGE, and full=True still recomputes everything.
+
+Usage:
+    python tests/test_item_features.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_session
+from services.item_feature_service import FEATURE_MAX_AGE, ItemFeatureService
+
+
+def seed(db, items=5):
+    user = models.User(email="features@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    menu = [models.Item(user_id=user.id, name=f"Drink {n}", current_price=4.0) for n in range(items)]
+    db.add_all(menu)
+    db.commit()
+    return user.id, [item.id for item in menu]
+
+
+def add_order(db, user_id, item_id, quantity, when):
+    order = models.Order(user_id=user_id, order_date=when, total_amount=4.0 * quantity)
+    db.add(order)
+    db.flush()
+    db.add(models.OrderItem(order_id=order.id, item_id=item_id, quantity=quantity, unit_price=4.0))
+    db.commit()
+
+
+def backdate_features(db, user_id, when):
+    """Pretend the last refresh ran at `when`, before every row seeded so far"""
+    db.query(models.ItemFeature).filter(models.ItemFeature.user_id == user_id).update(
+        {models.ItemFeature.refreshed_at: when}, synchronize_session=False
+    )
+    db.commit()
+
+
+def test_refresh_only_recomputes_touched_items():
+    db, _ = memory_session()
+    user_id, item_ids = seed(db)
+    service = ItemFeatureService(db)
+    assert service.refresh_features(user_id) == len(item_ids)
+    # Nothing changed since the first run
+    assert service.refresh_features(user_id) == 0
+
+    backdate_features(db, user_id, datetime.utcnow() - timedelta(hours=1))
+    add_order(db, user_id, item_ids[0], 3, datetime.utcnow() - timedelta(days=2))
+    db.add(models.PricingRecommendation(
+        user_id=user_id, item_id=item_ids[1], batch_id="b1", current_price=4.0, recommended_price=4.5,
+        price_change_amount=0.5, price_change_percent=12.5
+    ))
+    competitor = models.CompetitorEntity(user_id=user_id, name="Bean Co")
+    db.add(competitor)
+    db.flush()
+    db.add(models.CompetitorItem(competitor_id=competitor.id, item_name="drink 2", category="Coffee", price=5.0,
+                                 batch_id="c1", sync_timestamp=datetime.utcnow()))
+    db.commit()
+
+    assert service.refresh_features(user_id) == 3
+    features = service.get_features(user_id)
+    assert features[item_ids[0]]["velocity_7d"] == 3 / 7
+    assert features[item_ids[1]]["recommendation_count"] == 1
+    assert features[item_ids[2]]["competitor_price_avg"] == 5.0
+    assert service.refresh_features(user_id) == 0
+
+    # Old rows are recomputed so the velocity windows keep sliding; full=True recomputes everything
+    backdate_features(db, user_id, datetime.utcnow() - FEATURE_MAX_AGE - timedelta(hours=1))
+    assert service.refresh_features(user_id) == len(item_ids)
+    assert service.refresh_features(user_id, full=True) == len(item_ids)
+
+
+def test_elasticities_are_always_written():
+    db, _ = memory_session()
+    user_id, item_ids = seed(db, items=3)
+    service = ItemFeatureService(db)
+    service.refresh_features(user_id)
+
+    written = service.refresh_features(user_id, elasticities={item_ids[2]: {"elasticity": -1.4, "confidence": 0.8}})
+    assert written == 1
+    assert service.get_features(user_id)[item_ids[2]]["elasticity"] == -1.4
+
+
+if __name__ == "__main__":
+    test_refresh_only_recomputes_touched_items()
+    test_elasticities_are_always_written()
+    print("Item feature checks passed")
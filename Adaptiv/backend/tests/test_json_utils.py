@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Checks the orjson serialization layer: NumPy values, dates and non-string
+keys encode like the old recursive conversion did, ORJSONResponse renders
+them, and JSON columns accept NumPy values directly.
+
+Usage:
+    python tests/test_json_utils.py
+"""
+
+import json
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from config.database import Base, create_db_engine
+from utils.data_utils import convert_numpy_to_python
+from utils.json_utils import ORJSONResponse, json_dumps, to_jsonable
+
+
+PAYLOAD = {
+    "elasticity": np.float64(-1.25),
+    "orders": np.int64(42),
+    "significant": np.bool_(True),
+    "daily": np.array([1.5, 2.0, 3.25]),
+    "matrix": np.arange(4, dtype=np.int32).reshape(2, 2),
+    "price": Decimal("4.50"),
+    "as_of": date(2026, 3, 1),
+    "by_item": {7: {"momentum": np.float32(0.5)}},
+}
+
+
+def test_matches_legacy_conversion():
+    expected = json.loads(json.dumps(convert_numpy_to_python(PAYLOAD), default=str))
+    expected["price"] = 4.5
+    assert to_jsonable(PAYLOAD) == expected
+    assert json.loads(ORJSONResponse(PAYLOAD).body) == expected
+    assert json_dumps({"at": datetime(2026, 3, 1, 9, 30)}) == b'{"at":"2026-03-01T09:30:00"}'
+
+
+def test_json_columns_accept_numpy():
+    engine = create_db_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    user = models.User(email="json@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(models.AgentMemory(user_id=user.id, agent_name="test", memory_type="metrics",
+                              content={"lift": np.float64(0.12), "units": np.array([1, 2])}))
+    db.commit()
+    db.expire_all()
+    assert db.query(models.AgentMemory).one().content == {"lift": 0.12, "units": [1, 2]}
+
+
+if __name__ == "__main__":
+    test_matches_legacy_conversion()
+    test_json_columns_accept_numpy()
+    print("JSON utilities checks passed")
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Test the batch menu pipelines against a local fake LLM endpoint.
+
+A small OpenAI-compatible HTTP server answers /v1/chat/completions by echoing
+each "### MENU <id>" section back in standardized form (deduplicated, keeping
+the higher price, for cleanup prompts), so the test runs without network
+access or API keys. It checks that:
+- many restaurants are packed into fewer requests than restaurants
+- requests run concurrently, but never above the configured limit
+- unchanged menus are skipped on the next run, changed ones are reprocessed
+- batch cleanup and extraction route results back to menus keyed by name or URL
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the competitor_analysis directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(backend_dir, 'competitor_analysis'))
+
+from openai import OpenAI
+from menu_database import MenuDatabase
+from menu_batch import pack_batches
+from restaurant_menu_scraper import MenuScraper
+
+RESTAURANTS = 12
+ITEMS_PER_RESTAURANT = 15
+MAX_CONCURRENCY = 3
+
+
+class FakeLLMState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+def make_handler(state: FakeLLMState):
+    class FakeLLMHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            prompt = body['messages'][0]['content']
+
+            with state.lock:
+                state.requests += 1
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            time.sleep(0.05)  # Simulate model latency so requests overlap
+
+            # Only the section bodies after the instructions are menu data
+            lines = prompt.split('\n')
+            first_header = next(i for i, line in enumerate(lines) if re.match(r'^### MENU \d+$', line))
+            deduplicate = prompt.startswith('Clean up')
+            output = []
+            for line in lines[first_header:]:
+                if line.startswith('### MENU'):
+                    output.append(line)
+                    seen = {}
+                elif ' - ' in line:
+                    name, price = line.rsplit(' - ', 1)
+                    name, price = name.strip().title(), float(price.lstrip('$'))
+                    if deduplicate and name in seen:
+                        if price <= seen[name]:
+                            continue
+                        output = [entry for entry in output if not entry.startswith(f"{name} - ")]
+                    seen[name] = price
+                    output.append(f"{name} - ${price:.2f}")
+
+            with state.lock:
+                state.in_flight -= 1
+
+            payload = json.dumps({
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body['model'],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "\n".join(output)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeLLMHandler
+
+
+def seed_menus(db: MenuDatabase):
+    search_id = db.create_search_record('cafe', 'Testville')
+    for r in range(RESTAURANTS):
+        with sqlite3.connect(db.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'INSERT INTO restaurants (name, url, platform) VALUES (?, ?, ?)',
+                (f'Cafe {r}', f'https://cafe{r}.example.com/', 'test')
+            )
+            restaurant_id = cursor.lastrowid
+            for i in range(ITEMS_PER_RESTAURANT):
+                cursor.execute(
+                    'INSERT INTO menu_items (restaurant_id, search_id, name, price) VALUES (?, ?, ?, ?)',
+                    (restaurant_id, search_id, f'item {i:02d} of cafe {r}', f'{3 + i * 0.5}')
+                )
+            conn.commit()
+
+
+def test_batch_standardization():
+    state = FakeLLMState()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = MenuDatabase(os.path.join(tmp_dir, 'menus.db'), openai_api_key='test-key')
+            db.openai_client = OpenAI(api_key='test-key', base_url=f'http://127.0.0.1:{server.server_port}/v1')
+            seed_menus(db)
+
+            options = dict(max_batch_tokens=400, max_concurrency=MAX_CONCURRENCY, requests_per_minute=6000)
+
+            # First run: every menu is standardized, in packed concurrent requests
+            results = db.standardize_all_menus(**options)
+            assert results == {'processed': RESTAURANTS, 'successful': RESTAURANTS, 'failed': 0, 'skipped': 0}, results
+            assert 1 < state.requests < RESTAURANTS, f"expected packed requests, got {state.requests}"
+            assert 1 < state.max_in_flight <= MAX_CONCURRENCY, f"max in flight {state.max_in_flight}"
+
+            with sqlite3.connect(db.db_path) as conn:
+                name, price = conn.execute(
+                    "SELECT name, price FROM menu_items WHERE name LIKE 'Item 01 Of Cafe 0'"
+                ).fetchone()
+            assert (name, price) == ('Item 01 Of Cafe 0', '$3.50'), (name, price)
+
+            # Second run: nothing changed, so no requests are sent
+            first_run_requests = state.requests
+            results = db.standardize_all_menus(**options)
+            assert results['skipped'] == RESTAURANTS and results['processed'] == 0, results
+            assert state.requests == first_run_requests
+
+            # Change one menu: only that restaurant is reprocessed
+            with sqlite3.connect(db.db_path) as conn:
+                conn.execute("UPDATE menu_items SET price = '9' WHERE name = 'Item 03 Of Cafe 5'")
+                conn.commit()
+            results = db.standardize_all_menus(**options)
+            assert results == {'processed': 1, 'successful': 1, 'failed': 0, 'skipped': RESTAURANTS - 1}, results
+            assert state.requests == first_run_requests + 1
+
+            print(f"✅ {RESTAURANTS} menus standardized in {first_run_requests} requests "
+                  f"(max {state.max_in_flight} concurrent); unchanged menus skipped")
+    finally:
+        server.shutdown()
+
+
+def test_batch_cleanup_and_extraction():
+    state = FakeLLMState()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        scraper = MenuScraper(openai_api_key='test-key')
+        scraper.openai_client = OpenAI(api_key='test-key', base_url=f'http://127.0.0.1:{server.server_port}/v1')
+
+        # Restaurant names contain spaces, which a section header cannot carry
+        menus = {
+            'Blue Bottle Coffee': [{'name': 'latte', 'price': 4.0}, {'name': 'Latte', 'price': 4.5},
+                                   {'name': 'mocha', 'price': 5.0}],
+            'Cafe Luna': [{'name': 'espresso', 'price': 3.0}],
+        }
+        cleaned = scraper.cleanup_menus_with_ai(menus, requests_per_minute=6000)
+        assert cleaned == {
+            'Blue Bottle Coffee': [{'name': 'Latte', 'price': 4.5, 'description': '', 'category': ''},
+                                   {'name': 'Mocha', 'price': 5.0, 'description': '', 'category': ''}],
+            'Cafe Luna': [{'name': 'Espresso', 'price': 3.0, 'description': '', 'category': ''}],
+        }, cleaned
+        assert state.requests == 1 and scraper.api_call_count == 1
+
+        pages = {
+            'https://luna.example.com/menu': "Welcome to Cafe Luna\nEspresso - $3.00\nCroissant - $3.75",
+            'https://luna.example.com/about': "Our story\nOpen daily from 7am",
+        }
+        extracted = scraper.extract_menus_with_openai(pages, requests_per_minute=6000)
+        assert extracted == {
+            'https://luna.example.com/menu': [{'name': 'Espresso', 'price': '$3.00', 'description': ''},
+                                              {'name': 'Croissant', 'price': '$3.75', 'description': ''}],
+            'https://luna.example.com/about': [],
+        }, extracted
+        assert state.requests == 2 and scraper.api_call_count == 2
+    finally:
+        server.shutdown()
+
+
+def test_oversized_menu_is_split():
+    lines = [f"Item {i} - ${i}.00" for i in range(200)]
+    batches = pack_batches({1: lines, 2: lines[:3]}, max_tokens=300)
+    assert len(batches) > 2
+    assert all(len(batch) == 1 and batch[0][0] == 1 for batch in batches[:-1])
+    assert sum(len(chunk) for batch in batches for key, chunk in batch if key == 1) == 200
+
+
+if __name__ == "__main__":
+    test_oversized_menu_is_split()
+    test_batch_standardization()
+    test_batch_cleanup_and_extraction()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Checks the merchant-local order time buckets: orders are bucketed in the
+business timezone when created, the backfill fills (or with force,
+recomputes) older orders, and the hourly and weekday item analytics group by
+the local buckets rather than UTC timestamps. Orders the backfill has not
+reached yet are bucketed by their stored timestamp instead of being dropped.
+
+Usage:
+    python tests/test_order_local_time.py
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import models
+import schemas
+from conftest import memory_session
+from dynamic_pricing_agents.agents.performance_monitor import PerformanceMonitorAgent
+from routers.item_analytics import get_item_hourly_sales, get_item_weekly_sales
+from services.order_service import OrderService
+
+
+def make_db():
+    db, statements = memory_session()
+    user = models.User(email="local@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(models.BusinessProfile(user_id=user.id, business_name="Night Owl", industry="Cafe",
+                                  company_size="1-10", timezone="America/Los_Angeles"))
+    item = models.Item(user_id=user.id, name="Latte", category="Coffee", current_price=4.0)
+    db.add(item)
+    db.commit()
+    return db, user.id, item.id, statements
+
+
+def test_orders_are_bucketed_in_business_timezone():
+    db, user_id, item_id, statements = make_db()
+    service = OrderService(db)
+
+    # 03:30 UTC on Sunday is 19:30 on Saturday in Los Angeles
+    order = service.create_order(schemas.OrderCreate(
+        order_date=datetime(2026, 3, 1, 3, 30, tzinfo=timezone.utc),
+        items=[{"item_id": item_id, "quantity": 2, "unit_price": 4.0}]
+    ), user_id)
+    assert (order.local_date, order.local_hour, order.local_dow) == (date(2026, 2, 28), 19, 6)
+
+    statements.clear()
+    hourly = get_item_hourly_sales(item_id, date="2026-02-28", db=db)
+    assert [row for row in hourly if row["units"]] == [{"hour": "19:00", "units": 2, "sales": 8.0}]
+    assert "local_hour" in statements[-1]
+
+
+def test_backfill_fills_and_recomputes_buckets():
+    db, user_id, item_id, _ = make_db()
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    for hours in range(5):
+        order = models.Order(user_id=user_id, order_date=yesterday - timedelta(hours=hours), total_amount=4.0)
+        db.add(order)
+        db.flush()
+        db.add(models.OrderItem(order_id=order.id, item_id=item_id, quantity=1, unit_price=4.0))
+    db.commit()
+
+    service = OrderService(db)
+    assert service.backfill_local_time_buckets(batch_size=2) == {"users": 1, "orders_updated": 5}
+    assert service.backfill_local_time_buckets() == {"users": 0, "orders_updated": 0}
+    assert sum(row["units"] for row in get_item_weekly_sales(item_id, db=db)) == 5
+
+    # After a timezone change the forced backfill re-buckets every order
+    db.query(models.BusinessProfile).update({"timezone": "Asia/Tokyo"})
+    db.commit()
+    assert service.backfill_local_time_buckets(user_id, force=True)["orders_updated"] == 5
+    local = yesterday.astimezone(timezone(timedelta(hours=9)))
+    newest = db.query(models.Order).order_by(models.Order.order_date.desc()).first()
+    assert (newest.local_date, newest.local_hour) == (local.date(), local.hour)
+
+
+def test_orders_without_buckets_fall_back_to_order_date():
+    db, user_id, item_id, _ = make_db()
+    # Saved before the buckets existed: local_date/hour/dow are NULL
+    yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).replace(hour=15, tzinfo=None)
+    order = models.Order(user_id=user_id, order_date=yesterday, total_amount=12.0)
+    db.add(order)
+    db.flush()
+    db.add(models.OrderItem(order_id=order.id, item_id=item_id, quantity=3, unit_price=4.0))
+    db.commit()
+
+    hourly = get_item_hourly_sales(item_id, date=yesterday.date().isoformat(), db=db)
+    assert [row for row in hourly if row["units"]] == [{"hour": "15:00", "units": 3, "sales": 12.0}]
+    weekly = get_item_weekly_sales(item_id, db=db)
+    assert [row["day_num"] for row in weekly if row["units"]] == [(yesterday.weekday() + 1) % 7]
+
+    windows = PerformanceMonitorAgent()._load_performance_windows(db, user_id)
+    assert windows["current_orders"] == 1 and windows["current_revenue"] == 12.0
+    assert [day["date"] for day in windows["current_daily"]] == [yesterday.date().isoformat()]
+
+
+if __name__ == "__main__":
+    test_orders_are_bucketed_in_business_timezone()
+    test_backfill_fills_and_recomputes_buckets()
+    test_orders_without_buckets_fall_back_to_order_date()
+    print("Order local time bucket checks passed")
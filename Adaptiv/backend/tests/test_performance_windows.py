@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Checks the performance monitor windows on fixture orders with known totals:
+the last 7 days against the 21 days before, baseline averages over all 21
+calendar days (not only the days with orders), per-item trends as the change
+in daily average, and orders outside both windows ignored.
+
+Usage:
+    python tests/test_performance_windows.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import models
+from conftest import memory_session
+from dynamic_pricing_agents.agents.performance_monitor import PerformanceMonitorAgent
+
+NOW = datetime(2026, 3, 29, 12, 0)
+
+
+def seed(db):
+    user = models.User(email="monitor@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    latte = models.Item(user_id=user.id, name="Latte", current_price=4.0)
+    muffin = models.Item(user_id=user.id, name="Muffin", current_price=3.0)
+    cookie = models.Item(user_id=user.id, name="Cookie", current_price=2.5)
+    db.add_all([latte, muffin, cookie])
+    db.flush()
+
+    def sell(item, days_ago, quantity):
+        order = models.Order(user_id=user.id, order_date=NOW - timedelta(days=days_ago, hours=2),
+                             total_amount=quantity * item.current_price)
+        db.add(order)
+        db.flush()
+        db.add(models.OrderItem(order_id=order.id, item_id=item.id, quantity=quantity, unit_price=item.current_price))
+
+    # Latte: 3 a day on 7 of the 21 baseline days (1/day on average), then 2 every day
+    for days_ago in (7, 10, 13, 16, 19, 22, 25):
+        sell(latte, days_ago, 3)
+    for days_ago in range(7):
+        sell(latte, days_ago, 2)
+    # Muffin: three baseline sales, none since; Cookie: one current sale, no baseline
+    for days_ago in (10, 15, 20):
+        sell(muffin, days_ago, 1)
+    sell(cookie, 1, 1)
+    # Older than both windows
+    sell(latte, 30, 50)
+    db.commit()
+    return user.id, latte.id, muffin.id, cookie.id
+
+
+def test_windows_baseline_and_trends():
+    db, statements = memory_session()
+    user_id, latte, muffin, cookie = seed(db)
+    agent = PerformanceMonitorAgent()
+
+    statements.clear()
+    windows = agent._load_performance_windows(db, user_id, now=NOW)
+    # One grouped query per (day, window) and one per item, whatever the order volume
+    order_statements = [sql for sql in statements if "orders" in sql and "GROUP BY" in sql]
+    assert len(order_statements) == 2, order_statements
+
+    assert windows["current_start"] == NOW - timedelta(days=7)
+    assert windows["baseline_start"] == NOW - timedelta(days=28)
+    assert (windows["current_orders"], windows["current_revenue"]) == (8, 58.5)
+    assert (windows["baseline_orders"], windows["baseline_revenue"]) == (10, 93.0)
+    # Nine distinct baseline days had orders (day 10 had both a latte and a muffin)
+    assert len(windows["baseline_daily"]) == 9
+    assert len(windows["current_daily"]) == 7
+
+    baseline = agent._establish_baseline(db, user_id, windows)["summary"]
+    assert abs(baseline["avg_daily_revenue"] - 93.0 / 21) < 1e-9
+    assert abs(baseline["avg_daily_orders"] - 10 / 21) < 1e-9
+
+    current = agent._collect_current_performance(db, user_id, windows)
+    items = current["item_performance"]
+    assert items[str(latte)]["quantity_trend"] == 100.0
+    assert items[str(latte)]["revenue_trend"] == 100.0
+    assert items[str(muffin)]["quantity_trend"] == -100.0
+    assert items[str(cookie)]["quantity_trend"] == 0.0  # No baseline to compare against
+    assert (items[str(latte)]["quantity"], items[str(latte)]["baseline_quantity"]) == (14, 21)
+
+    metrics = agent._calculate_performance_metrics(current, {"summary": baseline})
+    expected = (58.5 / 7 - 93.0 / 21) / (93.0 / 21) * 100
+    assert abs(metrics["revenue"]["change_percent"] - expected) < 1e-9
+
+
+if __name__ == "__main__":
+    test_windows_baseline_and_trends()
+    print("Performance window checks passed")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Checks the per-request SQL query profiler on a small app: statements are
+counted per request only, the Server-Timing header reports them, a statement
+repeated with different parameters is flagged as an N+1 candidate, and the
+per-route rollup served by /api/admin/perf aggregates the requests.
+
+Usage:
+    python tests/test_query_profiler.py
+"""
+
+import os
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from conftest import memory_engine
+from middleware.query_profiler import REPEATED_STATEMENT_THRESHOLD, fingerprint, perf_aggregator, setup_query_profiler
+
+
+def make_client():
+    engine = memory_engine()
+    Session = sessionmaker(bind=engine)
+    app = FastAPI()
+
+    @app.get("/items/{count}")
+    def read_items(count: int):
+        with Session() as db:
+            # One lookup per id: the N+1 shape the profiler should flag
+            for item_id in range(count):
+                db.execute(text("SELECT id FROM items WHERE id = :id"), {"id": item_id}).all()
+        return {"count": count}
+
+    setup_query_profiler(app, engine)
+    return TestClient(app), Session
+
+
+def test_fingerprint_ignores_parameters():
+    assert fingerprint("SELECT * FROM items WHERE id = 5 AND name = 'Latte'") == \
+        fingerprint("SELECT *  FROM items WHERE id = 12 AND name = 'Mocha'")
+    assert fingerprint("SELECT * FROM items WHERE id IN (?, ?, ?)") == fingerprint("SELECT * FROM items WHERE id IN (?)")
+
+
+def test_requests_are_profiled_and_rolled_up():
+    perf_aggregator.reset()
+    client, Session = make_client()
+
+    # Statements outside a request are not recorded
+    with Session() as db:
+        db.query(models.Item).all()
+
+    response = client.get("/items/2")
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+
+    client.get(f"/items/{REPEATED_STATEMENT_THRESHOLD}")
+    routes = perf_aggregator.snapshot()["routes"]
+    assert [route["route"] for route in routes] == ["GET /items/{count}"]
+    route = routes[0]
+    assert route["requests"] == 2 and route["max_queries"] == REPEATED_STATEMENT_THRESHOLD
+    assert route["avg_queries"] == round((2 + REPEATED_STATEMENT_THRESHOLD) / 2, 1)
+    # Only the second request repeated the lookup often enough to be flagged
+    assert route["repeated_statements"] == [{"sql": "SELECT id FROM items WHERE id = ?", "requests": 1}]
+
+
+if __name__ == "__main__":
+    test_fingerprint_ignores_parameters()
+    test_requests_are_profiled_and_rolled_up()
+    print("Query profiler checks passed")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Checks the real-time metrics: the rolling window adds and expires orders
+incrementally, today is compared with yesterday from the retained buckets
+in the business timezone, orders created through OrderService reach the
+metrics without Redis, and the SSE stream's user lookup returns its database
+connection before the stream starts.
+
+Usage:
+    python tests/test_realtime_metrics.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+import pytz
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+import schemas
+from config.database import Base
+from conftest import memory_session
+from services.order_service import OrderService
+from routers.auth import create_access_token
+from routers.premium_analytics import get_stream_subscriber
+from services.realtime_metrics_service import RollingMetrics, order_event, realtime_metrics_hub
+
+TIMEZONE = "Asia/Tokyo"  # Never the server's timezone in CI
+
+
+def test_rolling_window_expires_orders():
+    tz = pytz.timezone(TIMEZONE)
+    noon = tz.localize(datetime.combine(datetime.now(tz).date(), time(12)))
+    metrics = RollingMetrics()
+    now = noon.timestamp()
+    for minutes_ago, total, items in ((70, 50.0, [(1, "Latte", 5)]),
+                                      (30, 10.0, [(1, "Latte", 2)]),
+                                      (10, 20.0, [(2, "Mocha", 1), (1, "Latte", 1)])):
+        metrics.apply(order_event(minutes_ago, noon - timedelta(minutes=minutes_ago), total, items), now=now)
+    # Same time yesterday: 15.0 before noon, 100.0 after
+    metrics.apply(order_event("y1", noon - timedelta(days=1, hours=2), 15.0, []), now=now)
+    metrics.apply(order_event("y2", noon - timedelta(days=1) + timedelta(hours=2), 100.0, []), now=now)
+
+    snapshot = metrics.snapshot(now, timezone=TIMEZONE)
+    assert (snapshot["current_hour_sales"], snapshot["current_hour_orders"]) == (30.0, 2)
+    assert snapshot["live_metrics"]["avg_order_value"] == 15.0
+    assert [(t["name"], t["orders_last_hour"], t["quantity_last_hour"]) for t in snapshot["trending_items"]] == \
+        [("Latte", 2, 3), ("Mocha", 1, 1)]
+    assert snapshot["live_metrics"]["sales_today"] == 80.0
+    assert snapshot["live_metrics"]["sales_vs_yesterday"] == "+433%"
+    assert snapshot["live_metrics"]["busiest_time_today"] == "10:00 AM"
+
+    later = metrics.snapshot(now + 3600, timezone=TIMEZONE)
+    assert (later["current_hour_sales"], later["current_hour_orders"], later["trending_items"]) == (0.0, 0, [])
+
+
+def test_created_orders_reach_metrics():
+    db, _ = memory_session()
+    user = models.User(email="live@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    latte = models.Item(user_id=user.id, name="Latte", current_price=4.0)
+    db.add(latte)
+    db.commit()
+
+    realtime_metrics_hub.reset()
+    service = OrderService(db)
+    for quantity in (1, 3):
+        service.create_order(schemas.OrderCreate(
+            order_date=datetime.now() - timedelta(minutes=5),
+            items=[schemas.OrderCreateItem(item_id=latte.id, quantity=quantity, unit_price=4.0)]
+        ), user.id)
+
+    metrics = realtime_metrics_hub.get_metrics(user.id)
+    assert (metrics["current_hour_sales"], metrics["current_hour_orders"]) == (16.0, 2)
+    assert metrics["trending_items"][0]["name"] == "Latte"
+
+
+def test_stream_subscriber_releases_its_connection():
+    with tempfile.TemporaryDirectory() as directory:
+        # A file database gets a real connection pool to check
+        engine = create_engine(f"sqlite:///{directory}/stream.db")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        premium = models.User(email="premium@test.local", hashed_password="x", subscription_tier="premium")
+        free = models.User(email="free@test.local", hashed_password="x")
+        db.add_all([premium, free])
+        db.flush()
+        db.add(models.BusinessProfile(user_id=premium.id, business_name="Kissa", industry="Cafe",
+                                      company_size="1-10", timezone=TIMEZONE))
+        db.commit()
+        premium_id = premium.id
+        db.close()
+
+        with mock.patch("routers.premium_analytics.SessionLocal", Session):
+            token = create_access_token({"sub": "premium@test.local", "user_id": premium_id})
+            assert asyncio.run(get_stream_subscriber(token)) == (premium_id, TIMEZONE)
+            assert engine.pool.checkedout() == 0
+
+            try:
+                asyncio.run(get_stream_subscriber(create_access_token({"sub": "free@test.local"})))
+                raise AssertionError("free tier must not stream")
+            except HTTPException as e:
+                assert e.status_code == 403
+            assert engine.pool.checkedout() == 0
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    test_rolling_window_expires_orders()
+    test_created_orders_reach_metrics()
+    test_stream_subscriber_releases_its_connection()
+    print("Real-time metrics checks passed")
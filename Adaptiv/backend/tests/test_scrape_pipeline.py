@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Checks the staged scraping pipeline against an httpx.MockTransport: a page
+cached with an ETag is revalidated and served from disk on 304, requests to
+one host never exceed the per-host limit, and once a stage finds enough menus
+its outstanding fetches are cancelled and later stages never run.
+
+Usage:
+    python tests/test_scrape_pipeline.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import httpx
+
+# Add the competitor_analysis directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(backend_dir, 'competitor_analysis'))
+
+from scrape_pipeline import MIN_MENU_ITEMS, ScrapePipeline, SeleniumPool
+
+MENU_PAGE = "<html><body><ul>" + "".join(f"<li>Dish {n}</li>" for n in range(MIN_MENU_ITEMS + 2)) + "</ul></body></html>"
+NOISE_PAGE = "<html><body><p>Opening hours and directions</p></body></html>"
+
+
+class FakeScraper:
+    """The parts of MenuScraper the pipeline uses; menus are <li> lists, no OpenAI"""
+
+    def __init__(self):
+        self.session = SimpleNamespace(headers={'User-Agent': 'test'})
+        self.openai_client = None
+
+    def _extract_menu_items_generic(self, soup):
+        return [{'name': li.get_text(), 'price': '$4.00', 'description': ''} for li in soup.select('li')]
+
+    def _can_make_api_call(self):
+        return False
+
+
+class FakeDriver:
+    def __init__(self, renders):
+        self.renders = renders
+        self.page_source = MENU_PAGE
+
+    def get(self, url):
+        self.renders.append(url)
+
+    def find_element(self, *args):
+        return True
+
+    def quit(self):
+        pass
+
+
+def make_pipeline(handler, stages=('static_html',), renders=None, **options):
+    pool = SeleniumPool(driver_factory=lambda: FakeDriver(renders if renders is not None else []))
+    return ScrapePipeline(FakeScraper(), transport=httpx.MockTransport(handler), selenium_pool=pool,
+                          stages=stages, **options)
+
+
+def test_not_modified_is_served_from_cache():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get('If-None-Match') == '"v1"':
+            return httpx.Response(304, headers={'ETag': '"v1"'})
+        return httpx.Response(200, headers={'ETag': '"v1"'}, text=MENU_PAGE)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        url = 'https://cafe.example.com/menu'
+        first = make_pipeline(handler, cache_dir=cache_dir)
+        [fresh] = first.scrape_sync([url])
+        assert first.stats.revalidated == 0 and first.stats.bytes_downloaded == len(MENU_PAGE)
+
+        second = make_pipeline(handler, cache_dir=cache_dir)
+        [cached] = second.scrape_sync([url])
+        assert requests[-1].headers['If-None-Match'] == '"v1"'
+        assert (second.stats.requests, second.stats.revalidated, second.stats.bytes_downloaded) == (1, 1, 0)
+        assert cached.menu_items == fresh.menu_items and cached.extractor == 'static_html'
+
+
+def test_per_host_limit():
+    in_flight, peak = {}, {}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        await asyncio.sleep(0.02)
+        in_flight[host] -= 1
+        return httpx.Response(200, text=NOISE_PAGE)
+
+    urls = [f'https://{host}.example.com/page{n}' for host in ('a', 'b') for n in range(6)]
+    pipeline = make_pipeline(handler, cache_dir=None, per_host_limit=2)
+    assert pipeline.scrape_sync(urls) == []
+    assert pipeline.stats.requests == len(urls)
+    assert peak == {'a.example.com': 2, 'b.example.com': 2}, peak
+
+
+def test_enough_menus_cancel_the_rest():
+    menu_urls = {'https://a.example.com/menu', 'https://b.example.com/menu'}
+
+    async def handler(request):
+        if str(request.url) in menu_urls:
+            return httpx.Response(200, text=MENU_PAGE)
+        await asyncio.sleep(5)  # A slow page the pipeline should not wait for
+        return httpx.Response(200, text=NOISE_PAGE)
+
+    renders = []
+    urls = ['https://c.example.com/slow', 'https://a.example.com/menu', 'https://b.example.com/menu']
+    pipeline = make_pipeline(handler, stages=('static_html', 'selenium'), renders=renders, cache_dir=None)
+
+    async def scrape():
+        try:
+            return await asyncio.wait_for(pipeline.scrape(urls, target_menus=2), timeout=2)
+        finally:
+            await pipeline.aclose()
+
+    results = asyncio.run(scrape())
+    assert {result.url for result in results} == menu_urls
+    assert pipeline.stats.cancelled == 1
+    assert renders == [] and 'selenium' not in pipeline.stats.stage_seconds
+
+    # With too few static menus the next stage takes over the remaining URLs
+    pipeline = make_pipeline(lambda request: httpx.Response(200, text=NOISE_PAGE),
+                             stages=('static_html', 'selenium'), renders=renders, cache_dir=None)
+    [result] = pipeline.scrape_sync(['https://d.example.com/'])
+    assert result.extractor == 'selenium' and renders == ['https://d.example.com/']
+
+
+if __name__ == "__main__":
+    test_not_modified_is_served_from_cache()
+    test_per_host_limit()
+    test_enough_menus_cancel_the_rest()
+    print("Scrape pipeline checks passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Checks the Square catalog sync: a full sync follows every catalog page and
+creates one item per variation, later syncs only fetch and write objects
+changed since the previous sync, and rows from older ITEM-keyed syncs are
+adopted rather than duplicated.
+
+Usage:
+    python tests/test_square_catalog_sync.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from benchmarks.fakes import MockSquareAPI, MockSquareService
+from conftest import memory_session
+
+
+def seed(db, catalog_size):
+    user = models.User(email="catalog@test.local", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(models.POSIntegration(user_id=user.id, provider="square", access_token="token"))
+    db.commit()
+    variation_ids = [f"VAR-{n}" for n in range(catalog_size)]
+    now = datetime.now(timezone.utc) - timedelta(hours=1)
+    return user.id, MockSquareAPI(variation_ids, ["LOC-1"], order_count=1, now=now)
+
+
+def user_items(db, user_id):
+    return {item.pos_id: item for item in db.query(models.Item).filter(models.Item.user_id == user_id)}
+
+
+def test_full_then_incremental_sync():
+    db, statements = memory_session()
+    user_id, api = seed(db, 250)
+    service = MockSquareService(db, api)
+
+    statements.clear()
+    first = service.sync_square_catalog(user_id)
+    assert (first["mode"], first["pages_fetched"], first["items_created"]) == ("full", 3, 250)
+    # Queries depend on pages fetched, not on catalog size
+    assert len(statements) < 15, len(statements)
+    assert len(user_items(db, user_id)) == 250
+
+    # Nothing changed: one search page and no writes
+    api.requests = 0
+    second = service.sync_square_catalog(user_id)
+    assert second["mode"] == "incremental"
+    assert (second["items_created"], second["items_updated"]) == (0, 0)
+    assert api.requests == 1
+
+    # A price edit and a new variation on another item
+    api.catalog[5]["item_data"]["variations"][0]["item_variation_data"]["price_money"]["amount"] = 999
+    api.touch(api.catalog[5])
+    api.catalog[7]["item_data"]["variations"].append({
+        "type": "ITEM_VARIATION", "id": "VAR-7-LARGE",
+        "item_variation_data": {"name": "Large", "price_money": {"amount": 600, "currency": "USD"}}
+    })
+    api.touch(api.catalog[7])
+    third = service.sync_square_catalog(user_id)
+    assert (third["items_created"], third["items_updated"]) == (1, 2)
+
+    items = user_items(db, user_id)
+    assert items["VAR-5"].current_price == 9.99
+    assert items["VAR-7"].name == "Item 7 (Regular)"
+    assert (items["VAR-7-LARGE"].name, items["VAR-7-LARGE"].current_price) == ("Item 7 (Large)", 6.0)
+
+
+def test_adopts_item_keyed_rows():
+    db, _ = memory_session()
+    user_id, api = seed(db, 3)
+    legacy = models.Item(user_id=user_id, name="Old name", current_price=1.0, pos_id="ITEM-VAR-1")
+    db.add(legacy)
+    db.commit()
+    legacy_id = legacy.id
+
+    result = MockSquareService(db, api).sync_square_catalog(user_id)
+    assert (result["items_created"], result["items_updated"]) == (2, 1)
+    items = user_items(db, user_id)
+    assert set(items) == {"VAR-0", "VAR-1", "VAR-2"}
+    assert items["VAR-1"].id == legacy_id
+
+
+def test_deleted_items_are_kept():
+    db, _ = memory_session()
+    user_id, api = seed(db, 3)
+    service = MockSquareService(db, api)
+    service.sync_square_catalog(user_id)
+
+    api.catalog[0]["is_deleted"] = True
+    api.touch(api.catalog[0])
+    result = service.sync_square_catalog(user_id)
+    assert result["variations_deleted"] == 1
+    assert "VAR-0" in user_items(db, user_id)
+
+
+if __name__ == "__main__":
+    test_full_then_incremental_sync()
+    test_adopts_item_keyed_rows()
+    test_deleted_items_are_kept()
+    print("Square catalog sync checks passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Checks the agent web search cache against the fake search backend: equivalent
+queries share an entry per search type, concurrent identical searches make
+one backend call, entries expire by type, and hit rates are reported.
+
+Usage:
+    python tests/test_web_search_cache.py
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import FakeSearchBackend
+from services import web_search_service
+from services.langgraph_service_v2 import PricingTools
+from services.web_search_service import WebSearchCache, normalize_query
+
+
+def make_tools(latency=0.0):
+    backend = FakeSearchBackend(latency=latency)
+    cache = WebSearchCache(use_redis=False)
+    return PricingTools(search_backend=backend), backend, cache
+
+
+def test_equivalent_queries_share_results():
+    tools, backend, cache = make_tools()
+    assert normalize_query("Latte prices,  Brooklyn") == normalize_query("brooklyn LATTE prices")
+
+    with mock.patch("services.langgraph_service_v2.web_search_cache", cache):
+        first = tools._search_web_impl("Latte prices, Brooklyn", "pricing")
+        again = tools._search_web_impl("brooklyn latte prices", "pricing")
+        tools._search_web_impl("brooklyn latte prices", "news")
+
+    assert len(backend.calls) == 2
+    assert "Summary for" in first and again.startswith("🔍 Web Search Results for 'brooklyn latte prices'")
+    entry = next(iter(cache._entries.values()))[1]
+    assert "raw_content" not in entry["results"][0] and len(entry["results"][0]["content"]) == 300
+    stats = cache.stats()
+    assert (stats["lookups"], stats["memory_hits"], stats["misses"], stats["hit_rate"]) == (3, 1, 2, 0.3333)
+
+
+def test_concurrent_searches_coalesce_and_expire():
+    tools, backend, cache = make_tools(latency=0.2)
+    with mock.patch("services.langgraph_service_v2.web_search_cache", cache):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            outputs = list(pool.map(lambda _: tools._search_web_impl("cold brew trends", "market_trends"), range(8)))
+        assert len(backend.calls) == 1 and len(set(outputs)) == 1
+        assert cache.stats()["coalesced"] == 7
+
+        # News expires after 30 minutes, market trends are still cached
+        tools._search_web_impl("cold brew trends", "news")
+        with mock.patch.object(web_search_service.time, "time", return_value=web_search_service.time.time() + 3600):
+            tools._search_web_impl("cold brew trends", "news")
+            tools._search_web_impl("cold brew trends", "market_trends")
+        assert len(backend.calls) == 3
+
+
+if __name__ == "__main__":
+    test_equivalent_queries_share_results()
+    test_concurrent_searches_coalesce_and_expire()
+    print("Web search cache checks passed")
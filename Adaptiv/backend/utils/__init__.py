@@ -23,6 +23,13 @@ from .data_utils import (
     merge_dicts,
     flatten_dict
 )
+from .json_utils import (
+    ORJSONResponse,
+    json_dumps,
+    json_dumps_str,
+    json_loads,
+    to_jsonable
+)
 from .validation_utils import (
     validate_email,
     validate_positive_number,
@@ -53,7 +60,8 @@ from .datetime_utils import (
     get_week_start,
     get_month_start,
     get_quarter_start,
-    get_year_start
+    get_year_start,
+    get_local_time_buckets
 )
 from .file_utils import (
     ensure_directory_exists,
@@ -101,6 +109,13 @@ __all__ = [
     "merge_dicts",
     "flatten_dict",
     
+    # JSON utilities
+    "ORJSONResponse",
+    "json_dumps",
+    "json_dumps_str",
+    "json_loads",
+    "to_jsonable",
+    
     # Validation utilities
     "validate_email",
     "validate_positive_number",
@@ -132,6 +147,7 @@ __all__ = [
     "get_month_start",
     "get_quarter_start",
     "get_year_start",
+    "get_local_time_buckets",
     
     # File utilities
     "ensure_directory_exists",
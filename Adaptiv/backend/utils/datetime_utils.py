@@ -2,7 +2,7 @@
 Date and time utilities for the Dynamic Pricing backend.
 """
 from datetime import datetime, date, timedelta, timezone
-from typing import Optional, Union, List
+from typing import Any, Dict, Optional, Union, List
 import pytz
 
 
@@ -276,3 +276,34 @@ def get_year_start(dt: Union[datetime, date]) -> date:
         dt = dt.date()
     
     return dt.replace(month=1, day=1)
+
+
+def get_local_time_buckets(dt: datetime, timezone_str: str = 'US/Eastern') -> Dict[str, Any]:
+    """
+    Get the merchant-local calendar buckets stored on an order.
+    
+    Naive datetimes are treated as UTC, as stored order timestamps are.
+    Unknown timezone names fall back to US/Eastern.
+    
+    Args:
+        dt: Order timestamp
+        timezone_str: Business timezone name (e.g. 'America/Chicago')
+        
+    Returns:
+        Dictionary with local_date, local_hour (0-23) and local_dow
+        (0=Sunday, 6=Saturday, as PostgreSQL's dow)
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    
+    try:
+        target_tz = pytz.timezone(timezone_str or 'US/Eastern')
+    except pytz.UnknownTimeZoneError:
+        target_tz = pytz.timezone('US/Eastern')
+    
+    local = dt.astimezone(target_tz)
+    return {
+        'local_date': local.date(),
+        'local_hour': local.hour,
+        'local_dow': (local.weekday() + 1) % 7
+    }
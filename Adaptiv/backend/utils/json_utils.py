@@ -0,0 +1,67 @@
+"""
+Fast JSON encoding shared by API responses and JSON column writes.
+
+orjson encodes NumPy scalars and arrays, datetimes, dates, UUIDs, enums and
+dataclasses natively, so agent results and analytics payloads no longer
+need a recursive Python pass (convert_numpy_to_python and friends) before
+they can be serialized.
+"""
+from datetime import time
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+import orjson
+from starlette.responses import JSONResponse
+
+# Non-string dict keys (item ids, dates) become strings, as json.dumps does
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not encode itself"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        # Non-contiguous or object arrays
+        return obj.tolist()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, time):
+        return obj.isoformat()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes"""
+    return orjson.dumps(obj, default=_default, option=JSON_OPTIONS)
+
+
+def json_dumps_str(obj: Any) -> str:
+    """Serialize to a JSON string (SQLAlchemy JSON columns, prompts)"""
+    return orjson.dumps(obj, default=_default, option=JSON_OPTIONS).decode()
+
+
+json_loads = orjson.loads
+
+
+def to_jsonable(obj: Any) -> Any:
+    """
+    Deep copy of `obj` made of plain JSON types, via one native encode and
+    decode instead of a recursive walk. Dates become ISO strings and dict
+    keys become strings.
+    """
+    return orjson.loads(orjson.dumps(obj, default=_default, option=JSON_OPTIONS))
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, NumPy and datetime values included"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
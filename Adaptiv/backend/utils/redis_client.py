@@ -5,11 +5,20 @@ Redis client utility for shared state management across processes.
 import redis
 import json
 import os
-from typing import Optional, Dict, Any
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Connection and command timeouts, so an unreachable Redis fails fast
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "2"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+# After a failed connection, wait this long before trying again (doubling up to the max)
+RECONNECT_BACKOFF_SECONDS = 1.0
+RECONNECT_BACKOFF_MAX_SECONDS = 60.0
+
 class RedisClient:
     """Singleton Redis client for consistent connection management."""
     
@@ -19,6 +28,9 @@ class RedisClient:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance._retry_at = 0.0
+            cls._instance._backoff = RECONNECT_BACKOFF_SECONDS
+            cls._instance._connect_lock = threading.Lock()
             cls._instance._initialize()
         return cls._instance
     
@@ -26,19 +38,37 @@ class RedisClient:
         """Initialize Redis connection."""
         try:
             redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-            self._client = redis.from_url(redis_url, decode_responses=True)
+            client = redis.from_url(
+                redis_url,
+                decode_responses=True,
+                socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+                socket_timeout=REDIS_SOCKET_TIMEOUT
+            )
             # Test connection
-            self._client.ping()
+            client.ping()
+            self._client = client
+            self._backoff = RECONNECT_BACKOFF_SECONDS
             logger.info(f"Redis connected successfully to {redis_url}")
         except Exception as e:
-            logger.error(f"Failed to connect to Redis: {e}")
             self._client = None
+            self._retry_at = time.monotonic() + self._backoff
+            logger.error(f"Failed to connect to Redis: {e} (retrying in {self._backoff:.0f}s)")
+            self._backoff = min(self._backoff * 2, RECONNECT_BACKOFF_MAX_SECONDS)
     
     @property
     def client(self) -> Optional[redis.Redis]:
-        """Get Redis client instance."""
-        if self._client is None:
-            self._initialize()
+        """
+        Get Redis client instance, or None while Redis is unavailable.
+        Reconnects are attempted at most once per backoff interval.
+        """
+        if self._client is None and time.monotonic() >= self._retry_at:
+            # One caller reconnects; the others see None until it succeeds
+            if self._connect_lock.acquire(blocking=False):
+                try:
+                    if self._client is None:
+                        self._initialize()
+                finally:
+                    self._connect_lock.release()
         return self._client
     
     def set_sync_progress(self, user_id: int, progress_data: Dict[str, Any], ttl: int = 3600) -> bool:
@@ -113,5 +143,87 @@ class RedisClient:
             logger.error(f"Failed to delete sync progress from Redis: {e}")
             return False
 
+    def add_stream_events(self, key: str, events: List[Dict[str, str]], min_id: Optional[str] = None) -> bool:
+        """
+        Append events to a Redis stream, trimming entries older than `min_id`.
+        
+        Args:
+            key: Stream key
+            events: Flat string-valued event dictionaries
+            min_id: Approximate oldest stream ID to keep
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.client:
+            return False
+        
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for event in events:
+                pipe.xadd(key, event, minid=min_id, approximate=True)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add events to stream {key}: {e}")
+            return False
+    
+    def read_stream_events(self, key: str, after_id: str, min_id: Optional[str] = None) -> Optional[List[Tuple[str, Dict[str, str]]]]:
+        """
+        Read stream entries newer than `after_id` (or, when `min_id` is given,
+        every entry from `min_id` on) without blocking.
+        
+        Returns:
+            List of (entry ID, fields) or None if Redis is unavailable
+        """
+        if not self.client:
+            return None
+        
+        try:
+            if min_id is not None:
+                return self.client.xrange(key, min=min_id)
+            response = self.client.xread({key: after_id})
+            return response[0][1] if response else []
+        except Exception as e:
+            logger.error(f"Failed to read stream {key}: {e}")
+            return None
+    
+    def increment_counter(self, key: str, ttl: Optional[int] = None) -> Optional[int]:
+        """
+        Increment a counter shared by all processes, expiring `ttl` seconds
+        after it was created (never, without a ttl).
+        
+        Returns:
+            The new count or None if Redis is unavailable
+        """
+        if not self.client:
+            return None
+        
+        try:
+            pipe = self.client.pipeline()
+            if ttl is not None:
+                pipe.set(key, 0, ex=ttl, nx=True)
+            pipe.incr(key)
+            return int(pipe.execute()[-1])
+        except Exception as e:
+            logger.error(f"Failed to increment counter {key}: {e}")
+            return None
+    
+    def get_counter(self, key: str) -> Optional[int]:
+        """
+        Current value of a counter shared by all processes.
+        
+        Returns:
+            The count (0 if it was never incremented) or None if Redis is unavailable
+        """
+        if not self.client:
+            return None
+        
+        try:
+            return int(self.client.get(key) or 0)
+        except Exception as e:
+            logger.error(f"Failed to read counter {key}: {e}")
+            return None
+
 # Global instance
 redis_client = RedisClient()
@@ -4,7 +4,7 @@ Validation utilities for the Dynamic Pricing backend.
 import re
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime, date
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
 
 def validate_email(email: str) -> bool:
@@ -81,7 +81,7 @@ def validate_price(price: Any) -> bool:
         if decimal_price.as_tuple().exponent < -2:
             return False
         return True
-    except (ValueError, TypeError, decimal.InvalidOperation):
+    except (ValueError, TypeError, InvalidOperation):
         return False
 
 
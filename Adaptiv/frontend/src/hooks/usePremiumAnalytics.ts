@@ -34,14 +34,18 @@ interface RealTimeMetrics {
   current_hour_sales: number;
   current_hour_orders: number;
   trending_items: Array<{
+    item_id: number;
     name: string;
     orders_last_hour: number;
+    quantity_last_hour: number;
   }>;
   live_metrics: {
     avg_order_value: number;
-    sales_vs_yesterday: string;
-    busiest_time_today: string;
+    sales_today: number;
+    sales_vs_yesterday: string | null;
+    busiest_time_today: string | null;
   };
+  last_event_at: string | null;
 }
 
 interface PremiumAnalyticsHook {